@@ -1,6 +1,7 @@
 """
 Describes subdomains of a scaffold with attached names and terms.
 """
+import math
 import sys
 
 from cmlibs.utils.zinc.general import ChangeManager
@@ -17,6 +18,8 @@ from cmlibs.zinc.field import Field, FieldFiniteElement, FieldGroup, FieldStored
 from cmlibs.zinc.fieldcache import Fieldcache
 from cmlibs.zinc.fieldmodule import Fieldmodule
 from cmlibs.zinc.result import RESULT_OK
+import numpy as np
+from scipy.spatial import cKDTree
 
 
 class AnnotationGroup(object):
@@ -202,6 +205,25 @@ class AnnotationGroup(object):
                     return
             self.createMarkerNode(nodeIdentifier, materialCoordinatesField, materialCoordinates, element, xi)
 
+    def getCopyInRegion(self, region):
+        """
+        Get annotation group with the same term and marker details as this one, for another region containing a copy
+        of this group's model, e.g. read from a file written from it.
+        :param region: Zinc region containing copies of this group and any marker node and fields.
+        :return: AnnotationGroup
+        """
+        annotationGroup = AnnotationGroup(region, (self._name, self._id), isMarker=self._isMarker)
+        annotationGroup._markerIdentifier = self._markerIdentifier
+        if self._materialCoordinatesField:
+            fieldmodule = region.getFieldmodule()
+            annotationGroup._materialCoordinatesField = \
+                fieldmodule.findFieldByName(self._materialCoordinatesField.getName()).castFiniteElement()
+            annotationGroup._markerMaterialCoordinatesField = \
+                fieldmodule.findFieldByName(self._markerMaterialCoordinatesField.getName()).castFiniteElement()
+            assert annotationGroup._materialCoordinatesField.isValid() and \
+                annotationGroup._markerMaterialCoordinatesField.isValid()
+        return annotationGroup
+
     def isMarker(self):
         """
         Query if this annotation group is a created marker node.
@@ -339,7 +361,7 @@ class AnnotationGroup(object):
             fieldcache, self._markerMaterialCoordinatesField.getNumberOfComponents())
         return self._materialCoordinatesField, materialCoordinates
 
-    def setMarkerMaterialCoordinates(self, materialCoordinatesField, materialCoordinates=None):
+    def setMarkerMaterialCoordinates(self, materialCoordinatesField, materialCoordinates=None, meshLocation=None):
         """
         Also updates the marker location when this is assigned, forcing it to be within the mesh.
         Some approximations may occur if the point is outside the mesh - user beware.
@@ -348,6 +370,8 @@ class AnnotationGroup(object):
         of highest dimension mesh.
         :param materialCoordinates: List of material coordinate values to set. If None,
         evaluate materialCoordinatesField at current marker location.
+        :param meshLocation: Optional (element, xi) nearest to materialCoordinates if already found, e.g. with
+        evaluateAnnotationMarkersNearestMeshLocations() for many markers. Only used with materialCoordinates.
         """
         assert self._isMarker and self._markerIdentifier
         if not (self._materialCoordinatesField or materialCoordinatesField):
@@ -377,9 +401,9 @@ class AnnotationGroup(object):
                 revert = False
                 if materialCoordinates:
                     mesh = get_highest_dimension_mesh(fieldmodule)
-                    element, xi = evaluateAnnotationMarkerNearestMeshLocation(
+                    element, xi = meshLocation if meshLocation else evaluateAnnotationMarkerNearestMeshLocation(
                         fieldmodule, fieldcache, materialCoordinates, materialCoordinatesField, mesh)
-                    if element.isValid():
+                    if element and element.isValid():
                         if not isinstance(xi, list):
                             xi = [xi]  # workaround for Zinc 1-D xi being a plain float
                         markerLocation = getAnnotationMarkerLocationField(fieldmodule, mesh)
@@ -673,3 +697,106 @@ def evaluateAnnotationMarkerNearestMeshLocation(fieldmodule: Fieldmodule, fieldc
     if element.isValid():
         return element, xi
     return None, None
+
+
+def evaluateAnnotationMarkersNearestMeshLocations(fieldmodule: Fieldmodule, materialCoordinatesList: list,
+                                                  materialCoordinatesField: Field, mesh: Mesh, maximumDistance=None,
+                                                  candidateElementsCount=8, tolerance=1.0E-6):
+    """
+    Batched version of evaluateAnnotationMarkerNearestMeshLocation for finding many points at once.
+    Centres and radii of elements in materialCoordinatesField are evaluated once into a spatial index, then each
+    point is searched for in the elements with the nearest centres. If not found within tolerance of the point
+    there, elements whose bounding spheres contain the point or are within maximumDistance of it are searched.
+    Only if the point is outside the mesh and maximumDistance is not specified is the whole mesh searched.
+    Assumes called while ChangeManager(fieldmodule) is active.
+    :param fieldmodule: Owning Zinc Fieldmodule.
+    :param materialCoordinatesList: List of material coordinates of each point to find.
+    :param materialCoordinatesField: Material coordinates field defined on highest dimension mesh.
+    :param mesh: Mesh to find locations in.
+    :param maximumDistance: Optional distance beyond which points outside the mesh are not found, for clients only
+    interested in points in or near the mesh. Default None searches the whole mesh for the nearest location.
+    :param candidateElementsCount: Number of elements with nearest centres to search first for each point.
+    :param tolerance: Distance within which the point must be found in candidate elements, relative to the range
+    of element centres.
+    :return: List of (Zinc Element, xi (list)) for each point; (None, None) if not found.
+    """
+    if not materialCoordinatesList:
+        return []
+    dimension = mesh.getDimension()
+    componentsCount = materialCoordinatesField.getNumberOfComponents()
+    fieldcache = fieldmodule.createFieldcache()
+    centreXi = [0.5] * dimension
+    cornerXis = [[(i >> d) & 1 for d in range(dimension)] for i in range(1 << dimension)]
+    elements = []
+    centres = []
+    radii = []
+    elementIter = mesh.createElementiterator()
+    element = elementIter.next()
+    while element.isValid():
+        fieldcache.setMeshLocation(element, centreXi)
+        result, centre = materialCoordinatesField.evaluateReal(fieldcache, componentsCount)
+        if result == RESULT_OK:
+            radius = 0.0
+            for cornerXi in cornerXis:
+                fieldcache.setMeshLocation(element, cornerXi)
+                corner = materialCoordinatesField.evaluateReal(fieldcache, componentsCount)[1]
+                radius = max(radius, sum((corner[c] - centre[c]) ** 2 for c in range(componentsCount)))
+            elements.append(element)
+            centres.append(centre)
+            radii.append(math.sqrt(radius))
+        element = elementIter.next()
+    del elementIter
+    if not elements:
+        return [(None, None)] * len(materialCoordinatesList)
+    centres = np.array(centres, dtype=float).reshape(len(elements), componentsCount)
+    # allow for curved elements bulging out beyond the sphere through their corners
+    radii = 1.5 * np.array(radii)
+    absoluteTolerance = tolerance * max(float(np.max(np.ptp(centres, axis=0))), 1.0)
+    targets = np.array(materialCoordinatesList, dtype=float).reshape(-1, componentsCount)
+    kdtree = cKDTree(centres)
+    candidatesCount = min(candidateElementsCount, len(elements))
+    candidateIndexes = kdtree.query(targets, k=candidatesCount)[1].reshape(len(targets), candidatesCount)
+
+    candidateGroup = fieldmodule.createFieldGroup()
+    candidateMeshGroup = candidateGroup.createMeshGroup(mesh)
+    constCoordinatesField = fieldmodule.createFieldConstant(targets[0].tolist())
+    findMeshLocationField = fieldmodule.createFieldFindMeshLocation(
+        constCoordinatesField, materialCoordinatesField, mesh)
+    findMeshLocationField.setSearchMesh(candidateMeshGroup)
+    findMeshLocationField.setSearchMode(FieldFindMeshLocation.SEARCH_MODE_NEAREST)
+    maximumRadius = float(np.max(radii))
+    reach = maximumDistance if maximumDistance else 0.0
+    locations = []
+    for target, indexes in zip(targets, candidateIndexes):
+        materialCoordinates = target.tolist()
+        assert RESULT_OK == constCoordinatesField.assignReal(fieldcache, materialCoordinates)
+        # search elements with nearest centres, then any others whose bounding spheres are within reach
+        for searchNumber in range(2):
+            if searchNumber == 1:
+                indexes = [index for index in kdtree.query_ball_point(target, maximumRadius + reach)
+                           if np.linalg.norm(centres[index] - target) <= (radii[index] + reach)]
+                if not indexes:
+                    break
+            candidateMeshGroup.removeAllElements()
+            for index in indexes:
+                candidateMeshGroup.addElement(elements[index])
+            fieldcache.clearLocation()
+            element, xi = findMeshLocationField.evaluateMeshLocation(fieldcache, dimension)
+            if element.isValid():
+                if (searchNumber == 1) and maximumDistance:
+                    break
+                fieldcache.setMeshLocation(element, xi if isinstance(xi, list) else [xi])
+                result, x = materialCoordinatesField.evaluateReal(fieldcache, componentsCount)
+                if (result == RESULT_OK) and (np.linalg.norm(np.array(x) - target) <= absoluteTolerance):
+                    break
+            element = xi = None
+        if (element is None) and (maximumDistance is None):
+            # point is outside mesh
+            element, xi = evaluateAnnotationMarkerNearestMeshLocation(
+                    fieldmodule, fieldcache, materialCoordinates, materialCoordinatesField, mesh)
+        locations.append((element, xi))
+    del findMeshLocationField
+    del constCoordinatesField
+    del candidateMeshGroup
+    del candidateGroup
+    return locations
@@ -5,13 +5,13 @@ Generates a 1-D tree of bifurcating curves with radius.
 from __future__ import division
 from math import cos, radians, sin
 
-from cmlibs.maths.vectorops import add, cross, magnitude, mult, normalize, sub
 from cmlibs.utils.zinc.field import findOrCreateFieldCoordinates, findOrCreateFieldFiniteElement
 from cmlibs.utils.zinc.general import ChangeManager
 from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+import numpy as np
 
 
 class MeshType_1d_bifurcationtree1(Scaffold_base):
@@ -155,14 +155,14 @@ class TreeNode:
 class BifurcationTree:
     '''
     Class for generating tree of 1-D bifurcating curves and converting to Zinc model.
+    Tree is generated iteratively breadth-first, with parameters for all nodes in each generation held in arrays, so
+    it scales to deep trees.
     '''
 
     def __init__(self, generationCount, rootLength, rootRadius, forkAngleRadians, forkRadiusRatio, branchArcRadians, branchLengthRatio, branchRadiusRatio):
         '''
         '''
         self._generationCount = generationCount
-        rootDirection = [ 0.0, 0.0, rootLength ]
-        self._rootNode = TreeNode([ 0.0, 0.0, 0.0 ], rootDirection, rootRadius)
         self._forkAngleRadians = forkAngleRadians
         self._cosForkAngle = cos(forkAngleRadians)
         self._sinForkAngle = sin(forkAngleRadians)
@@ -172,51 +172,119 @@ class BifurcationTree:
         self._sinBranchArc = sin(branchArcRadians)
         self._branchLengthRatio = branchLengthRatio
         self._branchRadiusRatio = branchRadiusRatio
-        self._rootNode.addChild(self._createNodeTree(1, rootDirection, rootDirection, rootRadius*branchRadiusRatio, [ 0.0, 1.0, 0.0 ]))
+        # Lists over generations of arrays of node parameters in breadth-first order. Generation 0 is the root node
+        # and generation 1 its only child, after which each node forks with children of node i at 2*i, 2*i + 1.
+        # Version 1 of d1 and r is used by the element from the parent; nodes with children have versions 2 and 3
+        # used by elements to their first and second child.
+        self._x = []  # arrays (nodesCount, 3)
+        self._d1 = []  # arrays (nodesCount, d1VersionsCount, 3)
+        self._r = []  # arrays (nodesCount, rVersionsCount)
+        self._rootNode = None  # TreeNode tree created on demand
+        self._generateTree(rootLength, rootRadius)
 
-    def _createNodeTree(self, generation, x1, d1, r, forkNormal):
+    def _generateTree(self, rootLength, rootRadius):
         '''
-        Create node with specified x1, d1, r and recursively add two child nodes until generationCount.
-        :param forkNormal: Unit direction normal to d1 and child branches.
-        :return: Top node of tree.
+        Calculate node parameters for all generations, vectorized over the nodes in each generation.
         '''
-        node = TreeNode(x1, d1, r)
-        if generation < self._generationCount:
-            branchLength = magnitude(d1)*self._branchLengthRatio
-            main = mult(d1, self._cosForkAngle*self._branchLengthRatio)
-            side = mult(cross(forkNormal, d1), self._sinForkAngle*self._branchLengthRatio)
-            branch1d1 = add(main, side)
-            branch2d1 = sub(main, side)
+        rootDirection = np.array([[ 0.0, 0.0, rootLength ]])
+        self._x.append(np.zeros((1, 3)))
+        self._d1.append(rootDirection[:, np.newaxis, :])
+        self._r.append(np.array([[ rootRadius ]]))
+        x1 = rootDirection
+        d1 = rootDirection
+        r = rootRadius*self._branchRadiusRatio  # same for all nodes in generation
+        forkNormal = np.array([[ 0.0, 1.0, 0.0 ]])  # unit direction normal to d1 and child branches
+        for generation in range(1, self._generationCount):
+            branchLength = np.sqrt(np.sum(d1*d1, axis=1))[:, np.newaxis]*self._branchLengthRatio
+            main = d1*(self._cosForkAngle*self._branchLengthRatio)
+            side = np.cross(forkNormal, d1)*(self._sinForkAngle*self._branchLengthRatio)
+            branch1d1 = main + side
+            branch2d1 = main - side
             if self._branchArcRadians > 0.0:
                 arcr = branchLength/self._branchArcRadians
-                arc2 = mult(branch1d1, arcr/branchLength)
-                arc1 = cross(arc2, forkNormal)
-                arcc = sub(x1, arc1)
-                branch1x2 = add(arcc, add(mult(arc1, self._cosBranchArc), mult(arc2, self._sinBranchArc)))
-                branch1d2 = mult(add(mult(arc1, -self._sinBranchArc), mult(arc2, self._cosBranchArc)), branchLength/arcr)
-                arc2 = mult(branch2d1, arcr/branchLength)
-                arc1 = cross(forkNormal, arc2)
-                arcc = sub(x1, arc1)
-                branch2x2 = add(arcc, add(mult(arc1, self._cosBranchArc), mult(arc2, self._sinBranchArc)))
-                branch2d2 = mult(add(mult(arc1, -self._sinBranchArc), mult(arc2, self._cosBranchArc)), branchLength/arcr)
+                arc2 = branch1d1*(arcr/branchLength)
+                arc1 = np.cross(arc2, forkNormal)
+                arcc = x1 - arc1
+                branch1x2 = arcc + (arc1*self._cosBranchArc + arc2*self._sinBranchArc)
+                branch1d2 = (arc1*-self._sinBranchArc + arc2*self._cosBranchArc)*(branchLength/arcr)
+                arc2 = branch2d1*(arcr/branchLength)
+                arc1 = np.cross(forkNormal, arc2)
+                arcc = x1 - arc1
+                branch2x2 = arcc + (arc1*self._cosBranchArc + arc2*self._sinBranchArc)
+                branch2d2 = (arc1*-self._sinBranchArc + arc2*self._cosBranchArc)*(branchLength/arcr)
             else:
-                branch1x2 = add(x1, branch1d1)
+                branch1x2 = x1 + branch1d1
                 branch1d2 = branch1d1
-                branch2x2 = add(x1, branch2d1)
+                branch2x2 = x1 + branch2d1
                 branch2d2 = branch2d1
-            branch1Normal = normalize(cross(forkNormal, branch1d2))
-            branch2Normal = normalize(cross(forkNormal, branch2d2))
+            branch1Normal = np.cross(forkNormal, branch1d2)
+            branch1Normal /= np.sqrt(np.sum(branch1Normal*branch1Normal, axis=1))[:, np.newaxis]
+            branch2Normal = np.cross(forkNormal, branch2d2)
+            branch2Normal /= np.sqrt(np.sum(branch2Normal*branch2Normal, axis=1))[:, np.newaxis]
             forkRadius = r*self._forkRadiusRatio
-            node.addChild(self._createNodeTree(generation + 1, branch1x2, branch1d2, forkRadius*self._branchRadiusRatio, branch1Normal), branch1d1, forkRadius)
-            node.addChild(self._createNodeTree(generation + 1, branch2x2, branch2d2, forkRadius*self._branchRadiusRatio, branch2Normal), branch2d1, forkRadius)
-        return node
+            nodesCount = len(x1)
+            self._x.append(x1)
+            self._d1.append(np.stack((d1, branch1d1, branch2d1), axis=1))
+            # zero fork radius is not stored as a separate version
+            self._r.append(np.full((nodesCount, 3 if forkRadius else 1), r))
+            if forkRadius:
+                self._r[-1][:, 1:] = forkRadius
+            x1 = np.stack((branch1x2, branch2x2), axis=1).reshape(-1, 3)
+            d1 = np.stack((branch1d2, branch2d2), axis=1).reshape(-1, 3)
+            r = forkRadius*self._branchRadiusRatio
+            forkNormal = np.stack((branch1Normal, branch2Normal), axis=1).reshape(-1, 3)
+        self._x.append(x1)
+        self._d1.append(d1[:, np.newaxis, :])
+        self._r.append(np.full((len(x1), 1), r))
+
+    def _getDepthFirstIndexes(self, generation):
+        '''
+        Get depth-first order of nodes in generation, which is used for numbering nodes and elements.
+        :param generation: Generation number from 0 at root.
+        :return: int64 array of indexes of nodes in depth-first order, in breadth-first order of nodes in generation.
+        '''
+        if generation < 2:
+            return np.array([ generation ], dtype=np.int64)
+        level = generation - 1  # level in binary tree below first generation
+        levelIndexes = np.arange(2**level, dtype=np.int64)
+        indexes = np.full(2**level, generation, dtype=np.int64)
+        for j in range(level):
+            # second child branch at level j skips the first child's subtree
+            subtreeNodesCount = 2**(self._generationCount - j - 1) - 1
+            indexes += ((levelIndexes >> (level - 1 - j)) & 1)*subtreeNodesCount
+        return indexes
 
     def getRootNode(self):
+        '''
+        Get tree of TreeNode objects, created on the first call. Avoid for very deep trees.
+        :return: Root TreeNode.
+        '''
+        if not self._rootNode:
+            parentTreeNodes = None
+            for generation in range(len(self._x)):
+                xList = self._x[generation].tolist()
+                d1List = self._d1[generation].tolist()
+                rList = self._r[generation].tolist()
+                treeNodes = [TreeNode(xList[n], d1List[n][0], rList[n][0]) for n in range(len(xList))]
+                if generation == 0:
+                    self._rootNode = treeNodes[0]
+                elif generation == 1:
+                    parentTreeNodes[0].addChild(treeNodes[0])
+                else:
+                    for n, treeNode in enumerate(treeNodes):
+                        p = n // 2
+                        version = n % 2 + 1
+                        parentTreeNodes[p].addChild(treeNode, parentD1List[p][version],
+                                                    parentRList[p][version] if (len(parentRList[p]) > 1) else None)
+                parentTreeNodes = treeNodes
+                parentD1List = d1List
+                parentRList = rList
         return self._rootNode
 
     def generateZincModel(self, region, nextNodeIdentifier=1, nextElementIdentifier=1):
         '''
         Generate Zinc nodes and elements in region to represent tree.
+        Nodes and elements are created in bulk per generation, but numbered depth-first from the root.
         :return: Final nextNodeIdentifier, nextElementIdentifier.
         '''
         self._fieldmodule = region.getFieldmodule()
@@ -226,13 +294,55 @@ class BifurcationTree:
         self._linearBasis = self._fieldmodule.createElementbasis(1, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
         self._nodetemplates = {}  # indexed by (d1VersionsCount, rVersionsCount)
         self._elementtemplates = {}  # indexed by start (d1Version, rVersion)
+        nodesCount = sum(len(x) for x in self._x)
         with ChangeManager(self._fieldmodule):
             self._coordinates = findOrCreateFieldCoordinates(self._fieldmodule)
             self._radius = findOrCreateFieldFiniteElement(self._fieldmodule, "radius", components_count=1, managed=True)
             self._fieldcache = self._fieldmodule.createFieldcache()
-            parentNode = None
-            nextNodeIdentifier, nextElementIdentifier = self._generateZincModelTree(self._rootNode, parentNode, nextNodeIdentifier, nextElementIdentifier)
-        return nextNodeIdentifier, nextElementIdentifier
+            parentNodeIdentifiers = None
+            for generation in range(len(self._x)):
+                depthFirstIndexes = self._getDepthFirstIndexes(generation)
+                nodeIdentifiers = (depthFirstIndexes + nextNodeIdentifier).tolist()
+                self._generateZincNodes(nodeIdentifiers, self._x[generation], self._d1[generation], self._r[generation])
+                if parentNodeIdentifiers:
+                    elementIdentifiers = (depthFirstIndexes + (nextElementIdentifier - 1)).tolist()
+                    parentRVersionsCount = self._r[generation - 1].shape[1]
+                    for n in range(len(nodeIdentifiers)):
+                        # first generation uses parent version 1, then versions 2, 3 for first, second child
+                        d1Version = 1 if (generation == 1) else (n % 2 + 2)
+                        rVersion = d1Version if (parentRVersionsCount > 1) else 1
+                        elementtemplate = self._getZincElementtemplate(d1Version, rVersion)
+                        element = self._mesh1d.createElement(elementIdentifiers[n], elementtemplate)
+                        elementNodeIdentifiers = [ parentNodeIdentifiers[n // 2], nodeIdentifiers[n] ]
+                        # must set nodes for both efts
+                        for field in ( self._coordinates, self._radius ):
+                            element.setNodesByIdentifier(element.getElementfieldtemplate(field, -1), elementNodeIdentifiers)
+                parentNodeIdentifiers = nodeIdentifiers
+        return nextNodeIdentifier + nodesCount, nextElementIdentifier + nodesCount - 1
+
+    def _generateZincNodes(self, nodeIdentifiers, x, d1, r):
+        '''
+        Create nodes with the same numbers of versions from arrays of parameters.
+        :param nodeIdentifiers: List of node identifiers to create.
+        :param x: Coordinates array (nodesCount, 3).
+        :param d1: Derivative versions array (nodesCount, d1VersionsCount, 3).
+        :param r: Radius versions array (nodesCount, rVersionsCount).
+        '''
+        d1VersionsCount = d1.shape[1]
+        rVersionsCount = r.shape[1]
+        nodetemplate = self._getZincNodetemplate(d1VersionsCount, rVersionsCount)
+        # convert to lists as Zinc does not accept numpy types
+        xList = x.tolist()
+        d1List = d1.tolist()
+        rList = r.tolist()
+        for n in range(len(nodeIdentifiers)):
+            node = self._nodes.createNode(nodeIdentifiers[n], nodetemplate)
+            self._fieldcache.setNode(node)
+            self._coordinates.setNodeParameters(self._fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, xList[n])
+            for i in range(d1VersionsCount):
+                self._coordinates.setNodeParameters(self._fieldcache, -1, Node.VALUE_LABEL_D_DS1, i + 1, d1List[n][i])
+            for i in range(rVersionsCount):
+                self._radius.setNodeParameters(self._fieldcache, -1, Node.VALUE_LABEL_VALUE, i + 1, rList[n][i])
 
     def _getZincNodetemplate(self, d1VersionsCount, rVersionsCount):
         '''
@@ -270,35 +380,3 @@ class BifurcationTree:
             elementtemplate.defineField(self._radius, -1, eftRadius)
             self._elementtemplates[templateId] = elementtemplate
         return elementtemplate
-
-    def _generateZincModelTree(self, treeNode, parentNode, nextNodeIdentifier, nextElementIdentifier):
-        '''
-        :return: Final nextNodeIdentifier, nextElementIdentifier.
-        '''
-        d1VersionsCount = len(treeNode._d1)
-        rVersionsCount = len(treeNode._r)
-        nodetemplate = self._getZincNodetemplate(d1VersionsCount, rVersionsCount)
-        node = self._nodes.createNode(nextNodeIdentifier, nodetemplate)
-        nextNodeIdentifier += 1
-        self._fieldcache.setNode(node)
-        self._coordinates.setNodeParameters(self._fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, treeNode._x)
-        for i in range(d1VersionsCount):
-            self._coordinates.setNodeParameters(self._fieldcache, -1, Node.VALUE_LABEL_D_DS1, i + 1, treeNode._d1[i])
-        for i in range(rVersionsCount):
-            self._radius.setNodeParameters(self._fieldcache, -1, Node.VALUE_LABEL_VALUE, i + 1, treeNode._r[i])
-
-        if parentNode:
-            elementtemplate = self._getZincElementtemplate(treeNode._parent_d1_index + 1, treeNode._parent_r_index + 1)
-            element = self._mesh1d.createElement(nextElementIdentifier, elementtemplate)
-            nextElementIdentifier += 1
-            eftCoordinates = element.getElementfieldtemplate(self._coordinates, -1)
-            eftRadius = element.getElementfieldtemplate(self._radius, -1)
-            # must set node for both efts
-            for eft in ( eftCoordinates, eftRadius ):
-                element.setNode(eft, 1, parentNode)
-                element.setNode(eft, 2, node)
-
-        for childTreeNode in treeNode._children:
-            nextNodeIdentifier, nextElementIdentifier = self._generateZincModelTree(childTreeNode, node, nextNodeIdentifier, nextElementIdentifier)
-
-        return nextNodeIdentifier, nextElementIdentifier
@@ -8,6 +8,7 @@ from cmlibs.utils.zinc.scene import scene_get_selection_group
 from cmlibs.zinc.field import Field, FieldGroup
 from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate
 from scaffoldmaker.utils.networkmesh import NetworkMesh, pathValueLabels
 from scaffoldmaker.utils.interpolation import smoothCurveSideCrossDerivatives
 from scaffoldmaker.utils.zinc_utils import clearRegion, get_nodeset_field_parameters, \
@@ -63,6 +64,15 @@ class MeshType_1d_network_layout1(Scaffold_base):
         dependentChanges = False
         return dependentChanges
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        nodeIdentifiers, versionsCounts, elementNodeIndexes, _ = NetworkMesh(options["Structure"]).getLayoutArrays()
+        nodesCount = len(nodeIdentifiers)
+        # value plus derivatives for each version, doubled if also defining inner coordinates
+        nodeParametersCount = (nodesCount + int(versionsCounts.sum()) * (len(pathValueLabels) - 1)) * 3 * \
+            (2 if options["Define inner coordinates"] else 1)
+        return MeshSizeEstimate(nodesCount, [len(elementNodeIndexes)], nodeParametersCount)
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
@@ -10,6 +10,7 @@ from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.utils.interpolation import smoothCurveSideCrossDerivatives
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate, getStructuredMeshSizes
 from scaffoldmaker.utils.zinc_utils import make_nodeset_derivatives_orthogonal, \
     get_nodeset_path_field_parameters, setPathParameters
 
@@ -53,6 +54,12 @@ class MeshType_1d_path1(Scaffold_base):
 
         return dependentChanges
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        nodesCount, meshSizes = getStructuredMeshSizes([options['Number of elements']])
+        nodeValuesCount = 2 + (2 if options['D2 derivatives'] else 0) + (2 if options['D3 derivatives'] else 0)
+        return MeshSizeEstimate(nodesCount, meshSizes, nodesCount*nodeValuesCount*options['Coordinate dimensions'])
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
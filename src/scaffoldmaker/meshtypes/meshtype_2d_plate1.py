@@ -9,6 +9,7 @@ from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate, getStructuredMeshSizes
 
 
 class MeshType_2d_plate1(Scaffold_base):
@@ -48,6 +49,13 @@ class MeshType_2d_plate1(Scaffold_base):
         if (options['Number of elements 2'] < 1) :
             options['Number of elements 2'] = 1
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        nodesCount, meshSizes = getStructuredMeshSizes(
+            [options['Number of elements 1'], options['Number of elements 2']])
+        nodeValuesCount = 4 if options['Use cross derivatives'] else 3
+        return MeshSizeEstimate(nodesCount, meshSizes, nodesCount*nodeValuesCount*options['Coordinate dimensions'])
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
@@ -11,6 +11,7 @@ from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate, getStructuredMeshSizes
 
 
 class MeshType_2d_tube1(Scaffold_base):
@@ -44,6 +45,13 @@ class MeshType_2d_tube1(Scaffold_base):
         if (options['Number of elements around'] < 2) :
             options['Number of elements around'] = 2
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        nodesCount, meshSizes = getStructuredMeshSizes(
+            [options['Number of elements around'], options['Number of elements along']], periodic=[True, False])
+        nodeValuesCount = 4 if options['Use cross derivatives'] else 3
+        return MeshSizeEstimate(nodesCount, meshSizes, nodesCount*nodeValuesCount*3)
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
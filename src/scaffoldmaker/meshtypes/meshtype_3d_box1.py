@@ -11,6 +11,7 @@ from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate, getStructuredMeshSizes
 
 
 class MeshType_3d_box1(Scaffold_base):
@@ -59,6 +60,18 @@ class MeshType_3d_box1(Scaffold_base):
             if options[key] < 1:
                 options[key] = 1
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        elementsCounts = [options['Number of elements 1'], options['Number of elements 2'],
+                          options['Number of elements 3']]
+        if options['Refine']:
+            elementsCounts = [elementsCounts[i]*options['Refine number of elements ' + str(i + 1)] for i in range(3)]
+            nodeValuesCount = 1  # trilinear
+        else:
+            nodeValuesCount = 8 if options['Use cross derivatives'] else 4
+        nodesCount, meshSizes = getStructuredMeshSizes(elementsCounts)
+        return MeshSizeEstimate(nodesCount, meshSizes, nodesCount*nodeValuesCount*3)
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
@@ -5,6 +5,7 @@ from scaffoldmaker.meshtypes.meshtype_1d_network_layout1 import MeshType_1d_netw
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
 from scaffoldmaker.utils.boxnetworkmesh import BoxNetworkMeshBuilder, BoxNetworkMeshGenerateData
+from scaffoldmaker.utils.networkmesh import NetworkLayoutEstimate
 
 
 class MeshType_3d_boxnetwork1(Scaffold_base):
@@ -84,6 +85,12 @@ class MeshType_3d_boxnetwork1(Scaffold_base):
         dependentChanges = False
         return dependentChanges
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        return BoxNetworkMeshBuilder.getMeshSizeEstimate(
+            NetworkLayoutEstimate(options["Network layout"]), options["Target element density along longest segment"],
+            options["Annotation numbers of elements along"])
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
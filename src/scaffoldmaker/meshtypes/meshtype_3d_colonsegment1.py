@@ -1981,26 +1981,15 @@ def createNodesAndElementsTeniaColi(region,
                                  else get_colon_term("longitudinal muscle layer of colon")))
 
     if closedProximalEnd:
-        elementtemplate3 = mesh.createElementtemplate()
-        elementtemplate3.setElementShapeType(Element.SHAPE_TYPE_CUBE)
         radiansPerElementAround = math.pi * 2.0 / elementsCountAround
 
-        elementtemplate4 = mesh.createElementtemplate()
-        elementtemplate4.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
-        elementtemplate5 = mesh.createElementtemplate()
-        elementtemplate5.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
-        elementtemplate6 = mesh.createElementtemplate()
-        elementtemplate6.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
         # Create apex
         for e3 in range(elementsCountThroughWall):
             for e1 in range(elementsCountAround):
                 va = e1
                 vb = (e1 + 1) % elementsCountAround
-                eft3 = eftfactory.createEftShellPoleBottom(va * 100, vb * 100)
-                elementtemplate3.defineField(coordinates, -1, eft3)
+                eft3 = eftfactory.getEft("createEftShellPoleBottom", va * 100, vb * 100)
+                elementtemplate3 = eftfactory.getElementtemplate(coordinates, eft3)
                 element = mesh.createElement(elementIdentifier, elementtemplate3)
                 bni1 = e3 + 1
                 bni2 = elementsCountThroughWall + 1 + elementsCountAround * e3 + e1 + 1
@@ -2046,12 +2035,12 @@ def createNodesAndElementsTeniaColi(region,
 
             tetrahedralElement = (eTC == int(elementsCountAroundTC * 0.5) - 1)
             if tetrahedralElement:
-                eft4 = eftfactory.createEftTetrahedronXi1One(va * 10000, vb * 10000)
-                elementtemplate4.defineField(coordinates, -1, eft4)
+                eft4 = eftfactory.getEft("createEftTetrahedronXi1One", va * 10000, vb * 10000)
+                elementtemplate4 = eftfactory.getElementtemplate(coordinates, eft4)
                 nodeIdentifiers = [bni21, bni22, bni23, bni31]
             else:
-                eft6 = eftfactory.createEftPyramidBottomSimple(va * 10000, vb * 10000)
-                elementtemplate6.defineField(coordinates, -1, eft6)
+                eft6 = eftfactory.getEft("createEftPyramidBottomSimple", va * 10000, vb * 10000)
+                elementtemplate6 = eftfactory.getElementtemplate(coordinates, eft6)
                 nodeIdentifiers = [bni21, bni22, bni23, bni31, bni31 + 1]
 
             element = \
@@ -2089,24 +2078,24 @@ def createNodesAndElementsTeniaColi(region,
                         int(elementsCountAroundTC * 0.5) + N * (elementsCountAroundTC - 1) + eTC + 1
 
                 if eTC == 0:
-                    eft5 = eftfactory.createEftTetrahedronXi1Zero(va * 10000, vb * 10000)
-                    elementtemplate5.defineField(coordinates, -1, eft5)
+                    eft5 = eftfactory.getEft("createEftTetrahedronXi1Zero", va * 10000, vb * 10000)
+                    elementtemplate5 = eftfactory.getElementtemplate(coordinates, eft5)
                     nodeIdentifiers = [bni21, bni22, bni23, bni31]
                     element = mesh.createElement(elementIdentifier, elementtemplate5)
                     element.setNodesByIdentifier(eft5, nodeIdentifiers)
                     element.setScaleFactors(eft5, scalefactors)
 
                 elif 0 < eTC < elementsCountAroundTC - 1:
-                    eft6 = eftfactory.createEftPyramidBottomSimple(va * 10000, vb * 10000)
-                    elementtemplate6.defineField(coordinates, -1, eft6)
+                    eft6 = eftfactory.getEft("createEftPyramidBottomSimple", va * 10000, vb * 10000)
+                    elementtemplate6 = eftfactory.getElementtemplate(coordinates, eft6)
                     nodeIdentifiers = [bni21, bni22, bni23, bni31 - 1, bni31]
                     element = mesh.createElement(elementIdentifier, elementtemplate6)
                     element.setNodesByIdentifier(eft6, nodeIdentifiers)
                     element.setScaleFactors(eft6, scalefactors)
 
                 else:
-                    eft4 = eftfactory.createEftTetrahedronXi1One(va * 10000, vb * 10000)
-                    elementtemplate4.defineField(coordinates, -1, eft4)
+                    eft4 = eftfactory.getEft("createEftTetrahedronXi1One", va * 10000, vb * 10000)
+                    elementtemplate4 = eftfactory.getElementtemplate(coordinates, eft4)
                     nodeIdentifiers = [bni21, bni22, bni23, bni31 - 1]
                     element = mesh.createElement(elementIdentifier, elementtemplate4)
                     element.setNodesByIdentifier(eft4, nodeIdentifiers)
@@ -2151,12 +2140,12 @@ def createNodesAndElementsTeniaColi(region,
 
             tetrahedralElement = (eTC == 0)
             if tetrahedralElement:
-                eft5 = eftfactory.createEftTetrahedronXi1Zero(va * 10000, vb * 10000)
-                elementtemplate5.defineField(coordinates, -1, eft5)
+                eft5 = eftfactory.getEft("createEftTetrahedronXi1Zero", va * 10000, vb * 10000)
+                elementtemplate5 = eftfactory.getElementtemplate(coordinates, eft5)
                 nodeIdentifiers = [bni21, bni22, bni23, bni31]
             else:
-                eft6 = eftfactory.createEftPyramidBottomSimple(va * 10000, vb * 10000)
-                elementtemplate6.defineField(coordinates, -1, eft6)
+                eft6 = eftfactory.getEft("createEftPyramidBottomSimple", va * 10000, vb * 10000)
+                elementtemplate6 = eftfactory.getElementtemplate(coordinates, eft6)
                 nodeIdentifiers = [bni21, bni22, bni23, bni31, bni32]
 
             element = \
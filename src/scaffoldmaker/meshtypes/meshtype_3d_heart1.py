@@ -101,8 +101,10 @@ class MeshType_3d_heart1(Scaffold_base):
         :return:  True if dependent options changed, otherwise False. This
         happens where two or more options must change together to be valid.
         '''
-        dependentChanges = MeshType_3d_heartventriclesbase1.checkOptions(options) \
-            or MeshType_3d_heartatria1.checkOptions(options)
+        # check both: 'or' would skip the atria checks whenever the ventricles options change
+        ventriclesDependentChanges = MeshType_3d_heartventriclesbase1.checkOptions(options)
+        atriaDependentChanges = MeshType_3d_heartatria1.checkOptions(options)
+        dependentChanges = ventriclesDependentChanges or atriaDependentChanges
         # set dependent outer diameter used in atria2
         options['Aorta outer plus diameter'] = options['LV outlet inner diameter'] + 2.0*options['LV outlet wall thickness']
         return dependentChanges
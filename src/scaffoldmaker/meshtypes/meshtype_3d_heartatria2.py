@@ -1072,9 +1072,8 @@ class MeshType_3d_heartatria2(Scaffold_base):
                 radiansAroundNext = radiansAroundApex + radiansPerElementAroundApex
                 va = e1
                 vb = e1 + 1
-                eft1 = tricubichermite.createEftShellPoleTop(s*100, (s + 1)*100)
-                elementtemplateX.defineField(coordinates, -1, eft1)
-                element = mesh.createElement(elementIdentifier, elementtemplateX)
+                eft1 = tricubichermite.getEft("createEftShellPoleTop", s*100, (s + 1)*100)
+                element = mesh.createElement(elementIdentifier, tricubichermite.getElementtemplate(coordinates, eft1))
                 nodeIdentifiers = [ aNodeId[0][n2][va], aNodeId[0][n2][vb], apexNodeId[0], aNodeId[1][n2][va], aNodeId[1][n2][vb], apexNodeId[1] ]
                 element.setNodesByIdentifier(eft1, nodeIdentifiers)
                 scalefactors = [
@@ -1211,9 +1210,8 @@ class MeshType_3d_heartatria2(Scaffold_base):
         for e1 in range(elementsCountAroundFossa):
             va = e1
             vb = (e1 + 1)%elementsCountAroundFossa
-            eft1 = tricubichermite.createEftShellPoleTop(va*100, vb*100)
-            elementtemplateX.defineField(coordinates, -1, eft1)
-            element = mesh.createElement(elementIdentifier, elementtemplateX)
+            eft1 = tricubichermite.getEft("createEftShellPoleTop", va*100, vb*100)
+            element = mesh.createElement(elementIdentifier, tricubichermite.getElementtemplate(coordinates, eft1))
             nids = [ fossaNodeId[0][va], fossaNodeId[0][vb], fossaCentreNodeId[0], fossaNodeId[1][va], fossaNodeId[1][vb], fossaCentreNodeId[1] ]
             result2 = element.setNodesByIdentifier(eft1, nids)
             radiansAround1 = fossaRadiansAround[va]
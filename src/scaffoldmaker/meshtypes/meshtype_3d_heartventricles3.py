@@ -187,6 +187,10 @@ class MeshType_3d_heartventricles3(Scaffold_base):
             ]:
             if options[key] < 4:
                 options[key] = 4
+        # LV shield needs 4 more elements around than the apex rim
+        if options['Number of elements around LV free wall'] < (options['Number of elements up LV apex'] + 4):
+            options['Number of elements around LV free wall'] = options['Number of elements up LV apex'] + 4
+            dependentChanges = True
         if options['Number of elements across septum'] % 2:
             if 0 == (options['Number of elements around LV free wall'] % 2):
                 options['Number of elements around LV free wall'] += 1
@@ -194,6 +198,9 @@ class MeshType_3d_heartventricles3(Scaffold_base):
             if 0 == (options['Number of elements around RV free wall'] % 2):
                 options['Number of elements around RV free wall'] += 1
                 dependentChanges = True
+        elif options['Number of elements around LV free wall'] % 2:
+            options['Number of elements around LV free wall'] += 1
+            dependentChanges = True
         nas = options['Number of elements across septum']//2
         nal = options['Number of elements around LV free wall']//2 - options['Number of elements up LV apex']
         nar = options['Number of elements around RV free wall']//2
@@ -280,24 +280,17 @@ class MeshType_3d_lung2(Scaffold_base):
         :param options: Dict containing options. See getDefaultOptions().
         :return: list of AnnotationGroup, None
         """
-        # Generate two meshes: geometric[0] and lung[1] coordinates
-        for coordinate in range(2):
+        fm = region.getFieldmodule()
+        coordinates_0 = findOrCreateFieldCoordinates(fm)
+        lung_coordinates = findOrCreateFieldCoordinates(fm, name="lung coordinates")
+        coordinatesFields = [coordinates_0, lung_coordinates]
+
+        # Generate one mesh with geometric[0] and lung[1] coordinates: nodes, elements and groups are created with
+        # the first field, and node parameters are set for each field from its own options
+        for coordinate, coordinates in enumerate(coordinatesFields):
             if coordinate == 0:
-                fm_0 = region.getFieldmodule()
-                coordinates_0 = findOrCreateFieldCoordinates(fm_0)
-                # point reference
-                fm = fm_0
-                coordinates = coordinates_0
-                region_temp = region
                 useOptions = options
             else:
-                region_1 = region.createRegion()
-                fm_1 = region_1.getFieldmodule()
-                coordinates_1 = findOrCreateFieldCoordinates(fm_1, name="lung coordinates")
-                # point reference
-                region = region_1
-                fm = fm_1
-                coordinates = coordinates_1
                 # update material coordinates according to geometric parameters
                 useOptions = copy.deepcopy(cls.materialOptions)
                 useOptions['Number of left lung lobes'] = options['Number of left lung lobes']
@@ -339,30 +332,32 @@ class MeshType_3d_lung2(Scaffold_base):
             rotateRightLung = useOptions['Right lung ventral-medial rotation degrees']
             rotateAccessoryLobe = useOptions['Accessory lobe ventral-left rotation degrees']
 
-            nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-            nodetemplate = nodes.createNodetemplate()
-            nodetemplate.defineField(coordinates)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_VALUE, 1)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
-            nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS3, 1)
-
-            mesh = fm.findMeshByDimension(3)
-
-            eftfactory = eftfactory_tricubichermite(mesh, None)
-            eftRegular = eftfactory.createEftBasic()
-
-            elementtemplateRegular = mesh.createElementtemplate()
-            elementtemplateRegular.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-            elementtemplateRegular.defineField(coordinates, -1, eftRegular)
-
-            elementtemplateCustom = mesh.createElementtemplate()
-            elementtemplateCustom.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
-            ####################
-            # Annotation groups
-            ####################
             if coordinate == 0:
+                nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+                nodetemplate = nodes.createNodetemplate()
+                for field in coordinatesFields:
+                    nodetemplate.defineField(field)
+                    nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_VALUE, 1)
+                    nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_D_DS1, 1)
+                    nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_D_DS2, 1)
+                    nodetemplate.setValueNumberOfVersions(field, -1, Node.VALUE_LABEL_D_DS3, 1)
+
+                mesh = fm.findMeshByDimension(3)
+
+                eftfactory = eftfactory_tricubichermite(mesh, None)
+                eftRegular = eftfactory.createEftBasic()
+
+                elementtemplateRegular = mesh.createElementtemplate()
+                elementtemplateRegular.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+                for field in coordinatesFields:
+                    elementtemplateRegular.defineField(field, -1, eftRegular)
+
+                elementtemplateCustom = mesh.createElementtemplate()
+                elementtemplateCustom.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+
+                ####################
+                # Annotation groups
+                ####################
                 lungGroup = AnnotationGroup(region, get_lung_term("lung"))
                 leftLungGroup = AnnotationGroup(region, get_lung_term("left lung"))
                 annotationGroups = [leftLungGroup, lungGroup]
@@ -476,6 +471,8 @@ class MeshType_3d_lung2(Scaffold_base):
             ###############
             # Create nodes
             ###############
+            # nodes are created with the first coordinates field, and only have parameters set for later fields
+            newNodetemplate = nodetemplate if (coordinate == 0) else None
             nodeIdentifier = 1
             lowerLeftNodeIds = []
             upperLeftNodeIds = []
@@ -486,7 +483,7 @@ class MeshType_3d_lung2(Scaffold_base):
             nodeIdentifier = createLungNodes(
                 spacingBetweenLeftRight, leftDepth, leftWidth, leftHeight,
                 leftObliqueLengthProportion, leftObliqueHeightProportion, horizontalHeightProportion,
-                leftLung, cache, coordinates, nodes, nodetemplate,
+                leftLung, cache, coordinates, nodes, newNodetemplate,
                 mediastinumLeftNodesetGroup, leftMedialLungNodesetGroup,
                 leftLungNodesetGroup, lungNodesetGroup,
                 lElementsCount1, lElementsCount2, lElementsCount3,
@@ -497,7 +494,7 @@ class MeshType_3d_lung2(Scaffold_base):
             nodeIdentifier = createLungNodes(
                 spacingBetweenLeftRight, rightDepth, rightWidth, rightHeight,
                 rightObliqueLengthProportion, rightObliqueHeightProportion, horizontalHeightProportion,
-                rightLung, cache, coordinates, nodes, nodetemplate,
+                rightLung, cache, coordinates, nodes, newNodetemplate,
                 mediastinumRightNodesetGroup, rightMedialLungNodesetGroup,
                 rightLungNodesetGroup, lungNodesetGroup,
                 lElementsCount1, lElementsCount2, lElementsCount3,
@@ -513,7 +510,7 @@ class MeshType_3d_lung2(Scaffold_base):
 
                 # Accessory lobe right lung nodes
                 nodeIdentifier = createAccessorylobeLungNodes(
-                    accessoryLobeBaseMidpointXY, cache, coordinates, nodes, nodetemplate,
+                    accessoryLobeBaseMidpointXY, cache, coordinates, nodes, newNodetemplate,
                     rightLungAccessoryLobeNodesetGroup, lungNodesetGroup,
                     accesssoryLobeElementsCount1, accesssoryLobeElementsCount2, accesssoryLobeElementsCount3,
                     accessoryLobeLength, accessoryLobeDorsalWidth, accessoryLobeDorsalHeight, accessoryLobeVentralWidth,
@@ -522,62 +519,47 @@ class MeshType_3d_lung2(Scaffold_base):
             ##################
             # Create elements
             ##################
-            elementIdentifier = 1
+            if coordinate == 0:
+                elementIdentifier = 1
 
-            if numberOfLeftLung == 2:
-                # Left lung elements
-                elementIdentifier, leftUpperLobeElementID, leftLowerLobeElementID = createLungElements(
-                    coordinates, eftfactory, eftRegular, elementtemplateRegular,
-                    elementtemplateCustom, mesh, lungMeshGroup,
-                    leftLungMeshGroup, lowerLeftLungMeshGroup, None,
-                    upperLeftLungMeshGroup, mediastinumLeftGroupMeshGroup, upperLeftDorsalLungMeshGroup,
-                    lElementsCount1, lElementsCount2, lElementsCount3,
-                    uElementsCount1, uElementsCount2, uElementsCount3,
-                    lowerLeftNodeIds, upperLeftNodeIds, elementIdentifier)
-            else:
-                elementIdentifier, leftUpperLobeElementID, leftLowerLobeElementID = createLungElements(
-                    coordinates, eftfactory, eftRegular, elementtemplateRegular,
+                if numberOfLeftLung == 2:
+                    # Left lung elements
+                    elementIdentifier, leftUpperLobeElementID, leftLowerLobeElementID = createLungElements(
+                        coordinatesFields, eftfactory, eftRegular, elementtemplateRegular,
+                        elementtemplateCustom, mesh, lungMeshGroup,
+                        leftLungMeshGroup, lowerLeftLungMeshGroup, None,
+                        upperLeftLungMeshGroup, mediastinumLeftGroupMeshGroup, upperLeftDorsalLungMeshGroup,
+                        lElementsCount1, lElementsCount2, lElementsCount3,
+                        uElementsCount1, uElementsCount2, uElementsCount3,
+                        lowerLeftNodeIds, upperLeftNodeIds, elementIdentifier)
+                else:
+                    elementIdentifier, leftUpperLobeElementID, leftLowerLobeElementID = createLungElements(
+                        coordinatesFields, eftfactory, eftRegular, elementtemplateRegular,
+                        elementtemplateCustom, mesh, lungMeshGroup,
+                        leftLungMeshGroup, None, None, None,
+                        mediastinumLeftGroupMeshGroup, None,
+                        lElementsCount1, lElementsCount2, lElementsCount3,
+                        uElementsCount1, uElementsCount2, uElementsCount3,
+                        lowerLeftNodeIds, upperLeftNodeIds, elementIdentifier)
+
+                # Right lung elements
+                elementIdentifier, rightUpperLobeElementID, rightLowerLobeElementID = createLungElements(
+                    coordinatesFields, eftfactory, eftRegular, elementtemplateRegular,
                     elementtemplateCustom, mesh, lungMeshGroup,
-                    leftLungMeshGroup, None, None, None,
-                    mediastinumLeftGroupMeshGroup, None,
+                    rightLungMeshGroup, lowerRightLungMeshGroup, middleRightLungMeshGroup,
+                    upperRightLungMeshGroup, mediastinumRightGroupMeshGroup, upperRightDorsalLungMeshGroup,
                     lElementsCount1, lElementsCount2, lElementsCount3,
                     uElementsCount1, uElementsCount2, uElementsCount3,
-                    lowerLeftNodeIds, upperLeftNodeIds, elementIdentifier)
-
-            # Right lung elements
-            elementIdentifier, rightUpperLobeElementID, rightLowerLobeElementID = createLungElements(
-                coordinates, eftfactory, eftRegular, elementtemplateRegular,
-                elementtemplateCustom, mesh, lungMeshGroup,
-                rightLungMeshGroup, lowerRightLungMeshGroup, middleRightLungMeshGroup,
-                upperRightLungMeshGroup, mediastinumRightGroupMeshGroup, upperRightDorsalLungMeshGroup,
-                lElementsCount1, lElementsCount2, lElementsCount3,
-                uElementsCount1, uElementsCount2, uElementsCount3,
-                lowerRightNodeIds, upperRightNodeIds, elementIdentifier)
+                    lowerRightNodeIds, upperRightNodeIds, elementIdentifier)
 
-            if hasAccessoryLobe:
-                # Accessory lobe right lung elements
-                createAccessorylobeLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular,
-                                                elementtemplateCustom, mesh, lungMeshGroup,
-                                                rightLungAccessoryLobeMeshGroup,
-                                                accesssoryLobeElementsCount1, accesssoryLobeElementsCount2,
-                                                accesssoryLobeElementsCount3,
-                                                accessoryLobeNodeIds, elementIdentifier)
-
-            ###########################
-            # Combining two coordinates
-            ###########################
-            if coordinate == 1:
-                sir_1 = region_1.createStreaminformationRegion()
-                srm_1 = sir_1.createStreamresourceMemory()
-                region_1.write(sir_1)
-                buffer = srm_1.getBuffer()[1]
-
-                region = region_temp
-                sir = region.createStreaminformationRegion()
-                srm = sir.createStreamresourceMemoryBuffer(buffer)
-                region.read(sir)
-
-                lung_coordinates = fm_0.findFieldByName("lung coordinates").castFiniteElement()
+                if hasAccessoryLobe:
+                    # Accessory lobe right lung elements
+                    createAccessorylobeLungElements(coordinatesFields, eftfactory, eftRegular, elementtemplateRegular,
+                                                    elementtemplateCustom, mesh, lungMeshGroup,
+                                                    rightLungAccessoryLobeMeshGroup,
+                                                    accesssoryLobeElementsCount1, accesssoryLobeElementsCount2,
+                                                    accesssoryLobeElementsCount3,
+                                                    accessoryLobeNodeIds, elementIdentifier)
 
             ####################################################################
             # Transformation and translation to the left (0) and right lungs (1)
@@ -693,7 +675,7 @@ class MeshType_3d_lung2(Scaffold_base):
             markerList.append({"group": accessoryDorsalRightGroup, "elementId": idx, "xi": [1.0, 0.0, 0.0]})
 
         # Marker point annotations
-        mesh = fm_0.findMeshByDimension(3)
+        mesh = fm.findMeshByDimension(3)
         for marker in markerList:
             annotationGroup = marker["group"]
             markerNode = annotationGroup.createMarkerNode(
@@ -705,13 +687,13 @@ class MeshType_3d_lung2(Scaffold_base):
         if isOpenfissure:
             if numberOfLeftLung > 1:
                 nodeIdentifier, copyIdentifiersLLU = disconnectFieldMeshGroupBoundaryNodes(
-                    [coordinates_0, lung_coordinates], lowerLeftLungMeshGroup, upperLeftLungMeshGroup, nodeIdentifier)
+                    coordinatesFields, lowerLeftLungMeshGroup, upperLeftLungMeshGroup, nodeIdentifier)
             nodeIdentifier, copyIdentifiersRLM = disconnectFieldMeshGroupBoundaryNodes(
-                [coordinates_0, lung_coordinates], lowerRightLungMeshGroup, middleRightLungMeshGroup, nodeIdentifier)
+                coordinatesFields, lowerRightLungMeshGroup, middleRightLungMeshGroup, nodeIdentifier)
             nodeIdentifier, copyIdentifiersRLU = disconnectFieldMeshGroupBoundaryNodes(
-                [coordinates_0, lung_coordinates], lowerRightLungMeshGroup, upperRightLungMeshGroup, nodeIdentifier)
+                coordinatesFields, lowerRightLungMeshGroup, upperRightLungMeshGroup, nodeIdentifier)
             nodeIdentifier, copyIdentifiersRMU = disconnectFieldMeshGroupBoundaryNodes(
-                [coordinates_0, lung_coordinates], middleRightLungMeshGroup, upperRightLungMeshGroup, nodeIdentifier)
+                coordinatesFields, middleRightLungMeshGroup, upperRightLungMeshGroup, nodeIdentifier)
 
         return annotationGroups, None
 
@@ -1049,7 +1031,8 @@ def createLungNodes(spaceFromCentre, lengthUnit, widthUnit, heightUnit,
     :param cache:
     :param coordinates:
     :param nodes:
-    :param nodetemplate:
+    :param nodetemplate: Template to create nodes with, or None to set coordinates on the nodes created for an
+    earlier coordinates field, without adding them to groups.
     :param mediastinumNodesetGroup:
     :param medialLungNodesetGroup:
     :param lungSideNodesetGroup:
@@ -1352,7 +1335,8 @@ def createLungNodes(spaceFromCentre, lengthUnit, widthUnit, heightUnit,
                 else:
                     x = [x[0] - spaceFromCentre, x[1], x[2]]
 
-                node = nodes.createNode(nodeIdentifier, nodetemplate)
+                node = nodes.createNode(nodeIdentifier, nodetemplate) if nodetemplate else \
+                    nodes.findNodeByIdentifier(nodeIdentifier)
                 cache.setNode(node)
                 coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x)
                 coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1)
@@ -1362,7 +1346,7 @@ def createLungNodes(spaceFromCentre, lengthUnit, widthUnit, heightUnit,
                 nodeIdentifier += 1
 
                 # Annotation
-                if lungNodesetGroup or lungSideNodesetGroup or medialLungNodesetGroup:
+                if nodetemplate and (lungNodesetGroup or lungSideNodesetGroup or medialLungNodesetGroup):
                     if(lungSide == leftLung) and (n1 != 0):
                         medialLungNodesetGroup.addNode(node)
                     elif (lungSide != leftLung) and (n1 != lElementsCount1):
@@ -1508,7 +1492,8 @@ def createLungNodes(spaceFromCentre, lengthUnit, widthUnit, heightUnit,
                     else:
                         x = [x[0] - spaceFromCentre, x[1], x[2]]
 
-                    node = nodes.createNode(nodeIdentifier, nodetemplate)
+                    node = nodes.createNode(nodeIdentifier, nodetemplate) if nodetemplate else \
+                        nodes.findNodeByIdentifier(nodeIdentifier)
                     cache.setNode(node)
                     coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x)
                     coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1)
@@ -1518,7 +1503,8 @@ def createLungNodes(spaceFromCentre, lengthUnit, widthUnit, heightUnit,
                     nodeIdentifier += 1
 
                 # Annotation
-                if lungNodesetGroup or lungSideNodesetGroup or medialLungNodesetGroup or mediastinumNodesetGroup:
+                if nodetemplate and (lungNodesetGroup or lungSideNodesetGroup or medialLungNodesetGroup or
+                                     mediastinumNodesetGroup):
                     if n2 > 2:
                         mediastinumNodesetGroup.addNode(node)
                     if (lungSide == leftLung) and (n1 != 0):
@@ -1531,13 +1517,15 @@ def createLungNodes(spaceFromCentre, lengthUnit, widthUnit, heightUnit,
     return nodeIdentifier
 
 
-def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular, elementtemplateCustom, mesh,
+def createLungElements(coordinatesFields, eftfactory, eftRegular, elementtemplateRegular, elementtemplateCustom, mesh,
                        lungMeshGroup, lungSideMeshGroup, lowerLobeMeshGroup, middleLobeMeshGroup,
                        upperLobeMeshGroup, mediastinumMeshGroup, upperDorsalMeshGroup,
                        lElementsCount1, lElementsCount2, lElementsCount3,
                        uElementsCount1, uElementsCount2, uElementsCount3,
                        lowerNodeIds, upperNodeIds, elementIdentifier):
     """
+    :param coordinatesFields: List of coordinate fields to define on elements, all with the same element field
+    templates.
     :param lowerNodeIds: Indexing by [lElementsCount3 + 1][lElementsCount2 + 1][lElementsCount1 + 1]
     :param upperNodeIds: Indexing by [uElementsCount3 + 1][uElementsCount2 + 1][uElementsCount1 + 1]
     :return: elementIdentifier
@@ -1611,7 +1599,8 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
-                    elementtemplateCustom.defineField(coordinates, -1, eft)
+                    for coordinates in coordinatesFields:
+                        elementtemplateCustom.defineField(coordinates, -1, eft)
                     element = mesh.createElement(elementIdentifier, elementtemplateCustom)
                 element.setNodesByIdentifier(eft, nodeIdentifiers)
                 if eft.getNumberOfLocalScaleFactors() == 1:
@@ -1771,7 +1760,8 @@ def createLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegul
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
-                    elementtemplateCustom.defineField(coordinates, -1, eft)
+                    for coordinates in coordinatesFields:
+                        elementtemplateCustom.defineField(coordinates, -1, eft)
                     element = mesh.createElement(elementIdentifier, elementtemplateCustom)
                 element.setNodesByIdentifier(eft, nodeIdentifiers)
                 if eft.getNumberOfLocalScaleFactors() == 1:
@@ -1805,6 +1795,8 @@ def createAccessorylobeLungNodes(centre, cache, coordinates, nodes, nodetemplate
     """
     Create a 3D triangular mesh from getAccessorylobeLungNodes
     :parameter: elementsCount1 - x, elementsCount2 - y, elementsCount3 - z
+    :param nodetemplate: Template to create nodes with, or None to set coordinates on the nodes created for an
+    earlier coordinates field, without adding them to groups.
     :return: nodeIdentifier
     """
 
@@ -1857,7 +1849,8 @@ def createAccessorylobeLungNodes(centre, cache, coordinates, nodes, nodetemplate
                 if (n1 != 1) and (n3 == elementsCount3):
                     continue
 
-                node = nodes.createNode(nodeIdentifier, nodetemplate)
+                node = nodes.createNode(nodeIdentifier, nodetemplate) if nodetemplate else \
+                    nodes.findNodeByIdentifier(nodeIdentifier)
                 cache.setNode(node)
 
                 x = px[n3][n1][n2]
@@ -1883,19 +1876,22 @@ def createAccessorylobeLungNodes(centre, cache, coordinates, nodes, nodetemplate
                 nodeIdentifier += 1
 
                 # Annotation
-                lungSideNodesetGroup.addNode(node)
-                lungNodesetGroup.addNode(node)
+                if nodetemplate:
+                    lungSideNodesetGroup.addNode(node)
+                    lungNodesetGroup.addNode(node)
 
     return nodeIdentifier
 
 
-def createAccessorylobeLungElements(coordinates, eftfactory, eftRegular, elementtemplateRegular, elementtemplateCustom,
+def createAccessorylobeLungElements(coordinatesFields, eftfactory, eftRegular, elementtemplateRegular, elementtemplateCustom,
                                     mesh, lungMeshGroup, diaphragmaticLobeMeshGroup,
                                     elementsCount1, elementsCount2, elementsCount3,
                                     NodeIds, elementIdentifier):
     """
     Create a 3D triangular mesh from getAccessorylobeLungNodes
     :parameter: elementsCount1 - x, elementsCount2 - y, elementsCount3 - z
+    :param coordinatesFields: List of coordinate fields to define on elements, all with the same element field
+    templates.
     :return: elementIdentifier
     """
 
@@ -1943,7 +1939,8 @@ def createAccessorylobeLungElements(coordinates, eftfactory, eftRegular, element
                 if eft is eftRegular:
                     element = mesh.createElement(elementIdentifier, elementtemplateRegular)
                 else:
-                    elementtemplateCustom.defineField(coordinates, -1, eft)
+                    for coordinates in coordinatesFields:
+                        elementtemplateCustom.defineField(coordinates, -1, eft)
                     element = mesh.createElement(elementIdentifier, elementtemplateCustom)
                 element.setNodesByIdentifier(eft, nodeIdentifiers)
                 if eft.getNumberOfLocalScaleFactors() == 1:
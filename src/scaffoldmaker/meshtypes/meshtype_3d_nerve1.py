@@ -20,13 +20,13 @@ from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueL
     setEftScaleFactorIds
 from scaffoldmaker.utils.interpolation import (
     evaluateScalarOnCurve, getCubicHermiteBasis, getCubicHermiteBasisDerivatives, getCubicHermiteArcLength,
-    getCubicHermiteCurvesLength, getCubicHermiteTrimmedCurvesLengths, getNearestLocationOnCurve, get_curve_from_points,
-    interpolateCubicHermiteDerivative, sampleCubicHermiteCurves, sampleCubicHermiteCurvesSmooth,
-    smoothCurveSideCrossDerivatives, track_curve_side_direction)
+    getCubicHermiteCurvesLength, getCubicHermiteTrimmedCurvesLengths, getNearestLocationOnCurve,
+    getNearestLocationsOnCurve, get_curve_from_points, interpolateCubicHermiteDerivative, sampleCubicHermiteCurves,
+    sampleCubicHermiteCurvesSmooth, smoothCurveSideCrossDerivatives, track_curve_side_direction)
 from scaffoldmaker.utils.read_vagus_data import load_vagus_data
 from scaffoldmaker.utils.zinc_utils import (
-    define_and_fit_field, find_or_create_field_zero_fibres, fit_hermite_curve, generate_curve_mesh, generate_datapoints,\
-    generate_mesh_marker_points)
+    define_and_fit_field, find_or_create_field_zero_fibres, fit_hermite_curve_sparse, generate_curve_mesh,\
+    generate_datapoints, generate_mesh_marker_points)
 
 
 logger = logging.getLogger(__name__)
@@ -627,7 +627,7 @@ class MeshType_3d_nerve1(Scaffold_base):
             # cut the first part of the branch:
             px = [new_start_x] + branch_px[1:]
             ax, ad1 = get_curve_from_points(px, maximum_element_length=branch_max_element_length)
-            bx, bd1 = fit_hermite_curve(ax, ad1, px)
+            bx, bd1 = fit_hermite_curve_sparse(ax, ad1, px)
             branch_length = getCubicHermiteCurvesLength(bx, bd1)
             branch_elements_count = math.ceil(branch_length / branch_max_element_length)
             # previously had minimum of 2 elements along branch as can't attach sub-branches from first element
@@ -1070,7 +1070,7 @@ def generate_trunk_1d(vagus_data, trunk_proportion, trunk_elements_count_prefit,
     # # needs to be bigger if fewer elements:
     # if trunk_elements_count_prefit < 20:
     #     outlier_length += 0.075 * (20 - trunk_elements_count_prefit) / 19.0
-    cx, cd1 = fit_hermite_curve(bx, bd1, px)  # , outlier_length=outlier_length)
+    cx, cd1 = fit_hermite_curve_sparse(bx, bd1, px)  # , outlier_length=outlier_length)
     # resample to even size
     dx, dd1 = sampleCubicHermiteCurvesSmooth(cx, cd1, trunk_elements_count_prefit)[0:2]
     # generate_curve_mesh(region, dx, dd1, group_name=vagus_data.get_trunk_group_name())[0]
@@ -1307,8 +1307,8 @@ def generate_trunk_1d(vagus_data, trunk_proportion, trunk_elements_count_prefit,
                 logger.warning("Nerve: Ignoring unrecognized orientation points with name '" + name + "'")
                 continue
             wt2, wt3 = weights
-            for data_x in x_list:
-                curve_location, x = getNearestLocationOnCurve(tx, td1, data_x)
+            curve_locations, nearest_x = getNearestLocationsOnCurve(tx, td1, x_list)[:2]
+            for data_x, curve_location, x in zip(x_list, curve_locations, nearest_x):
                 e1 = curve_location[0]
                 e2 = curve_location[0] + 1
                 xi = curve_location[1]
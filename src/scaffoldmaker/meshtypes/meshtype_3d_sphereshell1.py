@@ -321,14 +321,11 @@ class MeshType_3d_sphereshell1(Scaffold_base):
             if excludeBottomRows == 0:
                 # create bottom apex elements, editing eft scale factor identifiers around apex
                 # scale factor identifiers follow convention of offsetting by 100 for each 'version'
-                elementtemplate1 = mesh.createElementtemplate()
-                elementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
                 for e1 in range(elementsCountAround):
                     va = e1
                     vb = (e1 + 1)%elementsCountAround
-                    eft1 = eftfactory.createEftShellPoleBottom(va*100, vb*100)
-                    elementtemplate1.defineField(coordinates, -1, eft1)
-                    element = mesh.createElement(elementIdentifier, elementtemplate1)
+                    eft1 = eftfactory.getEft("createEftShellPoleBottom", va*100, vb*100)
+                    element = mesh.createElement(elementIdentifier, eftfactory.getElementtemplate(coordinates, eft1))
                     bni1 = no + 1
                     bni2 = no + e1 + 2
                     bni3 = no + (e1 + 1)%elementsCountAround + 2
@@ -367,14 +364,11 @@ class MeshType_3d_sphereshell1(Scaffold_base):
             if excludeTopRows == 0:
                 # create top apex elements, editing eft scale factor identifiers around apex
                 # scale factor identifiers follow convention of offsetting by 100 for each 'version'
-                elementtemplate1 = mesh.createElementtemplate()
-                elementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
                 for e1 in range(elementsCountAround):
                     va = e1
                     vb = (e1 + 1)%elementsCountAround
-                    eft1 = eftfactory.createEftShellPoleTop(va*100, vb*100)
-                    elementtemplate1.defineField(coordinates, -1, eft1)
-                    element = mesh.createElement(elementIdentifier, elementtemplate1)
+                    eft1 = eftfactory.getEft("createEftShellPoleTop", va*100, vb*100)
+                    element = mesh.createElement(elementIdentifier, eftfactory.getElementtemplate(coordinates, eft1))
                     bni3 = no + now
                     bni1 = bni3 - elementsCountAround + e1
                     bni2 = bni3 - elementsCountAround + (e1 + 1)%elementsCountAround
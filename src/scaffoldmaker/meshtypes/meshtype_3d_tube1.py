@@ -14,6 +14,7 @@ from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate, getStructuredMeshSizes
 
 
 class MeshType_3d_tube1(Scaffold_base):
@@ -69,6 +70,19 @@ class MeshType_3d_tube1(Scaffold_base):
         elif (options['Wall thickness'] > 0.5) :
             options['Wall thickness'] = 0.5
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        elementsCounts = [options['Number of elements around'], options['Number of elements along'],
+                          options['Number of elements through wall']]
+        if options['Refine']:
+            elementsCounts = [elementsCounts[i]*options[refineKey] for i, refineKey in enumerate(
+                ['Refine number of elements around', 'Refine number of elements along',
+                 'Refine number of elements through wall'])]
+            nodeValuesCount = 1  # trilinear
+        else:
+            nodeValuesCount = 8 if options['Use cross derivatives'] else 4
+        nodesCount, meshSizes = getStructuredMeshSizes(elementsCounts, periodic=[True, False, False])
+        return MeshSizeEstimate(nodesCount, meshSizes, nodesCount*nodeValuesCount*3)
 
     @classmethod
     def generateBaseMesh(cls, region, options):
@@ -4,6 +4,7 @@ Generates a 3-D Hermite bifurcating tube network (with optional solid core).
 from scaffoldmaker.meshtypes.meshtype_1d_network_layout1 import MeshType_1d_network_layout1
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+from scaffoldmaker.utils.networkmesh import NetworkLayoutEstimate
 from scaffoldmaker.utils.tubenetworkmesh import TubeNetworkMeshBuilder, TubeNetworkMeshGenerateData
 
 
@@ -201,6 +202,20 @@ class MeshType_3d_tubenetwork1(Scaffold_base):
 
         return dependentChanges
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        return TubeNetworkMeshBuilder.getMeshSizeEstimate(
+            NetworkLayoutEstimate(options["Network layout"]),
+            targetElementDensityAlongLongestSegment=options["Target element density along longest segment"],
+            annotationElementsCountsAlong=options["Annotation numbers of elements along"],
+            defaultElementsCountAround=options["Number of elements around"],
+            annotationElementsCountsAround=options["Annotation numbers of elements around"],
+            elementsCountThroughShell=options["Number of elements through shell"],
+            isCore=options["Core"],
+            elementsCountTransition=options["Number of elements across core transition"],
+            defaultElementsCountCoreBoxMinor=options["Number of elements across core box minor"],
+            annotationElementsCountsCoreBoxMinor=options["Annotation numbers of elements across core box minor"])
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
@@ -8,6 +8,7 @@ from cmlibs.utils.zinc.general import ChangeManager
 from cmlibs.utils.zinc.scene import scene_get_selection_group
 from cmlibs.zinc.field import Field
 from scaffoldmaker.utils.derivativemoothing import DerivativeSmoothing
+from scaffoldmaker.utils.generatemonitor import reportGenerateProgress
 from scaffoldmaker.utils.interpolation import DerivativeScalingMode
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 from scaffoldmaker.utils.zinc_utils import get_nodeset_field_parameters, print_node_field_parameters
@@ -96,6 +97,52 @@ class Scaffold_base:
         if options['Real option'] < 0.0:
             options['Real option'] = 0.0
 
+    @classmethod
+    def getMeshSizeEstimate(cls, options):
+        """
+        Optionally override to predict the size of the mesh generateMesh() makes with options, without creating any
+        Zinc objects, for judging cost before generating. Call after checkOptions().
+        Estimate covers refinement if enabled in options, and all faces.
+        :param options: Dict containing options. See getDefaultOptions().
+        :return: MeshSizeEstimate, or None if not implemented for scaffold type, or size cannot be predicted
+        without generating.
+        """
+        return None
+
+    @classmethod
+    def getPreviewOptions(cls, options):
+        """
+        Get options for a quick, low resolution preview of the scaffold generated with options.
+        Default implementation roughly halves all 'Number of elements' options while keeping whether they are odd or
+        even, turns off refinement, does the same for scaffold package options without mesh edits, then calls
+        checkOptions() to make the options valid. Override if this does not give a valid scaffold.
+        :param options: Dict containing options. See getDefaultOptions(). Not modified.
+        :return: New dict containing preview options.
+        """
+        previewOptions = {}
+        for optionName, value in options.items():
+            lowerOptionName = optionName.lower()
+            if hasattr(value, "getScaffoldType"):
+                # ScaffoldPackage option; cannot reduce elements if edited as edits are node-based
+                value = copy.deepcopy(value)
+                if not value.getMeshEdits():
+                    value.getScaffoldSettings().update(
+                        value.getScaffoldType().getPreviewOptions(value.getScaffoldSettings()))
+            elif ("number of elements" in lowerOptionName) or ("numbers of elements" in lowerOptionName):
+                if lowerOptionName.startswith("crop") or lowerOptionName.startswith("refine"):
+                    value = copy.deepcopy(value)
+                elif isinstance(value, list):
+                    value = [getPreviewElementsCount(count) if (type(count) is int) else count for count in value]
+                elif type(value) is int:
+                    value = getPreviewElementsCount(value)
+            else:
+                value = copy.deepcopy(value)
+            previewOptions[optionName] = value
+        if "Refine" in previewOptions:
+            previewOptions["Refine"] = False
+        cls.checkOptions(previewOptions)
+        return previewOptions
+
     @classmethod
     def generateBaseMesh(cls, region, options):
         """
@@ -137,6 +184,7 @@ class Scaffold_base:
         If function makes a "construction object" needed by the caller, this is
         returned as the second return value.
         Note that no construction object is returned when using 'Refine'.
+        Reports progress to any active GenerateMonitor, and raises GenerateCancelled if it is cancelled.
         :param region: Zinc region to create mesh in. Must be empty.
         :param options: Dict containing options. See getDefaultOptions().
         :return: list of AnnotationGroup, construction object (or None)
@@ -147,12 +195,16 @@ class Scaffold_base:
             if options.get('Refine'):
                 baseRegion = region.createRegion()
                 annotationGroups = cls.generateBaseMesh(baseRegion, options)[0]
+                reportGenerateProgress("base mesh generated", 1.0)
                 meshrefinement = MeshRefinement(baseRegion, region, annotationGroups)
                 cls.refineMesh(meshrefinement, options)
                 annotationGroups = meshrefinement.getAnnotationGroups()
+                reportGenerateProgress("mesh refined", 1.0)
             else:
                 annotationGroups, constructionObject = cls.generateBaseMesh(region, options)
+                reportGenerateProgress("base mesh generated", 1.0)
             fieldmodule.defineAllFaces()
+            reportGenerateProgress("faces defined", 1.0)
             oldAnnotationGroups = copy.copy(annotationGroups)
             for annotationGroup in annotationGroups:
                 annotationGroup.addSubelements()
@@ -245,3 +297,18 @@ class Scaffold_base:
                 lambda region, options, constructionObject, functionOptions, editGroupName:
                     cls.smoothDerivatives(region, options, constructionObject, functionOptions, editGroupName))
             ]
+
+
+def getPreviewElementsCount(elementsCount):
+    """
+    Get reduced number of elements for a preview scaffold: half the number rounded up, plus one if needed to keep
+    odd or even parity which many scaffolds rely on.
+    :param elementsCount: Number of elements in full scaffold.
+    :return: Preview number of elements, never greater than elementsCount.
+    """
+    if elementsCount < 2:
+        return elementsCount
+    previewElementsCount = (elementsCount + 1) // 2
+    if (previewElementsCount % 2) != (elementsCount % 2):
+        previewElementsCount += 1
+    return min(previewElementsCount, elementsCount)
@@ -3,17 +3,41 @@ Class packaging a scaffold type, options and modifications.
 Supports serialisation to/from JSON. Can be used as a scaffold option.
 """
 
+import asyncio
 import copy
 import math
+import threading
 
 from cmlibs.maths.vectorops import euler_to_rotation_matrix, magnitude
 from cmlibs.utils.zinc.field import createFieldEulerAnglesRotationMatrix
 from cmlibs.utils.zinc.finiteelement import get_highest_dimension_mesh, get_maximum_node_identifier
 from cmlibs.utils.zinc.general import ChangeManager
+from cmlibs.utils.zinc.group import identifier_ranges_fix, mesh_group_add_identifier_ranges
+from cmlibs.zinc.context import Context
 from cmlibs.zinc.field import Field, FieldGroup
+from cmlibs.zinc.result import RESULT_OK
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, findAnnotationGroupByName, \
-    getAnnotationMarkerLocationField  # , getAnnotationMarkerNameField
+    evaluateAnnotationMarkersNearestMeshLocations, getAnnotationMarkerLocationField
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
+from scaffoldmaker.utils.generatemonitor import GenerateCancelled, GenerateMonitor, getCurrentGenerateMonitor
+
+
+class _MonitorCancellingFuture(asyncio.Future):
+    """
+    Future which cancels a GenerateMonitor as soon as it is cancelled, i.e. before the cancelled task awaiting it
+    resumes, so generation in another thread cannot make further progress in the meantime.
+    """
+
+    def __init__(self, monitor, *, loop=None):
+        """
+        :param monitor: GenerateMonitor to cancel.
+        """
+        super().__init__(loop=loop)
+        self._monitor = monitor
+
+    def cancel(self, *args, **kwargs):
+        self._monitor.cancel()
+        return super().cancel(*args, **kwargs)
 
 
 class ScaffoldPackage:
@@ -69,6 +93,8 @@ class ScaffoldPackage:
         # use by a parent scaffold/mesh type
         self._constructionObject = None
         self._nextNodeIdentifier = 1
+        # state of background generation of full scaffold after preview, see generate(progressive=True)
+        self._progressiveGenerate = None
 
     def __eq__(self, other):
         """
@@ -218,10 +244,11 @@ class ScaffoldPackage:
         :return: True if a non-identity transformation has been applied, False if not. Return None if field is invalid.
         """
         assert self._region
-        fieldmodule = self._region.getFieldmodule()
         if not editCoordinatesField.isValid():
             print('Warning: ScaffoldPackage.applyTransformation: Missing coordinates field')
             return
+        # field may be in the region generated in the background with generate(progressive=True)
+        fieldmodule = editCoordinatesField.getFieldmodule()
         with ChangeManager(fieldmodule):
             componentsCount = editCoordinatesField.getNumberOfComponents()
             # pad with zeros if componentsCount < 3
@@ -248,34 +275,226 @@ class ScaffoldPackage:
             del targetCoordinates
         return doApply
 
-    def generate(self, region, applyTransformation=True):
+    def generate(self, region, applyTransformation=True, progressive=False):
         """
         Generate the finite element scaffold and define annotation groups.
         :param applyTransformation: If True (default) apply scale, rotation and translation to
         node coordinates. Specify False if client will transform, e.g. with graphics transformations.
-        """
+        :param progressive: If True, quickly generate a low resolution preview of the scaffold with options from
+        the scaffold type's getPreviewOptions() in region, without mesh edits or user annotation groups, then
+        generate the full scaffold in a background thread in a private Zinc context so region and other objects in
+        its context can be used in the meantime. Client must call finishProgressiveGenerate() to replace the preview
+        in region with the full scaffold, and must not change settings until then. Preview is skipped if it fails to
+        generate. Calling generate() again cancels any full scaffold still being generated.
+        Generation reports progress to any active GenerateMonitor, and raises GenerateCancelled if it is cancelled.
+        """
+        self._discardProgressiveGenerate()
         self._region = region
+        if not progressive:
+            with ChangeManager(region.getFieldmodule()):
+                self._setGenerated(self._generateInRegion(region, applyTransformation))
+            return
+        previewSettings = None
+        try:
+            previewSettings = self._scaffoldType.getPreviewOptions(self._scaffoldSettings)
+            with ChangeManager(region.getFieldmodule()):
+                self._autoAnnotationGroups, self._constructionObject = \
+                    self._scaffoldType.generateMesh(region, previewSettings)
+                if applyTransformation:
+                    self._applyTransformationToEditFields(region)
+        except GenerateCancelled:
+            raise
+        except Exception as exception:
+            print("ScaffoldPackage.generate:  Skipping preview of " + self._scaffoldType.getName() +
+                  (" which failed to generate: " if previewSettings else " with invalid preview options: ") +
+                  repr(exception))
+            self._clearRegion(region)
+            self._autoAnnotationGroups = []
+            self._constructionObject = None
+        self._userAnnotationGroups = []
+        self._isGenerated = False
+        # own monitor so it can be cancelled if superseded, also reporting to and cancelled by any active monitor
+        monitor = GenerateMonitor(parent=getCurrentGenerateMonitor())
+        progressiveGenerate = {"monitor": monitor}
+
+        def generateFull():
+            """
+            Generate the full scaffold in a scratch region in a context used only by this thread, and serialise it
+            ready for reading into region.
+            """
+            try:
+                with monitor:
+                    scratchContext = Context("progressive")
+                    scratchRegion = scratchContext.getDefaultRegion()
+                    with ChangeManager(scratchRegion.getFieldmodule()):
+                        result = self._generateInRegion(scratchRegion, applyTransformation)
+                    sir = scratchRegion.createStreaminformationRegion()
+                    srm = sir.createStreamresourceMemory()
+                    scratchRegion.write(sir)
+                    writeResult, buffer = srm.getBuffer()
+                    assert writeResult == RESULT_OK
+                    del srm
+                    del sir
+                    progressiveGenerate["result"] = result
+                    progressiveGenerate["buffer"] = buffer
+            except Exception as exception:
+                progressiveGenerate["exception"] = exception
+
+        progressiveGenerate["thread"] = thread = threading.Thread(target=generateFull, daemon=True)
+        self._progressiveGenerate = progressiveGenerate
+        thread.start()
+
+    async def generateAsync(self, region, applyTransformation=True, monitor=None):
+        """
+        Coroutine running generate() in a worker thread so the asyncio event loop is not blocked.
+        Cancelling the awaiting task immediately cancels the monitor so generation stops at its next check, then
+        waits for it to stop.
+        Only one generate may be in progress at a time.
+        :param region: Zinc region to generate scaffold in.
+        :param applyTransformation: See generate().
+        :param monitor: Optional GenerateMonitor receiving progress from the worker thread. It may be cancelled from
+        any thread, upon which GenerateCancelled is raised and region is left partially generated.
+        """
+        if monitor is None:
+            monitor = GenerateMonitor()
+
+        def generateWithMonitor():
+            with monitor:
+                self.generate(region, applyTransformation)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(None, generateWithMonitor)
+        # cancelling the task synchronously cancels the future it is awaiting, which cancels monitor
+        waiter = _MonitorCancellingFuture(monitor, loop=loop)
+
+        def copyFutureResult(doneFuture):
+            if waiter.done():
+                return
+            if doneFuture.cancelled():
+                waiter.cancel()
+            elif doneFuture.exception():
+                waiter.set_exception(doneFuture.exception())
+            else:
+                waiter.set_result(doneFuture.result())
+
+        future.add_done_callback(copyFutureResult)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # don't return while the worker thread is still modifying the region
+            try:
+                await future
+            except GenerateCancelled:
+                pass
+            raise
+
+    def isProgressiveGenerateReady(self):
+        """
+        :return: True if the full scaffold from a progressive generate() has been generated and is waiting to be
+        read into the region by finishProgressiveGenerate(), otherwise False.
+        """
+        return bool(self._progressiveGenerate) and not self._progressiveGenerate["thread"].is_alive()
+
+    def finishProgressiveGenerate(self, wait=True):
+        """
+        If progressive generate() is in progress, replace the preview in region with the full scaffold when it is
+        ready, and use the annotation groups for the full scaffold. Region gets a single change notification for
+        the replacement. Must be called from the thread using the region, e.g. user interface. Re-raises any
+        exception from generating the full scaffold.
+        :param wait: If True (default) wait for the full scaffold to be generated, otherwise return immediately.
+        :return: True if the full scaffold is in the region (including if not progressive), False if it is still
+        being generated.
+        """
+        progressiveGenerate = self._progressiveGenerate
+        if not progressiveGenerate:
+            return True
+        thread = progressiveGenerate["thread"]
+        if wait:
+            thread.join()
+        elif thread.is_alive():
+            return False
+        self._progressiveGenerate = None
+        exception = progressiveGenerate.get("exception")
+        if exception:
+            raise exception
+        autoAnnotationGroups, constructionObject, nextNodeIdentifier, userAnnotationGroups = \
+            progressiveGenerate["result"]
+        region = self._region
         with ChangeManager(region.getFieldmodule()):
-            self._autoAnnotationGroups, self._constructionObject = \
-                self._scaffoldType.generateMesh(region, self._scaffoldSettings)
-            # need next node identifier for creating user-defined marker points
-            nodes = region.getFieldmodule().findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-            self._nextNodeIdentifier = get_maximum_node_identifier(nodes) + 1
-            if self._meshEdits:
-                # apply mesh edits, a Zinc-readable model file containing node edits
-                # Note: these are untransformed coordinates
-                sir = region.createStreaminformationRegion()
-                srm = sir.createStreamresourceMemoryBuffer(self._meshEdits)
-                region.read(sir)
-            # define user AnnotationGroups from serialised Dict
-            self._userAnnotationGroups = [ AnnotationGroup.fromDict(dct, self._region) for dct in self._userAnnotationGroupsDict ]
-            self._isGenerated = True
-            if applyTransformation:
-                fieldmodule = self._region.getFieldmodule()
-                for editFieldName in ['coordinates', 'inner coordinates']:
-                    editCoordinates = fieldmodule.findFieldByName(editFieldName)
-                    if editCoordinates.isValid():
-                        self.applyTransformation(editCoordinates)
+            self._autoAnnotationGroups = []
+            self._clearRegion(region)
+            sir = region.createStreaminformationRegion()
+            sir.createStreamresourceMemoryBuffer(progressiveGenerate["buffer"])
+            assert region.read(sir) == RESULT_OK
+            self._setGenerated((
+                [annotationGroup.getCopyInRegion(region) for annotationGroup in autoAnnotationGroups],
+                constructionObject, nextNodeIdentifier,
+                [annotationGroup.getCopyInRegion(region) for annotationGroup in userAnnotationGroups]))
+        return True
+
+    def _discardProgressiveGenerate(self):
+        """
+        Cancel any progressive generate in progress, wait for it to stop, and discard its result.
+        """
+        if self._progressiveGenerate:
+            self._progressiveGenerate["monitor"].cancel()
+            self._progressiveGenerate["thread"].join()
+            self._progressiveGenerate = None
+
+    def _generateInRegion(self, region, applyTransformation):
+        """
+        Generate the full scaffold with mesh edits and user annotation groups in region.
+        Assumes called while ChangeManager(region.getFieldmodule()) is active.
+        :return: autoAnnotationGroups, constructionObject, nextNodeIdentifier, userAnnotationGroups
+        """
+        autoAnnotationGroups, constructionObject = self._scaffoldType.generateMesh(region, self._scaffoldSettings)
+        # need next node identifier for creating user-defined marker points
+        nodes = region.getFieldmodule().findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        nextNodeIdentifier = get_maximum_node_identifier(nodes) + 1
+        if self._meshEdits:
+            # apply mesh edits, a Zinc-readable model file containing node edits
+            # Note: these are untransformed coordinates
+            sir = region.createStreaminformationRegion()
+            srm = sir.createStreamresourceMemoryBuffer(self._meshEdits)
+            region.read(sir)
+        # define user AnnotationGroups from serialised Dict
+        userAnnotationGroups = [ AnnotationGroup.fromDict(dct, region) for dct in self._userAnnotationGroupsDict ]
+        if applyTransformation:
+            self._applyTransformationToEditFields(region)
+        return autoAnnotationGroups, constructionObject, nextNodeIdentifier, userAnnotationGroups
+
+    def _setGenerated(self, generateResult):
+        """
+        Store results of _generateInRegion() in self.
+        """
+        self._autoAnnotationGroups, self._constructionObject, self._nextNodeIdentifier, \
+            self._userAnnotationGroups = generateResult
+        self._isGenerated = True
+
+    def _applyTransformationToEditFields(self, region):
+        fieldmodule = region.getFieldmodule()
+        for editFieldName in ['coordinates', 'inner coordinates']:
+            editCoordinates = fieldmodule.findFieldByName(editFieldName)
+            if editCoordinates.isValid():
+                self.applyTransformation(editCoordinates)
+
+    @staticmethod
+    def _clearRegion(region):
+        """
+        Destroy all elements, nodes and datapoints in region, and unmanage all fields so they are destroyed when no
+        longer referenced.
+        """
+        fieldmodule = region.getFieldmodule()
+        with ChangeManager(fieldmodule):
+            for dimension in range(3, 0, -1):
+                fieldmodule.findMeshByDimension(dimension).destroyAllElements()
+            for domainType in (Field.DOMAIN_TYPE_NODES, Field.DOMAIN_TYPE_DATAPOINTS):
+                fieldmodule.findNodesetByFieldDomainType(domainType).destroyAllNodes()
+            fielditerator = fieldmodule.createFielditerator()
+            field = fielditerator.next()
+            while field.isValid():
+                field.setManaged(False)
+                field = fielditerator.next()
 
     def deleteElementsInRanges(self, region, deleteElementRanges):
         """
@@ -291,72 +510,83 @@ class ScaffoldPackage:
         self._region = region
         fm = self._region.getFieldmodule()
         mesh = get_highest_dimension_mesh(fm)
-        meshDimension = mesh.getDimension()
         nodes = fm.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        identifierRanges = [[min(r), max(r)] for r in deleteElementRanges]
+        identifier_ranges_fix(identifierRanges)
         with ChangeManager(fm):
             # put the elements in a group and use subelement handling to get nodes in use by it
             destroyGroup = fm.createFieldGroup()
             destroyGroup.setSubelementHandlingMode(FieldGroup.SUBELEMENT_HANDLING_MODE_FULL)
             destroyMesh = destroyGroup.createMeshGroup(mesh)
-            elementIter = mesh.createElementiterator()
-            element = elementIter.next()
-            while element.isValid():
-                identifier = element.getIdentifier()
-                for deleteElementRange in deleteElementRanges:
-                    if (identifier >= deleteElementRange[0]) and (identifier <= deleteElementRange[1]):
-                        destroyMesh.addElement(element)
-                element = elementIter.next()
-            del elementIter
+            if sum((r[1] - r[0] + 1) for r in identifierRanges) <= mesh.getSize():
+                mesh_group_add_identifier_ranges(destroyMesh, identifierRanges)
+            else:
+                # ranges are mostly beyond existing identifiers; test each element's identifier once instead
+                identifier = fm.findFieldByName("cmiss_number")
+                inRanges = None
+                for identifierRange in identifierRanges:
+                    inRange = fm.createFieldAnd(
+                        fm.createFieldGreaterThan(identifier, fm.createFieldConstant(identifierRange[0] - 0.5)),
+                        fm.createFieldLessThan(identifier, fm.createFieldConstant(identifierRange[1] + 0.5)))
+                    inRanges = fm.createFieldOr(inRanges, inRange) if inRanges else inRange
+                destroyMesh.addElementsConditional(inRanges)
+                del inRange
+                del inRanges
+                del identifier
             # print("Deleting", destroyMesh.getSize(), "element(s)")
             if destroyMesh.getSize() > 0:
-                fieldcache = fm.createFieldcache()
                 destroyNodes = destroyGroup.getNodesetGroup(nodes)
                 markerGroup = fm.findFieldByName("marker").castGroup()
                 if markerGroup.isValid():
-                    markerNodes = markerGroup.getNodesetGroup(nodes)
                     markerLocation = getAnnotationMarkerLocationField(fm, mesh)
-
-                    if markerNodes.isValid() and markerLocation.isValid():
-                        nodeIter = markerNodes.createNodeiterator()
-                        node = nodeIter.next()
-                        while node.isValid():
-                            fieldcache.setNode(node)
-                            element, xi = markerLocation.evaluateMeshLocation(fieldcache, meshDimension)
-                            if element.isValid() and destroyMesh.containsElement(element):
-                                # markerName = getAnnotationMarkerNameField(fm)
-                                # print("Destroy marker '" + markerName.evaluateString(fieldcache) + "' node", \
-                                #       node.getIdentifier(), "in destroyed element", element.getIdentifier(), "at", xi)
-                                # following is reversed if a new location is found from material coordinates below:
-                                destroyNodes.addNode(node)
-                            node = nodeIter.next()
-                        del nodeIter
-                        del fieldcache
+                    # add marker nodes embedded in destroyed elements in a single pass;
+                    # reversed below if a new location is found from material coordinates:
+                    inDestroyedElement = fm.createFieldEmbedded(destroyGroup, markerLocation)
+                    destroyNodes.addNodesConditional(fm.createFieldAnd(markerGroup, inDestroyedElement))
+                    del inDestroyedElement
 
                 # must destroy elements first as Zinc won't destroy nodes that are in use
                 mesh.destroyElementsConditional(destroyGroup)
                 annotationGroups = self._autoAnnotationGroups + self._userAnnotationGroups
 
-                # attempt to re-find locations of to-be-destroyed marker points with material coordinates:
+                # attempt to re-find locations of to-be-destroyed marker points with material coordinates,
+                # finding all marker locations for each material coordinates field together:
+                relocateMarkers = {}
+                removeAnnotationGroups = []
                 for annotationGroup in annotationGroups:
                     if annotationGroup.isMarker() and destroyNodes.containsNode(annotationGroup.getMarkerNode()):
                         materialCoordinatesField, materialCoordinates = annotationGroup.getMarkerMaterialCoordinates()
-                        removeMarkerGroup = True
                         if materialCoordinates:
-                            annotationGroup.setMarkerMaterialCoordinates(materialCoordinatesField, materialCoordinates)
-                            evaluatedMaterialCoordinates = \
-                                annotationGroup.evaluateMarkerMaterialCoordinatesFromElementXi(materialCoordinatesField)
-                            diff = [abs(evaluatedMaterialCoordinates[c] - materialCoordinates[c]) for c in range(3)]
-
-                            # threshold designed for material coordinates of nominally unit scale
-                            if magnitude(diff) < 1e-03:
-                                destroyNodes.removeNode(annotationGroup.getMarkerNode())
-                                removeMarkerGroup = False
-
-                        if removeMarkerGroup:
-                            if annotationGroup in self._autoAnnotationGroups:
-                                self._autoAnnotationGroups.remove(annotationGroup)
-                            else:
-                                self._userAnnotationGroups.remove(annotationGroup)
+                            relocateMarkers.setdefault(materialCoordinatesField.getName(), []).append(
+                                (annotationGroup, materialCoordinatesField, materialCoordinates))
+                        else:
+                            removeAnnotationGroups.append(annotationGroup)
+                # threshold designed for material coordinates of nominally unit scale
+                relocateTolerance = 1.0E-3
+                for markers in relocateMarkers.values():
+                    materialCoordinatesField = markers[0][1]
+                    meshLocations = evaluateAnnotationMarkersNearestMeshLocations(
+                        fm, [marker[2] for marker in markers], materialCoordinatesField, mesh,
+                        maximumDistance=relocateTolerance)
+                    for (annotationGroup, _, materialCoordinates), meshLocation in zip(markers, meshLocations):
+                        if meshLocation[0] is None:
+                            removeAnnotationGroups.append(annotationGroup)
+                            continue
+                        annotationGroup.setMarkerMaterialCoordinates(
+                            materialCoordinatesField, materialCoordinates, meshLocation=meshLocation)
+                        evaluatedMaterialCoordinates = \
+                            annotationGroup.evaluateMarkerMaterialCoordinatesFromElementXi(materialCoordinatesField)
+                        diff = [abs(evaluatedMaterialCoordinates[c] - materialCoordinates[c]) for c in range(3)]
+                        if magnitude(diff) < relocateTolerance:
+                            destroyNodes.removeNode(annotationGroup.getMarkerNode())
+                        else:
+                            removeAnnotationGroups.append(annotationGroup)
+
+                for annotationGroup in removeAnnotationGroups:
+                    if annotationGroup in self._autoAnnotationGroups:
+                        self._autoAnnotationGroups.remove(annotationGroup)
+                    else:
+                        self._userAnnotationGroups.remove(annotationGroup)
 
                 nodes.destroyNodesConditional(destroyGroup)
                 # clean up group so no external code hears is notified of its existence
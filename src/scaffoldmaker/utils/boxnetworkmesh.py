@@ -6,6 +6,8 @@ from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.node import Node
 from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabelVersion, setEftScaleFactorIds
 from scaffoldmaker.utils.interpolation import interpolateSampleCubicHermite, sampleCubicHermiteCurvesSmooth
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate
+from scaffoldmaker.utils.meshwriter import MeshWriter
 from scaffoldmaker.utils.networkmesh import NetworkMesh, NetworkMeshBuilder, NetworkMeshGenerateData, \
     NetworkMeshJunction, NetworkMeshSegment, pathValueLabels
 from scaffoldmaker.utils.zinc_utils import get_nodeset_path_ordered_field_parameters
@@ -114,10 +116,7 @@ class BoxNetworkMeshSegment(NetworkMeshSegment):
         sx, sd1, sd2, sd12, sd3, sd13 = self._sampledBoxCoordinates
         elementsCountAlong = len(self._sampledBoxCoordinates[0]) - 1
         annotationMeshGroups = generateData.getAnnotationMeshGroups(self._annotationTerms)
-        coordinates = generateData.getCoordinates()
-        fieldcache = generateData.getFieldcache()
-        mesh = generateData.getMesh()
-        nodes = generateData.getNodes()
+        meshWriter = MeshWriter(generateData.getCoordinates(), generateData.getMeshDimension())
         lastVersion = None
         lastNodeIdentifier = None
         for n in range(elementsCountAlong + 1):
@@ -135,34 +134,27 @@ class BoxNetworkMeshSegment(NetworkMeshSegment):
             if nodeIdentifier is None:
                 nodeIdentifier = generateData.nextNodeIdentifier()
                 nodetemplate = generateData.getNodetemplate(versionsCount)
-                node = nodes.createNode(nodeIdentifier, nodetemplate)
                 if junction:
                     junction.setNodeIdentifier(nodeIdentifier)
             else:
-                node = nodes.findNodeByIdentifier(nodeIdentifier)
+                nodetemplate = None  # existing node
             # note following will set shared versions of coordinates or derivatives multiple times
             # junction.sample should have averaged derivatives from all adjoining segments so this is harmless
-            fieldcache.setNode(node)
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, sx[n])  # only one value version
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, version, sd1[n])
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, version, sd2[n])
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D2_DS1DS2, version, sd12[n])
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS3, version, sd3[n])
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D2_DS1DS3, version, sd13[n])
+            valueLabelsVersions = [(Node.VALUE_LABEL_VALUE, 1)] + \
+                [(valueLabel, version) for valueLabel in pathValueLabels[1:]]  # only one value version
+            meshWriter.addNode(nodeIdentifier, nodetemplate, valueLabelsVersions,
+                               [sx[n], sd1[n], sd2[n], sd12[n], sd3[n], sd13[n]])
 
             if n > 0:
                 startEndVersions = (lastVersion, version)
                 elementtemplate, eft = generateData.getElementtemplateAndEft(startEndVersions)
                 elementIdentifier = generateData.nextElementIdentifier()
-                element = mesh.createElement(elementIdentifier, elementtemplate)
-                nids = [lastNodeIdentifier, nodeIdentifier]
-                element.setNodesByIdentifier(eft, nids)
-                element.setScaleFactors(eft, [-1.0])
-                for annotationMeshGroup in annotationMeshGroups:
-                    annotationMeshGroup.addElement(element)
+                meshWriter.addElement(elementIdentifier, eft, [lastNodeIdentifier, nodeIdentifier], [-1.0],
+                                      annotationMeshGroups, elementtemplate)
 
             lastVersion = version
             lastNodeIdentifier = nodeIdentifier
+        meshWriter.write()
 
 
 class BoxNetworkMeshJunction(NetworkMeshJunction):
@@ -251,3 +243,37 @@ class BoxNetworkMeshBuilder(NetworkMeshBuilder):
         :return: A BoxNetworkMeshJunction.
         """
         return BoxNetworkMeshJunction(inSegments, outSegments)
+
+    @classmethod
+    def getMeshSizeEstimate(cls, networkLayoutEstimate, targetElementDensityAlongLongestSegment,
+                            annotationElementsCountsAlong=[]):
+        """
+        Predict size of box network mesh from the network layout without building it, with a single node at each
+        junction and each box element having 4 side faces and sharing end faces with adjacent elements using the
+        same node version. Numbers of faces and lines are approximate where more end faces are merged at a junction.
+        :param networkLayoutEstimate: NetworkLayoutEstimate for the network layout.
+        :param targetElementDensityAlongLongestSegment: As for constructor.
+        :param annotationElementsCountsAlong: As for constructor.
+        :return: MeshSizeEstimate
+        """
+        elementsCountsAlong = networkLayoutEstimate.getElementsCountsAlong(
+            targetElementDensityAlongLongestSegment, annotationElementsCountsAlong,
+            lambda networkSegment: 2 if (networkSegment.getNetworkNodes()[0] ==
+                                         networkSegment.getNetworkNodes()[-1]) else 1)
+        interiorNodesCount = 0
+        junctionNodeVersions = {}  # map from junction NetworkNode to set of versions used by segments there
+        for networkSegment, elementsCountAlong in elementsCountsAlong.items():
+            interiorNodesCount += elementsCountAlong - 1
+            segmentNodes = networkSegment.getNetworkNodes()
+            segmentNodeVersions = networkSegment.getNodeVersions()
+            for nodeIndex in (0, -1):
+                junctionNodeVersions.setdefault(segmentNodes[nodeIndex], set()).add(segmentNodeVersions[nodeIndex])
+        elementsCount = sum(elementsCountsAlong.values())
+        endFacesCount = interiorNodesCount + sum(len(versions) for versions in junctionNodeVersions.values())
+        # 3 components of value and 5 derivatives for each version
+        nodeParametersCount = 3 * (6 * interiorNodesCount + sum(
+            1 + 5 * networkNode.getVersionsCount() for networkNode in junctionNodeVersions))
+        return MeshSizeEstimate(
+            interiorNodesCount + len(junctionNodeVersions),
+            [4 * elementsCount + 4 * endFacesCount, 4 * elementsCount + endFacesCount, elementsCount],
+            nodeParametersCount, networkLayoutEstimate.getAnnotationGroupsCount())
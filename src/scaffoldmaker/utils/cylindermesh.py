@@ -13,10 +13,11 @@ from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from scaffoldmaker.utils import geometry
 from scaffoldmaker.utils.interpolation import sampleCubicHermiteCurves, interpolateSampleCubicHermite, \
-    smoothCubicHermiteDerivativesLine
+    smoothCubicHermiteDerivativesLine, smoothCubicHermiteDerivativesLines
 from scaffoldmaker.utils.mirror import Mirror
 from scaffoldmaker.utils.shieldmesh import ShieldMesh2D, ShieldShape2D, ShieldRimDerivativeMode
 from scaffoldmaker.utils.zinc_utils import get_nodeset_path_field_parameters
+import numpy as np
 
 
 class CylinderShape(Enum):
@@ -237,20 +238,28 @@ class CylinderMesh:
                                   None, self._elementsCountAlong, shieldMode,
                                   shieldType=ShieldRimDerivativeMode.SHIELD_RIM_DERIVATIVE_MODE_AROUND)
 
-        # generate ellipses mesh along cylinder axis
+        # generate ellipses mesh along cylinder axis, mapping from a previous ellipse of the same shape if possible
         n3Count = 0 if self._cylinderType == CylinderType.CYLINDER_STRAIGHT else self._elementsCountAlong
         self._ellipses = []
+        templates = []
         for n3 in range(n3Count + 1):
+            template = None
+            for ellipse in templates:
+                if ellipse.isTemplateFor(self._majorAxis[n3], self._minorAxis[n3],
+                                         self._coreMajorRadii[n3], self._coreMinorRadii[n3]):
+                    template = ellipse
+                    break
             ellipse = Ellipse2D(self._centres[n3], self._majorAxis[n3], self._minorAxis[n3],
                                 self._elementsCountAcrossMajor, self._elementsCountAcrossMinor, self._elementsCountAcrossShell,
                                 self._elementsCountAcrossTransition,
                                 self._shellProportion, self._coreMajorRadii[n3], self._coreMinorRadii[n3],
-                                ellipseShape=ellipseShape)
+                                ellipseShape=ellipseShape, template=template)
+            if not template:
+                templates.append(ellipse)
             self._ellipses.append(ellipse)
             self.copyEllipsesNodesToShieldNodes(n3)
 
-        for n3 in range(n3Count + 1):
-            self.calculateD2Derivatives(n3, n3Count)
+        self.calculateD2Derivatives(n3Count)
 
         if self._cylinderType == CylinderType.CYLINDER_TAPERED:
             self.smoothd2Derivatives()
@@ -281,42 +290,44 @@ class CylinderMesh:
                                      self._minorRadii[-1])
         self.setEndsNodes()
 
-    def calculateD2Derivatives(self, n3, n3Count):
+    def calculateD2Derivatives(self, n3Count):
         """
-        calculate d2 derivatives.
-        :param n3: Index of along cylinder axis coordinates to use
+        calculate d2 derivatives of all ellipses from differences in coordinates between them, or the step along the
+        axis for a straight cylinder.
         :param n3Count: number of bases to create coordinates for.
         """
         btx = self._shield.px
         btd1 = self._shield.pd1
         btd2 = self._shield.pd2
-        btd3 = self._shield.pd3
-        # get ellipse d2 and next ellipse x, d2
-        for n2 in range(self._elementsCountAcrossMajor + 1):
-            for n1 in range(self._elementsCountAcrossMinor + 1):
-                if btd1[n3][n2][n1]:
-                    n3n = n3 if (n3 < n3Count) else n3 - 1
-                    btd2[n3][n2][n1] = [(btx[n3n + 1][n2][n1][c] - btx[n3n][n2][n1][c]) for c in range(3)]
+        indexes = [(n2, n1) for n2 in range(self._elementsCountAcrossMajor + 1)
+                   for n1 in range(self._elementsCountAcrossMinor + 1) if btd1[0][n2][n1]]
+        if n3Count == 0:
+            d2 = [set_magnitude(self._base._alongAxis, self._length / self._elementsCountAlong)]
+            for n2, n1 in indexes:
+                btd2[0][n2][n1] = d2[0]
+            return
+        tx = np.array([[btx[n3][n2][n1] for n2, n1 in indexes] for n3 in range(n3Count + 1)])
+        td2 = np.diff(tx, axis=0)
+        td2 = np.concatenate((td2, td2[-1:])).tolist()
+        for n3 in range(n3Count + 1):
+            for (n2, n1), d2 in zip(indexes, td2[n3]):
+                btd2[n3][n2][n1] = d2
 
     def smoothd2Derivatives(self):
         """
-        smooth d2 derivatives using initial values calculated by calculateD2Derivatives
+        smooth d2 derivatives using initial values calculated by calculateD2Derivatives, all lines together.
         """
         btx = self._shield.px
-        btd1 = self._shield.pd1
         btd2 = self._shield.pd2
-        btd3 = self._shield.pd3
-        for n2 in range(self._elementsCountAcrossMajor + 1):
-            for n1 in range(self._elementsCountAcrossMinor + 1):
-                td2 = []
-                tx = []
-                if btx[0][n2][n1]:
-                    for n3 in range(self._elementsCountAlong + 1):
-                        tx.append(btx[n3][n2][n1])
-                        td2.append(btd2[n3][n2][n1])
-                    td2 = smoothCubicHermiteDerivativesLine(tx, td2, fixStartDirection=True)
-                    for n3 in range(self._elementsCountAlong + 1):
-                        btd2[n3][n2][n1] = td2[n3]
+        indexes = [(n2, n1) for n2 in range(self._elementsCountAcrossMajor + 1)
+                   for n1 in range(self._elementsCountAcrossMinor + 1) if btx[0][n2][n1]]
+        n3Range = range(self._elementsCountAlong + 1)
+        td2 = smoothCubicHermiteDerivativesLines(
+            [[btx[n3][n2][n1] for n3 in n3Range] for n2, n1 in indexes],
+            [[btd2[n3][n2][n1] for n3 in n3Range] for n2, n1 in indexes], fixStartDirection=True).tolist()
+        for (n2, n1), ltd2 in zip(indexes, td2):
+            for n3, d2 in zip(n3Range, ltd2):
+                btd2[n3][n2][n1] = d2
 
     def setEndsNodes(self):
         """
@@ -426,7 +437,7 @@ class Ellipse2D:
     def __init__(self, centre, majorAxis, minorAxis,
                  elementsCountAcrossMajor, elementsCountAcrossMinor, elementsCountAcrossShell,
                  elementsCountAcrossTransition, shellProportion, coreMajorRadius, coreMinorRadius,
-                 ellipseShape=EllipseShape.Ellipse_SHAPE_FULL):
+                 ellipseShape=EllipseShape.Ellipse_SHAPE_FULL, template=None):
         """
         :param centre: Ellipse centre.
         :param majorAxis: A vector for ellipse major axis.
@@ -434,6 +445,9 @@ class Ellipse2D:
         :param elementsCountAcrossMajor:
         :param elementsCountAcrossMinor:
         :param ellipseShape: The shape of the ellipse which can be full or lower half.
+        :param template: Optional Ellipse2D with the same element counts, shell proportion and ellipse shape for
+        which isTemplateFor() is True with this ellipse's axes and core radii. If supplied, its nodes are mapped
+        to this ellipse by a similarity transformation instead of generating them again.
         """
         self.centre = centre
         self.majorAxis = majorAxis
@@ -463,8 +477,12 @@ class Ellipse2D:
         self.pd3 = shield.pd3[0]
         self.__shield = shield
         self.ellipseShape = ellipseShape
+        self._nodeParameterArrays = None
         # generate the ellipse
-        self.generate2DEllipseMesh()
+        if template:
+            self.mapFromTemplate(template)
+        else:
+            self.generate2DEllipseMesh()
 
     def generate2DEllipseMesh(self):
         """
@@ -759,15 +777,17 @@ class Ellipse2D:
         """
         mirrorPlane = [-d for d in self.majorAxis] + [-dot(self.majorAxis, self.centre)]
         mirror = Mirror(mirrorPlane)
-        for n2 in range(self.elementsCountUp):
-            for n1 in range(self.elementsCountAcrossMinor + 1):
-                if self.px[n2][n1]:
-                    self.px[2 * self.elementsCountUp - n2][n1] = mirror.mirrorImageOfPoint(
-                        self.px[n2][n1])
-                    self.pd1[2 * self.elementsCountUp - n2][n1] = mirror.reverseMirrorVector(
-                        self.pd1[n2][n1])
-                    self.pd3[2 * self.elementsCountUp - n2][n1] = mirror.mirrorVector(
-                        self.pd3[n2][n1])
+        indexes = [(n2, n1) for n2 in range(self.elementsCountUp) for n1 in range(self.elementsCountAcrossMinor + 1)
+                   if self.px[n2][n1]]
+        if not indexes:
+            return
+        mirroredParameters = mirror.mirrorNodeParameters(
+            [[self.px[n2][n1], self.pd1[n2][n1], self.pd3[n2][n1]] for n2, n1 in indexes],
+            reverseDerivativeIndexes=[1]).tolist()
+        for (n2, n1), (x, d1, d3) in zip(indexes, mirroredParameters):
+            self.px[2 * self.elementsCountUp - n2][n1] = x
+            self.pd1[2 * self.elementsCountUp - n2][n1] = d1
+            self.pd3[2 * self.elementsCountUp - n2][n1] = d3
 
     def calculateD2(self):
         """
@@ -785,6 +805,63 @@ class Ellipse2D:
     def getShield(self):
         return self.__shield
 
+    def isTemplateFor(self, majorAxis, minorAxis, coreMajorRadius, coreMinorRadius):
+        """
+        Determine whether this ellipse can be mapped to an ellipse with the supplied parameters by a similarity
+        transformation i.e. rotation, translation and uniform scaling. Requires both ellipses to have orthogonal
+        axes and equal ratios of radii. Element counts, shell proportion and ellipse shape must be the same.
+        :param majorAxis: Major axis of the other ellipse.
+        :param minorAxis: Minor axis of the other ellipse.
+        :param coreMajorRadius: Core major radius of the other ellipse.
+        :param coreMinorRadius: Core minor radius of the other ellipse.
+        :return: True if this ellipse can be a template for the other ellipse.
+        """
+        tolerance = 1.0E-12
+        majorRadius = magnitude(majorAxis)
+        minorRadius = magnitude(minorAxis)
+        for major, minor, magMajor, magMinor in ((self.majorAxis, self.minorAxis, self.majorRadius, self.minorRadius),
+                                                 (majorAxis, minorAxis, majorRadius, minorRadius)):
+            if math.fabs(dot(major, minor)) > tolerance * magMajor * magMinor:
+                return False
+        return (math.fabs(minorRadius / majorRadius - self.minorRadius / self.majorRadius) <= tolerance) and \
+            (math.fabs(coreMajorRadius / majorRadius - self.coreMajorRadius / self.majorRadius) <= tolerance) and \
+            (math.fabs(coreMinorRadius / minorRadius - self.coreMinorRadius / self.minorRadius) <= tolerance)
+
+    def getNodeParameterArrays(self):
+        """
+        :return: List of (n2, n1) indexes of nodes in the ellipse, numpy arrays of their coordinates, d1 and d3.
+        """
+        if not self._nodeParameterArrays:
+            indexes = [(n2, n1) for n2 in range(len(self.px)) for n1 in range(len(self.px[n2])) if self.px[n2][n1]]
+            self._nodeParameterArrays = (
+                indexes,
+                np.array([self.px[n2][n1] for n2, n1 in indexes]),
+                np.array([self.pd1[n2][n1] for n2, n1 in indexes]),
+                np.array([self.pd3[n2][n1] for n2, n1 in indexes]))
+        return self._nodeParameterArrays
+
+    def mapFromTemplate(self, template):
+        """
+        Set nodes of this ellipse by mapping nodes of the template ellipse with the similarity transformation from
+        its centre and axes to those of this ellipse. d2 is the unit normal to the ellipse, as for calculateD2.
+        :param template: Ellipse2D satisfying template.isTemplateFor() with this ellipse's parameters.
+        """
+        indexes, tx, td1, td3 = template.getNodeParameterArrays()
+        templateFrame = np.array([normalize(template.majorAxis), normalize(template.minorAxis),
+                                  normalToEllipse(template.majorAxis, template.minorAxis)])
+        frame = np.array([normalize(self.majorAxis), normalize(self.minorAxis),
+                          normalToEllipse(self.majorAxis, self.minorAxis)])
+        transformation = (self.majorRadius / template.majorRadius) * (templateFrame.T @ frame)
+        nx = ((tx - template.centre) @ transformation + self.centre).tolist()
+        nd1 = (td1 @ transformation).tolist()
+        nd3 = (td3 @ transformation).tolist()
+        nte = frame[2].tolist()
+        for (n2, n1), x, d1, d3 in zip(indexes, nx, nd1, nd3):
+            self.px[n2][n1] = x
+            self.pd1[n2][n1] = d1
+            self.pd2[n2][n1] = nte
+            self.pd3[n2][n1] = d3
+
 
 def createEllipsePerimeter(centre, majorAxis, minorAxis, elementsCountAround, height):
     """
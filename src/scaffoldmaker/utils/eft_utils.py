@@ -2,7 +2,7 @@
 Utility functions for element field templates shared by mesh generators.
 '''
 from cmlibs.maths.vectorops import add, cross, dot, magnitude, matrix_inv, mult, normalize, sub, transpose
-from cmlibs.zinc.element import Elementbasis, Elementfieldtemplate
+from cmlibs.zinc.element import Element, Elementbasis, Elementfieldtemplate
 from cmlibs.zinc.node import Node
 from cmlibs.zinc.result import RESULT_OK
 from scaffoldmaker.utils.interpolation import (
@@ -1152,3 +1152,64 @@ def addTricubicHermiteSerendipityEftParameterScaling(eft, scalefactors, nodePara
         return eft, newScalefactors, addScalefactors
     remapEftNodeValueLabelsVersion(eft, localNodeIndexes, [valueLabel], version)
     return eft, scalefactors, addScalefactors
+
+
+class EftFactoryCache:
+    """
+    Mixin for 3-D element field template factories to share EFTs and element templates between elements.
+    Use getEft() in place of calling a createEft~ method to get one EFT object per distinct method and arguments,
+    and getElementtemplate() to get one element template per field and EFT. Zinc then stores and serializes one
+    template for all elements using it.
+    Shared EFTs must not be modified: call the createEft~ method directly to get a new EFT to modify.
+    Cached objects belong to the factory's mesh; call clearEftCache() if the mesh is cleared or its basis changed.
+    """
+
+    def _initEftCache(self):
+        """
+        Call from factory constructor after setting self._mesh.
+        """
+        self._eftCache = {}  # map from (createMethodName, args...) to eft
+        self._elementtemplateCache = {}  # map from (field name, eft) to elementtemplate
+
+    def getEft(self, createMethodName, *args):
+        """
+        Get shared EFT made by the named createEft~ method of this factory with args, creating it on first call.
+        :param createMethodName: Name of factory method e.g. "createEftShellPoleBottom".
+        :param args: Arguments to pass to method. Lists are treated as tuples in comparison.
+        :return: Zinc Elementfieldtemplate. Do not modify.
+        """
+        key = (createMethodName,) + tuple(tuple(arg) if isinstance(arg, list) else arg for arg in args)
+        eft = self._eftCache.get(key)
+        if eft is None:
+            eft = getattr(self, createMethodName)(*args)
+            self._eftCache[key] = eft
+        return eft
+
+    def getElementtemplate(self, field, eft):
+        """
+        Get shared element template defining field over all components with eft, creating it on first call.
+        :param field: Zinc finite element field.
+        :param eft: Zinc Elementfieldtemplate created for the factory's mesh, usually from getEft().
+        :return: Zinc Elementtemplate. Do not modify.
+        """
+        key = (field.getName(), eft)
+        elementtemplate = self._elementtemplateCache.get(key)
+        if elementtemplate is None:
+            elementtemplate = self._mesh.createElementtemplate()
+            elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+            elementtemplate.defineField(field, -1, eft)
+            self._elementtemplateCache[key] = elementtemplate
+        return elementtemplate
+
+    def clearEftCache(self):
+        """
+        Invalidate all shared EFTs and element templates so following calls create new ones.
+        """
+        self._eftCache.clear()
+        self._elementtemplateCache.clear()
+
+    def getEftCacheSize(self):
+        """
+        :return: Number of distinct shared EFTs.
+        """
+        return len(self._eftCache)
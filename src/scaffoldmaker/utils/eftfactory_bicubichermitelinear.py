@@ -3,10 +3,10 @@ Definitions of standard element field templates using bicubic Hermite x linear L
 """
 from cmlibs.zinc.element import Elementbasis
 from cmlibs.zinc.node import Node
-from scaffoldmaker.utils.eft_utils import remapEftLocalNodes, remapEftNodeValueLabel, setEftScaleFactorIds
+from scaffoldmaker.utils.eft_utils import EftFactoryCache, remapEftLocalNodes, remapEftNodeValueLabel, setEftScaleFactorIds
 
 
-class eftfactory_bicubichermitelinear:
+class eftfactory_bicubichermitelinear(EftFactoryCache):
     """
     Factory class for creating element field templates for a 3-D mesh using bicubic Hermite x linear Lagrange basis.
     """
@@ -35,6 +35,7 @@ class eftfactory_bicubichermitelinear:
         self._fieldmodule = mesh.getFieldmodule()
         self._basis = self._fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
         self._basis.setFunctionType(linearAxis, Elementbasis.FUNCTION_TYPE_LINEAR_LAGRANGE)
+        self._initEftCache()
 
     def _remapDefaultNodeDerivatives(self, eft):
         """
@@ -9,10 +9,10 @@ from cmlibs.utils.zinc.finiteelement import getElementNodeIdentifiers
 from cmlibs.zinc.element import Element, Elementbasis, Elementfieldtemplate
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
-from scaffoldmaker.utils.eft_utils import mapEftFunction1Node1Term, remapEftLocalNodes, remapEftNodeValueLabel, scaleEftNodeValueLabels, setEftScaleFactorIds
+from scaffoldmaker.utils.eft_utils import EftFactoryCache, mapEftFunction1Node1Term, remapEftLocalNodes, remapEftNodeValueLabel, scaleEftNodeValueLabels, setEftScaleFactorIds
 
 
-class eftfactory_tricubichermite:
+class eftfactory_tricubichermite(EftFactoryCache):
     '''
     Factory class for creating element field templates for a 3-D mesh using tricubic Hermite basis.
     '''
@@ -27,6 +27,7 @@ class eftfactory_tricubichermite:
         self._useCrossDerivatives = useCrossDerivatives
         self._fieldmodule = mesh.getFieldmodule()
         self._tricubicHermiteBasis = self._fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
+        self._initEftCache()
 
     def getElementbasis(self):
         return self._tricubicHermiteBasis
@@ -2,7 +2,7 @@
 Utilities for building solid ellipsoid meshes from hexahedral elements.
 """
 from cmlibs.maths.vectorops import add, cross, div, magnitude, mult, set_magnitude, sub
-from cmlibs.zinc.element import Element, Elementbasis
+from cmlibs.zinc.element import Elementbasis
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 
@@ -13,6 +13,7 @@ from scaffoldmaker.utils.geometry import (
 from scaffoldmaker.utils.interpolation import (
     DerivativeScalingMode, get_nway_point, linearlyInterpolateVectors, sampleHermiteCurve,
     smoothCubicHermiteDerivativesLine)
+from scaffoldmaker.utils.meshwriter import MeshWriter
 from scaffoldmaker.utils.quadtrianglemesh import QuadTriangleMesh
 import copy
 from enum import Enum
@@ -132,28 +133,50 @@ class EllipsoidMesh:
         """
         self._surface_d3_mode = surface_d3_mode
 
-    def build(self):
+    def __getstate__(self):
+        """
+        Get state for pickling, e.g. to build octants in another process. Omits zinc groups which cannot be
+        pickled, and the ellipsoid parameters and node identifiers which are not needed to build octants.
+        """
+        state = self.__dict__.copy()
+        for name in ("_box_group", "_transition_group", "_octant_group_lists", "_nx", "_nids"):
+            state[name] = None
+        return state
+
+    def build(self, executor=None):
         """
         Determine coordinates and derivatives over and within ellipsoid.
+        The two independent octants are built first, then copied, blended and mirrored into the ellipsoid.
+        :param executor: Optional concurrent.futures.Executor to build the two octants concurrently in, for clients
+        managing their own executor. No scaffold passes one. Threads do not run octant builds in parallel as they
+        hold the GIL, and a 2 process ProcessPoolExecutor was measured no faster at up to 24 elements per axis.
+        Results are identical to the default None which builds octants in turn.
         """
         half_counts = [count // 2 for count in self._element_counts]
         box_counts = [half_counts[i] - self._trans_count for i in range(3)]
 
-        octant1 = self._build_ellipsoid_octant(half_counts, self._axis2_x_rotation_radians, self._axis3_x_rotation_radians)
+        octant_build_args = [
+            (half_counts, self._axis2_x_rotation_radians, self._axis3_x_rotation_radians),
+            ([half_counts[0], half_counts[2], half_counts[1]],
+             self._axis3_x_rotation_radians - math.pi, self._axis2_x_rotation_radians)]
+        if executor:
+            futures = [executor.submit(_get_ellipsoid_octant_parameters, self, *args) for args in octant_build_args]
+            octant1_parameters, octant2_parameters = [future.result() for future in futures]
+        else:
+            octant1_parameters, octant2_parameters = [
+                self._build_ellipsoid_octant(*args).get_parameters() for args in octant_build_args]
 
-        # copy octant1 into ellipsoid
-        octant_parameters = octant1.get_parameters()
+        # copy octant1 into ellipsoid; octant is discarded after build so only need new lists per node
         for n3 in range(half_counts[2] + 1):
-            octant_nx_layer = octant_parameters[n3]
+            octant_nx_layer = octant1_parameters[n3]
             nx_layer = self._nx[half_counts[2] + n3]
             for n2 in range(half_counts[1] + 1):
                 octant_nx_row = octant_nx_layer[n2]
                 nx_row = nx_layer[half_counts[1] + n2]
                 for n1 in range(half_counts[0] + 1):
-                    nx_row[half_counts[0] + n1] = copy.deepcopy(octant_nx_row[n1])
-
-        octant2 = self._build_ellipsoid_octant([half_counts[0], half_counts[2], half_counts[1]],
-                                               self._axis3_x_rotation_radians - math.pi, self._axis2_x_rotation_radians)
+                    parameters = octant_nx_row[n1]
+                    nx_row[half_counts[0] + n1] = \
+                        [(v if v is None else list(v)) for v in parameters] if parameters else parameters
 
         # transfer parameters on bottom plane of octant1 to target location of octant2 for blending
         n3 = half_counts[2]
@@ -173,7 +196,7 @@ class EllipsoidMesh:
                 self._nx[n3][self._element_counts[1] - n2][n1] = [x, d1, d2, d3]
 
         # copy and mirror in y and z octant2 into ellipsoid, blending existing derivatives
-        octant_parameters = octant2.get_parameters()
+        octant_parameters = octant2_parameters
         for o3 in range(half_counts[1] + 1):
             octant_nx_layer = octant_parameters[o3]
             for o2 in range(half_counts[2] + 1):
@@ -701,7 +724,8 @@ class EllipsoidMesh:
         Note this is for mesh2d if surface_only, otherwise mesh3d.
         return next node identifier, next element identifier for objects after this.
         """
-        fieldcache = fieldmodule.createFieldcache()
+        mesh_dimension = 2 if self._surface_only else 3
+        mesh_writer = MeshWriter(coordinates, mesh_dimension)
 
         # create nodes
 
@@ -713,6 +737,8 @@ class EllipsoidMesh:
             value_labels.append(Node.VALUE_LABEL_D_DS3)
         for value_label in value_labels:
             nodetemplate.setValueNumberOfVersions(coordinates, -1, value_label, 1)
+        value_labels_versions = [(value_label, 1) for value_label in (
+            Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3)]
 
         node_identifier = start_node_identifier
         for n3 in range(self._element_counts[2] + 1):
@@ -724,26 +750,18 @@ class EllipsoidMesh:
                     x, d1, d2, d3 = parameters
                     if not x:
                         continue  # while in development
-                    node = nodes.createNode(node_identifier, nodetemplate)
+                    mesh_writer.addNode(node_identifier, nodetemplate, value_labels_versions,
+                                        [x, d1 or None, d2 or None, d3 or None])
                     self._nids[n3][n2][n1] = node_identifier
-                    fieldcache.setNode(node)
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, x)
-                    if d1:
-                        coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, d1)
-                    if d2:
-                        coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, 1, d2)
-                    if d3:
-                        coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS3, 1, d3)
                     node_identifier += 1
 
         # create elements
 
-        mesh_dimension = 2 if self._surface_only else 3
-        mesh = fieldmodule.findMeshByDimension(mesh_dimension)
+        mesh = mesh_writer.getMesh()
         element_identifier = start_element_identifier
         half_counts = [count // 2 for count in self._element_counts]
         node_layout_manager = HermiteNodeLayoutManager()
-        octant_mesh_group_lists = None
+        octant_mesh_group_lists = [[] for _ in range(8)]
         if self._octant_group_lists:
             octant_mesh_group_lists = []
             for octant_group_list in self._octant_group_lists:
@@ -751,24 +769,19 @@ class EllipsoidMesh:
                 for octant_group in octant_group_list:
                     octant_mesh_group_list.append(octant_group.getOrCreateMeshGroup(mesh))
                 octant_mesh_group_lists.append(octant_mesh_group_list)
-        box_mesh_group = None
-        transition_mesh_group = None
+        box_mesh_groups = []
+        transition_mesh_groups = []
         if not self._surface_only:
             if self._box_group:
-                box_mesh_group = self._box_group.getOrCreateMeshGroup(mesh)
+                box_mesh_groups.append(self._box_group.getOrCreateMeshGroup(mesh))
             if self._transition_group:
-                transition_mesh_group = self._transition_group.getOrCreateMeshGroup(mesh)
+                transition_mesh_groups.append(self._transition_group.getOrCreateMeshGroup(mesh))
 
         if self._surface_only:
             # 2-D mesh
-            elementtemplate_regular = mesh.createElementtemplate()
-            elementtemplate_regular.setElementShapeType(Element.SHAPE_TYPE_SQUARE)
             bicubic_hermite_serendipity_basis = (
                 fieldmodule.createElementbasis(2, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE_SERENDIPITY))
             eft_regular = mesh.createElementfieldtemplate(bicubic_hermite_serendipity_basis)
-            elementtemplate_regular.defineField(coordinates, -1, eft_regular)
-            elementtemplate_special = mesh.createElementtemplate()
-            elementtemplate_special.setElementShapeType(Element.SHAPE_TYPE_SQUARE)
             # get actual indexes used on rim in 1, 2, 3 directions
             rim_indexes = [[0] + [self._trans_count + 1 + j
                                   for j in range(self._element_counts[i] - 2 * self._trans_count - 1)] +
@@ -787,13 +800,9 @@ class EllipsoidMesh:
                         nids = [last_nids_row[i1 - 1], last_nids_row[i1], nids_row[i1 - 1], nids_row[i1]]
                         if None in nids:
                             continue
-                        element = mesh.createElement(element_identifier, elementtemplate_regular)
-                        element.setNodesByIdentifier(eft_regular, nids)
-                        # print("Element", element_identifier, "nids", nids)
-                        if octant_mesh_group_lists:
-                            octant = octant_n3 + octant_n2 + octant_n1
-                            for mesh_group in octant_mesh_group_lists[octant]:
-                                mesh_group.addElement(element)
+                        octant = octant_n3 + octant_n2 + octant_n1
+                        mesh_writer.addElement(element_identifier, eft_regular, nids, None,
+                                               octant_mesh_group_lists[octant])
                         element_identifier += 1
                 last_nids_row = nids_row
             # around sides
@@ -841,7 +850,6 @@ class EllipsoidMesh:
                             continue
                         q = nc // quarter_elements_count_around12
                         octant_nc.append(3 if (q == 0) else (2 if (q == 1) else (0 if (q == 2) else 1)))
-                        elementtemplate = elementtemplate_regular
                         eft = eft_regular
                         scalefactors = None
                         if n3 in (rim_indexes[2][1], self._element_counts[2]):
@@ -862,17 +870,9 @@ class EllipsoidMesh:
                                     node_layouts[3] = node_layout_triple_points[q]
                             eft, scalefactors = \
                                 determineCubicHermiteSerendipityEft(mesh, node_parameters, node_layouts)
-                            elementtemplate_special.defineField(coordinates, -1, eft)
-                            elementtemplate = elementtemplate_special
-                        element = mesh.createElement(element_identifier, elementtemplate)
-                        element.setNodesByIdentifier(eft, nids)
-                        if scalefactors:
-                            element.setScaleFactors(eft, scalefactors)
-                        # print("Element", element_identifier, "nids", nids)
-                        if octant_mesh_group_lists:
-                            octant = octant_n3 + octant_nc[nc]
-                            for mesh_group in octant_mesh_group_lists[octant]:
-                                mesh_group.addElement(element)
+                        octant = octant_n3 + octant_nc[nc]
+                        mesh_writer.addElement(element_identifier, eft, nids, scalefactors,
+                                               octant_mesh_group_lists[octant])
                         element_identifier += 1
                 last_nids_row = nids_row
                 last_parameters_row = parameters_row
@@ -891,25 +891,16 @@ class EllipsoidMesh:
                         nids = [last_nids_row[i1 - 1], last_nids_row[i1], nids_row[i1 - 1], nids_row[i1]]
                         if None in nids:
                             continue
-                        element = mesh.createElement(element_identifier, elementtemplate_regular)
-                        element.setNodesByIdentifier(eft_regular, nids)
-                        # print("Element", element_identifier, "nids", nids)
-                        if octant_mesh_group_lists:
-                            octant = octant_n3 + octant_n2 + octant_n1
-                            for mesh_group in octant_mesh_group_lists[octant]:
-                                mesh_group.addElement(element)
+                        octant = octant_n3 + octant_n2 + octant_n1
+                        mesh_writer.addElement(element_identifier, eft_regular, nids, None,
+                                               octant_mesh_group_lists[octant])
                         element_identifier += 1
                 last_nids_row = nids_row
         else:
             # 3-D mesh
-            elementtemplate_regular = mesh.createElementtemplate()
-            elementtemplate_regular.setElementShapeType(Element.SHAPE_TYPE_CUBE)
             tricubic_hermite_serendipity_basis = (
                 fieldmodule.createElementbasis(3, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE_SERENDIPITY))
             eft_regular = mesh.createElementfieldtemplate(tricubic_hermite_serendipity_basis)
-            elementtemplate_regular.defineField(coordinates, -1, eft_regular)
-            elementtemplate_special = mesh.createElementtemplate()
-            elementtemplate_special.setElementShapeType(Element.SHAPE_TYPE_CUBE)
             box_counts = [half_counts[i] - self._trans_count for i in range(3)]
             dbox_counts = [2 * box_counts[i] for i in range(3)]
             nid_to_node_layout = self._get_nid_to_node_layout_map_3d(node_layout_manager)
@@ -944,7 +935,6 @@ class EllipsoidMesh:
                                     last_nids_layer[i2][i1], last_nids_layer[i2][i1 - 1]]
                             if None in nids:
                                 continue
-                            elementtemplate = elementtemplate_regular
                             eft = eft_regular
                             scalefactors = None
                             node_layouts = [nid_to_node_layout.get(nid) for nid in nids]
@@ -955,19 +945,9 @@ class EllipsoidMesh:
                                                    last_nx_layer[i2][i1], last_nx_layer[i2][i1 - 1]]
                                 eft, scalefactors = \
                                     determineCubicHermiteSerendipityEft(mesh, node_parameters, node_layouts)
-                                elementtemplate_special.defineField(coordinates, -1, eft)
-                                elementtemplate = elementtemplate_special
-                            element = mesh.createElement(element_identifier, elementtemplate)
-                            element.setNodesByIdentifier(eft, nids)
-                            # print("Element", element_identifier, "nids", nids)
-                            if scalefactors:
-                                element.setScaleFactors(eft, scalefactors)
-                            if octant_mesh_group_lists:
-                                octant = octant_n3 + octant_n2 + octant_n1
-                                for mesh_group in octant_mesh_group_lists[octant]:
-                                    mesh_group.addElement(element)
-                            if transition_mesh_group:
-                                transition_mesh_group.addElement(element)
+                            octant = octant_n3 + octant_n2 + octant_n1
+                            mesh_writer.addElement(element_identifier, eft, nids, scalefactors,
+                                                   octant_mesh_group_lists[octant] + transition_mesh_groups)
                             element_identifier += 1
                     nids_layer.append(nids_row)
                     nx_layer.append(nx_row)
@@ -1005,7 +985,6 @@ class EllipsoidMesh:
                                     nids_row[i1 - 1], nids_row[i1]]
                             if None in nids:
                                 continue
-                            elementtemplate = elementtemplate_regular
                             eft = eft_regular
                             scalefactors = None
                             node_layouts = [nid_to_node_layout.get(nid) for nid in nids]
@@ -1016,19 +995,9 @@ class EllipsoidMesh:
                                                    nx_row[i1 - 1], nx_row[i1]]
                                 eft, scalefactors = \
                                     determineCubicHermiteSerendipityEft(mesh, node_parameters, node_layouts)
-                                elementtemplate_special.defineField(coordinates, -1, eft)
-                                elementtemplate = elementtemplate_special
-                            element = mesh.createElement(element_identifier, elementtemplate)
-                            element.setNodesByIdentifier(eft, nids)
-                            # print("Element", element_identifier, "nids", nids)
-                            if scalefactors:
-                                element.setScaleFactors(eft, scalefactors)
-                            if octant_mesh_group_lists:
-                                octant = octant_n3 + octant_n2 + octant_n1
-                                for mesh_group in octant_mesh_group_lists[octant]:
-                                    mesh_group.addElement(element)
-                            if box_mesh_group:
-                                box_mesh_group.addElement(element)
+                            octant = octant_n3 + octant_n2 + octant_n1
+                            mesh_writer.addElement(element_identifier, eft, nids, scalefactors,
+                                                   octant_mesh_group_lists[octant] + box_mesh_groups)
                             element_identifier += 1
                     nids_layer.append(nids_row)
                     nx_layer.append(nx_row)
@@ -1085,7 +1054,6 @@ class EllipsoidMesh:
                                     rim_nids_row[nc], rim_nids_row[ncp]]
                             if None in nids:
                                 continue
-                            elementtemplate = elementtemplate_regular
                             eft = eft_regular
                             scalefactors = None
                             node_layouts = [nid_to_node_layout.get(nid) for nid in nids]
@@ -1096,19 +1064,9 @@ class EllipsoidMesh:
                                                    rim_nx_row[nc], rim_nx_row[ncp]]
                                 eft, scalefactors = \
                                     determineCubicHermiteSerendipityEft(mesh, node_parameters, node_layouts)
-                                elementtemplate_special.defineField(coordinates, -1, eft)
-                                elementtemplate = elementtemplate_special
-                            element = mesh.createElement(element_identifier, elementtemplate)
-                            element.setNodesByIdentifier(eft, nids)
-                            # print("Element", element_identifier, "nids", nids)
-                            if scalefactors:
-                                element.setScaleFactors(eft, scalefactors)
-                            if octant_mesh_group_lists:
-                                octant = octant_n3 + octant_nc[nc]
-                                for mesh_group in octant_mesh_group_lists[octant]:
-                                    mesh_group.addElement(element)
-                            if transition_mesh_group:
-                                transition_mesh_group.addElement(element)
+                            octant = octant_n3 + octant_nc[nc]
+                            mesh_writer.addElement(element_identifier, eft, nids, scalefactors,
+                                                   octant_mesh_group_lists[octant] + transition_mesh_groups)
                             element_identifier += 1
                     rim_nids_layer.append(rim_nids_row)
                     rim_nx_layer.append(rim_nx_row)
@@ -1147,7 +1105,6 @@ class EllipsoidMesh:
                                     nids_row[i1 - 1], nids_row[i1]]
                             if None in nids:
                                 continue
-                            elementtemplate = elementtemplate_regular
                             eft = eft_regular
                             scalefactors = None
                             node_layouts = [nid_to_node_layout.get(nid) for nid in nids]
@@ -1158,19 +1115,9 @@ class EllipsoidMesh:
                                                    nx_row[i1 - 1], nx_row[i1]]
                                 eft, scalefactors = \
                                     determineCubicHermiteSerendipityEft(mesh, node_parameters, node_layouts)
-                                elementtemplate_special.defineField(coordinates, -1, eft)
-                                elementtemplate = elementtemplate_special
-                            element = mesh.createElement(element_identifier, elementtemplate)
-                            element.setNodesByIdentifier(eft, nids)
-                            # print("Element", element_identifier, "nids", nids)
-                            if scalefactors:
-                                element.setScaleFactors(eft, scalefactors)
-                            if octant_mesh_group_lists:
-                                octant = octant_n3 + octant_n2 + octant_n1
-                                for mesh_group in octant_mesh_group_lists[octant]:
-                                    mesh_group.addElement(element)
-                            if transition_mesh_group:
-                                transition_mesh_group.addElement(element)
+                            octant = octant_n3 + octant_n2 + octant_n1
+                            mesh_writer.addElement(element_identifier, eft, nids, scalefactors,
+                                                   octant_mesh_group_lists[octant] + transition_mesh_groups)
                             element_identifier += 1
                     nids_layer.append(nids_row)
                     nx_layer.append(nx_row)
@@ -1179,9 +1126,23 @@ class EllipsoidMesh:
                 last_nids_layer = nids_layer
                 last_nx_layer = nx_layer
 
+        mesh_writer.write()
         return node_identifier, element_identifier
 
 
+def _get_ellipsoid_octant_parameters(ellipsoid, half_counts, axis2_x_rotation_radians, axis3_x_rotation_radians):
+    """
+    Module-level function for building an ellipsoid octant in an executor, including in another process.
+    :param ellipsoid: EllipsoidMesh to build octant for.
+    :param half_counts: Numbers of elements across octant 1, 2 and 3 directions.
+    :param axis2_x_rotation_radians: Rotation of axis 2 about +x direction
+    :param axis3_x_rotation_radians: Rotation of axis 3 about +x direction.
+    :return: Octant parameters array, see EllipsoidOctantMesh.get_parameters().
+    """
+    return ellipsoid._build_ellipsoid_octant(half_counts, axis2_x_rotation_radians,
+                                             axis3_x_rotation_radians).get_parameters()
+
+
 class EllipsoidOctantMesh:
     """
     Generates one octant of an ellipsoid, 2-D surface or full 3-D volume.
@@ -0,0 +1,208 @@
+"""
+Class for exporting a Scaffold from Zinc to contiguous NumPy arrays.
+"""
+
+from multiprocessing import shared_memory
+
+from cmlibs.zinc.field import Field
+from cmlibs.zinc.result import RESULT_OK
+import numpy as np
+
+
+class ExportArrays:
+    """
+    Class for exporting a Scaffold from Zinc to contiguous NumPy arrays in one pass over its nodes and elements, for
+    in-memory use with PyVista, meshio or machine learning pipelines without writing files.
+    Exports elements of the highest dimension only, and excludes marker nodes, as for ExportVtk.
+    Assumes all nodes have the coordinates field defined.
+    """
+
+    def __init__(self, region, annotationGroups=None, coordinatesFieldName="coordinates"):
+        """
+        :param region: Region containing finite element model to export.
+        :param annotationGroups: Optional list of AnnotationGroup for model, to get membership of.
+        :param coordinatesFieldName: Name of coordinates field to export node values of.
+        """
+        self._region = region
+        self._fieldmodule = self._region.getFieldmodule()
+        for dimension in range(3, 0, -1):
+            self._mesh = self._fieldmodule.findMeshByDimension(dimension)
+            if self._mesh.getSize() > 0:
+                break
+        self._nodes = self._fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self._coordinates = self._fieldmodule.findFieldByName(coordinatesFieldName).castFiniteElement()
+        assert self._coordinates.isValid(), "ExportArrays:  Missing coordinates field " + coordinatesFieldName
+        self._annotationGroups = annotationGroups if annotationGroups else []
+        self._markerNodes = None
+        markerGroup = self._fieldmodule.findFieldByName("marker")
+        if markerGroup.isValid():
+            self._markerNodes = markerGroup.castGroup().getNodesetGroup(self._nodes)
+        self._sharedMemories = {}
+        self._sharedMemoryLayouts = {}
+
+    def getGroupNames(self):
+        """
+        :return: List of annotation group names in order of their bits in the group membership arrays.
+        """
+        return [annotationGroup.getName() for annotationGroup in self._annotationGroups]
+
+    def getArrays(self, sharedMemory=False):
+        """
+        Get arrays describing the model. Nodes and elements are in order of identifier.
+        Group membership is stored in bitsets with one row per node or element, with bit g of the row, i.e. bit
+        (g % 8) of byte (g // 8), set if it is in annotation group g. Use getGroupMembership() to unpack.
+        :param sharedMemory: If True, arrays are in shared memory blocks for other processes to attach, using the
+        description from getSharedMemoryDescription() with attachSharedMemoryArrays(). Client must call
+        releaseSharedMemory() when finished with them.
+        :return: dict mapping names to NumPy arrays:
+            "node identifiers": int64 (nodesCount), i.e. map from node index to identifier.
+            "node coordinates": float64 (nodesCount, 3) node values of coordinates, padded to 3 components with 0.0.
+            "element identifiers": int64 (elementsCount), i.e. map from element index to identifier.
+            "element node indexes": int64 (elementsCount, basisNodesCount) zero-based indexes of element nodes in
+            element basis order, as from getElementNodeIdentifiersBasisOrder(), padded with -1 for elements with
+            fewer basis nodes.
+            "node group bits": uint8 (nodesCount, (groupsCount + 7) // 8).
+            "element group bits": uint8 (elementsCount, (groupsCount + 7) // 8).
+        """
+        if sharedMemory:
+            self.releaseSharedMemory()
+        fieldcache = self._fieldmodule.createFieldcache()
+        coordinatesCount = self._coordinates.getNumberOfComponents()
+        exportComponentsCount = min(coordinatesCount, 3)
+        nodesCount = self._nodes.getSize() - (self._markerNodes.getSize() if self._markerNodes else 0)
+        groupBytesCount = (len(self._annotationGroups) + 7) // 8
+        arrays = {}
+
+        def createArray(name, shape, dtype):
+            if not sharedMemory:
+                arrays[name] = array = np.zeros(shape, dtype=dtype)
+                return array
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            self._sharedMemories[name] = memory
+            self._sharedMemoryLayouts[name] = (shape, np.dtype(dtype).str)
+            arrays[name] = array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+            array.fill(0)
+            return array
+
+        nodeIdentifiers = createArray("node identifiers", (nodesCount,), np.int64)
+        nodeCoordinates = createArray("node coordinates", (nodesCount, 3), np.float64)
+        index = 0
+        nodeIter = self._nodes.createNodeiterator()
+        node = nodeIter.next()
+        while node.isValid():
+            if not (self._markerNodes and self._markerNodes.containsNode(node)):
+                nodeIdentifiers[index] = node.getIdentifier()
+                fieldcache.setNode(node)
+                result, x = self._coordinates.evaluateReal(fieldcache, coordinatesCount)
+                if result != RESULT_OK:
+                    print("Coordinates not found for node", node.getIdentifier())
+                else:
+                    nodeCoordinates[index, :exportComponentsCount] = \
+                        x[:exportComponentsCount] if (coordinatesCount > 1) else [x]
+                index += 1
+            node = nodeIter.next()
+
+        # get node identifiers in basis order with local node indexes cached for each element field template
+        elementsCount = self._mesh.getSize()
+        elementIdentifiersList = []
+        elementNodeIdentifiersList = []
+        eftLocalNodeIndexes = {}
+        elementIter = self._mesh.createElementiterator()
+        element = elementIter.next()
+        while element.isValid():
+            eft = element.getElementfieldtemplate(self._coordinates, -1)  # assumes all components same
+            localNodeIndexes = eftLocalNodeIndexes.get(eft)
+            if localNodeIndexes is None:
+                localNodeIndexes = []
+                elementbasis = eft.getElementbasis()
+                functionNumber = 1
+                for n in range(elementbasis.getNumberOfNodes()):
+                    localNodeIndexes.append(eft.getTermLocalNodeIndex(functionNumber, 1))
+                    functionNumber += elementbasis.getNumberOfFunctionsPerNode(n + 1)
+                eftLocalNodeIndexes[eft] = localNodeIndexes
+            elementIdentifiersList.append(element.getIdentifier())
+            elementNodeIdentifiersList.append(
+                [element.getNode(eft, localNodeIndex).getIdentifier() for localNodeIndex in localNodeIndexes])
+            element = elementIter.next()
+        basisNodesCount = max((len(localNodeIndexes) for localNodeIndexes in eftLocalNodeIndexes.values()),
+                              default=0)
+        elementIdentifiers = createArray("element identifiers", (elementsCount,), np.int64)
+        elementIdentifiers[:] = elementIdentifiersList
+        elementNodeIndexes = createArray("element node indexes", (elementsCount, basisNodesCount), np.int64)
+        elementNodeIndexes.fill(-1)
+        for e, elementNodeIdentifiers in enumerate(elementNodeIdentifiersList):
+            elementNodeIndexes[e, :len(elementNodeIdentifiers)] = \
+                np.searchsorted(nodeIdentifiers, elementNodeIdentifiers)
+
+        # set bits from group contents, using that identifiers are in increasing order
+        nodeGroupBits = createArray("node group bits", (nodesCount, groupBytesCount), np.uint8)
+        elementGroupBits = createArray("element group bits", (elementsCount, groupBytesCount), np.uint8)
+        for g, annotationGroup in enumerate(self._annotationGroups):
+            byteIndex = g // 8
+            bit = np.uint8(1 << (g % 8))
+            for domainIdentifiers, domainGroup, groupBits in (
+                    (nodeIdentifiers, annotationGroup.getNodesetGroup(self._nodes), nodeGroupBits),
+                    (elementIdentifiers, annotationGroup.getMeshGroup(self._mesh), elementGroupBits)):
+                if not (domainGroup.isValid() and (domainGroup.getSize() > 0)):
+                    continue
+                identifiers = []
+                iterator = domainGroup.createNodeiterator() if (groupBits is nodeGroupBits) else \
+                    domainGroup.createElementiterator()
+                item = iterator.next()
+                while item.isValid():
+                    identifiers.append(item.getIdentifier())
+                    item = iterator.next()
+                # exclude identifiers not exported e.g. marker nodes
+                indexes = np.searchsorted(domainIdentifiers, identifiers)
+                exported = indexes < len(domainIdentifiers)
+                exported[exported] = domainIdentifiers[indexes[exported]] == np.array(identifiers)[exported]
+                groupBits[indexes[exported], byteIndex] |= bit
+        return arrays
+
+    def getSharedMemoryDescription(self):
+        """
+        :return: dict mapping array name to (shared memory name, shape, dtype string) for arrays from the last call
+        to getArrays(sharedMemory=True), which can be passed to another process to attachSharedMemoryArrays().
+        """
+        description = {}
+        for name, memory in self._sharedMemories.items():
+            description[name] = (memory.name,) + self._sharedMemoryLayouts[name]
+        return description
+
+    def releaseSharedMemory(self):
+        """
+        Close and unlink shared memory blocks for arrays from getArrays(sharedMemory=True).
+        Arrays using them must not be used afterwards.
+        """
+        for memory in self._sharedMemories.values():
+            memory.close()
+            memory.unlink()
+        self._sharedMemories = {}
+        self._sharedMemoryLayouts = {}
+
+    @staticmethod
+    def getGroupMembership(groupBits, groupIndex):
+        """
+        Unpack membership of one group from group bits array.
+        :param groupBits: Node or element group bits array from getArrays().
+        :param groupIndex: Index of group in getGroupNames().
+        :return: bool array with True for nodes or elements in group.
+        """
+        return ((groupBits[:, groupIndex // 8] >> (groupIndex % 8)) & 1).astype(bool)
+
+
+def attachSharedMemoryArrays(description):
+    """
+    Attach to arrays exported to shared memory by ExportArrays in another process.
+    :param description: dict from ExportArrays.getSharedMemoryDescription().
+    :return: dict mapping names to NumPy arrays, list of SharedMemory which client must keep while using arrays,
+    then close().
+    """
+    arrays = {}
+    memories = []
+    for name, (memoryName, shape, dtype) in description.items():
+        memory = shared_memory.SharedMemory(name=memoryName)
+        memories.append(memory)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=memory.buf)
+    return arrays, memories
@@ -0,0 +1,103 @@
+"""
+Progress reporting and cancellation for long-running scaffold generation.
+"""
+import contextvars
+import threading
+
+
+class GenerateCancelled(Exception):
+    """
+    Raised from within scaffold generation when its GenerateMonitor has been cancelled.
+    """
+    pass
+
+
+class GenerateMonitor:
+    """
+    Cancellation token and progress receiver for scaffold generation.
+    Activate it with a 'with' statement around generation in the thread doing it; generation code then reports
+    progress at stage boundaries and checks for cancellation in long loops with the module functions
+    reportGenerateProgress() and checkGenerateCancelled(), which do nothing if no monitor is active.
+    Method cancel() may be called from any thread.
+    """
+
+    def __init__(self, progressCallback=None, parent=None):
+        """
+        :param progressCallback: Optional callable(stageName, proportion) called in the generating thread with
+        the name of the current stage and proportion of it done from 0.0 to 1.0, or None if unknown.
+        :param parent: Optional parent GenerateMonitor which this is also cancelled by and forwards progress to.
+        """
+        self._progressCallback = progressCallback
+        self._parent = parent
+        self._cancelledEvent = threading.Event()
+        self._activeTokens = []
+
+    def __enter__(self):
+        self._activeTokens.append(_currentGenerateMonitor.set(self))
+        return self
+
+    def __exit__(self, *args):
+        _currentGenerateMonitor.reset(self._activeTokens.pop())
+
+    def cancel(self):
+        """
+        Request cancellation: generation stops with GenerateCancelled when it next checks.
+        """
+        self._cancelledEvent.set()
+
+    def isCancelled(self):
+        """
+        :return: True if this or the parent monitor has been cancelled.
+        """
+        return self._cancelledEvent.is_set() or (bool(self._parent) and self._parent.isCancelled())
+
+    def checkCancelled(self):
+        """
+        Raise GenerateCancelled if this or the parent monitor has been cancelled.
+        """
+        if self.isCancelled():
+            raise GenerateCancelled()
+
+    def reportProgress(self, stageName, proportion=None):
+        """
+        Report progress to callbacks, after checking for cancellation.
+        :param stageName: Name of stage of generation e.g. "segments sampled".
+        :param proportion: Proportion of stage done from 0.0 to 1.0, or None if unknown.
+        """
+        self.checkCancelled()
+        if self._progressCallback:
+            self._progressCallback(stageName, proportion)
+        if self._parent:
+            self._parent.reportProgress(stageName, proportion)
+
+
+_currentGenerateMonitor = contextvars.ContextVar("currentGenerateMonitor", default=None)
+
+
+def getCurrentGenerateMonitor():
+    """
+    :return: GenerateMonitor active in the current thread or context, or None if none.
+    """
+    return _currentGenerateMonitor.get()
+
+
+def checkGenerateCancelled():
+    """
+    Call in long loops during generation. Raises GenerateCancelled if the active GenerateMonitor, if any, has been
+    cancelled.
+    """
+    monitor = _currentGenerateMonitor.get()
+    if monitor:
+        monitor.checkCancelled()
+
+
+def reportGenerateProgress(stageName, proportion=None):
+    """
+    Call at stage boundaries and periodically in long loops during generation, to report progress to the active
+    GenerateMonitor, if any. Raises GenerateCancelled if it has been cancelled.
+    :param stageName: Name of stage of generation e.g. "segments sampled".
+    :param proportion: Proportion of stage done from 0.0 to 1.0, or None if unknown.
+    """
+    monitor = _currentGenerateMonitor.get()
+    if monitor:
+        monitor.reportProgress(stageName, proportion)
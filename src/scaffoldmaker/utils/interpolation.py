@@ -5,10 +5,12 @@ from cmlibs.maths.vectorops import (
     add, axis_angle_to_rotation_matrix, cross, distance, div, dot, euler_to_rotation_matrix, matrix_inv, magnitude,
     matrix_vector_mult, mult, normalize, sub, set_magnitude)
 from scipy.optimize import minimize
+from scipy.spatial import cKDTree
 import copy
 from collections.abc import Sequence
 from enum import Enum
 import math
+import numpy
 
 
 gaussXi3 = ( (-math.sqrt(0.6)+1.0)/2.0, 0.5, (+math.sqrt(0.6)+1.0)/2.0 )
@@ -210,6 +212,21 @@ def getCubicHermiteArcLength(v1, d1, v2, d2):
         arcLength += gaussWt4[i]*math.sqrt(sum(d*d for d in dm))
     return arcLength
 
+def getCubicHermiteArcLengths(v1, d1, v2, d2):
+    """
+    Vectorised getCubicHermiteArcLength for many curves at once.
+    Note this is approximate.
+    :param v1, d1, v2, d2: Arrays of shape (..., componentsCount) for start and end values and derivatives.
+    :return: numpy array of arc lengths of cubic curves with shape (...) using 4 point Gaussian quadrature.
+    """
+    v1, d1, v2, d2 = (numpy.asarray(a, dtype=float) for a in (v1, d1, v2, d2))
+    arcLengths = 0.0
+    for i in range(4):
+        f1, f2, f3, f4 = getCubicHermiteBasisDerivatives(gaussXi4[i])
+        dm = f1*v1 + f2*d1 + f3*v2 + f4*d2
+        arcLengths = arcLengths + gaussWt4[i]*numpy.linalg.norm(dm, axis=-1)
+    return arcLengths
+
 def getCubicHermiteArcLengthToXi(v1, d1, v2, d2, xi):
     """
     Note this is approximate.
@@ -908,6 +925,94 @@ def smoothCubicHermiteDerivativesLine(nx, nd1,
     return md1
 
 
+def smoothCubicHermiteDerivativesLines(nx, nd1,
+        fixAllDirections=False,
+        fixStartDerivative=False, fixEndDerivative=False,
+        fixStartDirection=False, fixEndDirection=False,
+        magnitudeScalingMode=DerivativeScalingMode.ARITHMETIC_MEAN):
+    """
+    Vectorised smoothCubicHermiteDerivativesLine for many lines with the same number of nodes, all smoothed with the
+    same options. Each line stops being modified once it converges, so results are as for smoothing each line
+    separately, to rounding error.
+    :param nx: Array-like of node coordinates with shape (linesCount, nodesCount, componentsCount).
+    :param nd1: Array-like of node derivatives with the same shape as nx.
+    :param fixAllDirections, fixStartDerivative, fixEndDerivative, fixStartDirection, fixEndDirection,
+    magnitudeScalingMode: See smoothCubicHermiteDerivativesLine.
+    :return: numpy array of modified nd1.
+    """
+    nx = numpy.asarray(nx, dtype=float)
+    nd1 = numpy.asarray(nd1, dtype=float)
+    assert nx.ndim == 3, 'smoothCubicHermiteDerivativesLines.  Coordinates must have shape (lines, nodes, components)'
+    assert nd1.shape == nx.shape, 'smoothCubicHermiteDerivativesLines.  Mismatched number of derivatives'
+    linesCount, nodesCount = nx.shape[:2]
+    elementsCount = nodesCount - 1
+    assert elementsCount > 0, 'smoothCubicHermiteDerivativesLines.  Too few nodes/elements'
+    arithmeticMeanMagnitude = magnitudeScalingMode is DerivativeScalingMode.ARITHMETIC_MEAN
+    assert arithmeticMeanMagnitude or (magnitudeScalingMode is DerivativeScalingMode.HARMONIC_MEAN), \
+        'smoothCubicHermiteDerivativesLines. Invalid magnitude scaling mode'
+    if (elementsCount == 1) or (linesCount == 0):
+        # special cases for one element are iterative per line
+        return numpy.array([smoothCubicHermiteDerivativesLine(
+            x, d, fixAllDirections=fixAllDirections,
+            fixStartDerivative=fixStartDerivative, fixEndDerivative=fixEndDerivative,
+            fixStartDirection=fixStartDirection, fixEndDirection=fixEndDirection,
+            magnitudeScalingMode=magnitudeScalingMode) for x, d in zip(nx.tolist(), nd1.tolist())],
+            dtype=float).reshape(nx.shape)
+
+    def setMagnitudes(v, mag):
+        return v*(mag/numpy.linalg.norm(v, axis=-1))[..., numpy.newaxis]
+
+    md1 = nd1.copy()
+    deltas = nx[:, 1:] - nx[:, :-1]
+    lineIndexes = numpy.arange(linesCount)  # of unconverged lines
+    tol = 1.0E-6
+    for iter in range(100):
+        x = nx[lineIndexes]
+        lastmd1 = md1[lineIndexes]
+        newmd1 = lastmd1.copy()
+        arcLengths = getCubicHermiteArcLengths(x[:, :-1], lastmd1[:, :-1], x[:, 1:], lastmd1[:, 1:])
+        # start
+        if not fixStartDerivative:
+            if fixAllDirections or fixStartDirection:
+                mag = 2.0*arcLengths[:, 0] - numpy.linalg.norm(lastmd1[:, 1], axis=-1)
+                newmd1[:, 0] = numpy.where((mag > 0.0)[:, numpy.newaxis],
+                                           setMagnitudes(nd1[lineIndexes, 0], numpy.maximum(mag, 0.0)), 0.0)
+            else:
+                # interpolateLagrangeHermiteDerivative at xi = 0.0
+                newmd1[:, 0] = 2.0*(x[:, 1] - x[:, 0]) - lastmd1[:, 1]
+        # middle
+        arcLengthsm = arcLengths[:, :-1]
+        arcLengthsp = arcLengths[:, 1:]
+        if not fixAllDirections:
+            # mean of directions to adjacent points weighted by fraction towards that end
+            arcLengthsmp = (arcLengthsm + arcLengthsp)[..., numpy.newaxis]
+            newmd1[:, 1:-1] = (arcLengthsp[..., numpy.newaxis]*deltas[lineIndexes, :-1] +
+                               arcLengthsm[..., numpy.newaxis]*deltas[lineIndexes, 1:])/arcLengthsmp
+        if arithmeticMeanMagnitude:
+            mag = 0.5*(arcLengthsm + arcLengthsp)
+        else:  # harmonicMeanMagnitude
+            mag = 2.0/(1.0/arcLengthsm + 1.0/arcLengthsp)
+        newmd1[:, 1:-1] = setMagnitudes(newmd1[:, 1:-1], mag)
+        # end
+        if not fixEndDerivative:
+            if fixAllDirections or fixEndDirection:
+                mag = 2.0*arcLengths[:, -1] - numpy.linalg.norm(lastmd1[:, -2], axis=-1)
+                newmd1[:, -1] = numpy.where((mag > 0.0)[:, numpy.newaxis],
+                                            setMagnitudes(nd1[lineIndexes, -1], numpy.maximum(mag, 0.0)), 0.0)
+            else:
+                # interpolateHermiteLagrangeDerivative at xi = 1.0
+                newmd1[:, -1] = 2.0*(x[:, -1] - x[:, -2]) - lastmd1[:, -2]
+        md1[lineIndexes] = newmd1
+        dtol = tol*numpy.mean(arcLengths, axis=1)
+        unconverged = numpy.max(numpy.abs(newmd1 - lastmd1), axis=(1, 2)) > dtol
+        lineIndexes = lineIndexes[unconverged]
+        if lineIndexes.size == 0:
+            return md1
+
+    print('smoothCubicHermiteDerivativesLines max iters reached:', iter + 1, 'for', lineIndexes.size, 'lines')
+    return md1
+
+
 def computeCubicHermiteSideCrossDerivatives(ax, ad1, bx, bd1, asd_list, bsd_list,
                                             ascd_fixed=None, bscd_fixed=None):
     """
@@ -1490,6 +1595,92 @@ def getNearestLocationOnCurve(nx, nd1, targetx, loop=False, startLocation=None,
     return location, x
 
 
+def getNearestLocationsOnCurve(nx, nd1, targetsx, loop=False, samplesPerElement=8, instrument=False):
+    """
+    Get locations on a piecewise Hermite curve which are closest to each of many target coordinates, processing all
+    targets together. Builds a KD-tree of samplesPerElement points per element once to seed each target at its
+    nearest sample, then refines all targets together with Newton iterations minimising squared distance, crossing
+    element boundaries as needed. Dense seeding finds the global minimum unless distant parts of the curve are
+    nearly equidistant.
+    :param nx: Coordinates along curve.
+    :param nd1: Derivatives along curve.
+    :param targetsx: List of coordinates to get nearest point on curve to.
+    :param loop: True if curve loops back to first point, False if not.
+    :param samplesPerElement: Number of points sampled in each element to seed search.
+    :param instrument: Set to True to print iterations and convergence.
+    :return: list of nearest location tuples (element index, xi), list of nearest x, list of bool True if converged
+    for each target.
+    """
+    nodesCount = len(nx)
+    assert nodesCount > 1
+    if len(targetsx) == 0:
+        return [], [], []
+    elementsCount = nodesCount if loop else nodesCount - 1
+    targets = numpy.array(targetsx, dtype=float)
+    px = numpy.array(nx, dtype=float)
+    pd1 = numpy.array(nd1, dtype=float)
+    ep = numpy.arange(elementsCount)
+    ex = numpy.stack((px[ep], pd1[ep], px[(ep + 1) % nodesCount], pd1[(ep + 1) % nodesCount]), axis=1)
+
+    def evaluate(e, xi, derivative):
+        xi2 = xi * xi
+        if derivative == 0:
+            xi3 = xi2 * xi
+            basis = (1.0 - 3.0 * xi2 + 2.0 * xi3, xi - 2.0 * xi2 + xi3, 3.0 * xi2 - 2.0 * xi3, xi3 - xi2)
+        elif derivative == 1:
+            basis = (6.0 * (xi2 - xi), 1.0 - 4.0 * xi + 3.0 * xi2, 6.0 * (xi - xi2), 3.0 * xi2 - 2.0 * xi)
+        else:
+            basis = (12.0 * xi - 6.0, 6.0 * xi - 4.0, 6.0 - 12.0 * xi, 6.0 * xi - 2.0)
+        return numpy.einsum("pk,pkc->pc", numpy.stack(basis, axis=1), ex[e])
+
+    # seed from nearest sample point
+    sampleLocations = numpy.arange(elementsCount * samplesPerElement + (0 if loop else 1)) / samplesPerElement
+    sampleElements = numpy.minimum(sampleLocations.astype(int), elementsCount - 1)
+    sampleXi = sampleLocations - sampleElements
+    nearestSamples = cKDTree(evaluate(sampleElements, sampleXi, 0)).query(targets)[1]
+    # location along curve s = element index + xi
+    s = sampleLocations[nearestSamples]
+    e = sampleElements[nearestSamples]
+    xi = sampleXi[nearestSamples]
+
+    MAX_MAG_DXI = 0.5  # maximum magnitude of xi increment
+    XI_TOL = 1.0E-9
+    MAX_ITERS = 100
+    converged = numpy.zeros(len(targets), dtype=bool)
+    active = numpy.arange(len(targets))
+    for it in range(MAX_ITERS):
+        ae = e[active]
+        axi = xi[active]
+        deltax = evaluate(ae, axi, 0) - targets[active]
+        d = evaluate(ae, axi, 1)
+        d2 = evaluate(ae, axi, 2)
+        gradient = numpy.sum(deltax * d, axis=1)
+        dd = numpy.sum(d * d, axis=1)
+        hessian = dd + numpy.sum(deltax * d2, axis=1)
+        # fall back to tangential projection where not locally convex
+        dxi = -gradient / numpy.where(hessian > 0.0, hessian, dd)
+        dxi = numpy.clip(dxi, -MAX_MAG_DXI, MAX_MAG_DXI)
+        startS = s[active]
+        newS = numpy.mod(startS + dxi, elementsCount) if loop else numpy.clip(startS + dxi, 0.0, elementsCount)
+        s[active] = newS
+        e[active] = numpy.minimum(newS.astype(int), elementsCount - 1)
+        xi[active] = newS - e[active]
+        magAdxi = numpy.abs(newS - startS)
+        if loop:
+            magAdxi = numpy.minimum(magAdxi, elementsCount - magAdxi)
+        done = (magAdxi < XI_TOL) | ~numpy.isfinite(dxi)
+        converged[active[done]] = numpy.isfinite(dxi[done])
+        active = active[~done]
+        if instrument:
+            print("getNearestLocationsOnCurve:  iteration", it + 1, "unconverged", len(active))
+        if len(active) == 0:
+            break
+    else:
+        print("getNearestLocationsOnCurve:  Reached max iterations", MAX_ITERS, "for", len(active), "targets")
+    nearestx = evaluate(e, xi, 0)
+    return list(zip(e.tolist(), xi.tolist())), nearestx.tolist(), converged.tolist()
+
+
 def getNearestLocationBetweenCurves(nx, nd1, ox, od1, nLoop=False, oLoop=False, startLocation=None, instrument=False):
     """
     Get the closest locations on two piecewise Hermite curves. Can be a local minimum depending on start location.
@@ -12,6 +12,7 @@ from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from cmlibs.zinc.result import RESULT_OK as ZINC_OK
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
+from scaffoldmaker.utils.generatemonitor import checkGenerateCancelled, reportGenerateProgress
 from scaffoldmaker.utils.octree import Octree
 
 
@@ -234,7 +235,17 @@ class MeshRefinement:
         return nids, nx
 
     def refineAllElementsCubeStandard3d(self, numberInXi1, numberInXi2, numberInXi3):
+        elementsCount = self._sourceMesh.getSize()
+        # report progress about every percent
+        reportInterval = max(1, elementsCount // 100)
+        elementIndex = 0
         element = self._sourceElementiterator.next()
         while element.isValid():
+            if (elementIndex % reportInterval) == 0:
+                reportGenerateProgress("elements refined", elementIndex / elementsCount)
+            else:
+                checkGenerateCancelled()
             self.refineElementCubeStandard3d(element, numberInXi1, numberInXi2, numberInXi3)
+            elementIndex += 1
             element = self._sourceElementiterator.next()
+        reportGenerateProgress("elements refined", 1.0)
@@ -0,0 +1,111 @@
+"""
+Prediction of scaffold mesh sizes and memory use from options, without generating them.
+"""
+from itertools import combinations
+import math
+
+
+class MeshSizeEstimate:
+    """
+    Predicted numbers of nodes, elements, faces and annotation groups in a scaffold mesh, plus its approximate
+    memory footprint. Returned by Scaffold_base.getMeshSizeEstimate() for scaffold types which implement it.
+    """
+
+    # approximate bytes used per object, from process memory measured while generating regular meshes
+    NODE_BYTES = 48
+    NODE_PARAMETER_BYTES = 9
+    ELEMENT_BYTES = 75
+    FACE_BYTES = 260
+    ANNOTATION_GROUP_BYTES = 2000
+
+    def __init__(self, nodesCount, meshSizes, nodeParametersCount, annotationGroupsCount=0):
+        """
+        :param nodesCount: Number of nodes.
+        :param meshSizes: List of numbers of elements in the 1-D, 2-D... meshes up to the highest dimension of the
+        scaffold, including faces and lines defined for the highest dimension elements.
+        :param nodeParametersCount: Total number of field parameters stored at all nodes, e.g. 12 per node for
+        3 component coordinates with value, d/ds1, d/ds2 and d/ds3.
+        :param annotationGroupsCount: Number of annotation groups.
+        """
+        self._nodesCount = nodesCount
+        self._meshSizes = list(meshSizes)
+        self._nodeParametersCount = nodeParametersCount
+        self._annotationGroupsCount = annotationGroupsCount
+
+    def getDimension(self):
+        """
+        :return: Dimension of highest dimension elements.
+        """
+        return len(self._meshSizes)
+
+    def getNodesCount(self):
+        return self._nodesCount
+
+    def getNodeParametersCount(self):
+        return self._nodeParametersCount
+
+    def getMeshSize(self, dimension):
+        """
+        :param dimension: Mesh dimension from 1 to getDimension().
+        :return: Number of elements in mesh of dimension.
+        """
+        return self._meshSizes[dimension - 1]
+
+    def getElementsCount(self):
+        """
+        :return: Number of elements of highest dimension.
+        """
+        return self._meshSizes[-1] if self._meshSizes else 0
+
+    def getFacesCount(self):
+        """
+        :return: Number of faces and lines of lower dimension than the highest dimension elements.
+        """
+        return sum(self._meshSizes[:-1])
+
+    def getAnnotationGroupsCount(self):
+        return self._annotationGroupsCount
+
+    def getMemoryBytes(self):
+        """
+        :return: Estimated memory used by the generated mesh in bytes. Typically within 20% for regular meshes.
+        """
+        return int(self._nodesCount * self.NODE_BYTES + self._nodeParametersCount * self.NODE_PARAMETER_BYTES +
+                   self.getElementsCount() * self.ELEMENT_BYTES + self.getFacesCount() * self.FACE_BYTES +
+                   self._annotationGroupsCount * self.ANNOTATION_GROUP_BYTES)
+
+    def getDict(self):
+        """
+        :return: dict of all estimated sizes by name, e.g. for serialising.
+        """
+        return {
+            "nodes": self._nodesCount,
+            "elements": self.getElementsCount(),
+            "faces": self.getFacesCount(),
+            "mesh sizes": list(self._meshSizes),
+            "node parameters": self._nodeParametersCount,
+            "annotation groups": self._annotationGroupsCount,
+            "memory bytes": self.getMemoryBytes()
+        }
+
+
+def getStructuredMeshSizes(elementsCounts, periodic=None):
+    """
+    Get numbers of nodes and elements of each dimension in a structured mesh with all faces defined.
+    :param elementsCounts: Numbers of elements in each direction, e.g. [elementsCount1, elementsCount2].
+    :param periodic: Optional list of bool for each direction, True if mesh wraps around in that direction so the
+    last node layer is the first.
+    :return: nodesCount, meshSizes (list of numbers of elements of dimension 1..len(elementsCounts))
+    """
+    dimension = len(elementsCounts)
+    if periodic is None:
+        periodic = [False] * dimension
+    nodesCounts = [elementsCounts[i] if periodic[i] else (elementsCounts[i] + 1) for i in range(dimension)]
+    meshSizes = []
+    for meshDimension in range(1, dimension + 1):
+        # sum over choices of directions spanned by the element
+        meshSize = 0
+        for directions in combinations(range(dimension), meshDimension):
+            meshSize += math.prod(elementsCounts[i] if i in directions else nodesCounts[i] for i in range(dimension))
+        meshSizes.append(meshSize)
+    return math.prod(nodesCounts), meshSizes
@@ -0,0 +1,186 @@
+"""
+Batch writer for creating nodes and elements in Zinc from accumulated parameters and connectivity.
+"""
+from cmlibs.utils.zinc.general import ChangeManager
+from cmlibs.zinc.element import Element, Mesh, MeshGroup
+from cmlibs.zinc.field import Field
+
+
+class MeshWriter:
+    """
+    Accumulates node parameters, element connectivity and group membership, and creates them in Zinc in one pass
+    when write() is called. Callers may supply element templates they have already made for an element field
+    template (EFT); otherwise one is made per distinct EFT object used with the writer.
+    Nodes and elements going in the same groups are created in a temporary group, which is added to each of those
+    groups in one call, so group membership costs no calls per object.
+    Objects do not exist in Zinc until written; write before anything needs to find them.
+    """
+
+    def __init__(self, field, meshDimension=None):
+        """
+        :param field: Finite element field to define and set parameters for, usually coordinates.
+        :param meshDimension: Dimension of mesh to create elements in, or None if creating nodes only.
+        """
+        self._field = field
+        self._fieldmodule = field.getFieldmodule()
+        self._nodes = self._fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self._mesh = self._fieldmodule.findMeshByDimension(meshDimension) if meshDimension else None
+        self._shapeType = {
+            1: Element.SHAPE_TYPE_LINE,
+            2: Element.SHAPE_TYPE_SQUARE,
+            3: Element.SHAPE_TYPE_CUBE}.get(meshDimension)
+        self._elementtemplates = {}  # map from eft to elementtemplate defining field with it, made by writer
+        self._nodeData = []  # list of (nodeIdentifier, nodetemplate, valueLabelsVersions, parameters, nodesetGroups)
+        # list of (elementIdentifier, elementtemplate, eft, nodeIdentifiers, scalefactors, meshGroups):
+        self._elementData = []
+
+    def getMesh(self):
+        """
+        :return: Zinc Mesh elements are created in, or None if not set.
+        """
+        return self._mesh
+
+    def addNode(self, nodeIdentifier, nodetemplate, valueLabelsVersions, parameters, nodesetGroups=None):
+        """
+        Add a node to create, or an existing node to set parameters on.
+        :param nodeIdentifier: Identifier of node to create or modify.
+        :param nodetemplate: Zinc Nodetemplate to create node with, or None to set parameters on a node created
+        earlier, including one added earlier to this writer.
+        :param valueLabelsVersions: Sequence of (valueLabel, version) in order of parameters. Can be shared between
+        nodes.
+        :param parameters: List of parameter values for each valueLabelsVersions. Values which are None are not set.
+        :param nodesetGroups: Optional list of Zinc NodesetGroups to add node to.
+        """
+        self._nodeData.append((nodeIdentifier, nodetemplate, valueLabelsVersions, parameters, nodesetGroups))
+
+    def addNodes(self, nodeIdentifiers, nodetemplate, valueLabelsVersions, parameters, nodesetGroups=None):
+        """
+        Add multiple nodes to create, or existing nodes to set parameters on, from arrays of parameters.
+        :param nodeIdentifiers: Sequence of node identifiers.
+        :param nodetemplate: Zinc Nodetemplate to create nodes with, or None to set parameters on existing nodes.
+        :param valueLabelsVersions: Sequence of (valueLabel, version) in order of parameters.
+        :param parameters: Array or nested list (nodesCount, len(valueLabelsVersions), componentsCount).
+        :param nodesetGroups: Optional list of Zinc NodesetGroups to add all nodes to.
+        """
+        if hasattr(parameters, "tolist"):
+            parameters = parameters.tolist()  # Zinc does not accept numpy types
+        valueLabelsVersions = tuple(valueLabelsVersions)
+        for nodeIdentifier, nodeParameters in zip(nodeIdentifiers, parameters):
+            self._nodeData.append((int(nodeIdentifier), nodetemplate, valueLabelsVersions, nodeParameters,
+                                   nodesetGroups))
+
+    def addElement(self, elementIdentifier, eft, nodeIdentifiers, scalefactors=None, meshGroups=None,
+                   elementtemplate=None):
+        """
+        Add an element to create.
+        :param elementIdentifier: Identifier of element to create.
+        :param eft: Zinc Elementfieldtemplate for field over element.
+        :param nodeIdentifiers: List of identifiers of local nodes in eft.
+        :param scalefactors: Optional list of scale factors for eft.
+        :param meshGroups: Optional list of Zinc MeshGroups to add element to.
+        :param elementtemplate: Optional Zinc Elementtemplate already defining field with eft. If None, elements
+        with the same eft object share an element template made by the writer.
+        """
+        self._elementData.append((elementIdentifier, elementtemplate, eft, nodeIdentifiers, scalefactors, meshGroups))
+
+    def addElements(self, elementIdentifiers, eft, nodeIdentifiers, scalefactors=None, meshGroups=None,
+                    elementtemplate=None):
+        """
+        Add multiple elements using the same eft from arrays of connectivity.
+        :param elementIdentifiers: Sequence of element identifiers.
+        :param eft: Zinc Elementfieldtemplate for field over all elements.
+        :param nodeIdentifiers: Array or nested list (elementsCount, localNodesCount) of node identifiers.
+        :param scalefactors: Optional array or nested list (elementsCount, scaleFactorsCount).
+        :param meshGroups: Optional list of Zinc MeshGroups to add all elements to.
+        :param elementtemplate: Optional Zinc Elementtemplate already defining field with eft.
+        """
+        if hasattr(nodeIdentifiers, "tolist"):
+            nodeIdentifiers = nodeIdentifiers.tolist()
+        if scalefactors is None:
+            scalefactors = [None] * len(nodeIdentifiers)
+        elif hasattr(scalefactors, "tolist"):
+            scalefactors = scalefactors.tolist()
+        for elementIdentifier, elementNodeIdentifiers, elementScalefactors in zip(
+                elementIdentifiers, nodeIdentifiers, scalefactors):
+            self._elementData.append((int(elementIdentifier), elementtemplate, eft, elementNodeIdentifiers,
+                                      elementScalefactors, meshGroups))
+
+    def _getElementtemplate(self, eft):
+        """
+        :return: Zinc Elementtemplate defining field with eft, created on first use.
+        """
+        elementtemplate = self._elementtemplates.get(eft)
+        if not elementtemplate:
+            elementtemplate = self._mesh.createElementtemplate()
+            elementtemplate.setElementShapeType(self._shapeType)
+            elementtemplate.defineField(self._field, -1, eft)
+            self._elementtemplates[eft] = elementtemplate
+        return elementtemplate
+
+    def write(self):
+        """
+        Create or modify all nodes then all elements added since the last write, in the order added, and add them
+        to their groups. Clears added data.
+        """
+        field = self._field
+        with ChangeManager(self._fieldmodule):
+            batchGroups = {}  # map from ids of domain and groups to (batch NodesetGroup or MeshGroup, groups)
+            if self._nodeData:
+                fieldcache = self._fieldmodule.createFieldcache()
+                findNodeByIdentifier = self._nodes.findNodeByIdentifier
+                setNode = fieldcache.setNode
+                setNodeParameters = field.setNodeParameters
+                for nodeIdentifier, nodetemplate, valueLabelsVersions, parameters, nodesetGroups in self._nodeData:
+                    batchNodesetGroup = self._getBatchGroup(batchGroups, self._nodes, nodesetGroups) \
+                        if nodesetGroups else None
+                    if nodetemplate is not None:
+                        node = (self._nodes if (batchNodesetGroup is None) else batchNodesetGroup).createNode(
+                            nodeIdentifier, nodetemplate)
+                    else:
+                        node = findNodeByIdentifier(nodeIdentifier)
+                        if batchNodesetGroup is not None:
+                            batchNodesetGroup.addNode(node)
+                    setNode(node)
+                    for (valueLabel, version), values in zip(valueLabelsVersions, parameters):
+                        if values is not None:
+                            setNodeParameters(fieldcache, -1, valueLabel, version, values)
+                self._nodeData = []
+            if self._elementData:
+                for elementIdentifier, elementtemplate, eft, nodeIdentifiers, scalefactors, meshGroups in \
+                        self._elementData:
+                    batchMeshGroup = self._getBatchGroup(batchGroups, self._mesh, meshGroups) if meshGroups else None
+                    element = (self._mesh if (batchMeshGroup is None) else batchMeshGroup).createElement(
+                        elementIdentifier, self._getElementtemplate(eft) if (elementtemplate is None) else
+                        elementtemplate)
+                    element.setNodesByIdentifier(eft, nodeIdentifiers)
+                    if scalefactors:
+                        element.setScaleFactors(eft, scalefactors)
+                self._elementData = []
+            for batchGroup, groups in batchGroups.values():
+                batchFieldGroup = batchGroup.getFieldGroup()
+                for group in groups:
+                    if isinstance(group, MeshGroup):
+                        group.addElementsConditional(batchFieldGroup)
+                    else:
+                        group.addNodesConditional(batchFieldGroup)
+
+    @staticmethod
+    def _getBatchGroup(batchGroups, domain, groups):
+        """
+        Get temporary group to create nodes or elements in which are added to groups, so they are added to each
+        group in one call. Batches are shared by objects added to the same group objects.
+        :param batchGroups: Map from ids of domain and groups to (batch NodesetGroup or MeshGroup, groups), modified.
+        :param domain: Zinc Nodeset or Mesh.
+        :param groups: List of Zinc NodesetGroup or MeshGroup in domain.
+        :return: Batch NodesetGroup or MeshGroup.
+        """
+        key = (id(domain),) + tuple(id(group) for group in groups)
+        batchGroupGroups = batchGroups.get(key)
+        if batchGroupGroups:
+            return batchGroupGroups[0]
+        batchFieldGroup = domain.getFieldmodule().createFieldGroup()
+        batchGroup = batchFieldGroup.createMeshGroup(domain) if isinstance(domain, Mesh) else \
+            batchFieldGroup.createNodesetGroup(domain)
+        # hold groups so their ids are not reused while batchGroups exists
+        batchGroups[key] = (batchGroup, groups)
+        return batchGroup
@@ -5,11 +5,14 @@ Utilities for getting a mirror image of a scaffold.
 from __future__ import division
 
 from cmlibs.maths.vectorops import magnitude, normalize, dot
+import numpy as np
 
 
 class Mirror:
     """
     Utilities for getting a mirror image of a scaffold.
+    Methods with plural names e.g. mirrorImageOfPoints() mirror arrays of points, vectors or node parameters in one
+    vectorized operation, so one half of a symmetric scaffold can be generated and reflected to get the other half.
     """
     def __init__(self, mirrorPlane):
         """
@@ -76,3 +79,43 @@ class Mirror:
         """
         n = self._planeUnitNormalVector
         return [-v[c] + 2 * dot(v, n) * n[c] for c in range(3)]
+
+    def mirrorImageOfPoints(self, x):
+        """
+        Find the mirror images of points x on plane p.
+        :param x: Array-like of point coordinates with shape (pointsCount, 3).
+        :return: numpy array of mirror images of points x.
+        """
+        x = np.asarray(x, dtype=float)
+        n = np.array(self._planeUnitNormalVector)
+        D = x @ n - self._planeDParam / self._magNormal
+        return x - 2.0 * np.outer(D, n)
+
+    def mirrorVectors(self, v):
+        """
+        Find the mirror images of vectors v on plane p.
+        :param v: Array-like of vectors with shape (vectorsCount, 3).
+        :return: numpy array of image vectors.
+        """
+        v = np.asarray(v, dtype=float)
+        n = np.array(self._planeUnitNormalVector)
+        return v - 2.0 * np.outer(v @ n, n)
+
+    def mirrorNodeParameters(self, parameters, reverseDerivativeIndexes=None):
+        """
+        Mirror node values and derivatives in one operation.
+        Reflecting a right-handed element gives a left-handed one; reversing one derivative direction e.g. d1, with
+        the element nodes ordered in the reverse xi direction, keeps the mirror image right-handed.
+        :param parameters: Array-like with shape (nodesCount, valuesCount, 3) with node value then derivatives for
+        each node, e.g. [[x, d1, d2, d3], ...].
+        :param reverseDerivativeIndexes: Optional list of indexes of derivatives in parameters, from 1, to reverse
+        as well as mirror, e.g. [1] to reverse d1.
+        :return: numpy array of mirrored parameters, same shape as parameters.
+        """
+        parameters = np.asarray(parameters, dtype=float)
+        mirrored = np.empty(parameters.shape)
+        mirrored[:, 0] = self.mirrorImageOfPoints(parameters[:, 0])
+        mirrored[:, 1:] = self.mirrorVectors(parameters[:, 1:].reshape((-1, 3))).reshape(parameters[:, 1:].shape)
+        if reverseDerivativeIndexes:
+            mirrored[:, reverseDerivativeIndexes] = -mirrored[:, reverseDerivativeIndexes]
+        return mirrored
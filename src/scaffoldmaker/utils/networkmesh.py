@@ -3,16 +3,20 @@ Utility class for defining network meshes from 1-D connectivity and lateral axes
 """
 
 from cmlibs.utils.zinc.field import find_or_create_field_coordinates
+from cmlibs.utils.zinc.group import identifier_ranges_from_string
 from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
-from cmlibs.maths.vectorops import cross, magnitude, mult, normalize, rejection, sub
+from cmlibs.zinc.result import RESULT_OK
+from cmlibs.maths.vectorops import magnitude, rejection
 from scaffoldmaker.annotation.annotationgroup import AnnotationGroup
+from scaffoldmaker.utils.generatemonitor import reportGenerateProgress
 from scaffoldmaker.utils.interpolation import (
     gaussWt4, gaussXi4, getCubicHermiteCurvesLength, interpolateCubicHermiteDerivative)
 from scaffoldmaker.utils.tracksurface import TrackSurface
 from abc import ABC, abstractmethod
 import math
+import numpy as np
 import sys
 
 
@@ -22,6 +26,64 @@ pathValueLabels = [
     Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3]
 
 
+def getNetworkStructureArrays(structureString):
+    """
+    Parse network structure string into compact arrays, an alternative form for very large networks which can be
+    built directly or saved in binary form e.g. with numpy.savez. See NetworkMesh.build() for structure string format.
+    Invalid sequences are skipped with a warning.
+    :param structureString: Comma-separated sequences of dash-separated node identifiers with optional versions.
+    :return: nodeIdentifiers, nodeVersions, sequenceOffsets, sequencePatch: numpy int32 arrays of node identifiers and
+    versions for all sequences concatenated, int64 array of sequencesCount + 1 start offsets into the node arrays
+    with end offset last, and bool array of whether each sequence is a patch.
+    """
+    nodeIdentifiers = []
+    nodeVersions = []
+    sequenceOffsets = [0]
+    sequencePatch = []
+    for sequenceString in structureString.split(","):
+        isPatch = sequenceString[:1] == "#"
+        if isPatch:
+            sequenceString = sequenceString[2:]
+        nodeVersionStrings = sequenceString.split("-")
+        if len(nodeVersionStrings) < 2:
+            print("Network mesh: Ignoring empty or single node sequence", sequenceString, file=sys.stderr)
+            continue
+        sequenceIdentifiers = []
+        sequenceVersions = []
+        try:
+            for nodeVersionString in nodeVersionStrings:
+                values = [int(s) for s in nodeVersionString.split(".", maxsplit=1)]
+                sequenceIdentifiers.append(values[0])
+                sequenceVersions.append(values[1] if (len(values) == 2) else 1)
+        except ValueError:
+            print("Network mesh: Skipping invalid sequence", sequenceString, file=sys.stderr)
+            continue
+        nodeIdentifiers += sequenceIdentifiers
+        nodeVersions += sequenceVersions
+        sequenceOffsets.append(len(nodeIdentifiers))
+        sequencePatch.append(isPatch)
+    return (np.array(nodeIdentifiers, dtype=np.int32), np.array(nodeVersions, dtype=np.int32),
+            np.array(sequenceOffsets, dtype=np.int64), np.array(sequencePatch, dtype=bool))
+
+
+def getNetworkStructureString(structureArrays):
+    """
+    Get network structure string from compact structure arrays.
+    :param structureArrays: Tuple of nodeIdentifiers, nodeVersions, sequenceOffsets, sequencePatch arrays as returned
+    by getNetworkStructureArrays().
+    :return: Structure string.
+    """
+    nodeIdentifiers, nodeVersions, sequenceOffsets, sequencePatch = (
+        np.asarray(array).tolist() for array in structureArrays)
+    nodeVersionStrings = [(str(nodeIdentifier) + "." + str(nodeVersion)) if (nodeVersion != 1) else str(nodeIdentifier)
+                          for nodeIdentifier, nodeVersion in zip(nodeIdentifiers, nodeVersions)]
+    sequenceStrings = []
+    for s in range(len(sequenceOffsets) - 1):
+        sequenceString = "-".join(nodeVersionStrings[sequenceOffsets[s]:sequenceOffsets[s + 1]])
+        sequenceStrings.append(("#-" + sequenceString) if sequencePatch[s] else sequenceString)
+    return ",".join(sequenceStrings)
+
+
 class NetworkNode:
     """
     Describes a single node in a network, storing number of versions etc.
@@ -175,7 +237,7 @@ class NetworkSegment:
         """
         index = self._networkNodes.index(splitNetworkNode, 1, -1)  # throws exception if not an interior node
         splitNetworkNode.setInteriorSegment(None)
-        nextSegment = NetworkSegment(self._networkNodes[index:], self._nodeVersions[index:])
+        nextSegment = NetworkSegment(self._networkNodes[index:], self._nodeVersions[index:], self._isPatch)
         self._networkNodes = self._networkNodes[:index + 1]
         self._nodeVersions = self._nodeVersions[:index + 1]
         return nextSegment
@@ -186,17 +248,21 @@ class NetworkMesh:
     Defines a 1-D network with lateral axes, and utility functions for fleshing into higher dimensional meshes.
     """
 
-    def __init__(self, structureString):
+    def __init__(self, structure):
+        """
+        :param structure: Structure string or tuple of structure arrays. See build().
+        """
         self._networkNodes = {}
         self._networkSegments = []
-        self.build(structureString)
+        self.build(structure)
         self._region = None  # set when generated
 
-    def build(self, structureString):
+    def build(self, structure):
         """
-        Set up network structure from structure string description.
-        :param structureString: Comma-separated sequences of dash-separated node identifiers defining connectivity and
-        continuity throughout network.
+        Set up network structure from structure string description or equivalent arrays.
+        :param structure: Structure string or tuple of structure arrays as returned by getNetworkStructureArrays().
+        Structure string consists of comma-separated sequences of dash-separated node identifiers defining
+        connectivity and continuity throughout network.
         Each listing of a given node identifier is either followed by a dot . and the version number, or version 1 is
         assumed. Each version gives a full set of all derivatives.
         Each sequence is a single contiguous segment until it is split by another sequence referencing an interior
@@ -210,59 +276,57 @@ class NetworkMesh:
         where C1 continuity is maintained along each sequence of connected nodes, e.g. 1-2-4-5-6 all use version 1 of
         d1 and side derivatives; 3-4.2-7 uses version 2 at node 4, and 5-8 uses version 1 at node 5 so both output
         segments at node 5 leave with the same longitudinal derivative and use the same side derivatives.
+        Sequences prefixed by "#-" are patch sequences.
         """
         self._networkNodes = {}
         self._networkSegments = []
-        sequenceStrings = structureString.split(",")
-        for sequenceString in sequenceStrings:
-            # check if segment is a patch
-            if not sequenceString[0].isnumeric():
-                try:
-                    isPatch = True if sequenceString[0] == "#" else False
-                    sequenceString = sequenceString[2:] if isPatch else sequenceString
-                except ValueError:
-                    print("Network mesh: Skipping invalid cap sequence", sequenceString, file=sys.stderr)
-                    continue
-            else:
-                isPatch = False
-
-            nodeIdentifiers = []
-            nodeVersions = []
-            nodeVersionStrings = sequenceString.split("-")
-            if len(nodeVersionStrings) < 2:
-                print("Network mesh: Ignoring empty or single node sequence", sequenceString, file=sys.stderr)
+        if isinstance(structure, str):
+            structure = getNetworkStructureArrays(structure)
+        nodeIdentifiers, nodeVersions, sequenceOffsets, sequencePatch = structure
+        # convert to python ints as Zinc does not accept numpy integer types
+        nodeIdentifiers = np.asarray(nodeIdentifiers).tolist()
+        nodeVersions = np.asarray(nodeVersions).tolist()
+        sequenceOffsets = np.asarray(sequenceOffsets).tolist()
+        sequencePatch = np.asarray(sequencePatch, dtype=bool).tolist()
+        sequencesCount = len(sequenceOffsets) - 1
+        assert (len(nodeVersions) == len(nodeIdentifiers)) and (len(sequencePatch) == sequencesCount) and \
+            ((sequencesCount < 0) or (sequenceOffsets[-1] == len(nodeIdentifiers)))
+
+        # first pass: create nodes in order of first appearance and count references to each node.
+        # Segments end at nodes referenced more than once, so no segments need splitting later
+        referenceCounts = {}
+        for s in range(sequencesCount):
+            start = sequenceOffsets[s]
+            end = sequenceOffsets[s + 1]
+            if (end - start) < 2:
+                print("Network mesh: Ignoring empty or single node sequence",
+                      "-".join(str(nodeIdentifier) for nodeIdentifier in nodeIdentifiers[start:end]), file=sys.stderr)
                 continue
-            try:
-                for nodeVersionString in nodeVersionStrings:
-                    values = [int(s) for s in nodeVersionString.split(".", maxsplit=1)]
-                    nodeIdentifiers.append(values[0])
-                    nodeVersions.append(values[1] if (len(values) == 2) else 1)
-            except ValueError:
-                print("Network mesh: Skipping invalid sequence", sequenceString, file=sys.stderr)
-                continue
-            sequenceNodes = []
-            sequenceVersions = []
-            for n in range(len(nodeIdentifiers)):
+            for n in range(start, end):
                 nodeIdentifier = nodeIdentifiers[n]
-                nodeVersion = nodeVersions[n]
-                networkNode = existingNetworkNode = self._networkNodes.get(nodeIdentifier)
+                networkNode = self._networkNodes.get(nodeIdentifier)
                 if networkNode:
-                    interiorSegment = networkNode.getInteriorSegment()
-                    if interiorSegment:
-                        nextSegment = interiorSegment.split(networkNode)
-                        index = self._networkSegments.index(interiorSegment) + 1
-                        self._networkSegments.insert(index, nextSegment)
+                    referenceCounts[nodeIdentifier] += 1
                 else:
-                    networkNode = NetworkNode(nodeIdentifier)
-                    self._networkNodes[nodeIdentifier] = networkNode
-                networkNode.defineVersion(nodeVersion)
-                sequenceNodes.append(networkNode)
-                sequenceVersions.append(nodeVersion)
-                if (len(sequenceNodes) > 1) and (existingNetworkNode or (nodeIdentifier == nodeIdentifiers[-1])):
-                    networkSegment = NetworkSegment(sequenceNodes, sequenceVersions, isPatch)
-                    self._networkSegments.append(networkSegment)
-                    sequenceNodes = sequenceNodes[-1:]
-                    sequenceVersions = sequenceVersions[-1:]
+                    networkNode = self._networkNodes[nodeIdentifier] = NetworkNode(nodeIdentifier)
+                    referenceCounts[nodeIdentifier] = 1
+                networkNode.defineVersion(nodeVersions[n])
+
+        # second pass: make segments in sequence order, breaking at junction nodes
+        for s in range(sequencesCount):
+            start = sequenceOffsets[s]
+            end = sequenceOffsets[s + 1]
+            if (end - start) < 2:
+                continue
+            isPatch = sequencePatch[s]
+            segmentStart = start
+            for n in range(start + 1, end):
+                if (n == (end - 1)) or (referenceCounts[nodeIdentifiers[n]] > 1):
+                    segmentNodes = [self._networkNodes[nodeIdentifier]
+                                    for nodeIdentifier in nodeIdentifiers[segmentStart:n + 1]]
+                    self._networkSegments.append(
+                        NetworkSegment(segmentNodes, nodeVersions[segmentStart:n + 1], isPatch))
+                    segmentStart = n
 
         # warn about nodes without all versions in use
         for networkNode in self._networkNodes.values():
@@ -317,7 +381,33 @@ class NetworkMesh:
         """
         :return: dict mapping node identifier to NetworkNode
         """
-        return self._networkSegments
+        return self._networkNodes
+
+    def getStructureArrays(self):
+        """
+        Get compact arrays describing the built network with one sequence per segment, which rebuild an equivalent
+        network. Suitable for saving very large networks in binary form.
+        :return: nodeIdentifiers, nodeVersions, sequenceOffsets, sequencePatch. See getNetworkStructureArrays().
+        """
+        sequenceOffsets = np.zeros(len(self._networkSegments) + 1, dtype=np.int64)
+        np.cumsum([len(networkSegment.getNetworkNodes()) for networkSegment in self._networkSegments],
+                  out=sequenceOffsets[1:])
+        nodeIdentifiers = np.empty(sequenceOffsets[-1], dtype=np.int32)
+        nodeVersions = np.empty(sequenceOffsets[-1], dtype=np.int32)
+        for s, networkSegment in enumerate(self._networkSegments):
+            nodeIdentifiers[sequenceOffsets[s]:sequenceOffsets[s + 1]] = networkSegment.getNodeIdentifiers()
+            nodeVersions[sequenceOffsets[s]:sequenceOffsets[s + 1]] = networkSegment.getNodeVersions()
+        sequencePatch = np.array([networkSegment.isPatch() for networkSegment in self._networkSegments], dtype=bool)
+        return nodeIdentifiers, nodeVersions, sequenceOffsets, sequencePatch
+
+    def getNetworkSegmentsUsingNodes(self, nodeIdentifiers):
+        """
+        :param nodeIdentifiers: Iterable over layout node identifiers. Unknown identifiers are ignored.
+        :return: List of segments using any of the nodes, in network order.
+        """
+        networkNodes = set(self._networkNodes.get(nodeIdentifier) for nodeIdentifier in nodeIdentifiers)
+        return [networkSegment for networkSegment in self._networkSegments
+                if not networkNodes.isdisjoint(networkSegment.getNetworkNodes())]
 
     def getNetworkSegments(self):
         """
@@ -331,105 +421,293 @@ class NetworkMesh:
         """
         return self._region
 
-    def create1DLayoutMesh(self, region):
-        """
+    def getLayoutArrays(self):
+        """
+        Get arrays describing 1-D layout connectivity, with nodes indexed in order of getNetworkNodes() and elements
+        in order along segments in segment order.
+        :return: nodeIdentifiers (nodesCount) int array, versionsCounts (nodesCount) int array,
+        elementNodeIndexes (elementsCount, 2) int array of indexes of start and end nodes of each element,
+        elementNodeVersions (elementsCount, 2) int array of derivative versions used at start and end nodes.
+        """
+        nodesCount = len(self._networkNodes)
+        nodeIdentifiers = np.fromiter(self._networkNodes.keys(), dtype=np.int64, count=nodesCount)
+        versionsCounts = np.fromiter((networkNode.getVersionsCount() for networkNode in self._networkNodes.values()),
+                                     dtype=np.int64, count=nodesCount)
+        nodeIndexes = {networkNode: index for index, networkNode in enumerate(self._networkNodes.values())}
+        startNodeIndexes = []
+        endNodeIndexes = []
+        startNodeVersions = []
+        endNodeVersions = []
+        for networkSegment in self._networkSegments:
+            segmentNodeIndexes = [nodeIndexes[networkNode] for networkNode in networkSegment.getNetworkNodes()]
+            segmentNodeVersions = networkSegment.getNodeVersions()
+            startNodeIndexes += segmentNodeIndexes[:-1]
+            endNodeIndexes += segmentNodeIndexes[1:]
+            startNodeVersions += segmentNodeVersions[:-1]
+            endNodeVersions += segmentNodeVersions[1:]
+        elementNodeIndexes = np.array([startNodeIndexes, endNodeIndexes], dtype=np.int64).reshape(2, -1).T
+        elementNodeVersions = np.array([startNodeVersions, endNodeVersions], dtype=np.int64).reshape(2, -1).T
+        return nodeIdentifiers, versionsCounts, elementNodeIndexes, elementNodeVersions
+
+    def _getLayoutNeighbourIndexes(self, versionsCounts, elementNodeIndexes, elementNodeVersions):
+        """
+        Get indexes of previous and next nodes for calculating default d1 at each node version.
+        At nodes interior to a segment, all versions use the previous and next nodes along the segment. Otherwise the
+        first element in or out using the node version is used.
+        :param versionsCounts, elementNodeIndexes, elementNodeVersions: Arrays from getLayoutArrays().
+        :return: prevIndexes, nextIndexes: int arrays (nodesCount, versionsMax), -1 where none.
+        """
+        nodesCount = len(versionsCounts)
+        versionsMax = max(1, int(versionsCounts.max())) if nodesCount else 1
+        neighbourIndexes = []
+        for fromColumn, toColumn in ((1, 0), (0, 1)):
+            indexes = np.full((nodesCount, versionsMax), -1, dtype=np.int64)
+            keys = elementNodeIndexes[:, fromColumn] * versionsMax + (elementNodeVersions[:, fromColumn] - 1)
+            keys, firstElements = np.unique(keys, return_index=True)
+            indexes.reshape(-1)[keys] = elementNodeIndexes[firstElements, toColumn]
+            neighbourIndexes.append(indexes)
+        prevIndexes, nextIndexes = neighbourIndexes
+        interior = np.fromiter(((networkNode.getInteriorSegment() is not None)
+                                for networkNode in self._networkNodes.values()), dtype=bool, count=nodesCount)
+        if np.any(interior):
+            # interior nodes are only referenced once: use the only neighbours for all versions
+            versionsMask = interior[:, np.newaxis] & (np.arange(versionsMax) < versionsCounts[:, np.newaxis])
+            prevIndexes[versionsMask] = np.broadcast_to(
+                prevIndexes.max(axis=1)[:, np.newaxis], prevIndexes.shape)[versionsMask]
+            nextIndexes[versionsMask] = np.broadcast_to(
+                nextIndexes.max(axis=1)[:, np.newaxis], nextIndexes.shape)[versionsMask]
+        return prevIndexes, nextIndexes
+
+    def create1DLayoutMesh(self, region, x=None, d1=None, d2=None, d3=None, radius=None):
+        """
+        Create nodes and line elements of the 1-D network layout, in bulk from arrays of node parameters.
+        Node parameters are calculated from the default layout where not supplied. Node arrays are in order of
+        getNetworkNodes(), and derivative arrays may be per node (nodesCount, 3), applying to all versions, or per
+        node version (nodesCount, versionsMax, 3) where versionsMax is the largest number of versions at any node.
         Expects region Fieldmodule ChangeManager to be in effect.
         :param region: Zinc region to create network layout in.
+        :param x: Optional array (nodesCount, 3) of node coordinates, e.g. from an imported tree. Default is the
+        integer grid layout from build().
+        :param d1: Optional array of d1 derivatives. Default is calculated from coordinates of neighbouring nodes.
+        :param d2: Optional array of d2 side derivatives. Default is normal to d1 and d3 with magnitude radius.
+        :param d3: Optional array of d3 side derivatives. Default is normal to d1 with magnitude radius, closest to
+        the z-axis, or the x-axis if d1 is nearly parallel to z.
+        :param radius: Optional scalar or array of radii per node (nodesCount) or node version
+        (nodesCount, versionsMax) giving magnitudes of default side derivatives. Default 0.1.
         """
         self._region = region
         fieldmodule = region.getFieldmodule()
         coordinates = find_or_create_field_coordinates(fieldmodule)
 
+        nodeIdentifiers, versionsCounts, elementNodeIndexes, elementNodeVersions = self.getLayoutArrays()
+        nodesCount = len(nodeIdentifiers)
+        versionsMax = max(1, int(versionsCounts.max())) if nodesCount else 1
+        versionsShape = (nodesCount, versionsMax, 3)
+        if x is None:
+            x = np.array([networkNode.getX() for networkNode in self._networkNodes.values()], dtype=float)
+        else:
+            x = np.asarray(x, dtype=float)
+            assert x.shape == (nodesCount, 3)
+        versionsDefined = np.arange(versionsMax) < versionsCounts[:, np.newaxis]
+        if d1 is None:
+            prevIndexes, nextIndexes = self._getLayoutNeighbourIndexes(
+                versionsCounts, elementNodeIndexes, elementNodeVersions)
+            hasPrev = prevIndexes >= 0
+            hasNext = nextIndexes >= 0
+            xNode = np.broadcast_to(x[:, np.newaxis, :], versionsShape)
+            xPrev = np.where(hasPrev[:, :, np.newaxis], x[prevIndexes], xNode)
+            xNext = np.where(hasNext[:, :, np.newaxis], x[nextIndexes], xNode)
+            d1 = np.where((hasPrev & hasNext)[:, :, np.newaxis], (xNext - xPrev) * 0.5, xNext - xPrev)
+            versionsSet = versionsDefined & (hasPrev | hasNext)
+            for index, nodeVersion in zip(*np.nonzero(versionsDefined & ~versionsSet)):
+                print("Warning: No data to define derivative version", nodeVersion + 1, "at node",
+                      nodeIdentifiers[index], ".", file=sys.stderr)
+        else:
+            d1 = np.broadcast_to(np.asarray(d1, dtype=float).reshape(nodesCount, -1, 3), versionsShape)
+            versionsSet = versionsDefined
+        if (d2 is None) or (d3 is None):
+            if radius is None:
+                radius = 0.1
+            radius = np.broadcast_to(np.asarray(radius, dtype=float).reshape(
+                (nodesCount, -1) if np.ndim(radius) else (1, 1)), versionsShape[:2])[:, :, np.newaxis]
+            d1Magnitude = np.sqrt(np.sum(d1 * d1, axis=2))[:, :, np.newaxis]
+            d1Normal = np.divide(d1, d1Magnitude, out=np.zeros(versionsShape), where=d1Magnitude > 0.0)
+            axis = np.where((np.abs(d1Normal[:, :, 2:]) > 0.9), [1.0, 0.0, 0.0], [0.0, 0.0, 1.0])
+            if d3 is None:
+                # project axis normal to d1; exactly the axis if already normal to it
+                d3 = axis - np.sum(axis * d1Normal, axis=2)[:, :, np.newaxis] * d1Normal
+                d3 = d3 / np.sqrt(np.sum(d3 * d3, axis=2))[:, :, np.newaxis] * radius
+            else:
+                d3 = np.broadcast_to(np.asarray(d3, dtype=float).reshape(nodesCount, -1, 3), versionsShape)
+            if d2 is None:
+                d2 = np.cross(d3, d1Normal)
+            else:
+                d2 = np.broadcast_to(np.asarray(d2, dtype=float).reshape(nodesCount, -1, 3), versionsShape)
+        else:
+            d2 = np.broadcast_to(np.asarray(d2, dtype=float).reshape(nodesCount, -1, 3), versionsShape)
+            d3 = np.broadcast_to(np.asarray(d3, dtype=float).reshape(nodesCount, -1, 3), versionsShape)
+
+        # convert to lists as Zinc does not accept numpy types, per node to limit memory use
+        nodeIdentifiersList = nodeIdentifiers.tolist()
+        versionsCountsList = versionsCounts.tolist()
+        versionsSetList = versionsSet.tolist()
+        derivatives = np.stack((d1, d2, d3), axis=2)
+        derivativeValueLabels = (Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3)
+
+        # one node template per number of versions
         nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
-        nodetemplates = [None]
+        nodetemplates = {}
+        for versionsCount in np.unique(versionsCounts).tolist():
+            nodetemplate = nodes.createNodetemplate()
+            nodetemplate.defineField(coordinates)
+            for valueLabel in pathValueLabels[1:]:
+                nodetemplate.setValueNumberOfVersions(coordinates, -1, valueLabel, versionsCount)
+            nodetemplates[versionsCount] = nodetemplate
         fieldcache = fieldmodule.createFieldcache()
-        derivativeValueLabels = [
-            Node.VALUE_LABEL_D_DS1,
-            Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D2_DS1DS2,
-            Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3]
-        nodetemplate = None
-        for nodeIdentifier, networkNode in self._networkNodes.items():
-            versionsCount = networkNode.getVersionsCount()
-            # print("Node", nodeIdentifier, "versions", versionsCount)
-            if versionsCount < len(nodetemplates):
-                nodetemplate = nodetemplates[versionsCount]
-            else:
-                for v in range(len(nodetemplates), versionsCount + 1):
-                    nodetemplate = nodes.createNodetemplate()
-                    nodetemplate.defineField(coordinates)
-                    for valueLabel in derivativeValueLabels:
-                        nodetemplate.setValueNumberOfVersions(coordinates, -1, valueLabel, v)
-                    nodetemplates.append(nodetemplate)
-            node = nodes.createNode(networkNode.getNodeIdentifier(), nodetemplate)
+        for index in range(nodesCount):
+            versionsCount = versionsCountsList[index]
+            node = nodes.createNode(nodeIdentifiersList[index], nodetemplates[versionsCount])
             fieldcache.setNode(node)
-            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, networkNode.getX())
-            d1 = []
-            for nodeVersion in range(1, versionsCount + 1):
-                interiorSegment = networkNode.getInteriorSegment()
-                if interiorSegment:
-                    segmentNodes = interiorSegment.getNetworkNodes()
-                    index = segmentNodes.index(networkNode)
-                    prevNetworkNode = segmentNodes[index - 1]
-                    nextNetworkNode = segmentNodes[index + 1]
-                else:
-                    prevNetworkNode = None
-                    for inNetworkSegment in networkNode.getInSegments():
-                        if inNetworkSegment.getNodeVersions()[-1] == nodeVersion:
-                            prevNetworkNode = inNetworkSegment.getNetworkNodes()[-2]
-                            break
-                    nextNetworkNode = None
-                    for outNetworkSegment in networkNode.getOutSegments():
-                        if outNetworkSegment.getNodeVersions()[0] == nodeVersion:
-                            nextNetworkNode = outNetworkSegment.getNetworkNodes()[1]
-                            break
-                if prevNetworkNode or nextNetworkNode:
-                    if prevNetworkNode and nextNetworkNode:
-                        d1 = mult(sub(nextNetworkNode.getX(), prevNetworkNode.getX()), 0.5)
-                    elif prevNetworkNode:
-                        d1 = sub(networkNode.getX(), prevNetworkNode.getX())
-                    else:
-                        d1 = sub(nextNetworkNode.getX(), networkNode.getX())
-                    d3 = [0.0, 0.0, 0.1]
-                    d2 = cross(d3, normalize(d1))
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, nodeVersion, d1)
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, nodeVersion, d2)
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS3, nodeVersion, d3)
-                else:
-                    print("Warning: No data to define derivative version", nodeVersion, "at node", nodeIdentifier, ".",
-                          file=sys.stderr)
-
+            coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, x[index].tolist())
+            nodeVersionsSet = versionsSetList[index]
+            nodeDerivatives = derivatives[index].tolist()
+            for v in range(versionsCount):
+                if nodeVersionsSet[v]:
+                    for valueLabel, values in zip(derivativeValueLabels, nodeDerivatives[v]):
+                        coordinates.setNodeParameters(fieldcache, -1, valueLabel, v + 1, values)
+
+        # one element template per pair of start and end versions
         mesh = fieldmodule.findMeshByDimension(1)
+        elementbasis = fieldmodule.createElementbasis(1, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
+        elementtemplates = {}  # dict (startVersion, endVersion) -> (Elementtemplate, Elementfieldtemplate)
+        for startVersion, endVersion in np.unique(elementNodeVersions, axis=0).tolist():
+            elementtemplate = mesh.createElementtemplate()
+            elementtemplate.setElementShapeType(Element.SHAPE_TYPE_LINE)
+            eft = mesh.createElementfieldtemplate(elementbasis)
+            if startVersion != 1:
+                eft.setTermNodeParameter(2, 1, 1, Node.VALUE_LABEL_D_DS1, startVersion)
+            if endVersion != 1:
+                eft.setTermNodeParameter(4, 1, 2, Node.VALUE_LABEL_D_DS1, endVersion)
+            elementtemplate.defineField(coordinates, -1, eft)
+            elementtemplates[(startVersion, endVersion)] = elementtemplate, eft
+        elementNodeIdentifiersList = nodeIdentifiers[elementNodeIndexes].tolist()
+        elementNodeVersionsList = elementNodeVersions.tolist()
         elementIdentifier = 1
-        elementtemplates = {}  # dict (startVersion, endVersion) -> Elementtemplate
         for networkSegment in self._networkSegments:
-            segmentNodes = networkSegment.getNetworkNodes()
-            segmentNodeVersions = networkSegment.getNodeVersions()
-            segmentElementCount = len(segmentNodes) - 1
-            for e in range(segmentElementCount):
-                startVersion = segmentNodeVersions[e]
-                endVersion = segmentNodeVersions[e + 1]
-                # print("Element", nextElementIdentifier, "versions", (startVersion, endVersion))
-                elementtemplate_eft = elementtemplates.get((startVersion, endVersion))
-                if elementtemplate_eft:
-                    elementtemplate, eft = elementtemplate_eft
-                else:
-                    elementtemplate = mesh.createElementtemplate()
-                    elementtemplate.setElementShapeType(Element.SHAPE_TYPE_LINE)
-                    elementbasis = fieldmodule.createElementbasis(1, Elementbasis.FUNCTION_TYPE_CUBIC_HERMITE)
-                    eft = mesh.createElementfieldtemplate(elementbasis)
-                    if startVersion != 1:
-                        eft.setTermNodeParameter(2, 1, 1, Node.VALUE_LABEL_D_DS1, startVersion)
-                    if endVersion != 1:
-                        eft.setTermNodeParameter(4, 1, 2, Node.VALUE_LABEL_D_DS1, endVersion)
-                    elementtemplate.defineField(coordinates, -1, eft)
-                    elementtemplates[(startVersion, endVersion)] = elementtemplate, eft
+            for e in range(len(networkSegment.getNetworkNodes()) - 1):
+                elementtemplate, eft = elementtemplates[tuple(elementNodeVersionsList[elementIdentifier - 1])]
                 element = mesh.createElement(elementIdentifier, elementtemplate)
-                element.setNodesByIdentifier(
-                    eft, [segmentNodes[e].getNodeIdentifier(), segmentNodes[e + 1].getNodeIdentifier()])
+                element.setNodesByIdentifier(eft, elementNodeIdentifiersList[elementIdentifier - 1])
                 networkSegment.setElementIdentifier(e, elementIdentifier)
                 elementIdentifier += 1
 
 
+class NetworkLayoutEstimate:
+    """
+    Describes the segments of a network layout and the layout annotation groups they are in, obtained from the
+    serialised network layout without generating it, for estimating sizes of meshes built from it.
+    Segment lengths are estimated from their numbers of layout elements, assuming layout elements are similar in
+    length.
+    """
+
+    def __init__(self, networkLayout):
+        """
+        :param networkLayout: Network layout ScaffoldPackage, generated or not.
+        """
+        networkLayoutDict = networkLayout.toDict()
+        self._networkMesh = NetworkMesh(networkLayoutDict["scaffoldSettings"]["Structure"])
+        networkSegments = self._networkMesh.getNetworkSegments()
+        # layout elements are numbered in order along segments in segment order, as in create1DLayoutMesh()
+        segmentElementRanges = []
+        elementIdentifier = 1
+        for networkSegment in networkSegments:
+            elementsCount = len(networkSegment.getNetworkNodes()) - 1
+            segmentElementRanges.append((elementIdentifier, elementIdentifier + elementsCount - 1))
+            elementIdentifier += elementsCount
+        # user annotation groups are in the same order as getAnnotationGroups() as network layouts have no others
+        self._segmentAnnotationIndexes = {networkSegment: [] for networkSegment in networkSegments}
+        for index, annotationGroupDict in enumerate(networkLayoutDict.get("userAnnotationGroups", [])):
+            if annotationGroupDict["dimension"] != 1:
+                continue
+            identifierRanges = identifier_ranges_from_string(annotationGroupDict["identifierRanges"])
+            for networkSegment, (first, last) in zip(networkSegments, segmentElementRanges):
+                for start, stop in identifierRanges:
+                    if (start <= last) and (stop >= first):
+                        self._segmentAnnotationIndexes[networkSegment].append(index)
+                        break
+
+    def getNetworkSegments(self):
+        """
+        :return: List of segments of NetworkMesh built from the layout structure, without a region.
+        """
+        return self._networkMesh.getNetworkSegments()
+
+    def getLayoutElementsCount(self, networkSegment):
+        """
+        :param networkSegment: NetworkSegment to query.
+        :return: Number of layout elements along segment.
+        """
+        return len(networkSegment.getNetworkNodes()) - 1
+
+    def getAnnotationNumber(self, networkSegment, annotationNumbers, defaultNumber):
+        """
+        Get number set for the first layout annotation group segment is in with a number > 0, matching how the
+        network mesh builders read annotation numbers.
+        :param networkSegment: NetworkSegment to query.
+        :param annotationNumbers: List of numbers in order of layout annotation groups.
+        :param defaultNumber: Number to return if none set for segment.
+        :return: Number.
+        """
+        for index in self._segmentAnnotationIndexes[networkSegment]:
+            if (index < len(annotationNumbers)) and (annotationNumbers[index] > 0):
+                return annotationNumbers[index]
+        return defaultNumber
+
+    def getElementsCountsAlong(self, targetElementDensityAlongLongestSegment, annotationElementsCountsAlong,
+                               minimumElementsCountAlong):
+        """
+        Get number of elements along each segment, either fixed through annotation groups or from the target
+        density along the longest segment by numbers of layout elements.
+        :param targetElementDensityAlongLongestSegment: Real number of elements along the longest segment.
+        :param annotationElementsCountsAlong: List of fixed numbers of elements along in order of layout annotation
+        groups, or 0 to use target density.
+        :param minimumElementsCountAlong: Function taking NetworkSegment and returning the minimum number of elements
+        along it.
+        :return: dict NetworkSegment -> number of elements along, in network order.
+        """
+        networkSegments = self.getNetworkSegments()
+        longestLayoutElementsCount = max((self.getLayoutElementsCount(networkSegment)
+                                          for networkSegment in networkSegments), default=1)
+        elementsCountsAlong = {}
+        for networkSegment in networkSegments:
+            elementsCountAlong = self.getAnnotationNumber(networkSegment, annotationElementsCountsAlong, 0)
+            if not elementsCountAlong:
+                # reduce slightly so exact multiples are not rounded up
+                elementsCountAlong = math.ceil(0.9999 * targetElementDensityAlongLongestSegment *
+                                               self.getLayoutElementsCount(networkSegment) / longestLayoutElementsCount)
+            elementsCountsAlong[networkSegment] = max(minimumElementsCountAlong(networkSegment), elementsCountAlong)
+        return elementsCountsAlong
+
+    def getAnnotationGroupsCount(self):
+        """
+        :return: Number of layout annotation groups with segments, which are mirrored on the final mesh.
+        """
+        return len(set(index for indexes in self._segmentAnnotationIndexes.values() for index in indexes))
+
+
+def _addIdentifierRange(identifierRanges, start, stop):
+    """
+    Append identifiers start <= identifier < stop to list of ranges, extending the last range if contiguous.
+    :param identifierRanges: List of [start, stop) ranges to modify.
+    """
+    if stop <= start:
+        return
+    if identifierRanges and (identifierRanges[-1][1] == start):
+        identifierRanges[-1][1] = stop
+    else:
+        identifierRanges.append([start, stop])
+
+
 class NetworkMeshGenerateData:
     """
     Data for passing to NetworkMesh generateMesh functions.
@@ -447,6 +725,12 @@ class NetworkMeshGenerateData:
         self._coordinates = find_or_create_field_coordinates(self._fieldmodule, coordinateFieldName)
         self._nodeIdentifier = startNodeIdentifier
         self._elementIdentifier = startElementIdentifier
+        # free identifiers to reuse before the above, stored in descending order for popping:
+        self._freeNodeIdentifiers = []
+        self._freeElementIdentifiers = []
+        # if recording, lists of [start, stop) ranges of node and element identifiers issued:
+        self._nodeIdentifierRanges = None
+        self._elementIdentifierRanges = None
         self._annotationGroups = []  # list of AnnotationGroup to return for mesh's scaffold
         self._annotationGroupMap = {}  # map from annotation term (name, ontId) to AnnotationGroup in output region
 
@@ -494,19 +778,61 @@ class NetworkMeshGenerateData:
         """
         Set next node and element identifiers after generating objects with external code.
         """
+        if self._nodeIdentifierRanges is not None:
+            _addIdentifierRange(self._nodeIdentifierRanges, self._nodeIdentifier, nodeIdentifier)
+            _addIdentifierRange(self._elementIdentifierRanges, self._elementIdentifier, elementIdentifier)
         self._nodeIdentifier = nodeIdentifier
         self._elementIdentifier = elementIdentifier
 
     def nextNodeIdentifier(self):
-        nodeIdentifier = self._nodeIdentifier
-        self._nodeIdentifier += 1
+        if self._freeNodeIdentifiers:
+            nodeIdentifier = self._freeNodeIdentifiers.pop()
+        else:
+            nodeIdentifier = self._nodeIdentifier
+            self._nodeIdentifier += 1
+        if self._nodeIdentifierRanges is not None:
+            _addIdentifierRange(self._nodeIdentifierRanges, nodeIdentifier, nodeIdentifier + 1)
         return nodeIdentifier
 
     def nextElementIdentifier(self):
-        elementIdentifier = self._elementIdentifier
-        self._elementIdentifier += 1
+        if self._freeElementIdentifiers:
+            elementIdentifier = self._freeElementIdentifiers.pop()
+        else:
+            elementIdentifier = self._elementIdentifier
+            self._elementIdentifier += 1
+        if self._elementIdentifierRanges is not None:
+            _addIdentifierRange(self._elementIdentifierRanges, elementIdentifier, elementIdentifier + 1)
         return elementIdentifier
 
+    def setFreeIdentifiers(self, nodeIdentifiers, elementIdentifiers):
+        """
+        Supply identifiers of destroyed nodes and elements to reuse, in increasing order, before issuing new
+        identifiers from the current next node and element identifiers.
+        :param nodeIdentifiers: Iterable over free node identifiers.
+        :param elementIdentifiers: Iterable over free element identifiers.
+        """
+        self._freeNodeIdentifiers = sorted(nodeIdentifiers, reverse=True)
+        self._freeElementIdentifiers = sorted(elementIdentifiers, reverse=True)
+
+    def beginIdentifierRanges(self):
+        """
+        Start recording ranges of node and element identifiers issued by nextNodeIdentifier, nextElementIdentifier
+        and setNodeElementIdentifiers.
+        """
+        self._nodeIdentifierRanges = []
+        self._elementIdentifierRanges = []
+
+    def endIdentifierRanges(self):
+        """
+        Stop recording identifier ranges.
+        :return: node identifier ranges, element identifier ranges; each a list of [start, stop) pairs.
+        """
+        nodeIdentifierRanges = self._nodeIdentifierRanges
+        elementIdentifierRanges = self._elementIdentifierRanges
+        self._nodeIdentifierRanges = None
+        self._elementIdentifierRanges = None
+        return nodeIdentifierRanges, elementIdentifierRanges
+
     def getRegion(self):
         return self._region
 
@@ -757,6 +1083,13 @@ class NetworkMeshBuilder(ABC):
         self._longestSegmentLength = 0.0
         self._targetElementLength = 1.0
         self._junctions = {}  # map from NetworkNode to NetworkMeshJunction-derived object
+        # maps from NetworkSegment, NetworkNode to (node ranges, element ranges) of identifiers used by the
+        # segment/junction mesh, each a list of [start, stop). Recorded by generateMesh() for replacing on rebuild:
+        self._segmentIdentifierRanges = {}
+        self._junctionIdentifierRanges = {}
+        # after rebuild(), list of NetworkSegment in network order to regenerate with their junctions, otherwise None:
+        self._rebuildNetworkSegments = None
+        self._rebuildPending = False  # True if rebuilt segments have not yet been regenerated
 
     @abstractmethod
     def createSegment(self, networkSegment):
@@ -768,21 +1101,26 @@ class NetworkMeshBuilder(ABC):
         """
         return None
 
-    def _createSegments(self):
+    def _createSegments(self, networkSegments=None):
         """
         Create objects for building segment meshes.
+        :param networkSegments: Optional list of NetworkSegment to recreate segments for, keeping others.
+        Default None creates segments for all network segments.
         """
-        self._segments = {}
-        self._longestSegmentLength = 0.0
-        for networkSegment in self._networkMesh.getNetworkSegments():
+        if networkSegments is None:
+            self._segments = {}
+            networkSegments = self._networkMesh.getNetworkSegments()
+        for networkSegment in networkSegments:
             # derived class makes the segment of its required type
             self._segments[networkSegment] = segment = self.createSegment(networkSegment)
-            segmentLength = segment.getSampleLength()
-            if segmentLength > self._longestSegmentLength:
-                self._longestSegmentLength = segmentLength
             for layoutAnnotationGroup in self._layoutAnnotationGroups:
                 if networkSegment.hasLayoutElementsInMeshGroup(layoutAnnotationGroup.getMeshGroup(self._layoutMesh)):
                     segment.addAnnotationTerm(layoutAnnotationGroup.getTerm())
+        self._longestSegmentLength = 0.0
+        for segment in self._segments.values():
+            segmentLength = segment.getSampleLength()
+            if segmentLength > self._longestSegmentLength:
+                self._longestSegmentLength = segmentLength
         if self._longestSegmentLength > 0.0:
             self._targetElementLength = self._longestSegmentLength / self._targetElementDensityAlongLongestSegment
 
@@ -797,12 +1135,18 @@ class NetworkMeshBuilder(ABC):
         """
         return None
 
-    def _createJunctions(self):
+    def _createJunctions(self, networkNodes=None):
         """
         Create objects for building junction meshes between segments.
         Must have called self.createSegments() first.
-        """
-        self._junctions = {}
+        :param networkNodes: Optional set of NetworkNode to recreate junctions at, keeping others.
+        Default None creates junctions at all segment ends.
+        """
+        if networkNodes is None:
+            self._junctions = {}
+        else:
+            for networkNode in networkNodes:
+                self._junctions.pop(networkNode, None)
         for networkSegment in self._networkMesh.getNetworkSegments():
             segment = self._segments[networkSegment]
             segmentNodes = networkSegment.getNetworkNodes()
@@ -818,39 +1162,57 @@ class NetworkMeshBuilder(ABC):
                 segmentJunctions.append(junction)
             segment.setJunctions(segmentJunctions)
 
-    def _sampleSegments(self):
+    def _sampleSegments(self, networkSegments=None):
         """
         Sample coordinates in segments to fit surrounding junctions.
         Must have called self.createJunctions() first.
+        :param networkSegments: Optional list of NetworkSegment to sample segments for. Default None samples all.
         """
-        for networkSegment in self._networkMesh.getNetworkSegments():
-            fixedElementsCountAlong = None
-            i = 0
-            for layoutAnnotationGroup in self._layoutAnnotationGroups:
-                if i >= len(self._annotationElementsCountsAlong):
-                    break
-                if self._annotationElementsCountsAlong[i] > 0:
-                    if networkSegment.hasLayoutElementsInMeshGroup(
-                            layoutAnnotationGroup.getMeshGroup(self._layoutMesh)):
-                        fixedElementsCountAlong = self._annotationElementsCountsAlong[i]
-                        break
-                i += 1
+        if networkSegments is None:
+            networkSegments = self._networkMesh.getNetworkSegments()
+        segmentsCount = len(networkSegments)
+        for s, networkSegment in enumerate(networkSegments):
+            reportGenerateProgress("segments sampled", s / segmentsCount)
             segment = self._segments[networkSegment]
-            segment.sample(fixedElementsCountAlong, self._targetElementLength)
+            segment.sample(self._getFixedElementsCountAlong(networkSegment), self._targetElementLength)
+        reportGenerateProgress("segments sampled", 1.0)
+
+    def _getFixedElementsCountAlong(self, networkSegment):
+        """
+        :param networkSegment: NetworkSegment to query.
+        :return: Number of elements along segment set for the first of its layout annotation groups with a number
+        in annotationElementsCountsAlong, or None if not fixed.
+        """
+        i = 0
+        for layoutAnnotationGroup in self._layoutAnnotationGroups:
+            if i >= len(self._annotationElementsCountsAlong):
+                break
+            if self._annotationElementsCountsAlong[i] > 0:
+                if networkSegment.hasLayoutElementsInMeshGroup(layoutAnnotationGroup.getMeshGroup(self._layoutMesh)):
+                    return self._annotationElementsCountsAlong[i]
+            i += 1
+        return None
 
-    def _sampleJunctions(self):
+    def _sampleJunctions(self, networkSegments=None):
         """
         Sample coordinates in junctions to fit surrounding junctions.
         Optionally blend common derivatives across simple junctions.
         Must have called self.sampleSegments() first.
+        :param networkSegments: Optional list of NetworkSegment to sample junctions at the ends of.
+        Default None samples all junctions.
         """
         sampledJunctions = set()
-        for networkSegment in self._networkMesh.getNetworkSegments():
+        if networkSegments is None:
+            networkSegments = self._networkMesh.getNetworkSegments()
+        segmentsCount = len(networkSegments)
+        for s, networkSegment in enumerate(networkSegments):
+            reportGenerateProgress("junctions built", s / segmentsCount)
             segment = self._segments[networkSegment]
             for junction in segment.getJunctions():
                 if junction not in sampledJunctions:
                     junction.sample(self._targetElementLength)
                     sampledJunctions.add(junction)
+        reportGenerateProgress("junctions built", 1.0)
 
     def build(self):
         """
@@ -860,24 +1222,154 @@ class NetworkMeshBuilder(ABC):
         self._createJunctions()
         self._sampleSegments()
         self._sampleJunctions()
+        self._rebuildNetworkSegments = None
+        self._rebuildPending = False
+
+    def rebuild(self, nodeIdentifiers):
+        """
+        Incrementally rebuild coordinates after editing parameters of the supplied network layout nodes.
+        Segments using edited nodes are recreated from the current layout parameters, and the junctions at their
+        ends are recreated. All segments meeting at those junctions are resampled, since their trimming is affected,
+        and the junctions at both ends of the resampled segments are recreated and resampled.
+        If the longest segment length changes, the target element length changes so everything is rebuilt.
+        Must have called self.build() and self.generateMesh() first. Follow with a call to self.generateMesh() with
+        the original generateData to replace the nodes and elements of only the rebuilt segments and junctions.
+        :param nodeIdentifiers: Iterable over identifiers of edited layout nodes.
+        :return: List of NetworkSegment rebuilt, in network order.
+        """
+        networkSegments = self._networkMesh.getNetworkSegments()
+        editedNetworkSegments = self._networkMesh.getNetworkSegmentsUsingNodes(nodeIdentifiers)
+        rebuildNetworkSegments = []
+        if editedNetworkSegments:
+            oldTargetElementLength = self._targetElementLength
+            self._createSegments(editedNetworkSegments)
+            if self._targetElementLength != oldTargetElementLength:
+                rebuildNetworkSegments = list(networkSegments)
+                self._createSegments()
+                self._createJunctions()
+            else:
+                editedJunctionNodes = set()
+                for networkSegment in editedNetworkSegments:
+                    segmentNodes = networkSegment.getNetworkNodes()
+                    editedJunctionNodes.update((segmentNodes[0], segmentNodes[-1]))
+                rebuildJunctionNodes = set()
+                for networkSegment in networkSegments:
+                    segmentNodes = networkSegment.getNetworkNodes()
+                    if (segmentNodes[0] in editedJunctionNodes) or (segmentNodes[-1] in editedJunctionNodes):
+                        rebuildNetworkSegments.append(networkSegment)
+                        rebuildJunctionNodes.update((segmentNodes[0], segmentNodes[-1]))
+                self._createJunctions(rebuildJunctionNodes)
+            self._sampleSegments(rebuildNetworkSegments)
+            self._sampleJunctions(rebuildNetworkSegments)
+        if self._rebuildPending:
+            # merge with segments rebuilt earlier but not yet regenerated
+            rebuildSet = set(self._rebuildNetworkSegments).union(rebuildNetworkSegments)
+            rebuildNetworkSegments = [networkSegment for networkSegment in networkSegments
+                                      if networkSegment in rebuildSet]
+        self._rebuildNetworkSegments = rebuildNetworkSegments
+        self._rebuildPending = True
+        return rebuildNetworkSegments
+
+    def getGeneratedNetworkSegments(self):
+        """
+        :return: List of NetworkSegment whose meshes are made by the next/current call to generateMesh(): all
+        segments after build(), only those rebuilt after rebuild().
+        """
+        if self._rebuildNetworkSegments is None:
+            return self._networkMesh.getNetworkSegments()
+        return self._rebuildNetworkSegments
+
+    def _destroyIdentifierRanges(self, generateData, networkSegments):
+        """
+        Destroy elements then nodes recorded for meshes of supplied segments and their junctions, and supply their
+        identifiers to generateData for reuse. Nodes still in use by other elements are not destroyed, and are kept
+        in the recorded ranges of their segment or junction so they are destroyed when it is next replaced.
+        :param generateData: NetworkMeshGenerateData-derived object.
+        :param networkSegments: List of NetworkSegment being regenerated.
+        """
+        identifierRangesMaps = []  # list of (identifierRangesMap, key)
+        junctionNodes = set()
+        for networkSegment in networkSegments:
+            identifierRangesMaps.append((self._segmentIdentifierRanges, networkSegment))
+            segmentNodes = networkSegment.getNetworkNodes()
+            for networkNode in (segmentNodes[0], segmentNodes[-1]):
+                if networkNode not in junctionNodes:
+                    junctionNodes.add(networkNode)
+                    identifierRangesMaps.append((self._junctionIdentifierRanges, networkNode))
+        mesh = generateData.getMesh()
+        nodes = generateData.getNodes()
+        freeElementIdentifiers = []
+        for identifierRangesMap, key in identifierRangesMaps:
+            identifierRanges = identifierRangesMap.get(key)
+            if identifierRanges:
+                for start, stop in identifierRanges[1]:
+                    for elementIdentifier in range(start, stop):
+                        element = mesh.findElementByIdentifier(elementIdentifier)
+                        if element.isValid():
+                            mesh.destroyElement(element)
+                            freeElementIdentifiers.append(elementIdentifier)
+        freeNodeIdentifiers = []
+        for identifierRangesMap, key in identifierRangesMaps:
+            identifierRanges = identifierRangesMap.pop(key, None)
+            if identifierRanges:
+                keepNodeRanges = []
+                for start, stop in identifierRanges[0]:
+                    for nodeIdentifier in range(start, stop):
+                        node = nodes.findNodeByIdentifier(nodeIdentifier)
+                        if node.isValid():
+                            if nodes.destroyNode(node) == RESULT_OK:
+                                freeNodeIdentifiers.append(nodeIdentifier)
+                            else:
+                                _addIdentifierRange(keepNodeRanges, nodeIdentifier, nodeIdentifier + 1)
+                if keepNodeRanges:
+                    identifierRangesMap[key] = (keepNodeRanges, [])
+        generateData.setFreeIdentifiers(freeNodeIdentifiers, freeElementIdentifiers)
+
+    def _generateItemMesh(self, item, generateData, identifierRangesMap, key):
+        """
+        Generate mesh for segment or junction, recording the ranges of identifiers it uses.
+        :param item: NetworkMeshSegment or NetworkMeshJunction-derived object.
+        :param generateData: NetworkMeshGenerateData-derived object.
+        :param identifierRangesMap: Map to record identifier ranges in.
+        :param key: NetworkSegment or NetworkNode key for the item in the identifierRangesMap.
+        """
+        generateData.beginIdentifierRanges()
+        item.generateMesh(generateData)
+        nodeIdentifierRanges, elementIdentifierRanges = generateData.endIdentifierRanges()
+        keepIdentifierRanges = identifierRangesMap.get(key)
+        if keepIdentifierRanges:
+            nodeIdentifierRanges = keepIdentifierRanges[0] + nodeIdentifierRanges
+        identifierRangesMap[key] = (nodeIdentifierRanges, elementIdentifierRanges)
 
     def generateMesh(self, generateData: NetworkMeshGenerateData):
         """
         Generate mesh from segments and junctions, in order of segments.
-        Must have called self.build() first.
+        Must have called self.build() first. If self.rebuild() has been called since the last call, only
+        the rebuilt segments and their junctions are regenerated, replacing their previous nodes and elements with
+        identifiers reused where possible. In that case generateData must be the object used to generate the
+        original mesh, and any faces must be redefined by the caller afterwards.
         Assumes ChangeManager active for region/fieldmodule.
         :param generateData: NetworkMeshGenerateData-derived object.
         """
+        networkSegments = self.getGeneratedNetworkSegments()
+        if self._rebuildPending:
+            self._destroyIdentifierRanges(generateData, networkSegments)
+            self._rebuildPending = False
         generatedJunctions = set()
-        for networkSegment in self._networkMesh.getNetworkSegments():
+        segmentsCount = len(networkSegments)
+        for s, networkSegment in enumerate(networkSegments):
+            reportGenerateProgress("elements created", s / segmentsCount)
             segment = self._segments[networkSegment]
             junctions = segment.getJunctions()
+            segmentNodes = networkSegment.getNetworkNodes()
             if junctions[0] not in generatedJunctions:
-                junctions[0].generateMesh(generateData)
+                self._generateItemMesh(junctions[0], generateData, self._junctionIdentifierRanges, segmentNodes[0])
                 generatedJunctions.add(junctions[0])
             if networkSegment.isPatch():
                 continue  # so as not to make patch mesh twice
-            segment.generateMesh(generateData)
+            self._generateItemMesh(segment, generateData, self._segmentIdentifierRanges, networkSegment)
             if junctions[1] not in generatedJunctions:
-                junctions[1].generateMesh(generateData)
+                self._generateItemMesh(junctions[1], generateData, self._junctionIdentifierRanges, segmentNodes[-1])
                 generatedJunctions.add(junctions[1])
+        generateData.setFreeIdentifiers([], [])
+        reportGenerateProgress("elements created", 1.0)
@@ -4,7 +4,7 @@ Utilities for building 3-D triangle-topology meshes out of quad elements
 from cmlibs.maths.vectorops import add, cross, div, dot, magnitude, mult, normalize, set_magnitude
 from scaffoldmaker.utils.interpolation import (
     DerivativeScalingMode, get_nway_point, getCubicHermiteCurvesLength, linearlyInterpolateVectors,
-    smoothCubicHermiteDerivativesLine)
+    smoothCubicHermiteDerivativesLines)
 import copy
 import math
 
@@ -341,19 +341,17 @@ class QuadTriangleMesh:
                             nx[pix], new_parameter, 0.5, magnitudeScalingMode=DerivativeScalingMode.HARMONIC_MEAN)
                 nx[pix] = new_parameter
 
-    def _smooth_derivative_across(self, start_indexes, end_indexes, index_increments, derivative_indexes,
-                                  fix_start_direction=True, fix_end_direction=True):
+    def _get_line_across(self, start_indexes, end_indexes, index_increments, derivative_indexes):
         """
-        Smooth derivatives across triangle.
+        Get coordinates and derivatives along a line across triangle, for smoothing.
         :param start_indexes: Indexes of first point.
         :param end_indexes: Indexes of last point.
         :param index_increments: List of increments in indexes. Starts with first and advances at each corner, then
         cycles back to first.
-        :param derivative_indexes: List of signed derivative parameter index to set along where 1=d1, 2=d2, 3=d3.
+        :param derivative_indexes: List of signed derivative parameter index to get along where 1=d1, 2=d2, 3=d3.
         Starts with first and advances at each corner, then cycles back to first. Can be negative to invert vector.
         e.g. [1, -2] for d1 then -d2 from first corner.
-        :param fix_start_direction: Set to True to keep the start direction but scale its magnitude.
-        :param fix_end_direction: Set to True to keep the end direction but scale its magnitude.
+        :return: indexes_list, derivative_index_list, px, pd. Derivatives are zero where not set.
         """
         indexes = start_indexes
         derivative_number = 0
@@ -398,18 +396,35 @@ class QuadTriangleMesh:
             px.append(x)
             pd.append(d)
             n += 1
-        sd = smoothCubicHermiteDerivativesLine(
-            px, pd, fixStartDirection=fix_start_direction, fixEndDirection=fix_end_direction)
-        if self._move_d_to_surface:
-            for n in range(1, len(sd) - 1):
-                sd[n] = self._move_d_to_surface(px[n], sd[n])
-            sd = smoothCubicHermiteDerivativesLine(px, sd, fixAllDirections=True)
-        for n in range(len(sd)):
-            indexes = indexes_list[n]
-            spix = derivative_index_list[n]
-            new_derivative = [-d for d in sd[n]] if (spix < 0) else sd[n]
-            pix = abs(spix)
-            self._nx[indexes[1]][indexes[0]][pix] = new_derivative
+        return indexes_list, derivative_index_list, px, pd
+
+    def _smooth_derivatives_across(self, lines, fix_start_direction=True, fix_end_direction=True):
+        """
+        Smooth derivatives along a family of lines across triangle, with lines of the same number of points
+        smoothed together.
+        :param lines: List of (start_indexes, end_indexes, index_increments, derivative_indexes) for each line.
+        See _get_line_across().
+        :param fix_start_direction: Set to True to keep the start direction but scale its magnitude.
+        :param fix_end_direction: Set to True to keep the end direction but scale its magnitude.
+        """
+        lines_by_count = {}
+        for line in lines:
+            line_across = self._get_line_across(*line)
+            lines_by_count.setdefault(len(line_across[0]), []).append(line_across)
+        for lines_across in lines_by_count.values():
+            lines_px = [line_across[2] for line_across in lines_across]
+            lines_sd = smoothCubicHermiteDerivativesLines(
+                lines_px, [line_across[3] for line_across in lines_across],
+                fixStartDirection=fix_start_direction, fixEndDirection=fix_end_direction).tolist()
+            if self._move_d_to_surface:
+                for px, sd in zip(lines_px, lines_sd):
+                    for n in range(1, len(sd) - 1):
+                        sd[n] = self._move_d_to_surface(px[n], sd[n])
+                lines_sd = smoothCubicHermiteDerivativesLines(lines_px, lines_sd, fixAllDirections=True).tolist()
+            for (indexes_list, derivative_index_list, _, _), sd in zip(lines_across, lines_sd):
+                for indexes, spix, d in zip(indexes_list, derivative_index_list, sd):
+                    new_derivative = [-c for c in d] if (spix < 0) else d
+                    self._nx[indexes[1]][indexes[0]][abs(spix)] = new_derivative
 
     def build(self):
         """
@@ -513,29 +528,18 @@ class QuadTriangleMesh:
                 [px], [[0]], corner_indexes, [[-1, 0]], skip_start=True, skip_end=True, blend=True)
 
         # smooth 1-2 curves
-        start_indexes = [0, 0]
-        end_indexes = [self._element_count12, 0]
-        for i in range(1, self._box_count3):
-            start_indexes[1] += 1
-            end_indexes[1] += 1
-            self._smooth_derivative_across(start_indexes, end_indexes, [[1, 0]], [1],
-                fix_start_direction=True, fix_end_direction=True)
+        self._smooth_derivatives_across(
+            [([0, i], [self._element_count12, i], [[1, 0]], [1]) for i in range(1, self._box_count3)],
+            fix_start_direction=True, fix_end_direction=True)
         # smooth 1-3 curves
-        start_indexes = [0, 0]
-        end_indexes = [0, self._element_count13]
-        for i in range(1, self._box_count2):
-            start_indexes[0] += 1
-            end_indexes[0] += 1
-            self._smooth_derivative_across(start_indexes, end_indexes, [[0, 1]], [2, -1],
-                fix_start_direction=True, fix_end_direction=True)
+        self._smooth_derivatives_across(
+            [([i, 0], [i, self._element_count13], [[0, 1]], [2, -1]) for i in range(1, self._box_count2)],
+            fix_start_direction=True, fix_end_direction=True)
         # smooth 2-3 curves
-        start_indexes = [self._element_count12, 0]
-        end_indexes = [0, self._element_count13]
-        for i in range(1, self._box_count1):
-            start_indexes[0] -= 1
-            end_indexes[1] -= 1
-            self._smooth_derivative_across(start_indexes, end_indexes, [[0, 1], [-1, 0]], [2, -2],
-                fix_start_direction=True, fix_end_direction=True)
+        self._smooth_derivatives_across(
+            [([self._element_count12 - i, 0], [0, self._element_count13 - i], [[0, 1], [-1, 0]], [2, -2])
+             for i in range(1, self._box_count1)],
+            fix_start_direction=True, fix_end_direction=True)
 
     def assign_d3(self, evaluate_d3):
         """
@@ -9,13 +9,13 @@ import copy
 from enum import Enum
 
 from cmlibs.maths.vectorops import cross, normalize
-from cmlibs.zinc.element import Element
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from scaffoldmaker.utils.eft_utils import remapEftNodeValueLabel, setEftScaleFactorIds
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.interpolation import DerivativeScalingMode, sampleCubicHermiteCurves, \
     smoothCubicHermiteDerivativesLine
+from scaffoldmaker.utils.meshwriter import MeshWriter
 from scaffoldmaker.utils.mirror import Mirror
 from scaffoldmaker.utils.tracksurface import TrackSurface, calculate_surface_axes
 
@@ -425,14 +425,18 @@ class ShieldMesh2D:
         :return:
         """
         mirror = Mirror(mirrorPlane)
-        for n2 in range(self.elementsCountUp):
-            for n3 in range(self.elementsCountAlong + 1):
-                for n1 in range(self.elementsCountAcross + 1):
-                    if self.px[n3][n2][n1]:
-                        self.px[n3][2*self.elementsCountUp-n2][n1] = mirror.mirrorImageOfPoint(self.px[n3][n2][n1])
-                        self.pd1[n3][2*self.elementsCountUp-n2][n1] = mirror.reverseMirrorVector(self.pd1[n3][n2][n1])
-                        self.pd2[n3][2*self.elementsCountUp-n2][n1] = mirror.mirrorVector(self.pd2[n3][n2][n1])
-                        self.pd3[n3][2*self.elementsCountUp-n2][n1] = mirror.mirrorVector(self.pd3[n3][n2][n1])
+        indexes = [(n3, n2, n1) for n2 in range(self.elementsCountUp) for n3 in range(self.elementsCountAlong + 1)
+                   for n1 in range(self.elementsCountAcross + 1) if self.px[n3][n2][n1]]
+        if not indexes:
+            return
+        mirroredParameters = mirror.mirrorNodeParameters(
+            [[self.px[n3][n2][n1], self.pd1[n3][n2][n1], self.pd2[n3][n2][n1], self.pd3[n3][n2][n1]]
+             for n3, n2, n1 in indexes], reverseDerivativeIndexes=[1]).tolist()
+        for (n3, n2, n1), (x, d1, d2, d3) in zip(indexes, mirroredParameters):
+            self.px[n3][2*self.elementsCountUp-n2][n1] = x
+            self.pd1[n3][2*self.elementsCountUp-n2][n1] = d1
+            self.pd2[n3][2*self.elementsCountUp-n2][n1] = d2
+            self.pd3[n3][2*self.elementsCountUp-n2][n1] = d3
 
     def generateNodes(self, fieldmodule, coordinates, startNodeIdentifier, rangeOfRequiredElements=None,
                       mirrorPlane=None):
@@ -454,7 +458,9 @@ class ShieldMesh2D:
         nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS1, 1)
         nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS2, 1)
         nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D_DS3, 1)
-        cache = fieldmodule.createFieldcache()
+        valueLabelsVersions = [(Node.VALUE_LABEL_VALUE, 1), (Node.VALUE_LABEL_D_DS1, 1),
+                               (Node.VALUE_LABEL_D_DS2, 1), (Node.VALUE_LABEL_D_DS3, 1)]
+        meshWriter = MeshWriter(coordinates)
 
         # for n2 in range(self.elementsCountUp, -1, -1):
         #    s = ""
@@ -474,14 +480,11 @@ class ShieldMesh2D:
                                 or n1 > rangeOfRequiredElements[1][1] or n1 < rangeOfRequiredElements[1][0]:
                             continue
                     if self.px[n3][n2][n1]:
-                        node = nodes.createNode(nodeIdentifier, nodetemplate)
+                        meshWriter.addNode(nodeIdentifier, nodetemplate, valueLabelsVersions, [
+                            self.px[n3][n2][n1], self.pd1[n3][n2][n1], self.pd2[n3][n2][n1], self.pd3[n3][n2][n1]])
                         self.nodeId[n3][n2][n1] = nodeIdentifier
-                        cache.setNode(node)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, self.px[n3][n2][n1])
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, self.pd1[n3][n2][n1])
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, self.pd2[n3][n2][n1])
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, self.pd3[n3][n2][n1])
                         nodeIdentifier += 1
+        meshWriter.write()
 
         return nodeIdentifier
 
@@ -502,16 +505,11 @@ class ShieldMesh2D:
                                                                 'the same length'
         elementIdentifier = startElementIdentifier
         useCrossDerivatives = False
-        mesh = fieldmodule.findMeshByDimension(3)
+        meshWriter = MeshWriter(coordinates, 3)
+        mesh = meshWriter.getMesh()
 
         tricubichermite = eftfactory_tricubichermite(mesh, useCrossDerivatives)
         eft = tricubichermite.createEftNoCrossDerivatives()
-        elementtemplate = mesh.createElementtemplate()
-        elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-        elementtemplate.defineField(coordinates, -1, eft)
-
-        elementtemplate1 = mesh.createElementtemplate()
-        elementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
 
         elementEnd = []
         count = 0
@@ -755,28 +753,18 @@ class ShieldMesh2D:
                                 remapEftNodeValueLabel(eft1, [1, 2, 3, 4], Node.VALUE_LABEL_D_DS3,
                                                        [(Node.VALUE_LABEL_D_DS3, [1])])
 
-                    if eft1 is not eft:
-                        elementtemplate1.defineField(coordinates, -1, eft1)
-                        element = mesh.createElement(elementIdentifier, elementtemplate1)
-                    else:
-                        element = mesh.createElement(elementIdentifier, elementtemplate)
-                    result2 = element.setNodesByIdentifier(eft1, nids)
-                    if scalefactors:
-                        result3 = element.setScaleFactors(eft1, scalefactors)
-                    else:
-                        result3 = 7
-                    # print('create element shield', elementIdentifier, result2, result3, nids)
+                    elementMeshGroups = []
+                    for c, meshGroup in enumerate(meshGroups):
+                        if e3 < elementEnd[c]:
+                            elementMeshGroups.append(meshGroup)
+                            break
+                    meshWriter.addElement(elementIdentifier, eft1, nids, scalefactors, elementMeshGroups)
                     if self._type == ShieldRimDerivativeMode.SHIELD_RIM_DERIVATIVE_MODE_AROUND:
                         self.elementId[e3][e2][e1] = elementIdentifier
                     else:
                         self.elementId[e2][e1] = elementIdentifier
                     elementIdentifier += 1
-
-                    for c, meshGroup in enumerate(meshGroups):
-                        if e3 < elementEnd[c]:
-                            meshGroup.addElement(element)
-                            break
-
+        meshWriter.write()
 
         return elementIdentifier
 
@@ -922,7 +910,9 @@ class ShieldMesh3D:
         nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS2DS3, 1)
         nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS3, 1)
         nodetemplate.setValueNumberOfVersions(coordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
-        cache = fieldmodule.createFieldcache()
+        valueLabelsVersions = [(Node.VALUE_LABEL_VALUE, 1), (Node.VALUE_LABEL_D_DS1, 1),
+                               (Node.VALUE_LABEL_D_DS2, 1), (Node.VALUE_LABEL_D_DS3, 1)]
+        meshWriter = MeshWriter(coordinates)
 
         for n2 in range(self.elementsCountAcross[0] + 1):
             for n3 in range(self.elementsCountAcross[2] + 1):
@@ -932,14 +922,11 @@ class ShieldMesh3D:
                             or n1 > rangeOfRequiredElements[1][1] or n1 < rangeOfRequiredElements[1][0]:
                         continue
                     if self.px[n3][n2][n1]:
-                        node = nodes.createNode(nodeIdentifier, nodetemplate)
+                        meshWriter.addNode(nodeIdentifier, nodetemplate, valueLabelsVersions, [
+                            self.px[n3][n2][n1], self.pd1[n3][n2][n1], self.pd2[n3][n2][n1], self.pd3[n3][n2][n1]])
                         self.nodeId[n3][n2][n1] = nodeIdentifier
-                        cache.setNode(node)
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, self.px[n3][n2][n1])
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, self.pd1[n3][n2][n1])
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, self.pd2[n3][n2][n1])
-                        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, self.pd3[n3][n2][n1])
                         nodeIdentifier += 1
+        meshWriter.write()
 
         return nodeIdentifier
 
@@ -1090,12 +1077,13 @@ class ShieldMesh3D:
 
         return signs
 
-    def get_element_node_identifiers(self, octant_number, e3, e2, e1, e3zo, e1zo):
+    def get_element_node_identifiers(self, octant_number, e3, e2, e1, e3zo, e1zo, lnm_octant1=None):
         """
         Find node identifiers for given element represented by its indexes (e3,e2,e1). It uses default order of nodes
          for [1,3,2] default element axes and finds the mapping between octant default local node numbers and
           the sphere.
         :param octant_number:
+        :param lnm_octant1: Optional local node mapping for octant 1 from local_node_mapping(), to avoid recalculating.
         :return: nids, node s for given element represented by its indexes (e3,e2,e1).
         """
         nids_default = [self.getNodeId(octant_number, e3, e2, e1, e3zo, e1zo),
@@ -1108,8 +1096,10 @@ class ShieldMesh3D:
                         self.getNodeId(octant_number, e3+1, e2+1, e1+1, e3zo, e1zo)]
 
         # change the order of nodes according to the box derivatives.
-        boxMappingOctant1 = self.get_box_mapping_for_other_octants(1, octant1_box_derivatives=self._boxDerivatives)
-        lnm_octant1 = self.local_node_mapping(boxMappingOctant1)
+        if not lnm_octant1:
+            boxMappingOctant1 = self.get_box_mapping_for_other_octants(
+                1, octant1_box_derivatives=self._boxDerivatives)
+            lnm_octant1 = self.local_node_mapping(boxMappingOctant1)
         nids = [1] * 8
         for ln in range(1, 9):
             nids[lnm_octant1[ln] - 1] = nids_default[ln - 1]
@@ -1129,631 +1119,625 @@ class ShieldMesh3D:
          """
         elementIdentifier = startElementIdentifier
         useCrossDerivatives = False
-        mesh = fieldmodule.findMeshByDimension(3)
+        meshWriter = MeshWriter(coordinates, 3)
+        mesh = meshWriter.getMesh()
 
         tricubichermite = eftfactory_tricubichermite(mesh, useCrossDerivatives)
-        eft = tricubichermite.createEftNoCrossDerivatives()
-        elementtemplate = mesh.createElementtemplate()
-        elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-        elementtemplate.defineField(coordinates, -1, eft)
-
-        elementtemplate1 = mesh.createElementtemplate()
-        elementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
-        for e3 in range(self.elementsCountAcross[2]):
-            for e2 in range(self.elementsCountAcross[0]):
-                for e1 in range(self.elementsCountAcross[1]):
-                    if e3 >= rangeOfRequiredElements[2][1] or e3 < rangeOfRequiredElements[2][0] or\
-                            e2 >= rangeOfRequiredElements[0][1] or e2 < rangeOfRequiredElements[0][0]\
-                            or e1 >= rangeOfRequiredElements[1][1] or e1 < rangeOfRequiredElements[1][0]:
-                        continue
-
-                    scalefactors = None
-                    self._element_needs_scale_factor = False
-
-                    def shell_element(e3o, e2o, e1o, e3zo, e1zo):
-                        return e3o > e3zo or e2o < self.elementsCountRim or e1o > e1zo
-
+        boxMappingOctant1 = self.get_box_mapping_for_other_octants(1, octant1_box_derivatives=self._boxDerivatives)
+        lnm_octant1 = self.local_node_mapping(boxMappingOctant1)
+        # element field templates and whether they need scale factors depend only on the octant, element type and
+        # whether the element is on the boundaries tested in create_element_eft, so are cached with these as keys
+        eftCache = {}
+        e2bo = 1 + self.elementsCountRim
+
+        for e3 in range(rangeOfRequiredElements[2][0],
+                        min(rangeOfRequiredElements[2][1], self.elementsCountAcross[2])):
+            for e2 in range(rangeOfRequiredElements[0][0],
+                            min(rangeOfRequiredElements[0][1], self.elementsCountAcross[0])):
+                for e1 in range(rangeOfRequiredElements[1][0],
+                                min(rangeOfRequiredElements[1][1], self.elementsCountAcross[1])):
                     octant_number, element_type, e3zo, e2zo, e1zo = self.get_element_type(e3, e2, e1)
                     e3o, e2o, e1o = self.get_local_element_index(octant_number, e3, e2, e1)
-                    element_shell = shell_element(e3o, e2o, e1o, e3zo, e1zo)
-                    e3yo, e2bo, e1yo = e3zo - 1, 1 + self.elementsCountRim, e1zo - 1
+                    element_shell = e3o > e3zo or e2o < self.elementsCountRim or e1o > e1zo
+                    eftKey = (octant_number, element_type, element_shell,
+                              e3o == 0, e2o == e2bo, e2o == e2zo, e1o == 0)
+                    eftScalefactors = eftCache.get(eftKey)
+                    if not eftScalefactors:
+                        eft1 = self.create_element_eft(tricubichermite, octant_number, element_type, element_shell,
+                                                       e3o, e2o, e1o, e3zo, e2zo, e1zo)
+                        eftScalefactors = eftCache[eftKey] = \
+                            (eft1, [-1.0] if self._element_needs_scale_factor else None)
+                    eft1, scalefactors = eftScalefactors
+                    if not eft1:
+                        continue
 
-                    eft1 = eft if element_type == self.ELEMENT_REGULAR else\
-                        tricubichermite.createEftNoCrossDerivatives()
+                    nids = self.get_element_node_identifiers(octant_number, e3, e2, e1, e3zo, e1zo, lnm_octant1)
+                    meshWriter.addElement(elementIdentifier, eft1, nids, scalefactors,
+                                          meshGroups[:1] if (element_type == self.ELEMENT_REGULAR) else meshGroups[1:2])
+                    self.elementId[e3][e2][e1] = elementIdentifier
 
-                    nids = self.get_element_node_identifiers(octant_number, e3, e2, e1, e3zo, e1zo)
+                    elementIdentifier += 1
+        meshWriter.write()
 
-                    boxMapping = self.get_box_mapping_for_other_octants(octant_number,
-                                                                        octant1_box_derivatives=self._boxDerivatives)
-                    lnm = self.local_node_mapping(boxMapping)
-                    corner1derivs, corner2derivs, corner3derivs, boundary12leftderivs, boundary12rightderivs,\
-                        triple12leftderivs, triple12rightderivs =\
-                        self.set_derivatives_for_irregular_nodes(octant_number)
+        return elementIdentifier
 
-                    if element_type == self.ELEMENT_REGULAR:
-                        pass
-                    elif element_type == self.ELEMENT_QUADRUPLE_DOWN_LEFT:
-                        self.remap_eft_node_value_label(eft1, [lnm[7]], self.QUADRUPLE_DOWN_LEFT)
-                        if element_shell:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.QUADRUPLE_DOWN_LEFT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.QUADRUPLE0_DOWN_LEFT)
-                        if e3o == 0:
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_LEFT,
-                                                            derivatives=triple12leftderivs)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_12_LEFT,
-                                                                derivatives=triple12leftderivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_12_LEFT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_LEFT)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE_3_LEFT)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE0_3_LEFT)
-                        if e1yo == 0:
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_DOWN)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_13_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_13_DOWN)
-
-                            if e3yo == 0:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
-                                                                    derivatives=corner1derivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
-                                                                derivatives=corner1derivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_DOWN)
-                        else:
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE_2_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE0_2_DOWN)
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_DOWN)
-                            if e3o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
-                                                                derivatives=boundary12leftderivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
-                                                                    derivatives=boundary12leftderivs)
-                            else:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_LEFT)
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_LEFT)
-
-                    elif element_type == self.ELEMENT_QUADRUPLE_DOWN:
-                        if not element_shell:
-                            self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_13_DOWN)
-                        self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_2_DOWN)
+    def create_element_eft(self, tricubichermite, octant_number, element_type, element_shell, e3o, e2o, e1o,
+                           e3zo, e2zo, e1zo):
+        """
+        Create element field template for element of given type in octant, remapped to use the irregular node
+        derivatives. Also sets self._element_needs_scale_factor.
+        The result depends only on the arguments used in the cache key in generateElements.
+        :param tricubichermite: eftfactory_tricubichermite to create template with.
+        :return: Element field template, or None if element type is not handled.
+        """
+        self._element_needs_scale_factor = False
+        e3yo, e2bo, e1yo = e3zo - 1, 1 + self.elementsCountRim, e1zo - 1
+        eft1 = tricubichermite.createEftNoCrossDerivatives()
+
+        boxMapping = self.get_box_mapping_for_other_octants(octant_number,
+                                                            octant1_box_derivatives=self._boxDerivatives)
+        lnm = self.local_node_mapping(boxMapping)
+        corner1derivs, corner2derivs, corner3derivs, boundary12leftderivs, boundary12rightderivs,\
+            triple12leftderivs, triple12rightderivs =\
+            self.set_derivatives_for_irregular_nodes(octant_number)
+
+        if element_type == self.ELEMENT_REGULAR:
+            pass
+        elif element_type == self.ELEMENT_QUADRUPLE_DOWN_LEFT:
+            self.remap_eft_node_value_label(eft1, [lnm[7]], self.QUADRUPLE_DOWN_LEFT)
+            if element_shell:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.QUADRUPLE_DOWN_LEFT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.QUADRUPLE0_DOWN_LEFT)
+            if e3o == 0:
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_LEFT,
+                                                derivatives=triple12leftderivs)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_12_LEFT,
+                                                    derivatives=triple12leftderivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_12_LEFT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_LEFT)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE_3_LEFT)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE0_3_LEFT)
+            if e1yo == 0:
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_DOWN)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_13_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_13_DOWN)
+
+                if e3yo == 0:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
+                                                        derivatives=corner1derivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
+                                                    derivatives=corner1derivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_DOWN)
+            else:
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE_2_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE0_2_DOWN)
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_DOWN)
+                if e3o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
+                                                    derivatives=boundary12leftderivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
+                                                        derivatives=boundary12leftderivs)
+                else:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_LEFT)
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_LEFT)
+
+        elif element_type == self.ELEMENT_QUADRUPLE_DOWN:
+            if not element_shell:
+                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_13_DOWN)
+            self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_2_DOWN)
+            if element_shell:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_2_DOWN)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE0_2_DOWN)
+            if e1o == 0:
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_DOWN)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_13_DOWN)
+                if e3yo == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
+                                                    derivatives=corner1derivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_LEFT,
+                                                    derivatives=boundary12leftderivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
+                                                        derivatives=corner1derivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_LEFT,
+                                                        derivatives=boundary12leftderivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_DOWN)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_DOWN_LEFT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_DOWN)
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_DOWN_LEFT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_DOWN)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE_2_DOWN)
+                if e3yo == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
+                                                    derivatives=boundary12leftderivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_LEFT,
+                                                    derivatives=boundary12leftderivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
+                                                        derivatives=boundary12leftderivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_LEFT,
+                                                        derivatives=boundary12leftderivs)
+                else:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2], lnm[6]],
+                                                        self.SURFACE_REGULAR_DOWN_LEFT)
+                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[5]], self.SURFACE_REGULAR_DOWN_LEFT)
+
+        elif element_type == self.ELEMENT_QUADRUPLE_DOWN_RIGHT:
+            if e2o == e2bo:
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.QUADRUPLE_RIGHT)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.QUADRUPLE0_RIGHT)
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.QUADRUPLE_RIGHT)
+                if e3o == 0:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_12_RIGHT,
+                                                        derivatives=triple12rightderivs)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE0_12_RIGHT)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_RIGHT,
+                                                    derivatives=triple12rightderivs)
+                else:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_3_RIGHT)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_3_RIGHT)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_RIGHT)
+
+                if e2bo == e2zo:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_23_DOWN)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_23_DOWN)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_DOWN)
+                    if e3yo == 0:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
+                                                        derivatives=corner2derivs)
                         if element_shell:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_2_DOWN)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE0_2_DOWN)
-                        if e1o == 0:
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_DOWN)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_13_DOWN)
-                            if e3yo == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
-                                                                derivatives=corner1derivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_LEFT,
-                                                                derivatives=boundary12leftderivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
-                                                                    derivatives=corner1derivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_LEFT,
-                                                                    derivatives=boundary12leftderivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_DOWN)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_DOWN_LEFT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_DOWN)
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_DOWN_LEFT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_DOWN)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE_2_DOWN)
-                            if e3yo == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
-                                                                derivatives=boundary12leftderivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_LEFT,
-                                                                derivatives=boundary12leftderivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
-                                                                    derivatives=boundary12leftderivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_LEFT,
-                                                                    derivatives=boundary12leftderivs)
-                            else:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2], lnm[6]],
-                                                                    self.SURFACE_REGULAR_DOWN_LEFT)
-                                self.remap_eft_node_value_label(eft1, [lnm[1], lnm[5]], self.SURFACE_REGULAR_DOWN_LEFT)
-
-                    elif element_type == self.ELEMENT_QUADRUPLE_DOWN_RIGHT:
-                        if e2o == e2bo:
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.QUADRUPLE_RIGHT)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.QUADRUPLE0_RIGHT)
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.QUADRUPLE_RIGHT)
-                            if e3o == 0:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_12_RIGHT,
-                                                                    derivatives=triple12rightderivs)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE0_12_RIGHT)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_RIGHT,
-                                                                derivatives=triple12rightderivs)
-                            else:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_3_RIGHT)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_3_RIGHT)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_RIGHT)
-
-                            if e2bo == e2zo:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_23_DOWN)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_23_DOWN)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_DOWN)
-                                if e3yo == 0:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
-                                                                    derivatives=corner2derivs)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
-                                                                        derivatives=corner2derivs)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_DOWN)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_DOWN)
-                            else:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE_1_DOWN)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE0_1_DOWN)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_1_DOWN)
-                                if e3yo == 0:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_RIGHT,
-                                                                    derivatives=boundary12rightderivs)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_RIGHT,
-                                                                        derivatives=boundary12rightderivs)
-                                else:
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_DOWN_RIGHT)
-
-                        elif e2o == e2zo:
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_1_DOWN)
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_23_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE0_1_DOWN)
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_23_DOWN)
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_1_DOWN)
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_DOWN)
-                            if e3yo == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_RIGHT,
-                                                                derivatives=boundary12rightderivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
-                                                                derivatives=corner2derivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_RIGHT,
-                                                                    derivatives=boundary12rightderivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
-                                                                    derivatives=corner2derivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_DOWN)
-                        else:
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.TRIPLE_CURVE_1_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.TRIPLE_CURVE0_1_DOWN)
-                            if e3yo == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.BOUNDARY_12_RIGHT,
-                                                                derivatives=boundary12rightderivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.BOUNDARY_12_RIGHT,
-                                                                    derivatives=boundary12rightderivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]],
-                                                                    self.SURFACE_REGULAR_DOWN_RIGHT)
-                            self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.TRIPLE_CURVE_1_DOWN)
-
-                    elif element_type == self.ELEMENT_QUADRUPLE_UP_LEFT:
-                        if e2o == e2bo:
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.QUADRUPLE_UP)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_2_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.QUADRUPLE0_UP)
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.QUADRUPLE_UP)
-                            if e2bo == e2zo:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_23_UP)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_23_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_UP)
-                                if e1yo == 0:
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
-                                                                    derivatives=corner3derivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
-                                                                        derivatives=corner3derivs)
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
-                            else:
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE_1_UP)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE0_1_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_1_UP)
-                                if e1yo == 0:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_UP)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_UP)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_UP)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_UP)
-                        elif e2o == e2zo:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_UP)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_1_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_23_UP)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE0_1_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_23_UP)
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_1_UP)
-                            if e1yo == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
-                                                                derivatives=corner3derivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
-                                                                    derivatives=corner3derivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_UP)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_UP)
-                        else:
-                            if e1yo == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.BOUNDARY_13_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.BOUNDARY_13_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE_1_UP)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE0_1_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.TRIPLE_CURVE_1_UP)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.SURFACE_REGULAR_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.SURFACE_REGULAR_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE_1_UP)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE0_1_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.TRIPLE_CURVE_1_UP)
-
-                    elif element_type == self.ELEMENT_QUADRUPLE_UP:
-                        if e2o == e2bo:
-                            if e1o == 0:
-                                if not element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE0_13_Up)
-                            else:
-                                if not element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_2_UP)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_2_UP)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE0_2_UP)
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_2_UP)
-                            if e2bo == e2zo:
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_UP)
-                                if e1o == 0:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
-                                                                    derivatives=corner3derivs)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
-                                                                        derivatives=corner3derivs)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
-
-                            else:
-                                if e1o == 0:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_UP)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_UP)
-                                else:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_UP)
-                                    if element_shell:
-                                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
-                                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_UP)
-                        elif e2o == e2zo:
-                            if e1o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
-                                                                derivatives=corner3derivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
-                                                                    derivatives=corner3derivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_UP)
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_UP)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_UP)
-                        else:
-                            if e1o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.BOUNDARY_13_UP)
-                                self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.SURFACE_REGULAR_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.BOUNDARY_13_UP)
-                                    self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.SURFACE_REGULAR_UP)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4], lnm[7], lnm[8]],
-                                                                self.SURFACE_REGULAR_UP)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2], lnm[5], lnm[6]],
-                                                                    self.SURFACE_REGULAR_UP)
-
-                    elif element_type == self.ELEMENT_QUADRUPLE_LEFT:
-                        self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_3_LEFT)
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
+                                                            derivatives=corner2derivs)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_DOWN)
                         if element_shell:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_3_LEFT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE0_3_LEFT)
-                        if e3o == 0:
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_LEFT,
-                                                            derivatives=triple12leftderivs)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_12_LEFT,
-                                                                derivatives=triple12leftderivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_12_LEFT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_LEFT)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE_3_LEFT)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE0_3_LEFT)
-                        if e1yo == 0:
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_DOWN)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_DOWN)
-                            if e3o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
-                                                                derivatives=corner1derivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
-                                                                    derivatives=corner1derivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_DOWN)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_LEFT)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_LEFT)
-                            if e3o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
-                                                                derivatives=boundary12leftderivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
-                                                                    derivatives=boundary12leftderivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_LEFT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_LEFT)
-
-                    elif element_type == self.ELEMENT_QUADRUPLE_RIGHT:
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_DOWN)
+                else:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE_1_DOWN)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_CURVE0_1_DOWN)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_1_DOWN)
+                    if e3yo == 0:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_RIGHT,
+                                                        derivatives=boundary12rightderivs)
                         if element_shell:
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_3_RIGHT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE0_3_RIGHT)
-                        self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_3_RIGHT)
-                        if e3o == 0:
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_12_RIGHT,
-                                                                derivatives=triple12rightderivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE0_12_RIGHT)
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_RIGHT,
-                                                            derivatives=triple12rightderivs)
-                        else:
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_3_RIGHT)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_3_RIGHT)
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_RIGHT)
-                        if e2bo == e2zo:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_DOWN)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_DOWN)
-                            if e3o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
-                                                                derivatives=corner2derivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
-                                                                    derivatives=corner2derivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_DOWN)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                            if e3o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_RIGHT,
-                                                                derivatives=boundary12rightderivs)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_RIGHT,
-                                                                    derivatives=boundary12rightderivs)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_RIGHT)
-
-                    elif element_type == self.ELEMENT_DOWN_RIGHT:
-                        if e3o == 0:
-                            if e2o == e2zo:
-                                self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_RIGHT,
-                                                                derivatives=boundary12rightderivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
-                                                                derivatives=corner2derivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_RIGHT,
-                                                                    derivatives=boundary12rightderivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
-                                                                    derivatives=corner2derivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_RIGHT,
-                                                                derivatives=boundary12rightderivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_RIGHT,
-                                                                derivatives=boundary12rightderivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_RIGHT,
-                                                                    derivatives=boundary12rightderivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_RIGHT,
-                                                                    derivatives=boundary12rightderivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                            if e2o == e2zo:
-                                self.remap_eft_node_value_label(eft1, [lnm[6], lnm[8]], self.BOUNDARY_23_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]], self.BOUNDARY_23_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[6], lnm[8]], self.SURFACE_REGULAR_DOWN_RIGHT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]],
-                                                                    self.SURFACE_REGULAR_DOWN_RIGHT)
-
-                    elif element_type == self.ELEMENT_DOWN_LEFT:
-                        if e3o == 0:
-                            self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_LEFT,
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_RIGHT,
                                                             derivatives=boundary12rightderivs)
-                            self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_LEFT)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_LEFT,
-                                                                derivatives=boundary12rightderivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_DOWN_LEFT)
-                            if e1o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
-                                                                derivatives=corner1derivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
-                                                                    derivatives=corner1derivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
-                                                                derivatives=boundary12rightderivs)
-                                self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_LEFT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
-                                                                    derivatives=boundary12rightderivs)
-                                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_LEFT)
-                        else:
-                            self.remap_eft_node_value_label(eft1, [lnm[5], lnm[7]], self.SURFACE_REGULAR_DOWN_LEFT)
-                            if element_shell:
-                                self.remap_eft_node_value_label(eft1, [lnm[6], lnm[8]], self.SURFACE_REGULAR_DOWN_LEFT)
-                            if e1o == 0:
-                                self.remap_eft_node_value_label(eft1, [lnm[1], lnm[3]], self.BOUNDARY_13_DOWN)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]], self.BOUNDARY_13_DOWN)
-                            else:
-                                self.remap_eft_node_value_label(eft1, [lnm[1], lnm[3]], self.SURFACE_REGULAR_DOWN_LEFT)
-                                if element_shell:
-                                    self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]],
-                                                                    self.SURFACE_REGULAR_DOWN_LEFT)
-
                     else:
-                        continue
-
-                    if self._element_needs_scale_factor:
-                        scalefactors = [-1.0]
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_DOWN_RIGHT)
 
-                    if eft1 is not eft:
-                        elementtemplate1.defineField(coordinates, -1, eft1)
-                        element = mesh.createElement(elementIdentifier, elementtemplate1)
+            elif e2o == e2zo:
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_1_DOWN)
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE_23_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE0_1_DOWN)
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.TRIPLE0_23_DOWN)
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_1_DOWN)
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_DOWN)
+                if e3yo == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_RIGHT,
+                                                    derivatives=boundary12rightderivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
+                                                    derivatives=corner2derivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_RIGHT,
+                                                        derivatives=boundary12rightderivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
+                                                        derivatives=corner2derivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_DOWN)
+            else:
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.TRIPLE_CURVE_1_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.TRIPLE_CURVE0_1_DOWN)
+                if e3yo == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.BOUNDARY_12_RIGHT,
+                                                    derivatives=boundary12rightderivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.BOUNDARY_12_RIGHT,
+                                                        derivatives=boundary12rightderivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]],
+                                                        self.SURFACE_REGULAR_DOWN_RIGHT)
+                self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.TRIPLE_CURVE_1_DOWN)
+
+        elif element_type == self.ELEMENT_QUADRUPLE_UP_LEFT:
+            if e2o == e2bo:
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.QUADRUPLE_UP)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_2_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.QUADRUPLE0_UP)
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.QUADRUPLE_UP)
+                if e2bo == e2zo:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_23_UP)
                     else:
-                        element = mesh.createElement(elementIdentifier, elementtemplate)
-                    result2 = element.setNodesByIdentifier(eft1, nids)
-                    if scalefactors:
-                        result3 = element.setScaleFactors(eft1, scalefactors)
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_23_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_UP)
+                    if e1yo == 0:
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
+                                                        derivatives=corner3derivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
+                                                            derivatives=corner3derivs)
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
                     else:
-                        result3 = 7
-
-                    self.elementId[e3][e2][e1] = elementIdentifier
-
-                    elementIdentifier += 1
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
+                else:
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE_1_UP)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE0_1_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_1_UP)
+                    if e1yo == 0:
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_UP)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_UP)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_UP)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_UP)
+            elif e2o == e2zo:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_23_UP)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_1_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_23_UP)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE0_1_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_23_UP)
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_1_UP)
+                if e1yo == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
+                                                    derivatives=corner3derivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
+                                                        derivatives=corner3derivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_UP)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_UP)
+            else:
+                if e1yo == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.BOUNDARY_13_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.BOUNDARY_13_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE_1_UP)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE0_1_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.TRIPLE_CURVE_1_UP)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.SURFACE_REGULAR_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.SURFACE_REGULAR_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE_1_UP)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.TRIPLE_CURVE0_1_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.TRIPLE_CURVE_1_UP)
+
+        elif element_type == self.ELEMENT_QUADRUPLE_UP:
+            if e2o == e2bo:
+                if e1o == 0:
+                    if not element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE0_13_Up)
+                else:
+                    if not element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_2_UP)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_2_UP)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE0_2_UP)
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_2_UP)
+                if e2bo == e2zo:
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_UP)
+                    if e1o == 0:
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
+                                                        derivatives=corner3derivs)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
+                                                            derivatives=corner3derivs)
+                    else:
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
 
-                    if element_type == self.ELEMENT_REGULAR:
-                        for meshGroup in meshGroups[:1]:
-                            meshGroup.addElement(element)
+                else:
+                    if e1o == 0:
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_13_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_UP)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_13_UP)
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_UP)
                     else:
-                        for meshGroup in meshGroups[1:2]:
-                            meshGroup.addElement(element)
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_2_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_UP)
+                        if element_shell:
+                            self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_2_UP)
+                            self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_UP)
+            elif e2o == e2zo:
+                if e1o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.CORNER_3,
+                                                    derivatives=corner3derivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_3,
+                                                        derivatives=corner3derivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_UP)
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_UP)
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_UP)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_UP)
+            else:
+                if e1o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4]], self.BOUNDARY_13_UP)
+                    self.remap_eft_node_value_label(eft1, [lnm[7], lnm[8]], self.SURFACE_REGULAR_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2]], self.BOUNDARY_13_UP)
+                        self.remap_eft_node_value_label(eft1, [lnm[5], lnm[6]], self.SURFACE_REGULAR_UP)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[3], lnm[4], lnm[7], lnm[8]],
+                                                    self.SURFACE_REGULAR_UP)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[1], lnm[2], lnm[5], lnm[6]],
+                                                        self.SURFACE_REGULAR_UP)
+
+        elif element_type == self.ELEMENT_QUADRUPLE_LEFT:
+            self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_3_LEFT)
+            if element_shell:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE_3_LEFT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.TRIPLE_CURVE0_3_LEFT)
+            if e3o == 0:
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_LEFT,
+                                                derivatives=triple12leftderivs)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_12_LEFT,
+                                                    derivatives=triple12leftderivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE0_12_LEFT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_LEFT)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE_3_LEFT)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.TRIPLE_CURVE0_3_LEFT)
+            if e1yo == 0:
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_DOWN)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_DOWN)
+                if e3o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
+                                                    derivatives=corner1derivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
+                                                        derivatives=corner1derivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_13_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_13_DOWN)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_LEFT)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_LEFT)
+                if e3o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
+                                                    derivatives=boundary12leftderivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
+                                                        derivatives=boundary12leftderivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_LEFT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_LEFT)
 
-        return elementIdentifier
+        elif element_type == self.ELEMENT_QUADRUPLE_RIGHT:
+            if element_shell:
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE_3_RIGHT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[3]], self.TRIPLE_CURVE0_3_RIGHT)
+            self.remap_eft_node_value_label(eft1, [lnm[7]], self.TRIPLE_CURVE_3_RIGHT)
+            if e3o == 0:
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_12_RIGHT,
+                                                    derivatives=triple12rightderivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE0_12_RIGHT)
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_12_RIGHT,
+                                                derivatives=triple12rightderivs)
+            else:
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE_3_RIGHT)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.TRIPLE_CURVE0_3_RIGHT)
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.TRIPLE_CURVE_3_RIGHT)
+            if e2bo == e2zo:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_DOWN)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_DOWN)
+                if e3o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
+                                                    derivatives=corner2derivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
+                                                        derivatives=corner2derivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_23_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_23_DOWN)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                if e3o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_RIGHT,
+                                                    derivatives=boundary12rightderivs)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_RIGHT,
+                                                        derivatives=boundary12rightderivs)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.SURFACE_REGULAR_DOWN_RIGHT)
+
+        elif element_type == self.ELEMENT_DOWN_RIGHT:
+            if e3o == 0:
+                if e2o == e2zo:
+                    self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_RIGHT,
+                                                    derivatives=boundary12rightderivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.CORNER_2,
+                                                    derivatives=corner2derivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.BOUNDARY_23_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_RIGHT,
+                                                        derivatives=boundary12rightderivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_2,
+                                                        derivatives=corner2derivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_23_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_RIGHT,
+                                                    derivatives=boundary12rightderivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_RIGHT,
+                                                    derivatives=boundary12rightderivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                        self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_RIGHT,
+                                                        derivatives=boundary12rightderivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_RIGHT,
+                                                        derivatives=boundary12rightderivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_RIGHT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                if e2o == e2zo:
+                    self.remap_eft_node_value_label(eft1, [lnm[6], lnm[8]], self.BOUNDARY_23_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]], self.BOUNDARY_23_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[6], lnm[8]], self.SURFACE_REGULAR_DOWN_RIGHT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]],
+                                                        self.SURFACE_REGULAR_DOWN_RIGHT)
+
+        elif element_type == self.ELEMENT_DOWN_LEFT:
+            if e3o == 0:
+                self.remap_eft_node_value_label(eft1, [lnm[5]], self.BOUNDARY_12_LEFT,
+                                                derivatives=boundary12rightderivs)
+                self.remap_eft_node_value_label(eft1, [lnm[7]], self.SURFACE_REGULAR_DOWN_LEFT)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[6]], self.BOUNDARY_12_LEFT,
+                                                    derivatives=boundary12rightderivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[8]], self.SURFACE_REGULAR_DOWN_LEFT)
+                if e1o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.CORNER_1,
+                                                    derivatives=corner1derivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.BOUNDARY_13_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.CORNER_1,
+                                                        derivatives=corner1derivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.BOUNDARY_13_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1]], self.BOUNDARY_12_LEFT,
+                                                    derivatives=boundary12rightderivs)
+                    self.remap_eft_node_value_label(eft1, [lnm[3]], self.SURFACE_REGULAR_DOWN_LEFT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2]], self.BOUNDARY_12_LEFT,
+                                                        derivatives=boundary12rightderivs)
+                        self.remap_eft_node_value_label(eft1, [lnm[4]], self.SURFACE_REGULAR_DOWN_LEFT)
+            else:
+                self.remap_eft_node_value_label(eft1, [lnm[5], lnm[7]], self.SURFACE_REGULAR_DOWN_LEFT)
+                if element_shell:
+                    self.remap_eft_node_value_label(eft1, [lnm[6], lnm[8]], self.SURFACE_REGULAR_DOWN_LEFT)
+                if e1o == 0:
+                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[3]], self.BOUNDARY_13_DOWN)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]], self.BOUNDARY_13_DOWN)
+                else:
+                    self.remap_eft_node_value_label(eft1, [lnm[1], lnm[3]], self.SURFACE_REGULAR_DOWN_LEFT)
+                    if element_shell:
+                        self.remap_eft_node_value_label(eft1, [lnm[2], lnm[4]],
+                                                        self.SURFACE_REGULAR_DOWN_LEFT)
+        else:
+            return None
+
+        return eft1
 
     def local_node_mapping(self, boxMapping):
         """
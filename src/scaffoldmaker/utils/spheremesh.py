@@ -9,9 +9,11 @@ import math
 from cmlibs.maths.vectorops import magnitude, mult, normalize, add_vectors, set_magnitude, rejection, cross, angle, rotate_vector_around_vector
 from cmlibs.utils.zinc.finiteelement import getMaximumNodeIdentifier, getMaximumElementIdentifier
 from cmlibs.zinc.field import Field
-from scaffoldmaker.utils.interpolation import sampleCubicHermiteCurves, smoothCubicHermiteDerivativesLine
+from scaffoldmaker.utils.interpolation import sampleCubicHermiteCurves, smoothCubicHermiteDerivativesLine, \
+    smoothCubicHermiteDerivativesLines
 from scaffoldmaker.utils.cylindermesh import Ellipse2D, EllipseShape
 from scaffoldmaker.utils.shieldmesh import ShieldMesh3D
+import numpy as np
 
 
 class SphereShape(Enum):
@@ -294,14 +296,13 @@ class SphereMesh:
             raise ValueError("Not implemented.")
 
         shield3D = octant.get_shield()
-        for n3 in range(n3a, n3z + 1):
-            for n2 in range(n2a, n2z + 1):
-                for n1 in range(n1a, n1z + 1):
-                    n3o, n2o, n1o = self._shield3D.get_octant_node_index(octant_number, n3, n2, n1)
-                    self._shield3D.px[n3][n2][n1] = shield3D.px[n3o][n2o][n1o]
-                    self._shield3D.pd1[n3][n2][n1] = shield3D.pd1[n3o][n2o][n1o]
-                    self._shield3D.pd2[n3][n2][n1] = shield3D.pd2[n3o][n2o][n1o]
-                    self._shield3D.pd3[n3][n2][n1] = shield3D.pd3[n3o][n2o][n1o]
+        # map all node indexes at once; get_octant_node_index is affine so works on index arrays
+        indexes = np.mgrid[n3a:n3z + 1, n2a:n2z + 1, n1a:n1z + 1].reshape(3, -1)
+        octantIndexes = self._shield3D.get_octant_node_index(octant_number, *indexes)
+        for target, source in ((self._shield3D.px, shield3D.px), (self._shield3D.pd1, shield3D.pd1),
+                               (self._shield3D.pd2, shield3D.pd2), (self._shield3D.pd3, shield3D.pd3)):
+            for n3, n2, n1, n3o, n2o, n1o in zip(*indexes.tolist(), *(i.tolist() for i in octantIndexes)):
+                target[n3][n2][n1] = source[n3o][n2o][n1o]
 
     def modify_octant_common_nodes(self):
         """
@@ -701,31 +702,31 @@ class OctantMesh:
         n3z = self._elementsCount[2]
 
         # regular curves crossing curve 1
-        for n2 in range(2, self._elementsCount[0]):
-            # bottom right
-            self.sample_curves_between_two_nodes_on_sphere([0, n2, n1z], [n3z, n2, n1z], self._elementsCount[2] - 1,
-                                                           [2], [2], [None, None])
-            # top
-            self.sample_curves_between_two_nodes_on_sphere([n3z, n2, 0], [n3z, n2, n1z], self._elementsCount[1] - 1,
-                                                           [1], [-2], [None, -2])
+        n2Range = range(2, self._elementsCount[0])
+        # bottom right
+        self.sample_curves_between_nodes_on_sphere([[0, n2, n1z] for n2 in n2Range], [[n3z, n2, n1z] for n2 in n2Range],
+                                                   self._elementsCount[2] - 1, [2], [2], [None, None])
+        # top
+        self.sample_curves_between_nodes_on_sphere([[n3z, n2, 0] for n2 in n2Range], [[n3z, n2, n1z] for n2 in n2Range],
+                                                   self._elementsCount[1] - 1, [1], [-2], [None, -2])
 
         # regular curves crossing curve 2
-        for n1 in range(1, self._elementsCount[1] - 1):
-            # bottom left. Top is done before.
-            self.sample_curves_between_two_nodes_on_sphere([0, 0, n1], [n3z, 0, n1], self._elementsCount[2] - 1,
-                                                           [2], [2], [None, None])
+        n1Range = range(1, self._elementsCount[1] - 1)
+        # bottom left. Top is done before.
+        self.sample_curves_between_nodes_on_sphere([[0, 0, n1] for n1 in n1Range], [[n3z, 0, n1] for n1 in n1Range],
+                                                   self._elementsCount[2] - 1, [2], [2], [None, None])
 
         # smooth regular curves crossing curve 1
-        for n2 in range(n2a + 1, n2z):
-            self.smooth_derivatives_regular_surface_curve(2, n2, [[1], [None, None]], [[-2], [-2]], [[None, -2], [-2]])
+        self.smooth_derivatives_regular_surface_curves(2, range(n2a + 1, n2z), [[1], [None, None]], [[-2], [-2]],
+                                                       [[None, -2], [-2]])
 
         # smooth regular curves crossing curve 2
-        for n1 in range(1, n1z - 1):
-            self.smooth_derivatives_regular_surface_curve(1, n1, [[2], [None, None]], [[2], [1]], [[None, 1], [1]])
+        self.smooth_derivatives_regular_surface_curves(1, range(1, n1z - 1), [[2], [None, None]], [[2], [1]],
+                                                       [[None, 1], [1]])
 
         # smooth regular curves crossing curve 3
-        for n3 in range(1, self._elementsCount[2] - 1):
-            self.smooth_derivatives_regular_surface_curve(3, n3, [[1], [None, None]], [[1], [1]], [[None, 1], [1]])
+        self.smooth_derivatives_regular_surface_curves(3, range(1, self._elementsCount[2] - 1), [[1], [None, None]],
+                                                       [[1], [1]], [[None, 1], [1]])
 
     def create_interior_nodes(self):
         """
@@ -784,12 +785,25 @@ class OctantMesh:
           one.
         :return:
         """
+        self.sample_curves_between_nodes_on_sphere([id1], [id2], elementsOut, dStart, dbetween, dEnd)
+
+    def sample_curves_between_nodes_on_sphere(self, ids1, ids2, elementsOut, dStart, dbetween, dEnd):
+        """
+        Samples a family of curves on the sphere surface between pairs of points given by their indexes, with the
+        same index varying along each curve. All curves are sampled together with sample_curves_on_sphere_arrays.
+        :param ids1, ids2: Lists of [n3,n2,n1] for the first and second points of each curve.
+        :param elementsOut, dStart, dBetween, dEnd: See sample_curves_between_two_nodes_on_sphere.
+        :return:
+        """
+        if not ids1:
+            return
         btx = self._shield3D.px
         btd1 = self._shield3D.pd1
         btd2 = self._shield3D.pd2
         btd3 = self._shield3D.pd3
 
         # Find what index is constant
+        id1, id2 = ids1[0], ids2[0]
         if id1[0] != id2[0]:
             varying_index = 3
             elementsCount = self._elementsCount[2]
@@ -804,47 +818,54 @@ class OctantMesh:
             raise ValueError("None of n1, n2, or n3 is constant. Only on the constant curves.")
 
         btd = {1: btd1, 2: btd2, 3: btd3}
-        idi = {0: id1[0], 1: id1[1], 2: id1[2]}
 
-        nx, nd1 = sample_curves_on_sphere(btx[id1[0]][id1[1]][id1[2]], btx[id2[0]][id2[1]][id2[2]], self._centre,
-                                          elementsOut)
+        nxs, nd1s = sample_curves_on_sphere_arrays([btx[id1[0]][id1[1]][id1[2]] for id1 in ids1],
+                                                   [btx[id2[0]][id2[1]][id2[2]] for id2 in ids2],
+                                                   self._centre, elementsOut)
+        unitVectors = [a.reshape(nxs.shape).tolist() for a in local_orthogonal_unit_vectors_arrays(
+            nxs.reshape((-1, 3)), self._axes[2], self._centre)]
+
+        for c, id1 in enumerate(ids1):
+            idi = {0: id1[0], 1: id1[1], 2: id1[2]}
+            nx = nxs[c].tolist()
+            nd1 = nd1s[c].tolist()
+            nit = 0
+            for ni in range(elementsCount + 1):
+                idi[3 - varying_index] = ni
+
+                if ni < len(dStart):
+                    if dStart[ni]:
+                        btd[dStart[ni]][idi[0]][idi[1]][idi[2]] = nd1[nit] if dStart[ni] > 0 else mult(
+                            nd1[nit], -1)
+                        nit += 1
+                elif ni > elementsCount - len(dEnd):
+                    nie = ni - elementsCount + len(dEnd) - 1
+                    if dEnd[nie]:
+                        btd[abs(dEnd[nie])][idi[0]][idi[1]][idi[2]] = nd1[nit] if dEnd[nie] > 0 else mult(
+                            nd1[nit], -1)
+                        nit += 1
+                else:
+                    btx[idi[0]][idi[1]][idi[2]] = nx[nit]
 
-        nit = 0
-        for ni in range(elementsCount + 1):
-            idi[3 - varying_index] = ni
+                    btd1[idi[0]][idi[1]][idi[2]] = unitVectors[0][c][nit]  # initialise
+                    btd2[idi[0]][idi[1]][idi[2]] = unitVectors[1][c][nit]  # initialise
+                    btd3[idi[0]][idi[1]][idi[2]] = unitVectors[2][c][nit]  # initialise
 
-            if ni < len(dStart):
-                if dStart[ni]:
-                    btd[dStart[ni]][idi[0]][idi[1]][idi[2]] = nd1[nit] if dStart[ni] > 0 else mult(
-                        nd1[nit], -1)
-                    nit += 1
-            elif ni > elementsCount - len(dEnd):
-                nie = ni - elementsCount + len(dEnd) - 1
-                if dEnd[nie]:
-                    btd[abs(dEnd[nie])][idi[0]][idi[1]][idi[2]] = nd1[nit] if dEnd[nie] > 0 else mult(
+                    btd[abs(dbetween[0])][idi[0]][idi[1]][idi[2]] = nd1[nit] if dbetween[0] > 0 else mult(
                         nd1[nit], -1)
                     nit += 1
-            else:
-                btx[idi[0]][idi[1]][idi[2]] = nx[nit]
 
-                a1, a2, a3 = local_orthogonal_unit_vectors(nx[nit], self._axes[2], self._centre)
-                btd1[idi[0]][idi[1]][idi[2]] = a1  # initialise
-                btd2[idi[0]][idi[1]][idi[2]] = a2  # initialise
-                btd3[idi[0]][idi[1]][idi[2]] = a3  # initialise
-
-                btd[abs(dbetween[0])][idi[0]][idi[1]][idi[2]] = nd1[nit] if dbetween[0] > 0 else mult(
-                    nd1[nit], -1)
-                nit += 1
-
-    def smooth_derivatives_regular_surface_curve(self, constant_index, nc, dStart, dBetween, dEnd):
+    def smooth_derivatives_regular_surface_curves(self, constant_index, ncs, dStart, dBetween, dEnd):
         """
-        Smooth derivatives for each constant index curve. e.g. n2 = 3
+        Smooth derivatives for a family of constant index curves e.g. n2 = 2, 3, 4, smoothing all curves together.
         :param constant_index: Specifies n1, n2 or n3 is constant.
-        :param nc: Index that is constant across the curve.
+        :param ncs: Indexes that are constant across each curve.
         :param dStart, dBetween, dEnd: See sample_curves_between_two_nodes_on_sphere. The difference here is
          the values are given for two curves that connect one end to the other end of the sphere surface.
         :return:
         """
+        if not ncs:
+            return
         btx = self._shield3D.px
         btd1 = self._shield3D.pd1
         btd2 = self._shield3D.pd2
@@ -863,72 +884,42 @@ class OctantMesh:
 
         btd = {1: btd1, 2: btd2, 3: btd3}
 
-        tx = []
-        td = []
-        for se in range(2):
-            for ni in range(elementsCount[se] + 1):
-                if constant_index == 1:
-                    ids = [ni, 0, nc] if se == 0 else [n3z, ni, nc]
-                elif constant_index == 2:
-                    ids = [n3z, nc, ni] if se == 0 else [elementsCount[se] - ni, nc, n1z]
-                elif constant_index == 3:
-                    ids = [nc, 0, ni] if se == 0 else [nc, ni, n1z]
-
-                if ni < len(dStart[se]):
-                    if dStart[se][ni]:
-                        tx.append(btx[ids[0]][ids[1]][ids[2]])
-                        if dStart[0][ni] > 0:
-                            td.append(btd[abs(dStart[se][ni])][ids[0]][ids[1]][ids[2]])
-                        else:
-                            td.append(mult(btd[abs(dStart[se][ni])][ids[0]][ids[1]][ids[2]], -1))
-                elif ni > elementsCount[se] - len(dEnd[se]):
-                    nie = ni - elementsCount[se] + len(dEnd[se]) - 1
-                    if dEnd[se][nie]:
-                        tx.append(btx[ids[0]][ids[1]][ids[2]])
-                        if dEnd[se][nie] > 0:
-                            td.append(btd[abs(dEnd[se][nie])][ids[0]][ids[1]][ids[2]])
-                        else:
-                            td.append(mult(btd[abs(dEnd[se][nie])][ids[0]][ids[1]][ids[2]], -1))
-                else:
-                    tx.append(btx[ids[0]][ids[1]][ids[2]])
-                    if dBetween[se][0] > 0:
-                        td.append(btd[abs(dBetween[se][0])][ids[0]][ids[1]][ids[2]])
-                    else:
-                        td.append(mult(btd[abs(dBetween[se][0])][ids[0]][ids[1]][ids[2]], -1))
-
-        td = smoothCubicHermiteDerivativesLine(tx, td, fixStartDirection=True, fixEndDirection=True)
-
-        nit = 0
-        for se in range(2):
-            for ni in range(elementsCount[se] + 1):
-                if constant_index == 1:
-                    ids = [ni, 0, nc] if se == 0 else [n3z, ni, nc]
-                elif constant_index == 2:
-                    ids = [n3z, nc, ni] if se == 0 else [elementsCount[se] - ni, nc, n1z]
-                elif constant_index == 3:
-                    ids = [nc, 0, ni] if se == 0 else [nc, ni, n1z]
-
-                if ni < len(dStart[se]):
-                    if dStart[se][ni]:
-                        if dStart[0][ni] > 0:
-                            btd[abs(dStart[se][ni])][ids[0]][ids[1]][ids[2]] = td[nit]
-                        else:
-                            btd[abs(dStart[se][ni])][ids[0]][ids[1]][ids[2]] = mult(td[nit], -1)
-                        nit += 1
-                elif ni > elementsCount[se] - len(dEnd[se]):
-                    nie = ni - elementsCount[se] + len(dEnd[se]) - 1
-                    if dEnd[se][nie]:
-                        if dEnd[se][nie] > 0:
-                            btd[abs(dEnd[se][nie])][ids[0]][ids[1]][ids[2]] = td[nit]
-                        else:
-                            btd[abs(dEnd[se][nie])][ids[0]][ids[1]][ids[2]] = mult(td[nit], -1)
-                        nit += 1
-                else:
-                    if dBetween[se][0] > 0:
-                        btd[abs(dBetween[se][0])][ids[0]][ids[1]][ids[2]] = td[nit]
+        def get_curve_node_derivatives(nc):
+            """
+            :return: List of (ids, derivative number, sign) for nodes on curve with constant index nc.
+            """
+            nodeDerivatives = []
+            for se in range(2):
+                for ni in range(elementsCount[se] + 1):
+                    if constant_index == 1:
+                        ids = [ni, 0, nc] if se == 0 else [n3z, ni, nc]
+                    elif constant_index == 2:
+                        ids = [n3z, nc, ni] if se == 0 else [elementsCount[se] - ni, nc, n1z]
+                    elif constant_index == 3:
+                        ids = [nc, 0, ni] if se == 0 else [nc, ni, n1z]
+
+                    if ni < len(dStart[se]):
+                        if dStart[se][ni]:
+                            nodeDerivatives.append((ids, abs(dStart[se][ni]), 1 if dStart[0][ni] > 0 else -1))
+                    elif ni > elementsCount[se] - len(dEnd[se]):
+                        nie = ni - elementsCount[se] + len(dEnd[se]) - 1
+                        if dEnd[se][nie]:
+                            nodeDerivatives.append((ids, abs(dEnd[se][nie]), 1 if dEnd[se][nie] > 0 else -1))
                     else:
-                        btd[abs(dBetween[se][0])][ids[0]][ids[1]][ids[2]] = mult(td[nit], -1)
-                    nit += 1
+                        nodeDerivatives.append((ids, abs(dBetween[se][0]), 1 if dBetween[se][0] > 0 else -1))
+            return nodeDerivatives
+
+        curvesNodeDerivatives = [get_curve_node_derivatives(nc) for nc in ncs]
+        tx = [[btx[ids[0]][ids[1]][ids[2]] for ids, d, sign in nodeDerivatives]
+              for nodeDerivatives in curvesNodeDerivatives]
+        td = [[btd[d][ids[0]][ids[1]][ids[2]] if (sign > 0) else mult(btd[d][ids[0]][ids[1]][ids[2]], -1)
+               for ids, d, sign in nodeDerivatives] for nodeDerivatives in curvesNodeDerivatives]
+
+        td = smoothCubicHermiteDerivativesLines(tx, td, fixStartDirection=True, fixEndDirection=True).tolist()
+
+        for nodeDerivatives, curveTd in zip(curvesNodeDerivatives, td):
+            for (ids, d, sign), nd in zip(nodeDerivatives, curveTd):
+                btd[d][ids[0]][ids[1]][ids[2]] = nd if (sign > 0) else mult(nd, -1)
 
     def calculate_interior_quadruple_point(self):
         """
@@ -1048,16 +1039,14 @@ class OctantMesh:
 
         # smooth d1 in regular 1
         if self._elementsCount[0] >= 3:
-            for n3 in range(1, self._elementsCount[2]):
-                for n1 in range(1, self._elementsCount[1]):
-                    tx = []
-                    td1 = []
-                    for n2 in range(1, self._elementsCount[0]+1):
-                        tx.append(btx[n3][n2][n1])
-                        td1.append(btd1[n3][n2][n1])
-                    td1 = smoothCubicHermiteDerivativesLine(tx, td1, fixEndDirection=True)
-                    for n2 in range(1, self._elementsCount[0]+1):
-                        btd1[n3][n2][n1] = td1[n2-1]
+            lines = [(n3, n1) for n3 in range(1, self._elementsCount[2]) for n1 in range(1, self._elementsCount[1])]
+            n2Range = range(1, self._elementsCount[0] + 1)
+            td1 = smoothCubicHermiteDerivativesLines(
+                [[btx[n3][n2][n1] for n2 in n2Range] for n3, n1 in lines],
+                [[btd1[n3][n2][n1] for n2 in n2Range] for n3, n1 in lines], fixEndDirection=True).tolist()
+            for (n3, n1), ltd1 in zip(lines, td1):
+                for n2, d1 in zip(n2Range, ltd1):
+                    btd1[n3][n2][n1] = d1
         else:
             for n3 in range(1, self._elementsCount[2]):
                 for n1 in range(1, self._elementsCount[1]):
@@ -1066,18 +1055,14 @@ class OctantMesh:
 
         # smooth d3 in regular
         if self._elementsCount[1] >= 3:
-            for n3 in range(1, self._elementsCount[2]):
-                for n2 in range(1, self._elementsCount[0]):
-                    tx = []
-                    td3 = []
-                    for n1 in range(self._elementsCount[1]):
-                        tx.append(btx[n3][n2][n1])
-                        td3.append(btd3[n3][n2][n1])
-
-                    td3 = smoothCubicHermiteDerivativesLine(tx, td3, fixStartDirection=True)
-
-                    for n1 in range(self._elementsCount[1]):
-                        btd3[n3][n2][n1] = td3[n1]
+            lines = [(n3, n2) for n3 in range(1, self._elementsCount[2]) for n2 in range(1, self._elementsCount[0])]
+            n1Range = range(self._elementsCount[1])
+            td3 = smoothCubicHermiteDerivativesLines(
+                [[btx[n3][n2][n1] for n1 in n1Range] for n3, n2 in lines],
+                [[btd3[n3][n2][n1] for n1 in n1Range] for n3, n2 in lines], fixStartDirection=True).tolist()
+            for (n3, n2), ltd3 in zip(lines, td3):
+                for n1, d3 in zip(n1Range, ltd3):
+                    btd3[n3][n2][n1] = d3
         else:
             for n3 in range(1, self._elementsCount[2]):
                 for n2 in range(1, self._elementsCount[0]):
@@ -1085,18 +1070,18 @@ class OctantMesh:
                     btd3[n3][n2][0] = set_magnitude(btd3[n3][n2][0], magnitude(btd3[n3][n2][1]))
 
         # regular curves d2
-        for n2 in range(1, self._elementsCount[0]):
-            for n1 in range(1, self._elementsCount[1]):
-                if self._elementsCount[2] >= 3:
-                    tx = []
-                    td2 = []
-                    for n3 in range(self._elementsCount[2]):
-                        tx.append(btx[n3][n2][n1])
-                        td2.append(btd2[n3][n2][n1])
-                    td2 = smoothCubicHermiteDerivativesLine(tx, td2, fixStartDirection=True)
-                    for n3 in range(self._elementsCount[2]):
-                        btd2[n3][n2][n1] = td2[n3]
-                else:
+        if self._elementsCount[2] >= 3:
+            lines = [(n2, n1) for n2 in range(1, self._elementsCount[0]) for n1 in range(1, self._elementsCount[1])]
+            n3Range = range(self._elementsCount[2])
+            td2 = smoothCubicHermiteDerivativesLines(
+                [[btx[n3][n2][n1] for n3 in n3Range] for n2, n1 in lines],
+                [[btd2[n3][n2][n1] for n3 in n3Range] for n2, n1 in lines], fixStartDirection=True).tolist()
+            for (n2, n1), ltd2 in zip(lines, td2):
+                for n3, d2 in zip(n3Range, ltd2):
+                    btd2[n3][n2][n1] = d2
+        else:
+            for n2 in range(1, self._elementsCount[0]):
+                for n1 in range(1, self._elementsCount[1]):
                     btd2[1][n2][n1] = add_vectors([btx[1][n2][n1], btx[0][n2][n1]], [1, -1])
                     btd2[0][n2][n1] = set_magnitude(btd2[0][n2][n1], magnitude(btd2[1][n2][n1]))
 
@@ -1191,6 +1176,23 @@ def local_orthogonal_unit_vectors(x, axis3, origin):
     return e1, e2, e3
 
 
+def local_orthogonal_unit_vectors_arrays(x, axis3, origin):
+    """
+    Array version of local_orthogonal_unit_vectors for many points.
+    :param x: Coordinates of points, array-like of shape (pointsCount, 3).
+    :param axis3: The third axis in Cartesian coordinate system (axis1, axis2, axis3)
+    :return: e1, e2, e3 numpy arrays of shape (pointsCount, 3).
+    """
+    r = np.asarray(x, dtype=float) - np.asarray(origin, dtype=float)
+    e3 = r / np.linalg.norm(r, axis=-1, keepdims=True)
+    axis3 = np.asarray(axis3, dtype=float)
+    e2 = axis3 - (e3 @ axis3)[:, np.newaxis] * e3
+    e2 /= np.linalg.norm(e2, axis=-1, keepdims=True)
+    e1 = np.cross(e2, e3)
+
+    return e1, e2, e3
+
+
 def calculate_arc_length(x1, x2, origin):
     """
     Calculate the arc length between points x1 and x2.
@@ -1232,6 +1234,32 @@ def sample_curves_on_sphere(x1, x2, origin, elementsOut):
     return nx, nd1
 
 
+def sample_curves_on_sphere_arrays(x1, x2, origin, elementsOut):
+    """
+    Array version of sample_curves_on_sphere, sampling great circle arcs between many pairs of points at once.
+    :param x1, x2: Start and end points coordinates of each curve, array-like of shape (curvesCount, 3).
+    :param elementsOut: Number of elements to sample each curve with.
+    :return: nx, nd1 numpy arrays of shape (curvesCount, elementsOut + 1, 3).
+    """
+    r1 = np.asarray(x1, dtype=float) - np.asarray(origin, dtype=float)
+    r2 = np.asarray(x2, dtype=float) - np.asarray(origin, dtype=float)
+    normal = np.cross(r1, r2 - r1)
+    k = normal / np.linalg.norm(normal, axis=-1, keepdims=True)
+    radius = np.linalg.norm(r1, axis=-1)
+    theta = np.arccos(np.clip(np.einsum('ij,ij->i', r1, r2) / (radius * np.linalg.norm(r2, axis=-1)), -1.0, 1.0))
+    arcLengthPerElement = radius * theta / elementsOut
+
+    radiansAcross = np.outer(theta / elementsOut, np.arange(elementsOut + 1))[:, :, np.newaxis]
+    cosa = np.cos(radiansAcross)
+    r = r1[:, np.newaxis, :] * cosa + np.cross(k, r1)[:, np.newaxis, :] * np.sin(radiansAcross) + \
+        (k * np.einsum('ij,ij->i', k, r1)[:, np.newaxis])[:, np.newaxis, :] * (1.0 - cosa)
+    nx = r + np.asarray(origin, dtype=float)
+    nd1 = np.cross(normal[:, np.newaxis, :], r)
+    nd1 *= (arcLengthPerElement[:, np.newaxis] / np.linalg.norm(nd1, axis=-1))[:, :, np.newaxis]
+
+    return nx, nd1
+
+
 def spherical_to_cartesian(r, theta, phi):
     """
     :param r: Radius.
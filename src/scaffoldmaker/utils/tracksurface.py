@@ -5,6 +5,7 @@ Utility class for representing surfaces on which features can be located.
 import copy
 from enum import Enum
 import math
+import numpy as np
 from cmlibs.maths.vectorops import add, cross, dot, magnitude, mult, normalize, sub, set_magnitude
 from cmlibs.utils.zinc.general import ChangeManager
 from cmlibs.utils.zinc.field import find_or_create_field_coordinates, find_or_create_field_group
@@ -83,6 +84,8 @@ class TrackSurface:
                 elif s > self._xMax[c]:
                     self._xMax[c] = s
         self._xRange = [self._xMax[c] - self._xMin[c] for c in range(3)]
+        # bounding volume hierarchy built on first use: see _getBoundingVolumes()
+        self._boundingVolumes = None
 
     def getElementsCount1(self):
         return self._elementsCount1
@@ -90,6 +93,102 @@ class TrackSurface:
     def getElementsCount2(self):
         return self._elementsCount2
 
+    def _getBoundingVolumes(self):
+        """
+        Get cached bounding volume hierarchy of the surface, building on first call. Levels are the whole surface,
+        each row of elements along direction 1, and each element. Element boxes bound the Bezier control points of
+        the bicubic Hermite element so fully contain it.
+        :return: tuple(elementCentres, elementMinimums, elementMaximums, rowMinimums, rowMaximums, minimums,
+        maximums). Element arrays have shape (elementsCount2 * elementsCount1, 3) varying fastest in direction 1,
+        row arrays have shape (elementsCount2, 3), whole surface arrays have shape (3,).
+        """
+        if self._boundingVolumes is None:
+            elementsCount1 = self._elementsCount1
+            elementsCount2 = self._elementsCount2
+            nodesCount1 = elementsCount1 if self._loop1 else elementsCount1 + 1
+            e1 = np.arange(elementsCount1)
+            e2 = np.arange(elementsCount2)
+            n1 = (e2[:, np.newaxis] * nodesCount1 + e1[np.newaxis, :]).reshape(-1)
+            n2 = (e2[:, np.newaxis] * nodesCount1 + (e1[np.newaxis, :] + 1) % nodesCount1).reshape(-1)
+            nids = (n1, n2, n1 + nodesCount1, n2 + nodesCount1)
+            nx = np.array(self._nx, dtype=float)
+            nd1 = np.array(self._nd1, dtype=float)
+            nd2 = np.array(self._nd2, dtype=float)
+            nd12 = np.array(self._nd12, dtype=float) if self._nd12 else np.zeros(nx.shape)
+            elementCentres = np.zeros((len(n1), 3))
+            controlPoints = []
+            for nid, sign1, sign2 in zip(nids, (1.0, -1.0, 1.0, -1.0), (1.0, 1.0, -1.0, -1.0)):
+                x = nx[nid]
+                d1 = sign1 * nd1[nid]
+                d2 = sign2 * nd2[nid]
+                d12 = (sign1 * sign2) * nd12[nid]
+                # cubic Hermite basis at xi = 0.5 is 0.5 for values, +/-0.125 for derivatives
+                elementCentres += 0.25 * x + 0.0625 * (d1 + d2) + 0.015625 * d12
+                controlPoints += [x, x + d1 / 3.0, x + d2 / 3.0, x + (d1 + d2) / 3.0 + d12 / 9.0]
+            controlPoints = np.stack(controlPoints)
+            elementMinimums = controlPoints.min(axis=0)
+            elementMaximums = controlPoints.max(axis=0)
+            rowMinimums = elementMinimums.reshape(elementsCount2, elementsCount1, 3).min(axis=1)
+            rowMaximums = elementMaximums.reshape(elementsCount2, elementsCount1, 3).max(axis=1)
+            self._boundingVolumes = (elementCentres, elementMinimums, elementMaximums, rowMinimums, rowMaximums,
+                                     rowMinimums.min(axis=0), rowMaximums.max(axis=0))
+        return self._boundingVolumes
+
+    def getBoundingBox(self):
+        """
+        :return: Minimum and maximum coordinates [x, y, z] of a box containing the whole surface.
+        """
+        boundingVolumes = self._getBoundingVolumes()
+        return boundingVolumes[5].tolist(), boundingVolumes[6].tolist()
+
+    def findElementsIntersectingBox(self, minimums, maximums):
+        """
+        Get indexes of elements whose bounding boxes overlap a box, culling whole rows of elements first.
+        :param minimums: Minimum coordinates [x, y, z] of box.
+        :param maximums: Maximum coordinates [x, y, z] of box.
+        :return: numpy array of element indexes e2 * elementsCount1 + e1 of elements which may intersect box.
+        """
+        elementCentres, elementMinimums, elementMaximums, rowMinimums, rowMaximums, surfaceMinimums, \
+            surfaceMaximums = self._getBoundingVolumes()
+        if np.any(surfaceMinimums > maximums) or np.any(surfaceMaximums < minimums):
+            return np.zeros(0, dtype=int)
+        rows = np.nonzero(np.all((rowMinimums <= maximums) & (rowMaximums >= minimums), axis=1))[0]
+        elementIndexes = (rows[:, np.newaxis] * self._elementsCount1 + np.arange(self._elementsCount1)).reshape(-1)
+        overlaps = np.all((elementMinimums[elementIndexes] <= maximums) &
+                          (elementMaximums[elementIndexes] >= minimums), axis=1)
+        return elementIndexes[overlaps]
+
+    def mayIntersectCurve(self, cx, cd1, loop=False, tolerance=None):
+        """
+        Quick check using bounding volumes of whether a cubic Hermite curve can possibly come close to the surface.
+        If this returns False, findNearestPositionOnCurve() cannot find an intersection.
+        :param cx: Coordinates along curve.
+        :param cd1: Derivatives along curve.
+        :param loop: True if curve loops back to first point, False if not.
+        :param tolerance: Distance to expand bounds by, or None to use the intersection tolerance of this surface.
+        :return: True if any element of curve has a bounding box overlapping an element box of the surface.
+        """
+        if tolerance is None:
+            tolerance = 1.0E-6 * max(self._xRange)
+        px = np.array(cx, dtype=float)
+        pd1 = np.array(cd1, dtype=float) / 3.0
+        if loop:
+            px = np.vstack((px, px[:1]))
+            pd1 = np.vstack((pd1, pd1[:1]))
+        # Bezier control points of each curve element
+        controlPoints = np.stack((px[:-1], px[:-1] + pd1[:-1], px[1:] - pd1[1:], px[1:]))
+        curveMinimums = controlPoints.min(axis=0) - tolerance
+        curveMaximums = controlPoints.max(axis=0) + tolerance
+        elementMinimums, elementMaximums = self._getBoundingVolumes()[1:3]
+        elementIndexes = self.findElementsIntersectingBox(curveMinimums.min(axis=0), curveMaximums.max(axis=0))
+        if len(elementIndexes) == 0:
+            return False
+        elementMinimums = elementMinimums[elementIndexes]
+        elementMaximums = elementMaximums[elementIndexes]
+        overlaps = np.all((elementMinimums[np.newaxis, :, :] <= curveMaximums[:, np.newaxis, :]) &
+                          (elementMaximums[np.newaxis, :, :] >= curveMinimums[:, np.newaxis, :]), axis=2)
+        return bool(np.any(overlaps))
+
     def createMirrorX(self):
         """
         Mirror track surface about x-axis by negating all x coordinates
@@ -734,18 +833,15 @@ class TrackSurface:
             startX = self.evaluateCoordinates(startPosition, derivatives=False)
             otherPosition = otherStartPosition = self.findNearestPositionSample(startX)[0]
         else:
-            nearestDistance = None
-            startPosition = None
-            otherStartPosition = None
-            for n2 in range(self._elementsCount2):
-                for n1 in range(self._elementsCount1):
-                    position = TrackSurfacePosition(n1, n2, 0.5, 0.5)
-                    targetx = self.evaluateCoordinates(position)
-                    otherPosition, distance = otherTrackSurface.findNearestPositionSample(targetx)
-                    if (nearestDistance is None) or (distance < nearestDistance):
-                        nearestDistance = distance
-                        startPosition = position
-                        otherStartPosition = otherPosition
+            # nearest pair of element centres on self and otherTrackSurface
+            elementCentres = self._getBoundingVolumes()[0]
+            otherElementCentres = otherTrackSurface._getBoundingVolumes()[0]
+            distances = np.linalg.norm(elementCentres[:, np.newaxis, :] - otherElementCentres[np.newaxis, :, :], axis=2)
+            elementIndex, otherElementIndex = np.unravel_index(np.argmin(distances), distances.shape)
+            n2, n1 = divmod(int(elementIndex), self._elementsCount1)
+            startPosition = TrackSurfacePosition(n1, n2, 0.5, 0.5)
+            o2, o1 = divmod(int(otherElementIndex), otherTrackSurface._elementsCount1)
+            otherStartPosition = TrackSurfacePosition(o1, o2, 0.5, 0.5)
             nextPosition = startPosition
             otherPosition = otherStartPosition
         START_MAX_MAG_DXI = MAX_MAG_DXI
@@ -959,21 +1055,12 @@ class TrackSurface:
         :param targetx: Coordinates of point to find nearest to.
         :return: nearest TrackSurfacePosition, nearest distance
         """
-        e1Start = 0
         # future: loop option to limit to between [0.5, 1.5]
-        # e1Start = (self._elementsCount1 // 2) if self._loop1 else 0
-        e1Limit = e1Start + self._elementsCount1
-        nearestDistance = None
-        nearestPosition = None
-        for e2 in range(self._elementsCount2):
-            for e1 in range(e1Start, e1Limit):
-                position = TrackSurfacePosition(e1, e2, 0.5, 0.5)
-                x = self.evaluateCoordinates(position)
-                distance = magnitude(sub(x, targetx))
-                if (nearestDistance is None) or (distance < nearestDistance):
-                    nearestDistance = distance
-                    nearestPosition = position
-        return nearestPosition, nearestDistance
+        elementCentres = self._getBoundingVolumes()[0]
+        distances = np.linalg.norm(elementCentres - targetx, axis=1)
+        elementIndex = int(np.argmin(distances))
+        e2, e1 = divmod(elementIndex, self._elementsCount1)
+        return TrackSurfacePosition(e1, e2, 0.5, 0.5), float(distances[elementIndex])
 
     def findNearestPosition(self, targetx: list, startPosition: TrackSurfacePosition = None, instrument=False) \
             -> TrackSurfacePosition:
@@ -17,6 +17,7 @@ from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicub
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.eft_utils import remapEftNodeValueLabelsVersion
 from scaffoldmaker.utils.geometry import createCirclePoints
+from scaffoldmaker.utils.meshwriter import MeshWriter
 
 
 def getPlaneProjectionOnCentralPath(x, elementsCountAround, elementsCountAlong,
@@ -587,9 +588,6 @@ def createNodesAndElements(region,
     elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
     result = elementtemplate.defineField(coordinates, -1, eft)
 
-    elementtemplateApex = mesh.createElementtemplate()
-    elementtemplateApex.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
     if xFlat:
         # Flat coordinates field
         bicubichermitelinear = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
@@ -660,9 +658,6 @@ def createNodesAndElements(region,
         organElementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
         organElementtemplate.defineField(organCoordinates, -1, eftOrgan)
 
-        organElementtemplateApex = mesh.createElementtemplate()
-        organElementtemplateApex.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-
     # Create nodes
     # Coordinates field
     if nodeIdProximal:
@@ -677,20 +672,19 @@ def createNodesAndElements(region,
                 newNodeList.append(nodeIdProximal[n3][n1])
                 nodeIdentifier = nodeIdentifier + 1
 
+    meshWriter = MeshWriter(coordinates)
+    valueLabels = [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3]
+    if useCrossDerivatives:
+        valueLabels += [Node.VALUE_LABEL_D2_DS1DS2, Node.VALUE_LABEL_D2_DS1DS3, Node.VALUE_LABEL_D2_DS2DS3,
+                        Node.VALUE_LABEL_D3_DS1DS2DS3]
+    valueLabelsVersions = [(valueLabel, 1) for valueLabel in valueLabels]
+    crossDerivatives = [zero] * 4 if useCrossDerivatives else []
     for n in range(proximalNodesOffset if nodeIdProximal else 0, len(x)):
-        node = nodes.createNode(nodeIdentifier, nodetemplate)
-        cache.setNode(node)
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, d3[n])
-        if useCrossDerivatives:
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS2DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1, zero)
-        # print('NodeIdentifier = ', nodeIdentifier, x[n], d1[n], d2[n])
+        meshWriter.addNode(nodeIdentifier, nodetemplate, valueLabelsVersions,
+                           [x[n], d1[n], d2[n], d3[n]] + crossDerivatives)
         nodeIdentifier = nodeIdentifier + 1
+    # flat and organ coordinates are merged onto these nodes below, so they must exist first
+    meshWriter.write()
 
     # Flat coordinates field
     if xFlat:
@@ -761,9 +755,8 @@ def createNodesAndElements(region,
             for e1 in range(elementsCountAround):
                 va = e1
                 vb = (e1 + 1) % elementsCountAround
-                eftApex = eftfactory.createEftShellPoleBottom(va * 100, vb * 100)
-                elementtemplateApex.defineField(coordinates, -1, eftApex)
-                element = mesh.createElement(elementIdentifier, elementtemplateApex)
+                eftApex = eftfactory.getEft("createEftShellPoleBottom", va * 100, vb * 100)
+                element = mesh.createElement(elementIdentifier, eftfactory.getElementtemplate(coordinates, eftApex))
                 bni1 = e3 + 1 + startNode - 1
                 bni2 = elementsCountThroughWall + 1 + elementsCountAround*e3 + e1 + 1 + startNode - 1
                 bni3 = elementsCountThroughWall + 1 + elementsCountAround*e3 + (e1 + 1) % elementsCountAround + 1 + startNode - 1
@@ -773,9 +766,8 @@ def createNodesAndElements(region,
                 if xOrgan:
                     vao = e1
                     vbo = (e1 + 1) % elementsCountAround
-                    eftApexOrgan = eftfactory.createEftShellPoleBottom(vao * 100, vbo * 100)
-                    organElementtemplateApex.defineField(organCoordinates, -1, eftApexOrgan)
-                    element.merge(organElementtemplateApex)
+                    eftApexOrgan = eftfactory.getEft("createEftShellPoleBottom", vao * 100, vbo * 100)
+                    element.merge(eftfactory.getElementtemplate(organCoordinates, eftApexOrgan))
                     element.setNodesByIdentifier(eftApexOrgan, nodeIdentifiers)
                 if xFlat:
                     vaf = e1 + elementsCountAround
@@ -14,12 +14,19 @@ from scaffoldmaker.utils.interpolation import (
     interpolateSampleCubicHermite, sampleCubicHermiteCurves,
     sampleCubicHermiteCurvesSmooth, smoothCubicHermiteDerivativesLine, smoothCubicHermiteDerivativesLoop,
     smoothCurveSideCrossDerivatives, getNearestLocationBetweenCurves)
+from scaffoldmaker.utils.meshsizeestimate import MeshSizeEstimate
+from scaffoldmaker.utils.meshwriter import MeshWriter
 from scaffoldmaker.utils.networkmesh import NetworkMesh, NetworkMeshBuilder, NetworkMeshGenerateData, \
     NetworkMeshJunction, NetworkMeshSegment, pathValueLabels
 from scaffoldmaker.utils.tracksurface import TrackSurface
 from scaffoldmaker.utils.zinc_utils import get_nodeset_path_ordered_field_parameters
+from collections import OrderedDict
+import array
 import copy
+import hashlib
 import math
+import numpy as np
+import threading
 
 
 class TubeNetworkMeshGenerateData(NetworkMeshGenerateData):
@@ -288,15 +295,17 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                 nd2 += pd2[i]
                 nd12 += pd12[i]
             self._rawTrackSurfaceList.append(TrackSurface(len(px[0]), len(px) - 1, nx, nd1, nd2, nd12, loop1=True))
-        # list[pathsCount][4] of sx, sd1, sd2, sd12; all [nAlong][nAround]:
+        # list[pathsCount][4] of sx, sd1, sd2, sd12; numpy arrays [nAlong][nAround][3] once sampled:
         self._sampledTubeCoordinates = [[[], [], [], []] for p in range(self._pathsCount)]
-        self._rimCoordinates = None  # these are just shell coordinates; with core there may also be transition coords
-        self._rimNodeIds = None
+        # these are just shell coordinates; with core there may also be transition coords.
+        # tuple of rx, rd1, rd2, rd3 numpy arrays [nAlong][nThroughShell][nAround][3]; rd3 is None for 2-D:
+        self._rimCoordinates = None
+        self._rimNodeIds = None  # [along] None or list[n3] of compact node identifier arrays [n1]
         self._rimElementIds = None  # [e2][e3][e1]
 
-        self._boxCoordinates = None
-        self._transitionCoordinates = None
-        self._boxNodeIds = None  # [along][major][minor]
+        self._boxCoordinates = None  # tuple of numpy arrays [along][major][minor][3]
+        self._transitionCoordinates = None  # tuple of numpy arrays [along][nTransition - 1][nAround][3]
+        self._boxNodeIds = None  # [along] None or list[major] of compact node identifier arrays [minor]
         self._boxBoundaryNodeIds = None
         # boxNodeIds that form the boundary of the solid core, rearranged in circular format
         self._boxBoundaryNodeToBoxId = None
@@ -431,6 +440,7 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                     # print("    p", p, "q", q, "dEnd", dEnd[p][q])
 
         tubeGenerator = TubeEllipseGenerator()
+        sampledTubeCoordinates = [[[], [], [], []] for p in range(self._pathsCount)]
 
         for n in range(elementsCountAlong + 1):
 
@@ -479,11 +489,15 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                     # smooth magnitudes only
                     ed1 = smoothCubicHermiteDerivativesLoop(ex, ted1, fixAllDirections=True)
 
-                for lst, ev in zip(self._sampledTubeCoordinates[p], (ex, ed1, ed2, ed12)):
+                for lst, ev in zip(sampledTubeCoordinates[p], (ex, ed1, ed2, ed12)):
                     lst.append(ev)
 
         # smooth d2, d12
 
+        # store each parameter as a compact [nAlong][nAround][3] array
+        self._sampledTubeCoordinates = [[np.array(lst, dtype=float) for lst in pathCoordinates]
+                                        for pathCoordinates in sampledTubeCoordinates]
+
     def sample(self, fixedElementsCountAlong, targetElementLength):
         self._sampleTubeCoordinates(fixedElementsCountAlong, targetElementLength)
 
@@ -492,42 +506,30 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         if self._dimension == 2:
             # copy first sampled tube coordinates, but insert single-entry 'n3' index after n2
             self._rimCoordinates = (
-                [[ring] for ring in self._sampledTubeCoordinates[0][0]],
-                [[ring] for ring in self._sampledTubeCoordinates[0][1]],
-                [[ring] for ring in self._sampledTubeCoordinates[0][2]],
+                self._sampledTubeCoordinates[0][0][:, np.newaxis].copy(),
+                self._sampledTubeCoordinates[0][1][:, np.newaxis].copy(),
+                self._sampledTubeCoordinates[0][2][:, np.newaxis].copy(),
                 None)
         else:
+            # interpolate linearly through the shell, all rings along the segment at once
             shellFactor = 1.0 / self._elementsCountThroughShell
             ox, od1, od2 = self._sampledTubeCoordinates[0][0:3]
             ix, id1, id2 = self._sampledTubeCoordinates[1][0:3]
-            rx, rd1, rd2, rd3 = [], [], [], []
-            for n2 in range(elementsCountAlong + 1):
-                coreCentre, arcCentre = self._determineCentrePoints(n2)
-                for r in (rx, rd1, rd2, rd3):
-                    r.append([])
-                otx, otd1, otd2 = ox[n2], od1[n2], od2[n2]
-                itx, itd1, itd2 = ix[n2], id1[n2], id2[n2]
-                # wx, wd3 = self._determineShellCoordinates(otx, otd1, otd2, itx, itd1, itd2, coreCentre, arcCentre)
-                wd3 = [mult(sub(otx[n1], itx[n1]), shellFactor) for n1 in range(self._elementsCountAround)]
-                for n3 in range(self._elementsCountThroughShell + 1):
-                    oFactor = n3 / self._elementsCountThroughShell
-                    iFactor = 1.0 - oFactor
-                    for r in (rx, rd1, rd2, rd3):
-                        r[n2].append([])
-                    for n1 in range(self._elementsCountAround):
-                        if n3 == 0:
-                            x, d1, d2 = itx[n1], itd1[n1], itd2[n1]
-                        elif n3 == self._elementsCountThroughShell:
-                            x, d1, d2 = otx[n1], otd1[n1], otd2[n1]
-                        else:
-                            x = add(mult(itx[n1], iFactor), mult(otx[n1], oFactor))
-                            # x = wx[n3][n1]
-                            d1 = add(mult(itd1[n1], iFactor), mult(otd1[n1], oFactor))
-                            d2 = add(mult(itd2[n1], iFactor), mult(otd2[n1], oFactor))
-                        d3 = wd3[n1]
-                        # d3 = wd3[n3][n1]
-                        for r, value in zip((rx, rd1, rd2, rd3), (x, d1, d2, d3)):
-                            r[n2][n3].append(value)
+            shape = (elementsCountAlong + 1, self._elementsCountThroughShell + 1, self._elementsCountAround, 3)
+            rx, rd1, rd2, rd3 = [np.empty(shape) for _ in range(4)]
+            wd3 = (ox - ix) * shellFactor
+            for n3 in range(self._elementsCountThroughShell + 1):
+                oFactor = n3 / self._elementsCountThroughShell
+                iFactor = 1.0 - oFactor
+                if n3 == 0:
+                    rx[:, n3], rd1[:, n3], rd2[:, n3] = ix, id1, id2
+                elif n3 == self._elementsCountThroughShell:
+                    rx[:, n3], rd1[:, n3], rd2[:, n3] = ox, od1, od2
+                else:
+                    rx[:, n3] = ix * iFactor + ox * oFactor
+                    rd1[:, n3] = id1 * iFactor + od1 * oFactor
+                    rd2[:, n3] = id2 * iFactor + od2 * oFactor
+                rd3[:, n3] = wd3
             self._rimCoordinates = rx, rd1, rd2, rd3
 
         self._rimNodeIds = [None] * (elementsCountAlong + 1)
@@ -551,6 +553,10 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
             for lst, value in zip((boxx, boxd1, boxd3, transx, transd1, transd3),
                                   (cbx, cbd1, cbd3, ctx, ctd1, ctd3)):
                 lst.append(value)
+        boxx, boxd1, boxd3 = [np.array(lst, dtype=float) for lst in (boxx, boxd1, boxd3)]
+        transitionShape = (elementsCountAlong + 1, self._elementsCountTransition - 1, self._elementsCountAround, 3)
+        transx, transd1, transd3 = [np.array(lst, dtype=float).reshape(transitionShape)
+                                    for lst in (transx, transd1, transd3)]
         boxd2, transd2 = self._determineCoreD2Derivatives(boxx, boxd1, boxd3, transx, transd1, transd3)
         self._boxCoordinates = boxx, boxd1, boxd2, boxd3
         self._transitionCoordinates = transx, transd1, transd2, transd3
@@ -562,8 +568,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         :param n2: Index for elements along the tube.
         :return: Coordinates of the solid core.
         """
-        ox = self._sampledTubeCoordinates[0][0][n2]
-        ix = self._sampledTubeCoordinates[1][0][n2]
+        ox = self._sampledTubeCoordinates[0][0][n2].tolist()
+        ix = self._sampledTubeCoordinates[1][0][n2].tolist()
         cp = []
 
         for x in [ox, ix]:
@@ -612,13 +618,13 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         :param centreNormal: Optional normal to remove component in direction from centre.
         :return: Radial rx, rd1 (across), rd2(up) for points at n1, centre and opposite n1.
         """
-        ix = self._rimCoordinates[0][n2][0]
-        id1 = self._rimCoordinates[1][n2][0]
-        id3 = self._rimCoordinates[3][n2][0]
+        ix = self._rimCoordinates[0][n2][0].tolist()
+        id1 = self._rimCoordinates[1][n2][0].tolist()
+        id3 = self._rimCoordinates[3][n2][0].tolist()
         n1End = n1Start + self._elementsCountAround // 2
         if n1Half:
-            nx = self._rimCoordinates[0][n2][1]
-            nd1 = self._rimCoordinates[1][n2][1]
+            nx = self._rimCoordinates[0][n2][1].tolist()
+            nd1 = self._rimCoordinates[1][n2][1].tolist()
             ax, ad2 = evaluateCoordinatesOnCurve(ix, id1, (n1Start, 0.5), loop=True, derivative=True)
             tx = evaluateCoordinatesOnCurve(nx, nd1, (n1Start, 0.5), loop=True)
             ad1 = sub(ix, tx)
@@ -804,9 +810,9 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
             for i in range(self._elementsCountTransition - 1):
                 for lst in (ctx, ctd1, ctd3):
                     lst.append([None] * self._elementsCountAround)
-            ix = self._rimCoordinates[0][n2][0]
-            id1 = self._rimCoordinates[1][n2][0]
-            id3 = self._rimCoordinates[3][n2][0]
+            ix = self._rimCoordinates[0][n2][0].tolist()
+            id1 = self._rimCoordinates[1][n2][0].tolist()
+            id3 = self._rimCoordinates[3][n2][0].tolist()
             start_bn3 = minorBoxSize // 2
             topLeft_n1 = minorBoxSize - start_bn3
             topRight_n1 = topLeft_n1 + majorBoxSize
@@ -880,61 +886,39 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
     def _determineCoreD2Derivatives(self, boxx, boxd1, boxd3, transx, transd1, transd3):
         """
         Compute d2 derivatives for the solid core.
-        :param boxx, boxd1, boxd3: Coordinates and derivatives (d1 & d3) of the core box nodes.
-        :param transx, transd1, transd3: Coordinates and derivatives (d1 & d3) of the core transition nodes.
-        :return: D2 derivatives of box and rim components of the core.
-        """
-        elementsCountAlong = len(boxx)
-        coreBoxMajorNodesCount = len(boxx[0])
-        coreBoxMinorNodesCount = len(boxx[0][0])
-
-        boxd2 = [[[None for _ in range(coreBoxMinorNodesCount)] for _ in range(coreBoxMajorNodesCount)]
-                 for _ in range(elementsCountAlong)]
-        transd2 = [[[None for _ in range(self._elementsCountAround)] for _ in range(self._elementsCountTransition - 1)]
-                   for _ in range(elementsCountAlong)]
-
-        # compute core d2 directions by weighting with 1/distance from inner coordinates
-
-        def get_d2(n2, x):
-            sum_weight = 0.0
-            sum_d2 = [0.0, 0.0, 0.0]
+        :param boxx, boxd1, boxd3: Coordinates and derivatives (d1 & d3) of the core box nodes, numpy arrays
+        [nAlong][nMajor][nMinor][3].
+        :param transx, transd1, transd3: Coordinates and derivatives (d1 & d3) of the core transition nodes, numpy
+        arrays [nAlong][nTransition - 1][nAround][3].
+        :return: D2 derivatives of box and rim components of the core, as numpy arrays shaped as boxx, transx.
+        """
+        boxd2 = np.empty_like(boxx)
+        transd2 = np.empty_like(transx)
+
+        # compute core d2 directions by weighting with 1/distance from inner coordinates,
+        # for all box and transition points at each n2 at once
+        for n2 in range(len(boxx)):
             ix = self._rimCoordinates[0][n2][0]
             id2 = self._rimCoordinates[2][n2][0]
+            x = np.concatenate((boxx[n2].reshape(-1, 3), transx[n2].reshape(-1, 3)))
+            delta = x[:, np.newaxis, :] - ix[np.newaxis, :, :]
+            distance_sq = delta[:, :, 0] * delta[:, :, 0] + delta[:, :, 1] * delta[:, :, 1] + \
+                delta[:, :, 2] * delta[:, :, 2]
+            coincident = distance_sq == 0.0
+            with np.errstate(divide='ignore'):
+                weight = 1.0 / np.sqrt(distance_sq)
+            sum_weight = np.zeros(len(x))
+            sum_d2 = np.zeros((len(x), 3))
             for i in range(len(ix)):
-                distance_sq = 0.0
-                for c in range(3):
-                    delta = x[c] - ix[i][c]
-                    distance_sq += delta * delta
-                if distance_sq == 0.0:
-                    return id2[i]
-                weight = 1.0 / math.sqrt(distance_sq)
-                sum_weight += weight
-                for c in range(3):
-                    sum_d2[c] += weight * id2[i][c]
-            return [sum_d2[c] / sum_weight for c in range(3)]
-
-        for m in range(coreBoxMajorNodesCount):
-            for n in range(coreBoxMinorNodesCount):
-                tx, td2 = [], []
-                for n2 in range(elementsCountAlong):
-                    x = boxx[n2][m][n]
-                    tx.append(x)
-                    td2.append(get_d2(n2, x))
-                # td2 = smoothCubicHermiteDerivativesLine(tx, td2, fixAllDirections=True)
-                for n2 in range(elementsCountAlong):
-                    boxd2[n2][m][n] = td2[n2]
-
-        if self._elementsCountTransition > 1:
-            for n3 in range(self._elementsCountTransition - 1):
-                for n1 in range(self._elementsCountAround):
-                    tx, td2 = [], []
-                    for n2 in range(elementsCountAlong):
-                        x = transx[n2][n3][n1]
-                        tx.append(x)
-                        td2.append(get_d2(n2, x))
-                    # td2 = smoothCubicHermiteDerivativesLine(tx, td2, fixAllDirections=True)
-                    for n2 in range(elementsCountAlong):
-                        transd2[n2][n3][n1] = td2[n2]
+                sum_weight += weight[:, i]
+                sum_d2 += weight[:, i, np.newaxis] * id2[i]
+            with np.errstate(invalid='ignore'):
+                d2 = sum_d2 / sum_weight[:, np.newaxis]
+            for p in np.flatnonzero(coincident.any(axis=1)):
+                d2[p] = id2[np.flatnonzero(coincident[p])[0]]
+            boxCount = boxx[n2].shape[0] * boxx[n2].shape[1]
+            boxd2[n2] = d2[:boxCount].reshape(boxx[n2].shape)
+            transd2[n2] = d2[boxCount:].reshape(transx[n2].shape)
 
         return boxd2, transd2
 
@@ -1055,53 +1039,38 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
 
     @classmethod
     def blendSampledCoordinates(cls, segment1, nodeIndexAlong1, segment2, nodeIndexAlong2):
-        nodesCountAround = segment1._elementsCountAround
-        nodesCountRim = len(segment1._rimCoordinates[0][nodeIndexAlong1])
-        if ((nodesCountAround != segment2._elementsCountAround) or
-                (nodesCountRim != len(segment2._rimCoordinates[0][nodeIndexAlong2]))):
+        s1rd2 = segment1._rimCoordinates[2][nodeIndexAlong1]
+        s2rd2 = segment2._rimCoordinates[2][nodeIndexAlong2]
+        if s1rd2.shape != s2rd2.shape:
             return  # can't blend unless these match
 
         if segment1._isCore and segment2._isCore:
-            coreBoxMajorNodesCount = len(segment1._boxCoordinates[0][nodeIndexAlong1])
-            coreBoxMinorNodesCount = len(segment1._boxCoordinates[0][nodeIndexAlong1][0])
-            nodesCountTransition = len(segment1._transitionCoordinates[0][nodeIndexAlong1]) if segment1._transitionCoordinates else 0
-            if ((coreBoxMajorNodesCount != len(segment2._boxCoordinates[0][nodeIndexAlong2])) or
-                    (coreBoxMinorNodesCount != len(segment2._boxCoordinates[0][nodeIndexAlong2][0])) or
-                    (nodesCountTransition != (len(segment2._transitionCoordinates[0][nodeIndexAlong2])
-                    if segment1._transitionCoordinates else 0))):
+            s1bd2 = segment1._boxCoordinates[2][nodeIndexAlong1]
+            s2bd2 = segment2._boxCoordinates[2][nodeIndexAlong2]
+            s1td2 = segment1._transitionCoordinates[2][nodeIndexAlong1]
+            s2td2 = segment2._transitionCoordinates[2][nodeIndexAlong2]
+            if (s1bd2.shape != s2bd2.shape) or (s1td2.shape != s2td2.shape):
                 return  # can't blend unless these match
             # blend core coordinates
-            s1d2 = segment1._boxCoordinates[2][nodeIndexAlong1]
-            s2d2 = segment2._boxCoordinates[2][nodeIndexAlong2]
-            for m in range(coreBoxMajorNodesCount):
-                for n in range(coreBoxMinorNodesCount):
-                    # harmonic mean magnitude
-                    s1d2Mag = magnitude(s1d2[m][n])
-                    s2d2Mag = magnitude(s2d2[m][n])
-                    d2Mag = 2.0 / ((1.0 / s1d2Mag) + (1.0 / s2d2Mag))
-                    s2d2[m][n] = s1d2[m][n] = mult(s1d2[m][n], d2Mag / s1d2Mag)
-            for n3 in range(nodesCountTransition):
-                s1d2 = segment1._transitionCoordinates[2][nodeIndexAlong1][n3]
-                s2d2 = segment2._transitionCoordinates[2][nodeIndexAlong2][n3]
-                for n1 in range(nodesCountAround):
-                    # harmonic mean magnitude
-                    s1d2Mag = magnitude(s1d2[n1])
-                    s2d2Mag = magnitude(s2d2[n1])
-                    d2Mag = 2.0 / ((1.0 / s1d2Mag) + (1.0 / s2d2Mag))
-                    s2d2[n1] = s1d2[n1] = mult(s1d2[n1], d2Mag / s1d2Mag)
+            cls._blendD2(s1bd2, s2bd2)
+            cls._blendD2(s1td2, s2td2)
         elif segment1._isCore or segment2._isCore:
             return  # can't blend if both don't have core
 
         # blend rim coordinates
-        for n3 in range(nodesCountRim):
-            s1d2 = segment1._rimCoordinates[2][nodeIndexAlong1][n3]
-            s2d2 = segment2._rimCoordinates[2][nodeIndexAlong2][n3]
-            for n1 in range(nodesCountAround):
-                # harmonic mean magnitude
-                s1d2Mag = magnitude(s1d2[n1])
-                s2d2Mag = magnitude(s2d2[n1])
-                d2Mag = 2.0 / ((1.0 / s1d2Mag) + (1.0 / s2d2Mag))
-                s2d2[n1] = s1d2[n1] = mult(s1d2[n1], d2Mag / s1d2Mag)
+        cls._blendD2(s1rd2, s2rd2)
+
+    @staticmethod
+    def _blendD2(s1d2, s2d2):
+        """
+        Set both arrays of d2 derivatives in place to the first's directions with harmonic mean magnitudes.
+        :param s1d2, s2d2: Views of d2 arrays of matching shape [...][3].
+        """
+        s1d2Mag = np.sqrt(s1d2[..., 0] * s1d2[..., 0] + s1d2[..., 1] * s1d2[..., 1] + s1d2[..., 2] * s1d2[..., 2])
+        s2d2Mag = np.sqrt(s2d2[..., 0] * s2d2[..., 0] + s2d2[..., 1] * s2d2[..., 1] + s2d2[..., 2] * s2d2[..., 2])
+        d2Mag = 2.0 / ((1.0 / s1d2Mag) + (1.0 / s2d2Mag))
+        s1d2 *= (d2Mag / s1d2Mag)[..., np.newaxis]
+        s2d2[...] = s1d2
 
     def getSampledElementsCountAlong(self):
         return len(self._sampledTubeCoordinates[0][0]) - 1
@@ -1113,7 +1082,7 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         :param nodeIndexAlong: Node index from 0 to self._elementsCountAlong, or negative to count from end.
         :return: sx[nAround]
         """
-        return self._sampledTubeCoordinates[pathIndex][0][nodeIndexAlong]
+        return self._sampledTubeCoordinates[pathIndex][0][nodeIndexAlong].tolist()
 
     def getElementsCountShell(self):
         """
@@ -1152,7 +1121,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         for i in range(4):
             params = []
             for n2 in n2List:
-                params.append(self._rimCoordinates[i][n2][n3][n1] if self._rimCoordinates[i] else None)
+                params.append(self._rimCoordinates[i][n2][n3][n1].tolist() if self._rimCoordinates[i] is not None
+                              else None)
             paramsList.append(params)
         return paramsList
 
@@ -1168,7 +1138,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         for i in range(4):
             params = []
             for n2 in n2List:
-                params.append(self._boxCoordinates[i][n2][n3][n1] if self._boxCoordinates[i] else None)
+                params.append(self._boxCoordinates[i][n2][n3][n1].tolist() if self._boxCoordinates[i] is not None
+                              else None)
             paramsList.append(params)
 
         return paramsList
@@ -1185,8 +1156,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         for i in range(4):
             params = []
             for n2 in n2List:
-                params.append(self._transitionCoordinates[i][n2][n3][n1] if self._transitionCoordinates[i]
-                              else None)
+                params.append(self._transitionCoordinates[i][n2][n3][n1].tolist()
+                              if self._transitionCoordinates[i] is not None else None)
             paramsList.append(params)
 
         return paramsList
@@ -1201,8 +1172,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         return self._elementsCountTransition
 
     def getBoxCoordinates(self, n1, n2, n3):
-        return (self._boxCoordinates[0][n2][n3][n1], self._boxCoordinates[1][n2][n3][n1],
-                self._boxCoordinates[2][n2][n3][n1], self._boxCoordinates[3][n2][n3][n1])
+        return (self._boxCoordinates[0][n2][n3][n1].tolist(), self._boxCoordinates[1][n2][n3][n1].tolist(),
+                self._boxCoordinates[2][n2][n3][n1].tolist(), self._boxCoordinates[3][n2][n3][n1].tolist())
 
     def getBoxNodeIds(self, n1, n2, n3):
         """
@@ -1294,18 +1265,16 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         :param n3: Node index from first core transition row or inner to outer shell.
         :return: x, d1, d2, d3
         """
-        transitionNodeCount = (len(self._transitionCoordinates[0][0])
-                               if (self._transitionCoordinates and self._transitionCoordinates[0]) else 0)
+        transitionNodeCount = self._transitionCoordinates[0].shape[1] if self._transitionCoordinates else 0
         if n3 < transitionNodeCount:
-            return (self._transitionCoordinates[0][n2][n3][n1],
-                    self._transitionCoordinates[1][n2][n3][n1],
-                    self._transitionCoordinates[2][n2][n3][n1],
-                    self._transitionCoordinates[3][n2][n3][n1] if self._transitionCoordinates[3] else None)
-        sn3 = n3 - transitionNodeCount
-        return (self._rimCoordinates[0][n2][sn3][n1],
-                self._rimCoordinates[1][n2][sn3][n1],
-                self._rimCoordinates[2][n2][sn3][n1],
-                self._rimCoordinates[3][n2][sn3][n1] if self._rimCoordinates[3] else None)
+            parameters = self._transitionCoordinates
+        else:
+            parameters = self._rimCoordinates
+            n3 -= transitionNodeCount
+        return (parameters[0][n2][n3][n1].tolist(),
+                parameters[1][n2][n3][n1].tolist(),
+                parameters[2][n2][n3][n1].tolist(),
+                parameters[3][n2][n3][n1].tolist() if parameters[3] is not None else None)
 
     def getRimNodeId(self, n1, n2, n3):
         """
@@ -1501,15 +1470,15 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
         elementsCountAlong = len(self._rimCoordinates[0]) - 1
         elementsCountRim = self.getElementsCountRim()
         elementsCountTransition = self.getElementsCountTransition()
-        coordinates = generateData.getCoordinates()
-        fieldcache = generateData.getFieldcache()
+        meshWriter = MeshWriter(generateData.getCoordinates(), generateData.getMeshDimension())
         startSkipCount = 1 if (self._junctions[0].getSegmentsCount() > 2) else 0
         endSkipCount = 1 if (self._junctions[1].getSegmentsCount() > 2) else 0
 
         # create nodes
-        nodes = generateData.getNodes()
         isLinearThroughShell = generateData.isLinearThroughShell()
         nodetemplate = generateData.getNodetemplate()
+        valueLabelsVersions = [(Node.VALUE_LABEL_VALUE, 1), (Node.VALUE_LABEL_D_DS1, 1),
+                               (Node.VALUE_LABEL_D_DS2, 1), (Node.VALUE_LABEL_D_DS3, 1)]
         for n2 in range(elementsCountAlong + 1) if (n2Only is None) else [n2Only]:
             if (n2 < startSkipCount) or (n2 > elementsCountAlong - endSkipCount):
                 if self._isCore:
@@ -1553,19 +1522,15 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                 coreBoxMajorNodesCount = self.getCoreBoxMajorNodesCount()
                 coreBoxMinorNodesCount = self.getCoreBoxMinorNodesCount()
                 for n3 in range(coreBoxMajorNodesCount):
-                    self._boxNodeIds[n2].append([])
-                    rx = self._boxCoordinates[0][n2][n3]
-                    rd1 = self._boxCoordinates[1][n2][n3]
-                    rd2 = self._boxCoordinates[2][n2][n3]
-                    rd3 = self._boxCoordinates[3][n2][n3]
+                    self._boxNodeIds[n2].append(array.array('i'))
+                    rx = self._boxCoordinates[0][n2][n3].tolist()
+                    rd1 = self._boxCoordinates[1][n2][n3].tolist()
+                    rd2 = self._boxCoordinates[2][n2][n3].tolist()
+                    rd3 = self._boxCoordinates[3][n2][n3].tolist()
                     for n1 in range(coreBoxMinorNodesCount):
                         nodeIdentifier = generateData.nextNodeIdentifier()
-                        node = nodes.createNode(nodeIdentifier, nodetemplate)
-                        fieldcache.setNode(node)
-                        for nodeValue, rValue in zip([Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1,
-                                                      Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D_DS3],
-                                                     [rx[n1], rd1[n1], rd2[n1], rd3[n1]]):
-                            coordinates.setNodeParameters(fieldcache, -1, nodeValue, 1, rValue)
+                        meshWriter.addNode(nodeIdentifier, nodetemplate, valueLabelsVersions,
+                                           [rx[n1], rd1[n1], rd2[n1], rd3[n1]])
                         self._boxNodeIds[n2][n3].append(nodeIdentifier)
 
             # create rim nodes and transition nodes (if there are more than 1 layer of transition)
@@ -1575,26 +1540,22 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                 n3p = n3 - (elementsCountTransition - 1) if self._isCore else n3
                 if self._isCore and elementsCountTransition > 1 and n3 < (elementsCountTransition - 1):
                     # transition coordinates
-                    rx = self._transitionCoordinates[0][n2][n3]
-                    rd1 = self._transitionCoordinates[1][n2][n3]
-                    rd2 = self._transitionCoordinates[2][n2][n3]
-                    rd3 = self._transitionCoordinates[3][n2][n3]
+                    rx = self._transitionCoordinates[0][n2][n3].tolist()
+                    rd1 = self._transitionCoordinates[1][n2][n3].tolist()
+                    rd2 = self._transitionCoordinates[2][n2][n3].tolist()
+                    rd3 = self._transitionCoordinates[3][n2][n3].tolist()
                 else:
                     # rim coordinates
-                    rx = self._rimCoordinates[0][n2][n3p]
-                    rd1 = self._rimCoordinates[1][n2][n3p]
-                    rd2 = self._rimCoordinates[2][n2][n3p]
-                    rd3 = None if isLinearThroughShell else self._rimCoordinates[3][n2][n3p]
-                ringNodeIds = []
+                    rx = self._rimCoordinates[0][n2][n3p].tolist()
+                    rd1 = self._rimCoordinates[1][n2][n3p].tolist()
+                    rd2 = self._rimCoordinates[2][n2][n3p].tolist()
+                    rd3 = None if (isLinearThroughShell or (self._rimCoordinates[3] is None)) else \
+                        self._rimCoordinates[3][n2][n3p].tolist()
+                ringNodeIds = array.array('i')
                 for n1 in range(self._elementsCountAround):
                     nodeIdentifier = generateData.nextNodeIdentifier()
-                    node = nodes.createNode(nodeIdentifier, nodetemplate)
-                    fieldcache.setNode(node)
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, rx[n1])
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, rd1[n1])
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, 1, rd2[n1])
-                    if rd3:
-                        coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS3, 1, rd3[n1])
+                    meshWriter.addNode(nodeIdentifier, nodetemplate, valueLabelsVersions,
+                                       [rx[n1], rd1[n1], rd2[n1], rd3[n1] if rd3 else None])
                     ringNodeIds.append(nodeIdentifier)
                 self._rimNodeIds[n2].append(ringNodeIds)
 
@@ -1604,11 +1565,12 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                 self._createBoxBoundaryNodeIdsList(startSkipCount, endSkipCount))
 
         if n2Only is not None:
+            meshWriter.write()
             return
 
         # create elements
         annotationMeshGroups = generateData.getAnnotationMeshGroups(self._annotationTerms)
-        mesh = generateData.getMesh()
+        mesh = meshWriter.getMesh()
         elementtemplateStd, eftStd = generateData.getStandardElementtemplate()
         for e2 in range(startSkipCount, elementsCountAlong - endSkipCount):
             self._boxElementIds[e2] = []
@@ -1627,10 +1589,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                             nids += [self._boxNodeIds[e2][e3][n1], self._boxNodeIds[e2][e3p][n1],
                                      self._boxNodeIds[e2p][e3][n1], self._boxNodeIds[e2p][e3p][n1]]
                         elementIdentifier = generateData.nextElementIdentifier()
-                        element = mesh.createElement(elementIdentifier, elementtemplateStd)
-                        element.setNodesByIdentifier(eftStd, nids)
-                        for annotationMeshGroup in annotationMeshGroups:
-                            annotationMeshGroup.addElement(element)
+                        meshWriter.addElement(elementIdentifier, eftStd, nids, None, annotationMeshGroups,
+                                              elementtemplateStd)
                         elementIds.append(elementIdentifier)
                     self._boxElementIds[e2].append(elementIds)
 
@@ -1659,16 +1619,8 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                     if self._elementsCountTransition == 1:
                         eft, scalefactors = generateData.resolveEftCoreBoundaryScaling(
                             eft, scalefactors, nodeParameters, nids, self._coreBoundaryScalingMode)
-                    elementtemplate = mesh.createElementtemplate()
-                    elementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-                    elementtemplate.defineField(coordinates, -1, eft)
                     elementIdentifier = generateData.nextElementIdentifier()
-                    element = mesh.createElement(elementIdentifier, elementtemplate)
-                    element.setNodesByIdentifier(eft, nids)
-                    if scalefactors:
-                        element.setScaleFactors(eft, scalefactors)
-                    for annotationMeshGroup in annotationMeshGroups:
-                        annotationMeshGroup.addElement(element)
+                    meshWriter.addElement(elementIdentifier, eft, nids, scalefactors, annotationMeshGroups)
                     ringElementIds.append(elementIdentifier)
                 self._rimElementIds[e2].append(ringElementIds)
 
@@ -1694,21 +1646,15 @@ class TubeNetworkMeshSegment(NetworkMeshSegment):
                             for n2 in (e2, e2 + 1):
                                 for n1 in (e1, n1p):
                                     nodeParameters.append(self.getRimCoordinates(n1, n2, n3))
+                        elementtemplate = None  # made by meshWriter
                         eft = generateData.createElementfieldtemplate()
                         eft, scalefactors = generateData.resolveEftCoreBoundaryScaling(
                             eft, scalefactors, nodeParameters, nids, self._coreBoundaryScalingMode)
-                        elementtemplateTransition = mesh.createElementtemplate()
-                        elementtemplateTransition.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-                        elementtemplateTransition.defineField(coordinates, -1, eft)
-                        elementtemplate = elementtemplateTransition
-                    element = mesh.createElement(elementIdentifier, elementtemplate)
-                    element.setNodesByIdentifier(eft, nids)
-                    if scalefactors:
-                        element.setScaleFactors(eft, scalefactors)
-                    for annotationMeshGroup in annotationMeshGroups:
-                        annotationMeshGroup.addElement(element)
+                    meshWriter.addElement(elementIdentifier, eft, nids, scalefactors, annotationMeshGroups,
+                                          elementtemplate)
                     ringElementIds.append(elementIdentifier)
                 self._rimElementIds[e2].append(ringElementIds)
+        meshWriter.write()
 
     def generateJunctionRimElements(self, junction, generateData):
         """
@@ -2246,7 +2192,8 @@ class PatchTubeNetworkMeshSegment(TubeNetworkMeshSegment):
                             sParamRingAround.append(allCoordinates[1][n2][n3][endIdx])  # becomes d1
                     sParamLayer.append(sParamRingAround)
                 sParamRing.append(sParamLayer)
-            self._rimCoordinates.append(sParamRing)
+            self._rimCoordinates.append(np.array(sParamRing, dtype=float))
+        self._rimCoordinates = tuple(self._rimCoordinates)
 
     def getSampledTubeCoordinatesRing(self, pathIndex, nodeIndexAlong):
         """
@@ -2256,7 +2203,7 @@ class PatchTubeNetworkMeshSegment(TubeNetworkMeshSegment):
         :return: sx[nAround]
         """
         pathIndexPatch = 0 if pathIndex else 1
-        return self._rimCoordinates[0][nodeIndexAlong][pathIndexPatch]
+        return self._rimCoordinates[0][nodeIndexAlong][pathIndexPatch].tolist()
 
     def generateMesh(self, generateData: TubeNetworkMeshGenerateData, n2Only=None):
         """
@@ -2794,6 +2741,8 @@ class TubeNetworkMeshJunction(NetworkMeshJunction):
                         for i in range(2):
                             otherTrackSurface = \
                                 otherSegment.getRawTrackSurface(p) if (i == 0) else segmentEndPlaneTrackSurfaces[os][p]
+                            if not otherTrackSurface.mayIntersectCurve(cx, cd2):
+                                continue
                             otherSurfacePosition, curveLocation, isIntersection = \
                                 otherTrackSurface.findNearestPositionOnCurve(
                                     cx, cd2, loop=False, sampleEnds=False, sampleHalf=2 if self._segmentsIn[s] else 1)
@@ -4098,13 +4047,112 @@ class TubeNetworkMeshBuilder(NetworkMeshBuilder):
         """
         return TubeNetworkMeshJunction(inSegments, outSegments, self._useOuterTrimSurfaces)
 
+    @classmethod
+    def getMeshSizeEstimate(cls, networkLayoutEstimate, targetElementDensityAlongLongestSegment,
+                            annotationElementsCountsAlong=[], defaultElementsCountAround=8,
+                            annotationElementsCountsAround=[], elementsCountThroughShell=1, isCore=False,
+                            elementsCountTransition=1, defaultElementsCountCoreBoxMinor=2,
+                            annotationElementsCountsCoreBoxMinor=[]):
+        """
+        Predict size of tube network mesh from numbers of elements along and around segments, from the network
+        layout without building it. Counts are exact where the layout elements are similar in length and the
+        untrimmed segment lengths give the same numbers of elements along as the trimmed segments, which is common;
+        they are approximate otherwise.
+        Nodes at junctions of more than 2 segments are counted from rings meeting at 2 triple points. Faces are
+        counted from the elements and boundary faces, and lines from the Euler characteristic of the network.
+        :param networkLayoutEstimate: NetworkLayoutEstimate for the network layout.
+        Other parameters are as for constructor.
+        :return: MeshSizeEstimate
+        """
+
+        def getMinimumElementsCountAlong(networkSegment):
+            # as for TubeNetworkMeshSegment.sample()
+            segmentNodes = networkSegment.getNetworkNodes()
+            return 2 if ((segmentNodes[0] == segmentNodes[-1]) or all(
+                (len(segmentNode.getInSegments()) + len(segmentNode.getOutSegments())) > 2
+                for segmentNode in (segmentNodes[0], segmentNodes[-1]))) else 1
+
+        elementsCountsAlong = networkLayoutEstimate.getElementsCountsAlong(
+            targetElementDensityAlongLongestSegment, annotationElementsCountsAlong, getMinimumElementsCountAlong)
+        # rings of nodes around each cross section; with core, includes the core box boundary
+        ringsCount = elementsCountThroughShell + 1 + (elementsCountTransition if isCore else 0)
+        nodesCount = 0
+        elementsCount = 0
+        boundaryFacesCount = 0
+        junctionSegmentEnds = {}  # map from junction NetworkNode to list of (elementsCountAround, section sizes)
+        for networkSegment, elementsCountAlong in elementsCountsAlong.items():
+            elementsCountAround = networkLayoutEstimate.getAnnotationNumber(
+                networkSegment, annotationElementsCountsAround, defaultElementsCountAround)
+            elementsCountCoreBoxMinor = networkLayoutEstimate.getAnnotationNumber(
+                networkSegment, annotationElementsCountsCoreBoxMinor, defaultElementsCountCoreBoxMinor)
+            sectionSizes = cls._getSectionSizes(elementsCountAround, elementsCountThroughShell, isCore,
+                                                elementsCountTransition, elementsCountCoreBoxMinor)
+            nodesCount += (elementsCountAlong - 1) * sectionSizes[0]
+            elementsCount += elementsCountAlong * sectionSizes[1]
+            # outer surface, plus inner surface if no core
+            boundaryFacesCount += elementsCountAlong * elementsCountAround * (1 if isCore else 2)
+            segmentNodes = networkSegment.getNetworkNodes()
+            for nodeIndex in (0, -1):
+                junctionSegmentEnds.setdefault(segmentNodes[nodeIndex], []).append((elementsCountAround, sectionSizes))
+        openEndsCount = 0
+        for segmentEnds in junctionSegmentEnds.values():
+            segmentsCount = len(segmentEnds)
+            sumElementsCountAround = sum(segmentEnd[0] for segmentEnd in segmentEnds)
+            sectionInteriorNodesCount = round(sum(
+                sectionNodesCount - ringsCount * segmentElementsCountAround
+                for segmentElementsCountAround, (sectionNodesCount, _) in segmentEnds) / segmentsCount)
+            sectionElementsCount = round(sum(segmentEnd[1][1] for segmentEnd in segmentEnds) / segmentsCount)
+            if segmentsCount <= 2:
+                nodesCount += ringsCount * round(sumElementsCountAround / segmentsCount) + sectionInteriorNodesCount
+                if segmentsCount == 1:
+                    boundaryFacesCount += sectionElementsCount
+                    openEndsCount += 1
+            else:
+                # each segment shares half its ring with others, and 3 segments meet at 2 triple points, beyond which
+                # each further segment adds 1 less node
+                nodesCount += ringsCount * (sumElementsCountAround // 2 - segmentsCount + 2) + \
+                    sectionInteriorNodesCount
+        facesCount = (6 * elementsCount + boundaryFacesCount) // 2
+        # Euler characteristic of network as a graph, which a solid core network deforms to
+        eulerCharacteristic = len(junctionSegmentEnds) - len(elementsCountsAlong)
+        if not isCore:
+            # tube surface with holes at open ends
+            eulerCharacteristic = 2 * eulerCharacteristic - openEndsCount
+        linesCount = nodesCount + facesCount - elementsCount - eulerCharacteristic
+        annotationGroupsCount = networkLayoutEstimate.getAnnotationGroupsCount() + (2 if isCore else 0)
+        # value and 3 derivatives with 3 components
+        return MeshSizeEstimate(nodesCount, [linesCount, facesCount, elementsCount], nodesCount * 12,
+                                annotationGroupsCount)
+
+    @staticmethod
+    def _getSectionSizes(elementsCountAround, elementsCountThroughShell, isCore, elementsCountTransition,
+                         elementsCountCoreBoxMinor):
+        """
+        Get numbers of nodes and elements in a cross section of a segment with the supplied numbers of elements.
+        :return: Numbers of nodes, elements.
+        """
+        ringsCount = elementsCountThroughShell + 1
+        ringElementsCount = elementsCountThroughShell
+        boxNodesCount = 0
+        boxElementsCount = 0
+        if isCore:
+            ringsCount += elementsCountTransition
+            ringElementsCount += elementsCountTransition
+            # as for TubeNetworkMeshSegment
+            elementsCountCoreBoxMajor = (elementsCountAround // 2) - elementsCountCoreBoxMinor
+            # nodes inside the box boundary ring
+            boxNodesCount = (elementsCountCoreBoxMajor - 1) * (elementsCountCoreBoxMinor - 1)
+            boxElementsCount = elementsCountCoreBoxMajor * elementsCountCoreBoxMinor
+        return (ringsCount * elementsCountAround + boxNodesCount,
+                ringElementsCount * elementsCountAround + boxElementsCount)
+
     def generateMesh(self, generateData):
         super(TubeNetworkMeshBuilder, self).generateMesh(generateData)
         # build core, shell
         if self._isCore:
             coreMeshGroup = generateData.getCoreMeshGroup()
             shellMeshGroup = generateData.getShellMeshGroup()
-            for networkSegment in self._networkMesh.getNetworkSegments():
+            for networkSegment in self.getGeneratedNetworkSegments():
                 segment = self._segments[networkSegment]
                 segment.addCoreElementsToMeshGroup(coreMeshGroup)
                 segment.addShellElementsToMeshGroup(shellMeshGroup)
@@ -4126,7 +4174,7 @@ class BodyTubeNetworkMeshBuilder(TubeNetworkMeshBuilder):
         rightMeshGroup = generateData.getRightMeshGroup()
         dorsalMeshGroup = generateData.getDorsalMeshGroup()
         ventralMeshGroup = generateData.getVentralMeshGroup()
-        for networkSegment in self._networkMesh.getNetworkSegments():
+        for networkSegment in self.getGeneratedNetworkSegments():
             segment = self._segments[networkSegment]
             annotationTerms = segment.getAnnotationTerms()
             for annotationTerm in annotationTerms:
@@ -4144,6 +4192,82 @@ class BodyTubeNetworkMeshBuilder(TubeNetworkMeshBuilder):
             segment.addSideD3ElementsToMeshGroup(True, dorsalMeshGroup)
 
 
+class TubeCoordinatesCache:
+    """
+    Bounded least-recently-used cache of tube coordinates generated from path parameters, so repeated builds of
+    tube networks with unchanged segment paths skip regenerating them. Entries are keyed on a hash of all inputs
+    and hold read-only numpy arrays; get() returns new nested lists so callers may modify results freely.
+    """
+
+    def __init__(self, maximumSize):
+        """
+        :param maximumSize: Maximum number of entries to keep before discarding least recently used.
+        """
+        self._maximumSize = maximumSize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def makeKey(parameters, *settings):
+        """
+        :param parameters: Nested sequences of real parameters with regular shape.
+        :param settings: Other hashable inputs e.g. element counts, radius.
+        :return: Hashable key for parameters and settings.
+        """
+        parametersArray = np.asarray(parameters, dtype=float)
+        digest = hashlib.blake2b(parametersArray.tobytes(), digest_size=16).digest()
+        return digest, parametersArray.shape, settings
+
+    def get(self, key):
+        """
+        :param key: Key from makeKey().
+        :return: tuple of nested lists of cached parameters, or None if not cached.
+        """
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is None:
+                return None
+            self._entries.move_to_end(key)
+        return tuple(cachedArray.tolist() for cachedArray in arrays)
+
+    def put(self, key, results):
+        """
+        Store results, discarding least recently used entry if full.
+        :param key: Key from makeKey().
+        :param results: Sequence of regular nested lists of parameters.
+        """
+        arrays = []
+        for result in results:
+            resultArray = np.array(result, dtype=float)
+            resultArray.flags.writeable = False
+            arrays.append(resultArray)
+        with self._lock:
+            self._entries[key] = tuple(arrays)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maximumSize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def getSize(self):
+        return len(self._entries)
+
+
+_tubeEllipseCache = TubeCoordinatesCache(4096)
+_rawTubeCoordinatesCache = TubeCoordinatesCache(256)
+_resampledTubeCoordinatesCache = TubeCoordinatesCache(256)
+
+
+def clearTubeCoordinatesCaches():
+    """
+    Discard all cached tube ellipse, raw and resampled tube coordinates, e.g. to release memory.
+    """
+    for cache in (_tubeEllipseCache, _rawTubeCoordinatesCache, _resampledTubeCoordinatesCache):
+        cache.clear()
+
+
 class TubeEllipseGenerator:
     """
     Generates tube ellipse curves with even-sized elements with specified radius, phase angle,
@@ -4167,6 +4291,20 @@ class TubeEllipseGenerator:
             self._cd.append(d)
 
     def generate(self, px, pd1, pd2, pd12, pd3, pd13, elementsCountAround, d2Scale=1.0):
+        """
+        Generate a single row of 2-D ellipse parameters for the tube, reusing cached results for identical inputs.
+        See _generate() for parameters.
+        :return: 2-D tube ellipse row parameters ex, ed1, ed2, ed12
+        """
+        key = TubeCoordinatesCache.makeKey(
+            (px, pd1, pd2, pd12, pd3, pd13), elementsCountAround, self._radius, self._phaseAngle, d2Scale)
+        results = _tubeEllipseCache.get(key)
+        if results is None:
+            results = self._generate(px, pd1, pd2, pd12, pd3, pd13, elementsCountAround, d2Scale)
+            _tubeEllipseCache.put(key, results)
+        return results
+
+    def _generate(self, px, pd1, pd2, pd12, pd3, pd13, elementsCountAround, d2Scale=1.0):
         """
         Generate a single row of 2-D ellipse parameters for the tube.
         :param px: Centre of ellipse.
@@ -4241,6 +4379,10 @@ def getPathRawTubeCoordinates(pathParameters, elementsCountAround, radius=1.0, p
     assert pointsCountAlong > 1
     assert len(pathParameters[0][0]) == 3
 
+    key = TubeCoordinatesCache.makeKey(pathParameters, elementsCountAround, radius, phaseAngle)
+    results = _rawTubeCoordinatesCache.get(key)
+    if results is not None:
+        return results
     tubeGenerator = TubeEllipseGenerator(radius, phaseAngle)
     tx = []
     td1 = []
@@ -4248,13 +4390,14 @@ def getPathRawTubeCoordinates(pathParameters, elementsCountAround, radius=1.0, p
     td12 = []
     for p in range(pointsCountAlong):
         px, pd1, pd2, pd12, pd3, pd13 = [cp[p] for cp in pathParameters]
-        ex, ed1, ed2, ed12 = tubeGenerator.generate(
+        ex, ed1, ed2, ed12 = tubeGenerator._generate(
             px, pd1, pd2, pd12, pd3, pd13, elementsCountAround, d2Scale=magnitude(pd1))
         tx.append(ex)
         td1.append(ed1)
         td2.append(ed2)
         td12.append(ed12)
 
+    _rawTubeCoordinatesCache.put(key, (tx, td1, td2, td12))
     return tx, td1, td2, td12
 
 
@@ -4278,6 +4421,14 @@ def resampleTubeCoordinates(rawTubeCoordinates, fixedElementsCountAlong=None,
     second inner index in range(elementsCountAround)
     """
     assert fixedElementsCountAlong or targetElementLength
+    # only untrimmed results are cached as trim surfaces depend on neighbouring segments
+    key = None
+    if not (startSurface or endSurface):
+        key = TubeCoordinatesCache.makeKey(
+            rawTubeCoordinates, fixedElementsCountAlong, targetElementLength, minimumElementsCountAlong)
+        results = _resampledTubeCoordinatesCache.get(key)
+        if results is not None:
+            return results
     px, pd1, pd2, pd12 = rawTubeCoordinates
     pointsCountAlong = len(px)
     endPointLocation = float(pointsCountAlong - 1)
@@ -4366,4 +4517,6 @@ def resampleTubeCoordinates(rawTubeCoordinates, fixedElementsCountAlong=None,
         # smooth magnitudes only
         sd1[p] = smoothCubicHermiteDerivativesLoop(sx[p], td1, fixAllDirections=True)
 
+    if key:
+        _resampledTubeCoordinatesCache.put(key, (sx, sd1, sd2, sd12))
     return sx, sd1, sd2, sd12
@@ -20,6 +20,9 @@ from scaffoldfitter.fitterstepfit import FitterStepFit
 from scaffoldmaker.utils import interpolation as interp
 import copy
 import math
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
 
 
 def interpolateNodesCubicHermite(cache, coordinates, xi, normal_scale,
@@ -994,6 +997,224 @@ def fit_hermite_curve(bx, bd1, px, outlier_length=0.0, region=None, group_name=N
     return cx, cd1
 
 
+def _get_hermite_curve_basis(xi, derivative=0):
+    """
+    Get cubic Hermite basis functions or their derivatives for arrays of element xi.
+    :param xi: Array of element xi values.
+    :param derivative: Derivative order 0, 1 or 2.
+    :return: Array (len(xi), 4) of basis for x1, d1, x2, d2.
+    """
+    xi2 = xi * xi
+    if derivative == 0:
+        xi3 = xi2 * xi
+        return np.stack([1.0 - 3.0 * xi2 + 2.0 * xi3, xi - 2.0 * xi2 + xi3, 3.0 * xi2 - 2.0 * xi3, xi3 - xi2], axis=-1)
+    if derivative == 1:
+        return np.stack([6.0 * (xi2 - xi), 1.0 - 4.0 * xi + 3.0 * xi2, 6.0 * (xi - xi2), 3.0 * xi2 - 2.0 * xi], axis=-1)
+    return np.stack([12.0 * xi - 6.0, 6.0 * xi - 4.0, 6.0 - 12.0 * xi, 6.0 * xi - 2.0], axis=-1)
+
+
+def _evaluate_hermite_curve(ex, e, xi, derivative=0):
+    """
+    Evaluate hermite curve or its derivative at arrays of element index and xi.
+    :param ex: Array (elements_count, 4, components_count) of element parameters x1, d1, x2, d2.
+    :param e: Array of element indexes.
+    :param xi: Array of element xi, same size as e.
+    :param derivative: Derivative order 0, 1 or 2.
+    :return: Array (len(e), components_count).
+    """
+    return np.einsum("pk,pkc->pc", _get_hermite_curve_basis(xi, derivative), ex[e])
+
+
+def _find_nearest_hermite_curve_locations(cx, cd1, px, samples_per_element=8):
+    """
+    Find the nearest locations on a hermite curve to an array of points, by nearest sampled point then Newton
+    iterations on the element, also trying the neighbouring element if the solution reaches an element end.
+    :param cx: Array of curve node coordinates.
+    :param cd1: Array of curve node derivatives.
+    :param px: Array (points_count, components_count) of points to project.
+    :param samples_per_element: Number of points to sample in each element for the initial search.
+    :return: element indexes, xi, projected coordinates (arrays).
+    """
+    elements_count = len(cx) - 1
+    ex = np.stack([cx[:-1], cd1[:-1], cx[1:], cd1[1:]], axis=1)
+    sample_xi = np.arange(samples_per_element) / samples_per_element
+    sample_e = np.repeat(np.arange(elements_count), samples_per_element)
+    sample_e = np.append(sample_e, elements_count - 1)
+    sample_xi = np.append(np.tile(sample_xi, elements_count), 1.0)
+    sample_x = _evaluate_hermite_curve(ex, sample_e, sample_xi)
+    # limit memory used for the distance matrix
+    chunk_size = max(1, 2000000 // len(sample_x))
+    nearest = np.concatenate([
+        np.argmin(((px[i:i + chunk_size, np.newaxis, :] - sample_x[np.newaxis, :, :]) ** 2).sum(axis=2), axis=1)
+        for i in range(0, len(px), chunk_size)])
+
+    def refine(e, xi):
+        for _ in range(10):
+            x = _evaluate_hermite_curve(ex, e, xi)
+            dx = _evaluate_hermite_curve(ex, e, xi, 1)
+            d2x = _evaluate_hermite_curve(ex, e, xi, 2)
+            delta = x - px
+            f = (delta * dx).sum(axis=1)
+            df = (dx * dx).sum(axis=1) + (delta * d2x).sum(axis=1)
+            step = np.where(df > 0.0, -f / np.where(df > 0.0, df, 1.0), np.where(f > 0.0, -0.1, 0.1))
+            xi = np.clip(xi + step, 0.0, 1.0)
+            if np.all(np.abs(step) < 1.0E-8):
+                break
+        return xi, ((_evaluate_hermite_curve(ex, e, xi) - px) ** 2).sum(axis=1)
+
+    e = sample_e[nearest]
+    xi, distance_squared = refine(e, sample_xi[nearest])
+    for end_xi, neighbour_xi, offset in ((0.0, 1.0, -1), (1.0, 0.0, 1)):
+        ne = e + offset
+        mask = (xi == end_xi) & (ne >= 0) & (ne < elements_count)
+        if np.any(mask):
+            ne = np.where(mask, ne, e)
+            nxi, n_distance_squared = refine(ne, np.where(mask, neighbour_xi, xi))
+            better = mask & (n_distance_squared < distance_squared)
+            e = np.where(better, ne, e)
+            xi = np.where(better, nxi, xi)
+            distance_squared = np.where(better, n_distance_squared, distance_squared)
+    return e, xi, _evaluate_hermite_curve(ex, e, xi)
+
+
+def _solve_hermite_curve_fit(rx, rd1, cx, cd1, px, e, xi, curvature_penalty, sliding_factor=0.1):
+    """
+    Solve the linear least squares problem for hermite curve parameters fitting data points at fixed element
+    locations, plus a curvature penalty integrated over reference arc length. Data projections are weighted by the
+    sliding factor in the tangent direction unless the point is off the end of the curve.
+    :param rx, rd1: Arrays of reference curve coordinates and derivatives for the curvature penalty.
+    :param cx, cd1: Arrays of current curve coordinates and derivatives, giving tangents at projections.
+    :param px: Array (points_count, components_count) of data points.
+    :param e, xi: Arrays of element indexes and xi of data point projections.
+    :param curvature_penalty: Penalty factor on squared second derivative w.r.t. arc length.
+    :param sliding_factor: Weight of data projection in tangent direction.
+    :return: Arrays of fitted cx, cd1.
+    """
+    nodes_count, components_count = cx.shape
+    elements_count = nodes_count - 1
+    unknowns_count = 2 * nodes_count * components_count
+    # element parameters x1, d1, x2, d2 for element e are unknown blocks 2e..2e+3, each of components_count
+    block = 2 * e[:, np.newaxis] + np.arange(4)
+    ex = np.stack([cx[:-1], cd1[:-1], cx[1:], cd1[1:]], axis=1)
+    delta = _evaluate_hermite_curve(ex, e, xi) - px
+    tangent = _evaluate_hermite_curve(ex, e, xi, 1)
+    tangent /= np.linalg.norm(tangent, axis=1)[:, np.newaxis]
+    tangent_delta = (tangent * delta).sum(axis=1)
+    # stretch: data beyond the ends of the curve are not allowed to slide
+    stretch = tangent_delta > 0.01 * np.linalg.norm(delta, axis=1)
+    tangent_weight = np.where(stretch, 1.0, sliding_factor)
+    weight = (np.eye(components_count)[np.newaxis, :, :] +
+              (tangent_weight - 1.0)[:, np.newaxis, np.newaxis] * tangent[:, :, np.newaxis] * tangent[:, np.newaxis, :])
+    basis = _get_hermite_curve_basis(xi)
+    component = np.arange(components_count)
+    rows = (block[:, :, np.newaxis] * components_count + component).reshape(len(e), -1)
+    values = (basis[:, :, np.newaxis, np.newaxis, np.newaxis] * basis[:, np.newaxis, np.newaxis, :, np.newaxis] *
+              weight[:, np.newaxis, :, np.newaxis, :]).reshape(len(e), rows.shape[1], rows.shape[1])
+    matrix_rows = [np.broadcast_to(rows[:, :, np.newaxis], values.shape).ravel()]
+    matrix_cols = [np.broadcast_to(rows[:, np.newaxis, :], values.shape).ravel()]
+    matrix_values = [values.ravel()]
+    weighted_px = np.einsum("pab,pb->pa", weight, px)
+    rhs = np.bincount(rows.ravel(), (basis[:, :, np.newaxis] * weighted_px[:, np.newaxis, :]).ravel(),
+                      minlength=unknowns_count)
+
+    if curvature_penalty > 0.0:
+        # integrate |d2x/dS2|^2 over reference arc length S with 3-point Gauss quadrature
+        gauss_xi = np.array([0.5 - math.sqrt(0.15), 0.5, 0.5 + math.sqrt(0.15)])
+        gauss_weights = np.array([5.0, 8.0, 5.0]) / 18.0
+        ge = np.repeat(np.arange(elements_count), 3)
+        gxi = np.tile(gauss_xi, elements_count)
+        gw = np.tile(gauss_weights, elements_count)
+        rex = np.stack([rx[:-1], rd1[:-1], rx[1:], rd1[1:]], axis=1)
+        dX = _evaluate_hermite_curve(rex, ge, gxi, 1)
+        d2X = _evaluate_hermite_curve(rex, ge, gxi, 2)
+        dS = np.linalg.norm(dX, axis=1)
+        d2S = (dX * d2X).sum(axis=1) / dS
+        d2basis = ((_get_hermite_curve_basis(gxi, 2) / dS[:, np.newaxis] -
+                    _get_hermite_curve_basis(gxi, 1) * (d2S / (dS * dS))[:, np.newaxis]) / dS[:, np.newaxis])
+        scale = curvature_penalty * gw * dS
+        gblock = 2 * ge[:, np.newaxis] + np.arange(4)
+        for c in range(components_count):
+            grows = gblock * components_count + c
+            matrix_rows.append(np.broadcast_to(grows[:, :, np.newaxis], (len(ge), 4, 4)).ravel())
+            matrix_cols.append(np.broadcast_to(grows[:, np.newaxis, :], (len(ge), 4, 4)).ravel())
+            matrix_values.append(
+                (scale[:, np.newaxis, np.newaxis] * d2basis[:, :, np.newaxis] * d2basis[:, np.newaxis, :]).ravel())
+
+    matrix = scipy.sparse.coo_matrix(
+        (np.concatenate(matrix_values), (np.concatenate(matrix_rows), np.concatenate(matrix_cols))),
+        shape=(unknowns_count, unknowns_count)).tocsc()
+    solution = scipy.sparse.linalg.spsolve(matrix, rhs).reshape(nodes_count, 2, components_count)
+    return solution[:, 0, :], solution[:, 1, :]
+
+
+def fit_hermite_curve_sparse(bx, bd1, px, outlier_length=0.0, region=None, group_name=None):
+    """
+    Fit 1-D multi-element hermite curve to list of data point coordinates.
+    Alternative to fit_hermite_curve taking the same arguments and performing the same fit steps, but solving the
+    least squares problem directly as a sparse linear system with numpy/scipy, avoiding the cost of setting up a
+    Zinc region and fitter on every call. Data are projected onto the curve, the curve is fitted with data weight
+    reduced in the tangent direction and a curvature penalty, then data are re-projected; outliers are removed and
+    the curve refitted if outlier_length is non-zero.
+    As each fit is solved exactly, results can differ from fit_hermite_curve where its iterative solver stops short
+    of the minimum, e.g. for curves with few elements.
+    :param bx: Initial/before curve coordinates, close to data.
+    :param bd1: Initial/before curve derivatives, close to data.
+    :param px: List of data points [x, y, z] or [x, y] if 2-D to fit to.
+    :param outlier_length: Absolute outlier length for data if positive, or relative outlier length if negative e.g.
+    -0.1 removes data points with projections lengths within 10% of largest projection length. Not used in the first
+    fit iteration. Ignored if zero.
+    :param region: Optional Zinc Region to generate fitted curve and data points in, so available for re-use after
+    call. Region is expected to be empty.
+    :param group_name: Optional name of group to put fit elements and data in, or None to use default "curve".
+    :return: cx, cd1 (lists of hermite coordinates and derivatives)
+    """
+    points_count = len(px)
+    elements_count = len(bx) - 1
+    curve_length = interp.getCubicHermiteCurvesLength(bx, bd1)
+    rx = np.array(bx, dtype=float)
+    rd1 = np.array(bd1, dtype=float)
+    data_x = np.array(px, dtype=float)
+    # aim for no more than 25 points per element, selected in the same way as scaffoldfitter:
+    points_per_element = 25
+    data_proportion = min(1.0, points_per_element * elements_count / points_count)
+    if data_proportion < 1.0:
+        selected = []
+        proportion = 0.5
+        for p in range(points_count):
+            proportion += data_proportion
+            if proportion >= 1.0:
+                selected.append(p)
+                proportion -= 1.0
+        data_x = data_x[selected]
+    # calibrated by scaling the model: a power of 3 relationship
+    curvature_penalty = ((points_count * data_proportion) / (points_per_element * elements_count) *
+                         1.0E-6 * (curve_length ** 3))
+
+    e, xi, projection_x = _find_nearest_hermite_curve_locations(rx, rd1, data_x)
+    cx, cd1 = _solve_hermite_curve_fit(rx, rd1, rx, rd1, data_x, e, xi, curvature_penalty)
+    e, xi, projection_x = _find_nearest_hermite_curve_locations(cx, cd1, data_x)
+
+    if outlier_length != 0.0:
+        projection_lengths = np.linalg.norm(projection_x - data_x, axis=1)
+        max_length = (outlier_length if (outlier_length > 0.0) else
+                      (1.0 + outlier_length) * np.max(projection_lengths))
+        inlier = projection_lengths <= max_length
+        data_x = data_x[inlier]
+        e = e[inlier]
+        xi = xi[inlier]
+        cx, cd1 = _solve_hermite_curve_fit(rx, rd1, cx, cd1, data_x, e, xi, curvature_penalty)
+
+    cx = cx.tolist()
+    cd1 = cd1.tolist()
+    if region:
+        curve_group_name = group_name if group_name else "curve"
+        fieldmodule = region.getFieldmodule()
+        with ChangeManager(fieldmodule):
+            generate_curve_mesh(region, cx, cd1, group_name=curve_group_name)
+            generate_datapoints(region, px, group_name=curve_group_name)
+    return cx, cd1
+
+
 def define_and_fit_field(region, coordinate_field_name, data_coordinate_field_name, fit_field_name,
                          gradient1_penalty, gradient2_penalty, group_name=None):
     """
@@ -0,0 +1,83 @@
+import unittest
+from testutils import assertAlmostEqualList
+
+from cmlibs.utils.zinc.finiteelement import evaluateFieldNodesetRange
+from cmlibs.zinc.context import Context
+from cmlibs.zinc.field import Field
+from cmlibs.zinc.result import RESULT_OK
+from scaffoldmaker.meshtypes.meshtype_1d_bifurcationtree1 import MeshType_1d_bifurcationtree1
+
+
+class BifurcationTreeScaffoldTestCase(unittest.TestCase):
+
+    def test_bifurcationtree1(self):
+        """
+        Test creation of bifurcation tree scaffold, including a deep tree generated breadth-first.
+        """
+        scaffold = MeshType_1d_bifurcationtree1
+        parameterSetNames = scaffold.getParameterSetNames()
+        self.assertEqual(parameterSetNames, ["Default"])
+        options = scaffold.getDefaultOptions("Default")
+        self.assertEqual(8, len(options))
+        self.assertEqual(8, options.get("Number of generations"))
+
+        for generationCount, expectedRanges, lastNodeX in (
+                (8, ([-2.214653623146991, -1.6265910142766151, 0.0],
+                     [2.214653623146991, 1.6265910142766151, 3.4760677737796164],
+                     0.010030613004288008),
+                 [-1.253231388031896, 1.003791198133554, 3.3520575238120345]),
+                (14, ([-2.7322189445070437, -2.156105698109937, 0.0],
+                      [2.7322189445070437, 2.156105698109937, 4.0193730136065025],
+                      0.0013974055172471063),
+                 [-1.5086218104669673, 1.1827774884303532, 3.816118211866948])):
+            options["Number of generations"] = generationCount
+            context = Context("Test")
+            region = context.getDefaultRegion()
+            self.assertTrue(region.isValid())
+            annotationGroups, bifurcationTree = scaffold.generateBaseMesh(region, options)
+            self.assertEqual(0, len(annotationGroups))
+
+            fieldmodule = region.getFieldmodule()
+            nodesCount = 2 ** generationCount
+            mesh1d = fieldmodule.findMeshByDimension(1)
+            self.assertEqual(nodesCount - 1, mesh1d.getSize())
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            self.assertEqual(nodesCount, nodes.getSize())
+            coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+            self.assertTrue(coordinates.isValid())
+            radius = fieldmodule.findFieldByName("radius").castFiniteElement()
+            self.assertTrue(radius.isValid())
+            minimums, maximums = evaluateFieldNodesetRange(coordinates, nodes)
+            assertAlmostEqualList(self, minimums, expectedRanges[0], 1.0E-6)
+            assertAlmostEqualList(self, maximums, expectedRanges[1], 1.0E-6)
+            minimumRadius, maximumRadius = evaluateFieldNodesetRange(radius, nodes)
+            self.assertAlmostEqual(minimumRadius, expectedRanges[2], delta=1.0E-9)
+            self.assertAlmostEqual(maximumRadius, 0.125, delta=1.0E-9)
+
+            # nodes and elements are numbered depth-first
+            fieldcache = fieldmodule.createFieldcache()
+            fieldcache.setNode(nodes.findNodeByIdentifier(nodesCount))
+            result, x = coordinates.evaluateReal(fieldcache, 3)
+            self.assertEqual(RESULT_OK, result)
+            assertAlmostEqualList(self, x, lastNodeX, 1.0E-6)
+            for elementIdentifier, expectedNodeIdentifiers in (
+                    (1, [1, 2]), (generationCount + 1, [generationCount, generationCount + 2]),
+                    (nodesCount - 1, [nodesCount - 2, nodesCount])):
+                element = mesh1d.findElementByIdentifier(elementIdentifier)
+                for field in (coordinates, radius):
+                    eft = element.getElementfieldtemplate(field, -1)
+                    self.assertEqual(expectedNodeIdentifiers, [element.getNode(eft, n).getIdentifier() for n in (1, 2)])
+
+        # check tree nodes created on demand
+        rootNode = bifurcationTree.getRootNode()
+        x1, d1, r1, x2, d2, r2 = rootNode.getChildCurve(0)
+        assertAlmostEqualList(self, x1, [0.0, 0.0, 0.0], 1.0E-12)
+        assertAlmostEqualList(self, x2, [0.0, 0.0, 1.0], 1.0E-12)
+        self.assertAlmostEqual(r1, 0.125, delta=1.0E-12)
+        self.assertAlmostEqual(r2, 0.1, delta=1.0E-12)
+        x1, d1, r1, x2, d2, r2 = rootNode.getChild(0).getChildCurve(1)
+        self.assertAlmostEqual(r1, 0.09, delta=1.0E-12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import math
 import unittest
 
 from cmlibs.utils.zinc.finiteelement import evaluateFieldNodesetRange
@@ -6,6 +7,7 @@ from cmlibs.zinc.context import Context
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.result import RESULT_OK
 from scaffoldmaker.meshtypes.meshtype_3d_solidcylinder1 import MeshType_3d_solidcylinder1
+from scaffoldmaker.utils.cylindermesh import Ellipse2D
 
 from testutils import assertAlmostEqualList
 
@@ -59,6 +61,37 @@ class CylinderScaffoldTestCase(unittest.TestCase):
         self.assertEqual(result, RESULT_OK)
         self.assertAlmostEqual(volume, 9.414866630615249, delta=1.0E-3)
 
+    def test_ellipse_template(self):
+        """
+        Test mapping an ellipse from a template by a similarity transformation gives the same nodes as generating it.
+        """
+        elementsCountAcrossShell = 1
+        shellProportion = 0.25
+        template = Ellipse2D([0.1, 0.2, 0.3], [1.0, 0.0, 0.0], [0.0, 0.6, 0.0], 8, 6, elementsCountAcrossShell, 1,
+                             shellProportion, 0.9, 0.48)
+        # rotate by 40 degrees around z and scale by 2.5
+        cosAngle = math.cos(math.radians(40.0))
+        sinAngle = math.sin(math.radians(40.0))
+        centre = [1.0, -2.0, 5.0]
+        majorAxis = [2.5 * cosAngle, 2.5 * sinAngle, 0.0]
+        minorAxis = [-1.5 * sinAngle, 1.5 * cosAngle, 0.0]
+        self.assertTrue(template.isTemplateFor(majorAxis, minorAxis, 2.25, 1.2))
+        self.assertFalse(template.isTemplateFor(majorAxis, minorAxis, 2.25, 1.0))
+        self.assertFalse(template.isTemplateFor(majorAxis, [0.0, 1.5, 0.0], 2.25, 1.2))
+        generated = Ellipse2D(centre, majorAxis, minorAxis, 8, 6, elementsCountAcrossShell, 1, shellProportion,
+                              2.25, 1.2)
+        mapped = Ellipse2D(centre, majorAxis, minorAxis, 8, 6, elementsCountAcrossShell, 1, shellProportion,
+                           2.25, 1.2, template=template)
+        TOL = 1.0E-7
+        for expectedParameters, actualParameters in ((generated.px, mapped.px), (generated.pd1, mapped.pd1),
+                                                     (generated.pd2, mapped.pd2), (generated.pd3, mapped.pd3)):
+            for expectedRow, actualRow in zip(expectedParameters, actualParameters):
+                for expected, actual in zip(expectedRow, actualRow):
+                    if expected is None:
+                        self.assertIsNone(actual)
+                    else:
+                        assertAlmostEqualList(self, expected, actual, TOL)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,8 +4,11 @@ from cmlibs.zinc.context import Context
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
 from cmlibs.zinc.result import RESULT_OK
+from concurrent.futures import ProcessPoolExecutor
 from scaffoldmaker.meshtypes.meshtype_3d_ellipsoid1 import MeshType_3d_ellipsoid1
+from scaffoldmaker.utils.ellipsoidmesh import EllipsoidMesh
 from testutils import assertAlmostEqualList
+import math
 import unittest
 
 
@@ -182,6 +185,26 @@ class EllipsoidScaffoldTestCase(unittest.TestCase):
                 self.assertTrue(name in ["left", "right", "back", "front", "bottom", "top"])
                 self.assertEqual(68, annotation_group.getMeshGroup(mesh3d).getSize())
 
+    def test_ellipsoid_build_concurrent(self):
+        """
+        Test building ellipsoid octants concurrently in other processes gives identical parameters.
+        """
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        group = region.getFieldmodule().createFieldGroup()
+        parameters = []
+        for executor in (None, ProcessPoolExecutor(max_workers=2)):
+            ellipsoid = EllipsoidMesh(1.0, 1.5, 2.0, [4, 6, 8], 1, 0.0, 0.5 * math.pi)
+            # zinc groups cannot be pickled so must be omitted when sent to another process
+            ellipsoid.set_box_transition_groups(group, group)
+            if executor:
+                with executor:
+                    ellipsoid.build(executor)
+            else:
+                ellipsoid.build()
+            parameters.append(ellipsoid._nx)
+        self.assertEqual(parameters[0], parameters[1])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -9,6 +9,7 @@ from cmlibs.zinc.result import RESULT_OK
 from scaffoldmaker.annotation.annotationgroup import getAnnotationGroupForTerm
 from scaffoldmaker.annotation.heart_terms import get_heart_term
 from scaffoldmaker.meshtypes.meshtype_3d_heart1 import MeshType_3d_heart1
+from scaffoldmaker.meshtypes.meshtype_3d_heartventricles3 import MeshType_3d_heartventricles3
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 
 from testutils import assertAlmostEqualList
@@ -16,6 +17,33 @@ from testutils import assertAlmostEqualList
 
 class HeartScaffoldTestCase(unittest.TestCase):
 
+    def test_heart_check_options(self):
+        """
+        Test dependent option changes made by heart checkOptions, including for preview options.
+        """
+        # atria options are checked even when ventricles options change
+        options = MeshType_3d_heart1.getDefaultOptions("Human 1")
+        options["Number of elements around LV free wall"] = 1
+        options["Number of elements over atria"] = 7
+        self.assertTrue(MeshType_3d_heart1.checkOptions(options))
+        self.assertEqual(7, options["Number of elements around LV free wall"])
+        self.assertEqual(8, options["Number of elements over atria"])
+        # heart atria only support 6, 8 or 10 elements over atria
+        previewOptions = MeshType_3d_heart1.getPreviewOptions(MeshType_3d_heart1.getDefaultOptions())
+        self.assertEqual(6, previewOptions["Number of elements over atria"])
+        self.assertEqual(6, previewOptions["Number of elements around left atrium free wall"])
+
+        # LV free wall needs 4 more elements around than up apex, and an even count with an even septum count
+        options = MeshType_3d_heartventricles3.getDefaultOptions("Pig 1")
+        self.assertEqual(1, options["Number of elements up LV apex"])
+        self.assertEqual(6, options["Number of elements across septum"])
+        options["Number of elements around LV free wall"] = 4
+        self.assertTrue(MeshType_3d_heartventricles3.checkOptions(options))
+        self.assertEqual(6, options["Number of elements around LV free wall"])
+        options["Number of elements around LV free wall"] = 7
+        self.assertTrue(MeshType_3d_heartventricles3.checkOptions(options))
+        self.assertEqual(8, options["Number of elements around LV free wall"])
+
     def test_heart1(self):
         """
         Test creation of heart scaffold.
@@ -1,6 +1,8 @@
 import math
 import unittest
+from unittest.mock import patch
 
+import numpy as np
 from cmlibs.maths.vectorops import magnitude
 from cmlibs.utils.zinc.finiteelement import evaluateFieldNodesetRange
 from cmlibs.utils.zinc.general import ChangeManager
@@ -17,9 +19,12 @@ from scaffoldmaker.meshtypes.meshtype_2d_tubenetwork1 import MeshType_2d_tubenet
 from scaffoldmaker.meshtypes.meshtype_3d_boxnetwork1 import MeshType_3d_boxnetwork1
 from scaffoldmaker.meshtypes.meshtype_3d_tubenetwork1 import MeshType_3d_tubenetwork1
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
+from scaffoldmaker.utils.networkmesh import (
+    NetworkMesh, NetworkNode, NetworkSegment, getNetworkStructureArrays, getNetworkStructureString)
+from scaffoldmaker.utils.tubenetworkmesh import TubeNetworkMeshBuilder, TubeNetworkMeshGenerateData
 from scaffoldmaker.utils.zinc_utils import get_nodeset_path_ordered_field_parameters
 
-from testutils import assertAlmostEqualList
+from testutils import assertAlmostEqualList, countFunctionCalls
 
 
 class NetworkScaffoldTestCase(unittest.TestCase):
@@ -81,6 +86,121 @@ class NetworkScaffoldTestCase(unittest.TestCase):
         assertAlmostEqualList(self, nd1[0], expected_nd, 1.0E-6)
         assertAlmostEqualList(self, nd1[1], expected_nd, 1.0E-6)
 
+    def test_network_layout_arrays(self):
+        """
+        Test bulk creation of 1-D network layout from arrays of node coordinates and radii.
+        """
+        networkMesh = NetworkMesh("1-2-3,3-4,3.2-5")
+        nodeIdentifiers, versionsCounts, elementNodeIndexes, elementNodeVersions = networkMesh.getLayoutArrays()
+        self.assertEqual([1, 2, 3, 4, 5], nodeIdentifiers.tolist())
+        self.assertEqual([1, 1, 2, 1, 1], versionsCounts.tolist())
+        self.assertEqual([[0, 1], [1, 2], [2, 3], [2, 4]], elementNodeIndexes.tolist())
+        self.assertEqual([[1, 1], [1, 1], [1, 1], [2, 1]], elementNodeVersions.tolist())
+
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        fieldmodule = region.getFieldmodule()
+        x = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0], [2.0, 0.0, 1.0], [3.0, 1.0, 0.0]])
+        with ChangeManager(fieldmodule):
+            networkMesh.create1DLayoutMesh(region, x=x, radius=np.array([0.1, 0.2, 0.3, 0.4, 0.5]))
+        mesh1d = fieldmodule.findMeshByDimension(1)
+        self.assertEqual(4, mesh1d.getSize())
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self.assertEqual(5, nodes.getSize())
+        self.assertEqual([[1, 2], [3], [4]], [networkSegment.getElementIdentifiers()
+                                             for networkSegment in networkMesh.getNetworkSegments()])
+        coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+        fieldcache = fieldmodule.createFieldcache()
+        s = math.sqrt(0.5)
+        expectedNodeParameters = [
+            (1, 1, [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.1, 0.0], [0.0, 0.0, 0.1]),
+            (2, 1, [1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.2, 0.0], [0.0, 0.0, 0.2]),
+            (3, 1, [2.0, 0.0, 0.0], [0.5, 0.0, 0.5], [0.0, 0.3, 0.0], [-0.3 * s, 0.0, 0.3 * s]),
+            (3, 2, [2.0, 0.0, 0.0], [1.0, 1.0, 0.0], [-0.3 * s, 0.3 * s, 0.0], [0.0, 0.0, 0.3]),
+            (4, 1, [2.0, 0.0, 1.0], [0.0, 0.0, 1.0], [0.0, -0.4, 0.0], [0.4, 0.0, 0.0]),
+            (5, 1, [3.0, 1.0, 0.0], [1.0, 1.0, 0.0], [-0.5 * s, 0.5 * s, 0.0], [0.0, 0.0, 0.5])]
+        for nodeIdentifier, nodeVersion, expectedX, expectedD1, expectedD2, expectedD3 in expectedNodeParameters:
+            fieldcache.setNode(nodes.findNodeByIdentifier(nodeIdentifier))
+            for valueLabel, version, expectedValues in (
+                    (Node.VALUE_LABEL_VALUE, 1, expectedX), (Node.VALUE_LABEL_D_DS1, nodeVersion, expectedD1),
+                    (Node.VALUE_LABEL_D_DS2, nodeVersion, expectedD2),
+                    (Node.VALUE_LABEL_D_DS3, nodeVersion, expectedD3)):
+                result, values = coordinates.getNodeParameters(fieldcache, -1, valueLabel, version, 3)
+                self.assertEqual(RESULT_OK, result)
+                assertAlmostEqualList(self, values, expectedValues, 1.0E-12)
+
+    def test_network_mesh_build_scaling(self):
+        """
+        Test building a large network structure makes each segment once without splitting, that the work done scales
+        linearly with size, and check structure arrays build the same network as structure strings.
+        """
+        def getCombStructureString(trunkNodesCount):
+            """
+            :return: Trunk sequence with 2-element branches from each interior node, which must split the trunk at
+            each branch.
+            """
+            return ",".join(["-".join(str(n) for n in range(1, trunkNodesCount + 1))] +
+                            ["%d-%d-%d" % (n, trunkNodesCount + 2 * n, trunkNodesCount + 2 * n + 1)
+                             for n in range(2, trunkNodesCount)])
+
+        # count calls as a measure of work which, unlike timing, is repeatable: 4 times the size must be
+        # close to 4 times the work, while quadratic would be 16 times
+        smallCallsCount = countFunctionCalls(NetworkMesh, getCombStructureString(500))[1]
+        largeCallsCount = countFunctionCalls(NetworkMesh, getCombStructureString(2000))[1]
+        self.assertLess(largeCallsCount, 5 * smallCallsCount)
+
+        trunkNodesCount = 2000
+        structureString = getCombStructureString(trunkNodesCount)
+        segmentsCreatedCount = 0
+        networkSegmentInit = NetworkSegment.__init__
+
+        def countingNetworkSegmentInit(networkSegment, *args, **kwargs):
+            nonlocal segmentsCreatedCount
+            segmentsCreatedCount += 1
+            networkSegmentInit(networkSegment, *args, **kwargs)
+
+        # splitting segments while parsing was quadratic in the number of segments
+        with patch.object(NetworkSegment, "__init__", countingNetworkSegmentInit), \
+                patch.object(NetworkSegment, "split") as networkSegmentSplit:
+            networkMesh = NetworkMesh(structureString)
+        networkSegmentSplit.assert_not_called()
+        self.assertEqual(3 * trunkNodesCount - 4, len(networkMesh.getNetworkNodes()))
+        networkSegments = networkMesh.getNetworkSegments()
+        self.assertEqual(2 * trunkNodesCount - 3, len(networkSegments))
+        self.assertEqual(len(networkSegments), segmentsCreatedCount)
+        self.assertEqual([1, 2], networkSegments[0].getNodeIdentifiers())
+        self.assertEqual([trunkNodesCount - 1, trunkNodesCount],
+                         networkSegments[trunkNodesCount - 2].getNodeIdentifiers())
+        self.assertEqual([2, trunkNodesCount + 4, trunkNodesCount + 5],
+                         networkSegments[trunkNodesCount - 1].getNodeIdentifiers())
+
+        structureString = "1-2-4-5-6,3-4.2-7,5-8,#-8-9"
+        structureArrays = getNetworkStructureArrays(structureString)
+        self.assertEqual([1, 2, 4, 5, 6, 3, 4, 7, 5, 8, 8, 9], structureArrays[0].tolist())
+        self.assertEqual([1, 1, 1, 1, 1, 1, 2, 1, 1, 1, 1, 1], structureArrays[1].tolist())
+        self.assertEqual([0, 5, 8, 10, 12], structureArrays[2].tolist())
+        self.assertEqual([False, False, False, True], structureArrays[3].tolist())
+        self.assertEqual(structureString, getNetworkStructureString(structureArrays))
+        networkMesh = NetworkMesh(structureArrays)
+        expectedSegmentNodeIdentifiers = [[1, 2, 4], [4, 5], [5, 6], [3, 4], [4, 7], [5, 8], [8, 9]]
+        self.assertEqual(expectedSegmentNodeIdentifiers, [networkSegment.getNodeIdentifiers()
+                                                          for networkSegment in networkMesh.getNetworkSegments()])
+        self.assertEqual([False] * 6 + [True], [networkSegment.isPatch()
+                                                for networkSegment in networkMesh.getNetworkSegments()])
+        # compact arrays from built network have one sequence per segment and rebuild the same network
+        networkMesh = NetworkMesh(networkMesh.getStructureArrays())
+        self.assertEqual(expectedSegmentNodeIdentifiers, [networkSegment.getNodeIdentifiers()
+                                                          for networkSegment in networkMesh.getNetworkSegments()])
+        self.assertEqual([1, 2, 4, 5, 6, 3, 7, 8, 9], list(networkMesh.getNetworkNodes().keys()))
+
+        # split retains patch state
+        networkNodes = [NetworkNode(nodeIdentifier) for nodeIdentifier in (1, 2, 4)]
+        networkSegment = NetworkSegment(networkNodes, [1, 1, 1], True)
+        nextSegment = networkSegment.split(networkNodes[1])
+        self.assertEqual([1, 2], networkSegment.getNodeIdentifiers())
+        self.assertEqual([2, 4], nextSegment.getNodeIdentifiers())
+        self.assertTrue(nextSegment.isPatch())
+
     def test_2d_tube_network_bifurcation(self):
         """
         Test 2D tube bifurcation is generated correctly.
@@ -1298,6 +1418,81 @@ class NetworkScaffoldTestCase(unittest.TestCase):
             self.assertAlmostEqual(outerSurfaceArea, 1.9681077595642782, delta=1.0E-6)
             self.assertAlmostEqual(innerSurfaceArea, 1.5745958498454014, delta=1.0E-6)
 
+    def test_3d_tube_network_rebuild(self):
+        """
+        Test incremental rebuild of 3-D tube network after editing a layout node matches a full build.
+        """
+        context = Context("Test")
+        region = context.getDefaultRegion()
+        layoutRegion = region.createChild("layout")
+        layoutSettings = MeshType_1d_network_layout1.getDefaultOptions()
+        layoutSettings["Structure"] = "1-2.1,2.2-3,2.3-4-5,5-6"
+        layoutSettings["Define inner coordinates"] = True
+        _, networkMesh = MeshType_1d_network_layout1.generateBaseMesh(layoutRegion, layoutSettings)
+
+        def generateTubeNetwork(tubeRegion):
+            tubeNetworkMeshBuilder = TubeNetworkMeshBuilder(networkMesh, 4.0, isCore=True)
+            tubeNetworkMeshBuilder.build()
+            generateData = TubeNetworkMeshGenerateData(tubeRegion, 3)
+            with ChangeManager(tubeRegion.getFieldmodule()):
+                tubeNetworkMeshBuilder.generateMesh(generateData)
+            return tubeNetworkMeshBuilder, generateData
+
+        def getVolume(tubeRegion):
+            fieldmodule = tubeRegion.getFieldmodule()
+            coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+            volumeField = fieldmodule.createFieldMeshIntegral(
+                fieldmodule.createFieldConstant(1.0), coordinates, fieldmodule.findMeshByDimension(3))
+            volumeField.setNumbersOfPoints(4)
+            result, volume = volumeField.evaluateReal(fieldmodule.createFieldcache(), 1)
+            self.assertEqual(result, RESULT_OK)
+            return volume
+
+        tubeRegion = region.createChild("tube")
+        tubeNetworkMeshBuilder, generateData = generateTubeNetwork(tubeRegion)
+        fieldmodule = tubeRegion.getFieldmodule()
+        mesh3d = fieldmodule.findMeshByDimension(3)
+        nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        self.assertEqual(200, mesh3d.getSize())
+        self.assertEqual(284, nodes.getSize())
+        self.assertEqual((285, 201), generateData.getNodeElementIdentifiers())
+        self.assertAlmostEqual(getVolume(tubeRegion), 0.16403791558724726, delta=1.0E-6)
+        element1 = mesh3d.findElementByIdentifier(1)
+        element1Nodes = [element1.getNode(element1.getElementfieldtemplate(
+            fieldmodule.findFieldByName("coordinates"), -1), ln).getIdentifier() for ln in range(1, 9)]
+
+        # move end node 6 and rebuild
+        layoutFieldmodule = layoutRegion.getFieldmodule()
+        layoutFieldcache = layoutFieldmodule.createFieldcache()
+        layoutNodes = layoutFieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+        layoutFieldcache.setNode(layoutNodes.findNodeByIdentifier(6))
+        for fieldName in ("coordinates", "inner coordinates"):
+            layoutCoordinates = layoutFieldmodule.findFieldByName(fieldName).castFiniteElement()
+            result, x = layoutCoordinates.getNodeParameters(layoutFieldcache, -1, Node.VALUE_LABEL_VALUE, 1, 3)
+            layoutCoordinates.setNodeParameters(
+                layoutFieldcache, -1, Node.VALUE_LABEL_VALUE, 1, [x[0] - 0.1, x[1] + 0.2, x[2]])
+        self.assertEqual([[5, 6]], [networkSegment.getNodeIdentifiers()
+                                    for networkSegment in networkMesh.getNetworkSegmentsUsingNodes([6])])
+        rebuildNetworkSegments = tubeNetworkMeshBuilder.rebuild([6])
+        self.assertEqual([[2, 4, 5], [5, 6]], [networkSegment.getNodeIdentifiers()
+                                               for networkSegment in rebuildNetworkSegments])
+        with ChangeManager(fieldmodule):
+            tubeNetworkMeshBuilder.generateMesh(generateData)
+        self.assertEqual(200, mesh3d.getSize())
+        self.assertEqual(284, nodes.getSize())
+        # freed identifiers are reused, and elements of segments not rebuilt are unchanged
+        self.assertEqual((285, 201), generateData.getNodeElementIdentifiers())
+        element1 = mesh3d.findElementByIdentifier(1)
+        self.assertEqual(element1Nodes, [element1.getNode(element1.getElementfieldtemplate(
+            fieldmodule.findFieldByName("coordinates"), -1), ln).getIdentifier() for ln in range(1, 9)])
+        volume = getVolume(tubeRegion)
+        self.assertAlmostEqual(volume, 0.16018294089995808, delta=1.0E-6)
+
+        # compare with full build from edited layout
+        fullRegion = region.createChild("full")
+        generateTubeNetwork(fullRegion)
+        self.assertAlmostEqual(volume, getVolume(fullRegion), delta=1.0E-12)
+
 
 if __name__ == "__main__":
     unittest.main()
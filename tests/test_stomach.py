@@ -12,6 +12,7 @@ from scaffoldmaker.annotation.esophagus_terms import get_esophagus_term
 from scaffoldmaker.annotation.smallintestine_terms import get_smallintestine_term
 from scaffoldmaker.annotation.stomach_terms import get_stomach_term
 from scaffoldmaker.meshtypes.meshtype_3d_stomach1 import MeshType_3d_stomach1
+from scaffoldmaker.meshtypes.meshtype_3d_stomachhuman1 import MeshType_3d_stomachhuman1
 from scaffoldmaker.utils.meshrefinement import MeshRefinement
 from scaffoldmaker.utils.zinc_utils import createFaceMeshGroupExteriorOnFace
 
@@ -179,6 +180,39 @@ class StomachScaffoldTestCase(unittest.TestCase):
         self.assertEqual(5888, element.getIdentifier())
         assertAlmostEqualList(self, xi, [1.0, 1.0, 1.0], 1.0E-06)
 
+    def test_stomachhuman1(self):
+        """
+        Test creation of human stomach scaffold embedded in shared host mesh.
+        """
+        scaffold = MeshType_3d_stomachhuman1
+        options = scaffold.getDefaultOptions()
+        self.assertEqual(4, len(options))
+        for optionsUpdate, expectedNodesCount, expectedElementsCount, expectedRange in (
+                ({}, 384, 264,
+                 ([-0.416169638, -0.471842385, -0.561783177], [0.581554563, 0.525356025, 0.406414029])),
+                ({"Number of elements along the axis": 14, "Number of elements along the circumference": 12,
+                  "Normalize Circumferential Segment Lengths": False}, 720, 504,
+                 ([-0.417614854, -0.473411148, -0.580368979], [0.592195147, 0.538954394, 0.430809448]))):
+            options.update(optionsUpdate)
+            context = Context("Test")
+            region = context.getDefaultRegion()
+            self.assertTrue(region.isValid())
+            annotationGroups = scaffold.generateBaseMesh(region, options)[0]
+            self.assertEqual(0, len(annotationGroups))
+
+            fieldmodule = region.getFieldmodule()
+            nodes = fieldmodule.findNodesetByFieldDomainType(Field.DOMAIN_TYPE_NODES)
+            self.assertEqual(expectedNodesCount, nodes.getSize())
+            self.assertEqual(expectedElementsCount, fieldmodule.findMeshByDimension(3).getSize())
+            coordinates = fieldmodule.findFieldByName("coordinates").castFiniteElement()
+            minimums, maximums = evaluateFieldNodesetRange(coordinates, nodes)
+            assertAlmostEqualList(self, minimums, expectedRange[0], 1.0E-6)
+            assertAlmostEqualList(self, maximums, expectedRange[1], 1.0E-6)
+            fibres = fieldmodule.findFieldByName("fibres").castFiniteElement()
+            minimums, maximums = evaluateFieldNodesetRange(fibres, nodes)
+            assertAlmostEqualList(self, minimums, [0.0, 0.0, 0.0], 1.0E-6)
+            assertAlmostEqualList(self, maximums, [1.570796327, 0.0, 0.0], 1.0E-6)
+
 
 if __name__ == "__main__":
     unittest.main()
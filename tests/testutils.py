@@ -1,9 +1,34 @@
 """
 Utility function for tests.
 """
+import sys
+
 
 def assertAlmostEqualList(testcase, actualList, expectedList, delta):
     assert len(actualList) == len(expectedList)
     for actual, expected in zip(actualList, expectedList):
         testcase.assertAlmostEqual(actual, expected, delta=delta,
                                    msg=str(actualList) + " != " + str(expectedList))
+
+
+def countFunctionCalls(function, *args, **kwargs):
+    """
+    Count Python and built-in function calls made while calling function, as a measure of work done for checking
+    how it scales with problem size which, unlike timing, does not vary with machine load.
+    :param function: Function to call.
+    :param args, kwargs: Arguments to pass to function.
+    :return: Result of function, number of calls.
+    """
+    callsCount = 0
+
+    def profile(frame, event, arg):
+        nonlocal callsCount
+        if event in ("call", "c_call"):
+            callsCount += 1
+
+    sys.setprofile(profile)
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        sys.setprofile(None)
+    return result, callsCount